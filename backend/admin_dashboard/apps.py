@@ -1,7 +1,21 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
 
 
 class AdminDashboardConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "admin_dashboard"
     verbose_name = "Admin Dashboard"
+
+    def ready(self):
+        from . import jobs  # noqa: F401 - registers the periodic jobs
+
+        if getattr(settings, 'SCHEDULER_ENABLED', False):
+            from .scheduler import start_scheduler
+
+            request_started.connect(
+                lambda **kwargs: start_scheduler(),
+                weak=False,
+                dispatch_uid='admin_dashboard.start_scheduler',
+            )
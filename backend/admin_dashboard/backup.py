@@ -0,0 +1,387 @@
+# admin_dashboard/backup.py
+
+"""
+Streaming backup and restore.
+
+A backup is a compressed NDJSON archive. Tables are read model by model with
+``.iterator()`` and written in chunks of ``BACKUP_CHUNK_SIZE`` rows, so memory
+use stays flat however large the tables are. The archive is a sequence of JSON
+lines:
+
+    {"type": "header", "version": 1, "kind": "full", "since": null, ...}
+    {"type": "model", "model": "clients_app.client", "fields": ["id", ...]}
+    {"type": "chunk", "model": "clients_app.client", "sha256": "...", "rows": [[...], ...]}
+    ...
+    {"type": "footer", "counts": {"clients_app.client": 120, ...}}
+
+Each chunk carries the SHA-256 of its rows, which restore verifies before
+writing anything from it. An archive without a footer is treated as
+truncated.
+
+Incremental backups only contain rows whose ``updated_at`` (or, for models
+without one, ``created_at``) is later than the start of the last completed
+backup; models with neither are copied in full. Deleted rows are not
+tracked, so restoring means replaying the last full backup followed by the
+incrementals taken after it.
+
+Archives are gzip-compressed, or zstd-compressed when
+``BACKUP_COMPRESSION = 'zstd'`` and the ``zstandard`` package is installed.
+
+Backups requested through the API are queued (``queue_backup``) and run by
+the ``run_backups`` scheduler job, one at a time; a backup still marked
+running after ``BACKUP_TIMEOUT`` is failed as interrupted. When the
+scheduler is off (``SCHEDULER_ENABLED``), a queued backup is run on a
+single background thread of this process instead, once queued.
+
+Restores only run from the ``restore_backup`` management command: while
+``restore_archive`` runs, ``auto_now``/``auto_now_add`` are switched off on
+the model fields of the whole process, so it must not run in a process
+that also serves requests or scheduled jobs.
+"""
+
+import datetime
+import gzip
+import hashlib
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import BackupRecord
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+FORMAT_VERSION = 1
+DEFAULT_CHUNK_SIZE = 2000
+# Longest a backup may run; also the run_backups job's lease
+BACKUP_TIMEOUT = datetime.timedelta(hours=6)
+ACTIVE_STATUSES = ('pending', 'running')
+
+DEFAULT_APPS = [
+    'auth', 'admin_dashboard', 'inquiries', 'invoices_app', 'clients_app',
+    'time_logs_app', 'projects_app', 'analytics_app', 'api',
+]
+# Rebuilt by migrate, or only meaningful for the running instance
+DEFAULT_EXCLUDE = [
+    'auth.permission', 'admin_dashboard.backuprecord', 'admin_dashboard.scheduledjob',
+]
+
+
+def backup_models():
+    """Models included in backups, auto-created M2M tables included."""
+    app_labels = getattr(settings, 'BACKUP_APPS', DEFAULT_APPS)
+    exclude = set(getattr(settings, 'BACKUP_EXCLUDE_MODELS', DEFAULT_EXCLUDE))
+    return [
+        model for model in apps.get_models(include_auto_created=True)
+        if model._meta.app_label in app_labels and model._meta.label_lower not in exclude
+    ]
+
+
+def _compression():
+    if getattr(settings, 'BACKUP_COMPRESSION', 'gzip') == 'zstd' and zstandard is not None:
+        return 'zst'
+    return 'gz'
+
+
+def _open_archive(path, mode):
+    """Open ``path`` as a text stream, compressing or decompressing by suffix."""
+    path = Path(path)
+    if path.suffix == '.zst':
+        if zstandard is None:
+            raise Exception("zstandard is required to read or write .zst backups")
+        raw = open(path, mode + 'b')
+        if mode == 'w':
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    return gzip.open(path, mode + 't', encoding='utf-8')
+
+
+class ArchiveEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder without its truncation of times to milliseconds."""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _dumps(value):
+    return json.dumps(value, cls=ArchiveEncoder, separators=(',', ':'))
+
+
+def _checksum(rows_json):
+    return hashlib.sha256(rows_json.encode('utf-8')).hexdigest()
+
+
+def _change_field(model):
+    for name in ('updated_at', 'created_at'):
+        try:
+            return model._meta.get_field(name).name
+        except FieldDoesNotExist:
+            continue
+    return None
+
+
+def last_completed_backup():
+    return BackupRecord.objects.filter(status='completed').order_by('-created_at').first()
+
+
+def write_archive(path, since=None, chunk_size=None):
+    """
+    Stream every backed-up model into a new archive at ``path``.
+
+    Returns the row count per model.
+    """
+    chunk_size = chunk_size or getattr(settings, 'BACKUP_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    models = backup_models()
+    counts = {}
+
+    with _open_archive(path, 'w') as archive:
+        archive.write(_dumps({
+            'type': 'header',
+            'version': FORMAT_VERSION,
+            'kind': 'incremental' if since else 'full',
+            'since': since,
+            'created_at': timezone.now(),
+            'models': [model._meta.label_lower for model in models],
+        }) + '\n')
+
+        for model in models:
+            label = model._meta.label_lower
+            fields = [field.attname for field in model._meta.concrete_fields]
+            archive.write(_dumps({'type': 'model', 'model': label, 'fields': fields}) + '\n')
+
+            queryset = model._base_manager.order_by('pk')
+            change_field = _change_field(model)
+            if since and change_field:
+                queryset = queryset.filter(**{f'{change_field}__gt': since})
+
+            counts[label] = 0
+            rows = []
+            for row in queryset.values_list(*fields).iterator(chunk_size=chunk_size):
+                rows.append(row)
+                if len(rows) >= chunk_size:
+                    counts[label] += _write_chunk(archive, label, rows)
+                    rows = []
+            if rows:
+                counts[label] += _write_chunk(archive, label, rows)
+
+        archive.write(_dumps({'type': 'footer', 'counts': counts}) + '\n')
+
+    return counts
+
+
+def _write_chunk(archive, label, rows):
+    rows_json = _dumps(rows)
+    archive.write(
+        f'{{"type":"chunk","model":"{label}","sha256":"{_checksum(rows_json)}","rows":{rows_json}}}\n'
+    )
+    return len(rows)
+
+
+def run_backup(record, incremental=False):
+    """
+    Produce the archive for ``record`` and fill in its status, file path,
+    size and duration. Returns the record.
+    """
+    started = timezone.now()
+    since = None
+    if incremental:
+        previous = last_completed_backup()
+        since = previous.created_at if previous else None
+    record.kind = 'incremental' if since else 'full'
+
+    backup_dir = Path(getattr(settings, 'BACKUP_DIR', Path(settings.BASE_DIR) / 'backups'))
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    path = backup_dir / f"backup-{record.pk}-{started:%Y%m%d-%H%M%S}-{record.kind}.ndjson.{_compression()}"
+
+    record.status = 'running'
+    record.file_path = str(path)
+    record.save(update_fields=['kind', 'status', 'file_path'])
+
+    try:
+        write_archive(path, since=since)
+        record.status = 'completed'
+        record.file_size = path.stat().st_size
+        record.error_message = None
+    except Exception as e:
+        record.status = 'failed'
+        record.error_message = str(e)
+        path.unlink(missing_ok=True)
+
+    record.completed_at = timezone.now()
+    record.duration = record.completed_at - started
+    record.save(update_fields=['status', 'file_size', 'error_message', 'completed_at', 'duration'])
+    return record
+
+
+def create_backup(backup_type='manual', incremental=False, user=None):
+    """Create a BackupRecord and run the backup for it."""
+    record = BackupRecord.objects.create(backup_type=backup_type, status='pending', created_by=user)
+    return run_backup(record, incremental=incremental)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """The thread that runs queued backups while the scheduler is off."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='backup')
+        return _executor
+
+
+@transaction.atomic
+def queue_backup(backup_type='manual', incremental=False, user=None):
+    """
+    Queue a backup for the ``run_backups`` job, or for the backup thread
+    when the scheduler is off. Raises if one is already pending or
+    running. Returns the pending BackupRecord.
+    """
+    if BackupRecord.objects.select_for_update().filter(status__in=ACTIVE_STATUSES).exists():
+        raise Exception("A backup is already pending or running")
+    record = BackupRecord.objects.create(
+        backup_type=backup_type,
+        kind='incremental' if incremental else 'full',
+        status='pending',
+        created_by=user,
+    )
+    if not getattr(settings, 'SCHEDULER_ENABLED', False):
+        # No run_backups job will pick it up
+        transaction.on_commit(lambda: get_executor().submit(run_pending_backups))
+    return record
+
+
+def run_pending_backups(now=None):
+    """
+    Fail backups interrupted mid-run, then run the pending ones, oldest
+    first. Returns the records run.
+    """
+    now = now or timezone.now()
+    BackupRecord.objects.filter(status='running', created_at__lt=now - BACKUP_TIMEOUT).update(
+        status='failed', error_message='Interrupted', completed_at=now
+    )
+    ran = []
+    while True:
+        record = BackupRecord.objects.filter(status='pending').order_by('created_at', 'pk').first()
+        if record is None:
+            return ran
+        ran.append(run_backup(record, incremental=record.kind == 'incremental'))
+
+
+def restore_archive(path, chunk_size=None):
+    """
+    Restore an archive written by ``write_archive``. Only for the
+    ``restore_backup`` command (see the module docstring).
+
+    Rows are upserted on their primary key with ``bulk_create``, one chunk at
+    a time, inside a single transaction; foreign keys are checked once at the
+    end so that models can be restored in any order. Returns the row count
+    per model.
+    """
+    chunk_size = chunk_size or getattr(settings, 'BACKUP_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    counts = {}
+    restored_models = []
+    columns = {}
+    footer = None
+
+    with _open_archive(path, 'r') as archive, transaction.atomic():
+        with connection.constraint_checks_disabled(), _stored_timestamps():
+            for number, line in enumerate(archive, start=1):
+                entry = json.loads(line)
+                kind = entry['type']
+
+                if kind == 'header':
+                    if entry['version'] != FORMAT_VERSION:
+                        raise Exception(f"Unsupported backup format version {entry['version']}")
+                elif kind == 'model':
+                    model = apps.get_model(entry['model'])
+                    fields = [model._meta.get_field(name) for name in _field_names(model, entry['fields'])]
+                    columns[entry['model']] = (model, entry['fields'], fields)
+                    restored_models.append(model)
+                    counts[entry['model']] = 0
+                elif kind == 'chunk':
+                    if _checksum(_dumps(entry['rows'])) != entry['sha256']:
+                        raise Exception(f"Checksum mismatch in {entry['model']} chunk on line {number}")
+                    model, attnames, fields = columns[entry['model']]
+                    objects = [
+                        model(**{
+                            attname: field.to_python(value)
+                            for attname, field, value in zip(attnames, fields, row)
+                        })
+                        for row in entry['rows']
+                    ]
+                    pk = model._meta.pk
+                    model._base_manager.bulk_create(
+                        objects,
+                        batch_size=chunk_size,
+                        update_conflicts=True,
+                        unique_fields=[pk.name],
+                        update_fields=[field.name for field in fields if field is not pk],
+                    )
+                    counts[entry['model']] += len(objects)
+                elif kind == 'footer':
+                    footer = entry
+
+        if footer is None:
+            raise Exception("Backup archive is truncated (no footer)")
+        if footer['counts'] != counts:
+            raise Exception("Backup archive row counts do not match its footer")
+
+        connection.check_constraints(
+            table_names=[model._meta.db_table for model in restored_models]
+        )
+
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), restored_models)
+        if sequence_sql:
+            with connection.cursor() as cursor:
+                for sql in sequence_sql:
+                    cursor.execute(sql)
+
+    return counts
+
+
+@contextmanager
+def _stored_timestamps():
+    """
+    Keep the archived values of ``auto_now``/``auto_now_add`` fields, which
+    ``bulk_create`` would otherwise overwrite with the current time. The
+    fields are shared by every thread, hence restores only run from the
+    management command.
+    """
+    fields = [
+        field for model in backup_models() for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    flags = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _field_names(model, attnames):
+    by_attname = {field.attname: field.name for field in model._meta.concrete_fields}
+    return [by_attname[attname] for attname in attnames]
@@ -0,0 +1,60 @@
+# admin_dashboard/jobs.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import AdminSettings, BackupRecord
+from .scheduler import periodic_job
+from .tasks import send_daily_system_summary
+from . import backup, reminders, retention
+
+
+def _summary_first_run(now):
+    # Carry on from the last summary sent before the job was scheduled
+    last_sent = AdminSettings.objects.aggregate(last=Max('last_notification_sent'))['last']
+    if last_sent:
+        return last_sent + timedelta(hours=settings.SYSTEM_NOTIFICATION_INTERVAL_HOURS)
+    return None
+
+
+@periodic_job(
+    'daily_system_summary',
+    every=timedelta(hours=settings.SYSTEM_NOTIFICATION_INTERVAL_HOURS),
+    first_run=_summary_first_run,
+)
+def daily_system_summary():
+    if not send_daily_system_summary():
+        raise Exception("Daily system summary email was not sent")
+
+
+@periodic_job('system_log_retention', every=timedelta(days=1), timeout=timedelta(hours=2))
+def system_log_retention():
+    retention.apply_retention()
+
+
+@periodic_job('scheduled_backup', every=timedelta(days=1))
+def scheduled_backup():
+    if BackupRecord.objects.filter(status__in=backup.ACTIVE_STATUSES).exists():
+        # A manual backup is already queued or running; it covers today
+        return
+    last_full = BackupRecord.objects.filter(status='completed', kind='full').order_by('-created_at').first()
+    incremental = bool(
+        last_full
+        and timezone.now() - last_full.created_at < timedelta(days=settings.BACKUP_FULL_INTERVAL_DAYS)
+    )
+    backup.queue_backup(backup_type='scheduled', incremental=incremental)
+
+
+@periodic_job('run_backups', every=timedelta(minutes=1), jitter=timedelta(0), timeout=backup.BACKUP_TIMEOUT)
+def run_backups():
+    failed = [record for record in backup.run_pending_backups() if record.status != 'completed']
+    if failed:
+        raise Exception('; '.join(record.error_message or 'Backup failed' for record in failed))
+
+
+@periodic_job('send_reminders', every=timedelta(hours=1), timeout=timedelta(minutes=30))
+def send_reminders():
+    reminders.send_reminders()
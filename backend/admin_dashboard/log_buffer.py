@@ -0,0 +1,255 @@
+# admin_dashboard/log_buffer.py
+
+"""
+Asynchronous, buffered writer for SystemLog rows.
+
+Audit records are put on an in-process bounded queue and written by a
+background thread with ``bulk_create``, either once ``SYSTEM_LOG_BATCH_SIZE``
+records are waiting or every ``SYSTEM_LOG_FLUSH_INTERVAL_MS`` milliseconds,
+so request and task code never waits on an audit insert.
+
+When the queue is full, new records are dropped and counted instead of
+blocking the caller. The queue is drained on interpreter shutdown.
+
+With ``SYSTEM_LOG_ASYNC`` off (the default under ``manage.py test``) rows
+are written inline, in the caller's thread and transaction, so they land
+in the database the caller is using and nothing is left for the exit drain.
+``created_at`` is stamped when a batch is written, so it can trail the event
+by up to the flush interval.
+
+Usage:
+
+    from admin_dashboard.log_buffer import log_event
+    log_event('INFO', 'Invoice sent', category='api', user=request.user)
+
+or through the standard logging module with ``SystemLogHandler`` (see the
+``system_log`` handler in settings.LOGGING):
+
+    logging.getLogger('vistaforge.audit').warning(
+        'Login failed', extra={'category': 'security'}
+    )
+"""
+
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL_MS = 500
+DEFAULT_QUEUE_SIZE = 10000
+
+LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+# SystemLog fields a log record may carry through ``extra``
+EXTRA_FIELDS = (
+    'user', 'user_id', 'category', 'ip_address', 'user_agent', 'metadata',
+    'related_client', 'related_client_id', 'related_project', 'related_project_id',
+    'related_invoice', 'related_invoice_id', 'related_inquiry', 'related_inquiry_id',
+)
+
+
+class SystemLogWriter:
+    """Bounded queue of pending SystemLog rows flushed by a daemon thread."""
+
+    def __init__(self, batch_size=None, flush_interval_ms=None, max_queue_size=None, asynchronous=None):
+        self.batch_size = batch_size or getattr(settings, 'SYSTEM_LOG_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+        self.flush_interval = (
+            flush_interval_ms or getattr(settings, 'SYSTEM_LOG_FLUSH_INTERVAL_MS', DEFAULT_FLUSH_INTERVAL_MS)
+        ) / 1000
+        self.max_queue_size = max_queue_size or getattr(settings, 'SYSTEM_LOG_QUEUE_SIZE', DEFAULT_QUEUE_SIZE)
+        # None follows SYSTEM_LOG_ASYNC at each call
+        self.asynchronous = asynchronous
+
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pid = None
+        self._start()
+
+    def _start(self):
+        self._queue = queue.Queue(maxsize=self.max_queue_size)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def _ensure_thread(self):
+        # Worker processes forked after the writer was created (e.g. gunicorn
+        # with --preload) inherit the queue but not the thread: start fresh.
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._start()
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name='system-log-writer', daemon=True
+                    )
+                    self._thread.start()
+
+    def enqueue(self, **fields):
+        """
+        Queue a SystemLog row without blocking.
+
+        Returns False if the record was dropped because the queue is full or
+        the writer is shutting down, or if writing it inline failed.
+        """
+        if self._stopping.is_set():
+            self._count_dropped()
+            return False
+
+        if not self.is_asynchronous():
+            # A savepoint, so a failed insert does not break the caller's transaction
+            try:
+                with transaction.atomic():
+                    self._write([fields])
+            except Exception as e:
+                self._count_failed(1, e)
+                return False
+            return True
+
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(fields)
+        except queue.Full:
+            self._count_dropped()
+            return False
+
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def is_asynchronous(self):
+        if self.asynchronous is not None:
+            return self.asynchronous
+        return getattr(settings, 'SYSTEM_LOG_ASYNC', True)
+
+    def _count_dropped(self):
+        with self._lock:
+            self.dropped += 1
+
+    def _count_failed(self, count, error):
+        # Never let audit logging take the process down; report to stderr
+        # rather than the logging module to avoid feeding back into it.
+        with self._lock:
+            self.failed += count
+        print(f"SystemLogWriter: failed to write {count} records: {error}", file=sys.stderr)
+
+    def pending(self):
+        """Number of records waiting to be written."""
+        return self._queue.qsize()
+
+    def flush(self):
+        """Write every queued record now, in the calling thread."""
+        while self._write_batch():
+            pass
+
+    def shutdown(self, timeout=5.0):
+        """Stop accepting records and drain the queue."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': self.pending(),
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+            }
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            if self._stopping.is_set():
+                # shutdown() drains what is left
+                break
+            self._wakeup.clear()
+            self.flush()
+
+    def _write_batch(self):
+        """Write up to one batch; return True if anything was taken off the queue."""
+        with self._flush_lock:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return False
+
+            close_old_connections()
+            try:
+                self._write(batch)
+            except Exception as e:
+                self._count_failed(len(batch), e)
+            return True
+
+    def _write(self, batch):
+        from .models import SystemLog
+
+        SystemLog.objects.bulk_create(
+            [SystemLog(**fields) for fields in batch], batch_size=self.batch_size
+        )
+        with self._lock:
+            self.written += len(batch)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """Return the process-wide SystemLogWriter, creating it on first use."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = SystemLogWriter()
+                atexit.register(_writer.shutdown)
+    return _writer
+
+
+def log_event(level, message, category='general', **fields):
+    """Queue a SystemLog row; see ``SystemLogWriter.enqueue``."""
+    return get_writer().enqueue(level=level, message=message, category=category, **fields)
+
+
+class SystemLogHandler(logging.Handler):
+    """
+    logging.Handler that records log records as SystemLog rows via the
+    buffered writer.
+
+    Model fields (``category``, ``user``, ``ip_address``, ``related_invoice``,
+    ...) and a ``metadata`` dict may be passed through ``extra``.
+    """
+
+    def emit(self, record):
+        try:
+            fields = {
+                name: getattr(record, name) for name in EXTRA_FIELDS if hasattr(record, name)
+            }
+            fields.setdefault('category', 'general')
+            fields['metadata'] = {**fields.get('metadata', {}), 'logger': record.name}
+            get_writer().enqueue(
+                level=record.levelname if record.levelname in LEVELS else 'INFO',
+                message=self.format(record),
+                **fields
+            )
+        except Exception:
+            self.handleError(record)
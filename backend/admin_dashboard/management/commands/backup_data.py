@@ -0,0 +1,29 @@
+# admin_dashboard/management/commands/backup_data.py
+
+from django.core.management.base import BaseCommand, CommandError
+from admin_dashboard.backup import create_backup
+
+
+class Command(BaseCommand):
+    help = 'Write a compressed backup of all application data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only back up rows changed since the last completed backup',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Running backup...')
+        record = create_backup(incremental=options['incremental'])
+
+        if record.status != 'completed':
+            raise CommandError(f'Backup failed: {record.error_message}')
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{record.kind.capitalize()} backup written to {record.file_path} '
+                f'({record.file_size} bytes in {record.duration.total_seconds():.1f}s)'
+            )
+        )
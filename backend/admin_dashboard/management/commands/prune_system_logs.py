@@ -0,0 +1,53 @@
+# admin_dashboard/management/commands/prune_system_logs.py
+
+from django.core.management.base import BaseCommand, CommandError
+from admin_dashboard import retention
+
+
+class Command(BaseCommand):
+    help = 'Roll up and delete expired system logs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            help='Number of rows rolled up and deleted per transaction',
+        )
+        parser.add_argument(
+            '--convert-partitions',
+            action='store_true',
+            help='Convert the system log table to monthly partitions (PostgreSQL only)',
+        )
+        parser.add_argument(
+            '--ensure-partitions',
+            type=int,
+            metavar='MONTHS',
+            help='Create partitions for the current and the next MONTHS months',
+        )
+
+    def handle(self, *args, **options):
+        if options['convert_partitions']:
+            try:
+                converted = retention.convert_to_partitioned()
+            except Exception as e:
+                raise CommandError(f'Error converting system logs to partitions: {str(e)}')
+            if converted:
+                self.stdout.write(self.style.SUCCESS('Converted system logs to monthly partitions'))
+            else:
+                self.stdout.write('System logs are already partitioned')
+
+        if options['ensure_partitions'] is not None:
+            created = retention.ensure_partitions(months_ahead=options['ensure_partitions'])
+            self.stdout.write(f'Ensured {len(created)} system log partitions')
+
+        self.stdout.write('Applying system log retention...')
+        report = retention.apply_retention(chunk_size=options['chunk_size'])
+
+        dropped = report.pop('dropped_partitions')
+        if dropped:
+            self.stdout.write(f'Dropped {dropped} expired partitions')
+        for key, deleted in sorted(report.items()):
+            self.stdout.write(f'  {key}: {deleted} rows rolled up and deleted')
+        self.stdout.write(
+            self.style.SUCCESS(f'Pruned {sum(report.values())} system log rows')
+        )
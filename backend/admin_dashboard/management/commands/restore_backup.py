@@ -0,0 +1,26 @@
+# admin_dashboard/management/commands/restore_backup.py
+
+from django.core.management.base import BaseCommand, CommandError
+from admin_dashboard.backup import restore_archive
+
+
+class Command(BaseCommand):
+    help = 'Restore application data from backup archives'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'archives',
+            nargs='+',
+            help='Backup files to restore, oldest first (a full backup, then its incrementals)',
+        )
+
+    def handle(self, *args, **options):
+        for path in options['archives']:
+            self.stdout.write(f'Restoring {path}...')
+            try:
+                counts = restore_archive(path)
+            except Exception as e:
+                raise CommandError(f'Error restoring {path}: {str(e)}')
+            self.stdout.write(
+                self.style.SUCCESS(f'Restored {sum(counts.values())} rows from {len(counts)} tables')
+            )
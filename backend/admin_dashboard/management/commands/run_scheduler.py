@@ -0,0 +1,29 @@
+# admin_dashboard/management/commands/run_scheduler.py
+
+from django.core.management.base import BaseCommand
+from admin_dashboard.scheduler import JOBS, Scheduler, run_pending
+
+
+class Command(BaseCommand):
+    help = 'Run due periodic jobs, once or continuously'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run the jobs that are due and exit (for cron)',
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            ran = run_pending()
+            self.stdout.write(
+                self.style.SUCCESS(f"Ran {len(ran)} of {len(JOBS)} jobs: {', '.join(ran) or 'none due'}")
+            )
+            return
+
+        self.stdout.write(f"Scheduler running {len(JOBS)} jobs: {', '.join(sorted(JOBS))}")
+        try:
+            Scheduler().run_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('Scheduler stopped')
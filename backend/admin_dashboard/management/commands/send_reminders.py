@@ -0,0 +1,20 @@
+# admin_dashboard/management/commands/send_reminders.py
+
+from django.core.management.base import BaseCommand
+from admin_dashboard.reminders import send_reminders
+
+
+class Command(BaseCommand):
+    help = 'Send follow-up and invoice due date reminder digests'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Emails per send_messages call (default: REMINDER_EMAIL_BATCH_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        sent = send_reminders(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} reminder digest(s)"))
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "admin_dashboard",
+            "0002_systemlog_related_client_systemlog_related_inquiry_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SystemLogRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "granularity",
+                    models.CharField(
+                        choices=[("hour", "Hourly"), ("day", "Daily")], max_length=4
+                    ),
+                ),
+                (
+                    "bucket_start",
+                    models.DateTimeField(
+                        help_text="Start of the hour or day the counts cover"
+                    ),
+                ),
+                (
+                    "level",
+                    models.CharField(
+                        choices=[
+                            ("DEBUG", "Debug"),
+                            ("INFO", "Info"),
+                            ("WARNING", "Warning"),
+                            ("ERROR", "Error"),
+                            ("CRITICAL", "Critical"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("category", models.CharField(max_length=50)),
+                ("count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "System Log Rollup",
+                "verbose_name_plural": "System Log Rollups",
+                "ordering": ["-bucket_start"],
+                "indexes": [
+                    models.Index(
+                        fields=["granularity", "-bucket_start"],
+                        name="admin_dashb_granula_a6bc9d_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("granularity", "bucket_start", "level", "category"),
+                        name="unique_systemlog_rollup_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("admin_dashboard", "0003_systemlogrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScheduledJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                (
+                    "last_status",
+                    models.CharField(
+                        choices=[
+                            ("never", "Never Run"),
+                            ("running", "Running"),
+                            ("succeeded", "Succeeded"),
+                            ("failed", "Failed"),
+                        ],
+                        default="never",
+                        max_length=10,
+                    ),
+                ),
+                ("last_started_at", models.DateTimeField(blank=True, null=True)),
+                ("last_finished_at", models.DateTimeField(blank=True, null=True)),
+                ("last_error", models.TextField(blank=True, null=True)),
+                ("next_run_at", models.DateTimeField(blank=True, null=True)),
+                ("locked_by", models.CharField(blank=True, max_length=100, null=True)),
+                ("locked_until", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Scheduled Job",
+                "verbose_name_plural": "Scheduled Jobs",
+                "ordering": ["name"],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("admin_dashboard", "0004_scheduledjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="backuprecord",
+            name="kind",
+            field=models.CharField(
+                choices=[("full", "Full"), ("incremental", "Incremental")],
+                default="full",
+                max_length=12,
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("admin_dashboard", "0005_backuprecord_kind"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scheduledjob",
+            name="failures",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
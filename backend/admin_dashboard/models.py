@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from django.db import models
 from django.contrib.auth.models import User
 import json
@@ -15,7 +17,7 @@ class AdminSettings(models.Model):
     phone = models.CharField(max_length=20, blank=True, null=True)
 
     # Preferences
-    default_hourly_rate = models.DecimalField(max_digits=8, decimal_places=2, default=150.00)
+    default_hourly_rate = models.DecimalField(max_digits=8, decimal_places=2, default=Decimal('150.00'))
     currency = models.CharField(max_length=3, default='USD', choices=[
         ('USD', 'US Dollar ($)'),
         ('EUR', 'Euro (€)'),
@@ -134,6 +136,38 @@ class SystemLog(models.Model):
         return f"[{self.level}] {self.category}: {self.message[:50]}"
 
 
+class SystemLogRollup(models.Model):
+    """Hourly and daily SystemLog counts kept after raw rows expire."""
+
+    GRANULARITY_CHOICES = [
+        ('hour', 'Hourly'),
+        ('day', 'Daily'),
+    ]
+
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField(help_text="Start of the hour or day the counts cover")
+    level = models.CharField(max_length=10, choices=SystemLog.LOG_LEVELS)
+    category = models.CharField(max_length=50)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "System Log Rollup"
+        verbose_name_plural = "System Log Rollups"
+        ordering = ['-bucket_start']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularity', 'bucket_start', 'level', 'category'],
+                name='unique_systemlog_rollup_bucket',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['granularity', '-bucket_start']),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} {self.bucket_start:%Y-%m-%d %H:00} [{self.level}] {self.category}: {self.count}"
+
+
 class BackupRecord(models.Model):
     """Model to track backup operations."""
 
@@ -149,6 +183,10 @@ class BackupRecord(models.Model):
         ('scheduled', 'Scheduled'),
         ('auto', 'Automatic'),
     ])
+    kind = models.CharField(max_length=12, default='full', choices=[
+        ('full', 'Full'),
+        ('incremental', 'Incremental'),
+    ])
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
     file_path = models.CharField(max_length=500, blank=True, null=True)
     file_size = models.BigIntegerField(null=True, blank=True)  # Size in bytes
@@ -166,3 +204,35 @@ class BackupRecord(models.Model):
 
     def __str__(self):
         return f"{self.backup_type} backup - {self.status} ({self.created_at.date()})"
+
+
+class ScheduledJob(models.Model):
+    """Run state of a periodic job, shared by every process running the scheduler."""
+
+    STATUS_CHOICES = [
+        ('never', 'Never Run'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100, unique=True)
+    last_status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='never')
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_finished_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, null=True)
+    next_run_at = models.DateTimeField(null=True, blank=True)
+    # Failed runs since the last success, for the retry backoff
+    failures = models.PositiveIntegerField(default=0)
+
+    # Lease held by the process currently running the job
+    locked_by = models.CharField(max_length=100, blank=True, null=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Scheduled Job"
+        verbose_name_plural = "Scheduled Jobs"
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} - {self.last_status}"
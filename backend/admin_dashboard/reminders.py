@@ -0,0 +1,141 @@
+# admin_dashboard/reminders.py
+
+"""
+Follow-up and invoice due date reminders.
+
+Due items are found with range queries on the (reminder_sent, date) indexes
+of each model:
+
+- inquiries with a follow-up date on or before today that are not closed
+- client notes that require a follow-up on or before today
+- sent or overdue invoices due within ``INVOICE_REMINDER_DAYS_BEFORE`` days
+
+Items are grouped per user into one digest email, sent to the user's
+AdminSettings email (falling back to the account email) unless the user
+turned the matching reminder preference off. All digests go out over one
+SMTP connection with ``send_messages``, in batches of
+``REMINDER_EMAIL_BATCH_SIZE``; after each batch is sent the items it
+covered are flagged ``reminder_sent`` with one UPDATE per model, so a
+failure part way only re-sends the unsent digests on the next run.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from clients_app.models import ClientNote
+from inquiries.bulk import CLOSED_STATUSES
+from inquiries.models import Inquiry
+from invoices_app.models import Invoice
+from .log_buffer import log_event
+
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_INVOICE_DAYS_BEFORE = 3
+
+# Model whose ``reminder_sent`` flag each kind of item sets
+ITEM_MODELS = {'inquiry': Inquiry, 'note': ClientNote, 'invoice': Invoice}
+
+
+def due_items(today=None):
+    """Return ``{user_id: [(kind, id, line), ...]}`` for every reminder that is due."""
+    today = today or timezone.localdate()
+    invoice_days = getattr(settings, 'INVOICE_REMINDER_DAYS_BEFORE', DEFAULT_INVOICE_DAYS_BEFORE)
+    items = defaultdict(list)
+
+    inquiries = Inquiry.objects.filter(
+        reminder_sent=False, follow_up_date__lte=today
+    ).exclude(status__in=CLOSED_STATUSES).exclude(user__admin_settings__email_reminders=False)
+    for pk, user_id, name, company, follow_up_date in inquiries.values_list(
+        'id', 'user_id', 'client_name', 'client_company', 'follow_up_date'
+    ).order_by('follow_up_date'):
+        who = f"{name} ({company})" if company else name
+        items[user_id].append(('inquiry', pk, f"Follow up on inquiry from {who} - due {follow_up_date}"))
+
+    notes = ClientNote.objects.filter(
+        reminder_sent=False, follow_up_date__lte=today, follow_up_required=True, follow_up_completed=False
+    ).exclude(user__admin_settings__email_reminders=False)
+    for pk, user_id, title, client_name, follow_up_date in notes.values_list(
+        'id', 'user_id', 'title', 'client__name', 'follow_up_date'
+    ).order_by('follow_up_date'):
+        items[user_id].append(('note', pk, f"Follow up with {client_name}: {title} - due {follow_up_date}"))
+
+    invoices = Invoice.objects.filter(
+        reminder_sent=False, due_date__lte=today + timedelta(days=invoice_days), status__in=['SENT', 'OVERDUE']
+    ).exclude(user__admin_settings__invoice_due_reminders=False)
+    for pk, user_id, number, client_name, total, due_date in invoices.values_list(
+        'id', 'user_id', 'invoice_number', 'client__name', 'total', 'due_date'
+    ).order_by('due_date'):
+        state = 'overdue since' if due_date < today else 'due'
+        items[user_id].append(('invoice', pk, f"Invoice #{number} to {client_name} ({total}) {state} {due_date}"))
+
+    return items
+
+
+def recipients(user_ids):
+    """Map each user id to the address its reminders go to, skipping users without one."""
+    addresses = {}
+    for user_id, email, settings_email in User.objects.filter(id__in=user_ids).values_list(
+        'id', 'email', 'admin_settings__email'
+    ):
+        if settings_email or email:
+            addresses[user_id] = settings_email or email
+    return addresses
+
+
+def build_digest(address, items, today):
+    lines = '\n'.join(f"- {line}" for _kind, _pk, line in items)
+    return EmailMessage(
+        subject=f"VistaForge reminders for {today}: {len(items)} item{'s' if len(items) != 1 else ''}",
+        body=f"You have {len(items)} reminder{'s' if len(items) != 1 else ''} due:\n\n{lines}\n\n---\n"
+             f"This is an automated reminder from VistaForge.\n",
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[address],
+    )
+
+
+def mark_sent(items):
+    """Flag the given items as reminded, one UPDATE per model."""
+    ids = defaultdict(list)
+    for kind, pk, _line in items:
+        ids[kind].append(pk)
+    for kind, pks in ids.items():
+        ITEM_MODELS[kind].objects.filter(id__in=pks).update(reminder_sent=True)
+
+
+def send_reminders(today=None, batch_size=None, connection=None):
+    """
+    Send the reminder digests that are due. Returns the number of emails sent.
+    """
+    today = today or timezone.localdate()
+    batch_size = batch_size or getattr(settings, 'REMINDER_EMAIL_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+
+    items = due_items(today)
+    addresses = recipients(items.keys())
+    digests = [
+        (build_digest(addresses[user_id], user_items, today), user_items)
+        for user_id, user_items in items.items()
+        if user_id in addresses
+    ]
+    if not digests:
+        return 0
+
+    sent = 0
+    connection = connection or get_connection(fail_silently=False)
+    with connection:
+        for start in range(0, len(digests), batch_size):
+            batch = digests[start:start + batch_size]
+            connection.send_messages([message for message, _items in batch])
+            mark_sent([item for _message, user_items in batch for item in user_items])
+            sent += len(batch)
+
+    log_event(
+        level='INFO',
+        message=f'Sent {sent} reminder digest(s) covering {sum(len(i) for _m, i in digests)} item(s)',
+        category='system',
+    )
+    return sent
@@ -0,0 +1,342 @@
+# admin_dashboard/retention.py
+
+"""
+Retention for SystemLog.
+
+Raw log rows live for a configurable number of days per level and per
+category (see the SYSTEM_LOG_RETENTION_* settings). Before expired rows are
+deleted they are rolled up into hourly and daily SystemLogRollup counts per
+level and category, so dashboards keep their history without the raw table
+growing without bound.
+
+Deletion runs in id-ordered chunks, each rolled up and deleted in its own
+transaction, so a large backlog never holds long locks.
+
+On PostgreSQL the table can optionally be converted to monthly range
+partitions (``SYSTEM_LOG_PARTITIONING``); months older than the longest
+retention period are then rolled up in one aggregate and dropped instead of
+deleted row by row. Rows that land in the DEFAULT partition (created while
+their month had no partition yet) are moved into the month's partition
+when it is created, and any left there past the longest retention period
+are rolled up and deleted in chunks.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import SystemLog, SystemLogRollup
+
+
+DEFAULT_RETENTION_DAYS = 90
+DEFAULT_CHUNK_SIZE = 5000
+
+PARTITION_PREFIX = f"{SystemLog._meta.db_table}_p"
+
+
+def retention_days(level, category):
+    """
+    Return the number of days a row with ``level`` and ``category`` is kept.
+
+    A level or category rule overrides the default; when both apply the
+    longer one wins, so a specific rule never shortens another one.
+    """
+    by_level = getattr(settings, 'SYSTEM_LOG_RETENTION_BY_LEVEL', {})
+    by_category = getattr(settings, 'SYSTEM_LOG_RETENTION_BY_CATEGORY', {})
+    rules = [days for days in (by_level.get(level), by_category.get(category)) if days is not None]
+    if rules:
+        return max(rules)
+    return getattr(settings, 'SYSTEM_LOG_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+
+
+def max_retention_days():
+    """The longest retention period any row can have."""
+    levels = [value for value, _label in SystemLog.LOG_LEVELS]
+    categories = [value for value, _label in SystemLog._meta.get_field('category').choices]
+    return max(retention_days(level, category) for level in levels for category in categories)
+
+
+def rollup(queryset):
+    """
+    Add the rows of ``queryset`` to the hourly and daily rollups.
+
+    Runs a single grouped aggregate; daily counts are derived from the hourly
+    buckets in Python.
+    """
+    hourly = (
+        queryset.order_by()
+        .annotate(bucket=TruncHour('created_at'))
+        .values('bucket', 'level', 'category')
+        .annotate(count=Count('id'))
+    )
+
+    counts = defaultdict(int)
+    for row in hourly:
+        hour = row['bucket']
+        day = hour.replace(hour=0)
+        counts[('hour', hour, row['level'], row['category'])] += row['count']
+        counts[('day', day, row['level'], row['category'])] += row['count']
+    if not counts:
+        return 0
+
+    buckets = {key[1] for key in counts}
+    existing = {
+        (r.granularity, r.bucket_start, r.level, r.category): r
+        for r in SystemLogRollup.objects.filter(bucket_start__in=buckets)
+    }
+
+    to_update, to_create = [], []
+    for key, count in counts.items():
+        if key in existing:
+            existing[key].count += count
+            to_update.append(existing[key])
+        else:
+            granularity, bucket_start, level, category = key
+            to_create.append(SystemLogRollup(
+                granularity=granularity, bucket_start=bucket_start,
+                level=level, category=category, count=count,
+            ))
+
+    SystemLogRollup.objects.bulk_update(to_update, ['count'])
+    SystemLogRollup.objects.bulk_create(to_create)
+    return sum(count for (granularity, *_), count in counts.items() if granularity == 'hour')
+
+
+def purge_expired(level, category, cutoff, chunk_size=None, queryset=None):
+    """
+    Roll up and delete rows for one level/category created before ``cutoff``
+    (among ``queryset``, default all rows).
+
+    Returns the number of rows deleted.
+    """
+    chunk_size = chunk_size or getattr(settings, 'SYSTEM_LOG_RETENTION_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    queryset = SystemLog.objects.all() if queryset is None else queryset
+    expired = queryset.filter(level=level, category=category, created_at__lt=cutoff)
+
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            # Bound each chunk by id range so neither the aggregate nor the
+            # delete needs a long IN (...) list.
+            upper = expired.order_by('id').values_list('id', flat=True)[chunk_size - 1:chunk_size].first()
+            chunk = expired.filter(id__lte=upper) if upper is not None else expired
+            if not rollup(chunk):
+                return deleted
+            deleted += chunk.delete()[0]
+        if upper is None:
+            return deleted
+
+
+def apply_retention(now=None, chunk_size=None):
+    """
+    Enforce SystemLog retention.
+
+    Returns a dict of deleted row counts keyed by ``"LEVEL/category"`` plus
+    the number of dropped partitions.
+    """
+    now = now or timezone.now()
+    report = {'dropped_partitions': 0}
+
+    if partitioning_enabled():
+        ensure_partitions(now)
+        report['dropped_partitions'] = drop_expired_partitions(now, chunk_size=chunk_size)
+
+    combinations = (
+        SystemLog.objects.order_by().values_list('level', 'category').distinct()
+    )
+    for level, category in combinations:
+        cutoff = now - timedelta(days=retention_days(level, category))
+        deleted = purge_expired(level, category, cutoff, chunk_size=chunk_size)
+        if deleted:
+            report[f"{level}/{category}"] = deleted
+
+    hourly_days = getattr(settings, 'SYSTEM_LOG_HOURLY_ROLLUP_DAYS', None)
+    if hourly_days:
+        SystemLogRollup.objects.filter(
+            granularity='hour', bucket_start__lt=now - timedelta(days=hourly_days)
+        ).delete()
+
+    return report
+
+
+# --- PostgreSQL monthly partitions ---
+
+def partitioning_enabled():
+    return getattr(settings, 'SYSTEM_LOG_PARTITIONING', False) and connection.vendor == 'postgresql'
+
+
+def is_partitioned():
+    """Whether the SystemLog table is a PostgreSQL partitioned table."""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)",
+            [SystemLog._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def _month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=value.tzinfo)
+
+
+def _next_month(value):
+    return _month_start(value + timedelta(days=32))
+
+
+def _partition_name(month):
+    return f"{PARTITION_PREFIX}{month:%Y_%m}"
+
+
+def _default_partition():
+    return f"{SystemLog._meta.db_table}_default"
+
+
+def _create_partition(cursor, month):
+    """
+    Create the partition of ``month`` unless it exists, moving the month's
+    rows out of the DEFAULT partition first (PostgreSQL refuses to create a
+    partition whose range the DEFAULT partition holds rows of).
+    """
+    qn = connection.ops.quote_name
+    table, default, name = SystemLog._meta.db_table, _default_partition(), _partition_name(month)
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+    if cursor.fetchone()[0]:
+        return
+    bounds = [month, _next_month(month)]
+    cursor.execute(f"CREATE TABLE {qn(name)} (LIKE {qn(table)} INCLUDING DEFAULTS)")
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {qn(default)} WHERE created_at >= %s AND created_at < %s RETURNING *) "
+        f"INSERT INTO {qn(name)} SELECT * FROM moved",
+        bounds,
+    )
+    cursor.execute(f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} FOR VALUES FROM (%s) TO (%s)", bounds)
+
+
+def ensure_partitions(now=None, months_ahead=2):
+    """Create the partitions for the current and the next ``months_ahead`` months."""
+    if not is_partitioned():
+        return []
+
+    month = _month_start(now or timezone.now())
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for _ in range(months_ahead + 1):
+            _create_partition(cursor, month)
+            created.append(_partition_name(month))
+            month = _next_month(month)
+    return created
+
+
+def drop_expired_partitions(now=None, chunk_size=None):
+    """
+    Roll up and drop monthly partitions that lie entirely past the longest
+    retention period, and roll up and delete the DEFAULT partition's rows
+    past it.
+    """
+    if not is_partitioned():
+        return 0
+
+    cutoff = (now or timezone.now()) - timedelta(days=max_retention_days())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = %s AND child.relname LIKE %s",
+            [SystemLog._meta.db_table, f"{PARTITION_PREFIX}%"],
+        )
+        names = sorted(row[0] for row in cursor.fetchall())
+
+    dropped = 0
+    for name in names:
+        year, month = name[len(PARTITION_PREFIX):].split('_')
+        start = datetime(int(year), int(month), 1, tzinfo=cutoff.tzinfo)
+        end = _next_month(start)
+        if end > cutoff:
+            continue
+        with transaction.atomic():
+            rollup(SystemLog.objects.filter(created_at__gte=start, created_at__lt=end))
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE {connection.ops.quote_name(name)}")
+        dropped += 1
+
+    # No partition to drop for these; delete them like unpartitioned rows
+    in_default = SystemLog.objects.extra(where=["tableoid = %s::regclass"], params=[_default_partition()])
+    for level, category in in_default.filter(created_at__lt=cutoff).order_by().values_list(
+        'level', 'category'
+    ).distinct():
+        purge_expired(level, category, cutoff, chunk_size=chunk_size, queryset=in_default)
+    return dropped
+
+
+def convert_to_partitioned(months_ahead=2):
+    """
+    Rebuild the SystemLog table as a table partitioned by month on
+    ``created_at`` (PostgreSQL only).
+
+    The primary key becomes ``(id, created_at)`` as PostgreSQL requires the
+    partition key in every unique index; ids keep coming from a sequence, so
+    they stay unique. Indexes and foreign key constraints are recreated on
+    the partitioned table (PostgreSQL 12+ supports foreign keys from
+    partitioned tables).
+    """
+    if connection.vendor != 'postgresql':
+        raise Exception("SystemLog partitioning requires PostgreSQL.")
+    if is_partitioned():
+        return False
+
+    table = SystemLog._meta.db_table
+    legacy = f"{table}_legacy"
+    qn = connection.ops.quote_name
+    sequence = f"{table}_id_seq_part"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {qn(table)} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+        cursor.execute(
+            f"CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE (created_at)"
+        )
+        cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {qn(sequence)} OWNED BY {qn(table)}.id")
+        cursor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN id SET DEFAULT nextval(%s)", [sequence])
+        cursor.execute(f"ALTER TABLE {qn(table)} ADD PRIMARY KEY (id, created_at)")
+        cursor.execute(f"CREATE TABLE {qn(table + '_default')} PARTITION OF {qn(table)} DEFAULT")
+
+        cursor.execute(f"SELECT MIN(created_at) FROM {qn(legacy)}")
+        oldest = cursor.fetchone()[0] or timezone.now()
+        month = _month_start(oldest)
+        last = _month_start(timezone.now())
+        while month <= last:
+            cursor.execute(
+                f"CREATE TABLE {qn(_partition_name(month))} PARTITION OF {qn(table)} "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [month, _next_month(month)],
+            )
+            month = _next_month(month)
+
+        cursor.execute(f"INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)}")
+        cursor.execute(
+            f"SELECT setval(%s, COALESCE((SELECT MAX(id) FROM {qn(table)}), 0) + 1, false)",
+            [sequence],
+        )
+        cursor.execute(f"DROP TABLE {qn(legacy)}")
+
+        with connection.schema_editor(atomic=False) as editor:
+            for index in SystemLog._meta.indexes:
+                editor.add_index(SystemLog, index)
+            for field in SystemLog._meta.fields:
+                if field.is_relation:
+                    editor.execute(editor._create_index_sql(SystemLog, fields=[field]))
+                    if field.db_constraint:
+                        editor.execute(editor._create_fk_sql(SystemLog, field, "_fk_%(to_table)s_%(to_column)s"))
+
+    ensure_partitions(months_ahead=months_ahead)
+    return True
@@ -0,0 +1,232 @@
+# admin_dashboard/scheduler.py
+
+"""
+Lightweight in-process scheduler for periodic jobs.
+
+Jobs are registered with ``periodic_job``:
+
+    @periodic_job('system_log_retention', every=timedelta(days=1))
+    def prune_system_logs():
+        ...
+
+Every process that runs the scheduler (each gunicorn worker when
+``SCHEDULER_ENABLED`` is set, or the ``run_scheduler`` management command)
+polls the registry every ``SCHEDULER_TICK_SECONDS``. Run state lives in the
+ScheduledJob table, and a job is claimed with a single conditional UPDATE that
+only succeeds when the job is due and no other process holds its lease. So
+however many workers poll, a due job runs once. Random jitter is added to each
+next run so that jobs sharing an interval do not all fire in the same tick.
+
+A job seen for the first time (no ScheduledJob row yet) first runs one
+interval plus jitter later, not at once, so a deploy does not fire every
+job together; a job can instead derive its first run from state it keeps
+elsewhere with ``first_run``.
+
+A failed run is retried after ``SCHEDULER_RETRY_SECONDS``, doubling with
+each consecutive failure up to ``SCHEDULER_RETRY_MAX_SECONDS`` (and never
+later than the job's next regular run), rather than a whole interval later.
+
+A lease expires after the job's ``timeout``, so a worker that dies mid-run
+does not block the job forever.
+
+Nothing runs unless ``SCHEDULER_ENABLED`` is set (render.yaml sets it) or
+``run_scheduler`` is running.
+"""
+
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ScheduledJob
+
+
+DEFAULT_TICK_SECONDS = 30
+DEFAULT_RETRY_SECONDS = 60
+DEFAULT_RETRY_MAX_SECONDS = 60 * 60
+
+
+@dataclass
+class Job:
+    name: str
+    func: callable
+    every: timedelta
+    jitter: timedelta
+    timeout: timedelta
+    first_run: callable = None
+
+
+# Job name -> Job
+JOBS = {}
+
+
+def periodic_job(name, every, jitter=None, timeout=None, first_run=None):
+    """
+    Register a function to run every ``every``.
+
+    ``jitter`` (default: a tenth of the interval, at most five minutes) is
+    the maximum random delay added to each next run. ``timeout`` (default:
+    the interval) is how long a run holds the job's lease. ``first_run``,
+    called with the current time, may return when the job first runs
+    (None for the default of one interval plus jitter from now).
+    """
+    def decorator(func):
+        JOBS[name] = Job(
+            name=name,
+            func=func,
+            every=every,
+            jitter=jitter if jitter is not None else min(every / 10, timedelta(minutes=5)),
+            timeout=timeout or every,
+            first_run=first_run,
+        )
+        return func
+    return decorator
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _jitter(job):
+    return timedelta(seconds=random.uniform(0, job.jitter.total_seconds()))
+
+
+def _first_run_at(job, now):
+    first = job.first_run(now) if job.first_run else None
+    return first if first is not None else now + job.every + _jitter(job)
+
+
+def _retry_delay(job, failures):
+    """How long after its ``failures``-th consecutive failure ``job`` is retried."""
+    base = getattr(settings, 'SCHEDULER_RETRY_SECONDS', DEFAULT_RETRY_SECONDS)
+    cap = getattr(settings, 'SCHEDULER_RETRY_MAX_SECONDS', DEFAULT_RETRY_MAX_SECONDS)
+    delay = timedelta(seconds=min(base * 2 ** min(failures - 1, 16), cap))
+    return min(delay, job.every)
+
+
+def _claim(job, now):
+    """Take the lease on ``job`` if it is due; return True if this process got it."""
+    if not ScheduledJob.objects.filter(name=job.name).exists():
+        ScheduledJob.objects.bulk_create(
+            [ScheduledJob(name=job.name, next_run_at=_first_run_at(job, now))], ignore_conflicts=True
+        )
+    claimed = ScheduledJob.objects.filter(
+        Q(next_run_at__isnull=True) | Q(next_run_at__lte=now),
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+        name=job.name,
+    ).update(
+        locked_by=worker_id(),
+        locked_until=now + job.timeout,
+        last_status='running',
+        last_started_at=now,
+    )
+    return claimed == 1
+
+
+def run_job(job, now=None):
+    """
+    Run ``job`` if it is due and not running elsewhere.
+
+    Returns True if the job ran in this process.
+    """
+    now = now or timezone.now()
+    if not _claim(job, now):
+        return False
+
+    status, error = 'succeeded', None
+    try:
+        job.func()
+    except Exception as e:
+        status, error = 'failed', str(e)
+
+    finished = timezone.now()
+    held = ScheduledJob.objects.filter(name=job.name, locked_by=worker_id())
+    if error is None:
+        next_run_at, failures = now + job.every + _jitter(job), 0
+    else:
+        failures = (held.values_list('failures', flat=True).first() or 0) + 1
+        next_run_at = now + _retry_delay(job, failures)
+    held.update(
+        last_status=status,
+        last_finished_at=finished,
+        last_error=error,
+        next_run_at=next_run_at,
+        failures=failures,
+        locked_by=None,
+        locked_until=None,
+    )
+    return True
+
+
+def run_pending(now=None):
+    """Run every registered job that is due; return the names of the jobs run."""
+    ran = []
+    for job in list(JOBS.values()):
+        try:
+            if run_job(job, now):
+                ran.append(job.name)
+        except Exception as e:
+            # A database hiccup must not kill the scheduler loop.
+            print(f"Scheduler: could not run {job.name}: {e}", file=sys.stderr)
+    return ran
+
+
+class Scheduler:
+    """Daemon thread calling ``run_pending`` every tick."""
+
+    def __init__(self, tick_seconds=None):
+        self.tick_seconds = tick_seconds or getattr(settings, 'SCHEDULER_TICK_SECONDS', DEFAULT_TICK_SECONDS)
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self.run_forever, name='scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_forever(self):
+        # Spread the first tick so workers started together do not poll in step.
+        self._stopping.wait(random.uniform(0, self.tick_seconds))
+        while not self._stopping.is_set():
+            close_old_connections()
+            run_pending()
+            close_old_connections()
+            self._stopping.wait(self.tick_seconds)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+_scheduler_pid = None
+
+
+def start_scheduler():
+    """
+    Start the scheduler thread for this process, once.
+
+    Called on first request rather than at import, so that workers forked
+    from a preloaded master each start their own thread.
+    """
+    global _scheduler, _scheduler_pid
+    if _scheduler_pid == os.getpid():
+        return _scheduler
+    with _scheduler_lock:
+        if _scheduler_pid != os.getpid():
+            _scheduler = Scheduler()
+            _scheduler.start()
+            _scheduler_pid = os.getpid()
+    return _scheduler
@@ -3,9 +3,12 @@
 import graphene
 from graphene_django.types import DjangoObjectType
 from django.db import transaction
+from django.db.models import Q, Subquery
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User
-from .models import AdminSettings, SystemLog, BackupRecord
+from backend.query_budget import query_budget
+from .backup import queue_backup
+from .models import AdminSettings, SystemLog, SystemLogRollup, BackupRecord
 
 
 # --- 1. Type Definitions ---
@@ -24,6 +27,13 @@ class SystemLogType(DjangoObjectType):
         fields = '__all__'
 
 
+class SystemLogRollupType(DjangoObjectType):
+    """GraphQL Type for SystemLogRollup model."""
+    class Meta:
+        model = SystemLogRollup
+        fields = '__all__'
+
+
 class BackupRecordType(DjangoObjectType):
     """GraphQL Type for BackupRecord model."""
     class Meta:
@@ -59,10 +69,20 @@ class AdminDashboardQuery(graphene.ObjectType):
     """Queries for admin dashboard functionality."""
 
     admin_settings = graphene.Field(AdminSettingsType)
-    system_logs = graphene.List(SystemLogType, limit=graphene.Int(), offset=graphene.Int())
+    system_logs = graphene.List(
+        SystemLogType, limit=graphene.Int(), offset=graphene.Int(), before_id=graphene.ID()
+    )
+    system_log_rollups = graphene.List(
+        SystemLogRollupType,
+        granularity=graphene.String(),
+        since=graphene.DateTime(),
+        level=graphene.String(),
+        category=graphene.String(),
+    )
     backup_records = graphene.List(BackupRecordType, limit=graphene.Int(), offset=graphene.Int())
 
     @staticmethod
+    @query_budget(4)
     def resolve_admin_settings(root, info):
         """Get current user's admin settings."""
         if not info.context.user.is_authenticated:
@@ -70,13 +90,39 @@ class AdminDashboardQuery(graphene.ObjectType):
         return AdminSettings.objects.get_or_create(user=info.context.user)[0]
 
     @staticmethod
-    def resolve_system_logs(root, info, limit=50, offset=0):
-        """Get system logs with pagination."""
+    @query_budget(1)
+    def resolve_system_logs(root, info, limit=50, offset=0, before_id=None):
+        """
+        Get system logs, newest first.
+
+        Pass the id of the last log received as ``before_id`` to fetch the next
+        page without the cost of a growing OFFSET.
+        """
         if not info.context.user.is_authenticated:
             raise Exception("Authentication required")
-        return SystemLog.objects.all().order_by('-created_at')[offset:offset+limit]
+        logs = SystemLog.objects.all().order_by('-created_at', '-id')
+        if before_id is not None:
+            cursor = Subquery(SystemLog.objects.filter(pk=before_id).values('created_at')[:1])
+            logs = logs.filter(Q(created_at__lt=cursor) | Q(created_at=cursor, id__lt=before_id))
+        return logs[offset:offset+limit]
 
     @staticmethod
+    @query_budget(1)
+    def resolve_system_log_rollups(root, info, granularity='day', since=None, level=None, category=None):
+        """Get hourly or daily log counts kept after raw logs expire."""
+        if not info.context.user.is_authenticated:
+            raise Exception("Authentication required")
+        rollups = SystemLogRollup.objects.filter(granularity=granularity)
+        if since:
+            rollups = rollups.filter(bucket_start__gte=since)
+        if level:
+            rollups = rollups.filter(level=level)
+        if category:
+            rollups = rollups.filter(category=category)
+        return rollups.order_by('-bucket_start', 'level', 'category')
+
+    @staticmethod
+    @query_budget(1)
     def resolve_backup_records(root, info, limit=20, offset=0):
         """Get backup records with pagination."""
         if not info.context.user.is_authenticated:
@@ -157,33 +203,30 @@ class CreateBackup(graphene.Mutation):
     """Mutation to initiate a backup."""
     class Arguments:
         backup_type = graphene.String(required=True)
+        incremental = graphene.Boolean()
 
     backup_record = graphene.Field(BackupRecordType)
     success = graphene.Boolean()
     message = graphene.String()
 
     @classmethod
-    @transaction.atomic
-    def mutate(cls, root, info, backup_type):
-        if not info.context.user.is_authenticated:
+    def mutate(cls, root, info, backup_type, incremental=False):
+        user = info.context.user
+        if not user.is_authenticated:
             raise Exception("Authentication required")
+        # Archives hold every account's password hash
+        if not (user.is_staff or user.is_superuser):
+            raise Exception("Only staff can create backups")
 
-        # Create backup record
-        backup = BackupRecord.objects.create(
-            backup_type=backup_type,
-            status='pending',
-            created_by=info.context.user
-        )
-
-        # Here you would typically trigger the actual backup process
-        # For now, we'll just mark it as completed immediately
-        backup.status = 'completed'
-        backup.save()
+        # The run_backups scheduler job (or, with the scheduler off, a
+        # background thread) writes the archive; poll backupRecords for its
+        # status, size and duration.
+        backup = queue_backup(backup_type=backup_type, incremental=incremental, user=user)
 
         return CreateBackup(
             backup_record=backup,
             success=True,
-            message="Backup completed successfully"
+            message="Backup queued"
         )
 
 
@@ -2,8 +2,10 @@
 
 from django.core.mail import send_mail
 from django.conf import settings
+from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import timedelta
+from .log_buffer import log_event
 from .models import AdminSettings, SystemLog
 from inquiries.models import Inquiry
 
@@ -11,19 +13,24 @@ from inquiries.models import Inquiry
 def send_daily_system_summary():
     """
     Send a daily system summary email to the configured notification email.
-    This function should be called every 24 hours via a scheduled task.
+    Runs as the daily_system_summary periodic job (see admin_dashboard.jobs).
     """
 
-    # Get system statistics
-    total_inquiries = Inquiry.objects.count()
-    new_inquiries_today = Inquiry.objects.filter(
-        created_at__date=timezone.now().date()
-    ).count()
-
-    new_inquiries = Inquiry.objects.filter(status='NEW').count()
-    contacted_inquiries = Inquiry.objects.filter(status='CONTACTED').count()
-    won_projects = Inquiry.objects.filter(status='WON').count()
-    lost_projects = Inquiry.objects.filter(status='LOST').count()
+    # Get system statistics in a single aggregate
+    stats = Inquiry.objects.aggregate(
+        total=Count('id'),
+        today=Count('id', filter=Q(created_at__date=timezone.now().date())),
+        new=Count('id', filter=Q(status='NEW')),
+        contacted=Count('id', filter=Q(status='CONTACTED')),
+        won=Count('id', filter=Q(status='WON')),
+        lost=Count('id', filter=Q(status='LOST')),
+    )
+    total_inquiries = stats['total']
+    new_inquiries_today = stats['today']
+    new_inquiries = stats['new']
+    contacted_inquiries = stats['contacted']
+    won_projects = stats['won']
+    lost_projects = stats['lost']
 
     # Calculate conversion rate
     conversion_rate = (won_projects / total_inquiries * 100) if total_inquiries > 0 else 0
@@ -105,7 +112,7 @@ VistaForge Admin Dashboard
             admin_settings.save()
 
         # Log successful notification
-        SystemLog.objects.create(
+        log_event(
             level='INFO',
             message=f'Daily system summary email sent to {settings.SYSTEM_NOTIFICATION_EMAIL}',
             category='system'
@@ -115,7 +122,7 @@ VistaForge Admin Dashboard
 
     except Exception as e:
         # Log failed notification
-        SystemLog.objects.create(
+        log_event(
             level='ERROR',
             message=f'Failed to send daily system summary email: {str(e)}',
             category='system'
@@ -125,23 +132,11 @@ VistaForge Admin Dashboard
 
 def check_and_send_daily_notification():
     """
-    Check if 24 hours have passed since last notification and send if needed.
-    This function can be called periodically to ensure notifications are sent.
-    """
-    admin_settings = AdminSettings.objects.first()
-
-    if not admin_settings:
-        return False
+    Send the daily summary if it is due.
 
-    # Check if 24 hours have passed
-    if admin_settings.last_notification_sent:
-        time_since_last = timezone.now() - admin_settings.last_notification_sent
-        hours_since_last = time_since_last.total_seconds() / 3600
-
-        if hours_since_last >= settings.SYSTEM_NOTIFICATION_INTERVAL_HOURS:
-            return send_daily_system_summary()
-    else:
-        # First time sending notification
-        return send_daily_system_summary()
+    Goes through the scheduler, so the interval is tracked in the database
+    and concurrent callers cannot send the summary twice.
+    """
+    from .scheduler import JOBS, run_job
 
-    return False
\ No newline at end of file
+    return run_job(JOBS['daily_system_summary'])
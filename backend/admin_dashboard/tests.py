@@ -1,3 +1,402 @@
-from django.test import TestCase
+import gzip
+import json
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from clients_app.models import Client, ClientNote
+from inquiries.models import Inquiry
+from invoices_app.models import Invoice
+from backend.schema import schema
+from .backup import queue_backup, restore_archive, run_pending_backups, write_archive
+from .log_buffer import SystemLogWriter, log_event
+from .models import AdminSettings, BackupRecord, ScheduledJob, SystemLog, SystemLogRollup
+from .reminders import send_reminders
+from .retention import apply_retention, retention_days, rollup
+from .scheduler import JOBS, Job, _claim, run_job
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class ReminderTests(TestCase):
+    today = date(2026, 3, 10)
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', email='owner@example.com', password='x')
+        self.client_record = Client.objects.create(user=self.user, name='Acme', contact_email='a@acme.com')
+
+    def inquiry(self, **kwargs):
+        return Inquiry.objects.create(
+            user=self.user, client_name='Ann', client_email='ann@example.com', message='Hi', **kwargs
+        )
+
+    def test_due_items_are_sent_in_one_digest_and_flagged(self):
+        due = self.inquiry(follow_up_date=self.today)
+        later = self.inquiry(follow_up_date=self.today + timedelta(days=1))
+        closed = self.inquiry(follow_up_date=self.today, status='WON')
+        note = ClientNote.objects.create(
+            client=self.client_record, user=self.user, title='Call back', content='-',
+            follow_up_required=True, follow_up_date=self.today - timedelta(days=2),
+        )
+        invoice = Invoice.objects.create(
+            user=self.user, client=self.client_record, invoice_number='INV-1', status='SENT',
+            issue_date=self.today, due_date=self.today + timedelta(days=2),
+        )
+
+        self.assertEqual(send_reminders(today=self.today), 1)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['owner@example.com'])
+        self.assertIn('3 items', mail.outbox[0].subject)
+        self.assertIn('Invoice #INV-1', mail.outbox[0].body)
+        self.assertEqual(
+            set(Inquiry.objects.filter(reminder_sent=True).values_list('id', flat=True)), {due.id}
+        )
+        self.assertFalse(Inquiry.objects.get(id=later.id).reminder_sent)
+        self.assertFalse(Inquiry.objects.get(id=closed.id).reminder_sent)
+        self.assertTrue(ClientNote.objects.get(id=note.id).reminder_sent)
+        self.assertTrue(Invoice.objects.get(id=invoice.id).reminder_sent)
+
+        # Nothing is sent twice
+        self.assertEqual(send_reminders(today=self.today), 0)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def execute(self, document, **variables):
+        request = RequestFactory().post('/graphql/')
+        request.user = self.user
+        result = schema.execute(document, variables=variables, context_value=request)
+        self.assertIsNone(result.errors)
+
+    def test_a_new_date_rearms_the_reminder(self):
+        inquiry = self.inquiry(follow_up_date=self.today)
+        note = ClientNote.objects.create(
+            client=self.client_record, user=self.user, title='Call back', content='-',
+            follow_up_required=True, follow_up_date=self.today,
+        )
+        invoice = Invoice.objects.create(
+            user=self.user, client=self.client_record, invoice_number='INV-1', status='SENT',
+            issue_date=self.today, due_date=self.today,
+        )
+        send_reminders(today=self.today)
+
+        # Saving the same date keeps the reminder sent
+        self.execute(
+            'mutation($id: ID!, $date: Date) { updateInquiry(id: $id, input: {followUpDate: $date, notes: "x"}) { inquiry { id } } }',
+            id=inquiry.id, date=self.today.isoformat(),
+        )
+        self.assertTrue(Inquiry.objects.get(id=inquiry.id).reminder_sent)
+
+        later = (self.today + timedelta(days=7)).isoformat()
+        self.execute(
+            'mutation($id: ID!, $date: Date) { updateInquiry(id: $id, input: {followUpDate: $date}) { inquiry { id } } }',
+            id=inquiry.id, date=later,
+        )
+        self.execute(
+            'mutation($id: ID!, $date: Date) { updateClientNote(id: $id, input: '
+            '{noteType: "GENERAL", title: "Call back", content: "-", followUpDate: $date}) { note { id } } }',
+            id=note.id, date=later,
+        )
+        self.execute(
+            'mutation($id: ID!, $date: Date) { updateInvoice(id: $id, input: {dueDate: $date}) { invoice { id } } }',
+            id=invoice.id, date=later,
+        )
+        self.assertFalse(Inquiry.objects.get(id=inquiry.id).reminder_sent)
+        self.assertFalse(ClientNote.objects.get(id=note.id).reminder_sent)
+        self.assertFalse(Invoice.objects.get(id=invoice.id).reminder_sent)
+
+        self.assertEqual(send_reminders(today=self.today + timedelta(days=7)), 1)
+        self.assertIn('3 items', mail.outbox[-1].subject)
+
+    def test_preferences_and_settings_email(self):
+        AdminSettings.objects.create(user=self.user, email='alerts@example.com', email_reminders=False)
+        self.inquiry(follow_up_date=self.today)
+        Invoice.objects.create(
+            user=self.user, client=self.client_record, invoice_number='INV-2', status='OVERDUE',
+            issue_date=self.today, due_date=self.today - timedelta(days=5),
+        )
+
+        send_reminders(today=self.today)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['alerts@example.com'])
+        self.assertIn('1 item', mail.outbox[0].subject)
+        self.assertIn('overdue since', mail.outbox[0].body)
+
+
+class SystemLogWriterTests(TestCase):
+    def test_records_are_written_inline_when_not_asynchronous(self):
+        log_event('INFO', 'Inline', category='system')
+        self.assertTrue(SystemLog.objects.filter(message='Inline').exists())
+
+    def test_a_failed_inline_write_is_counted_and_reported(self):
+        writer = SystemLogWriter(asynchronous=False)
+        with mock.patch('sys.stderr'):
+            self.assertFalse(writer.enqueue(level='INFO', message='Inline', no_such_field=1))
+        self.assertEqual(writer.stats(), {'pending': 0, 'written': 0, 'dropped': 0, 'failed': 1})
+        # The caller's transaction is still usable
+        self.assertTrue(writer.enqueue(level='INFO', message='Inline'))
+        self.assertEqual(SystemLog.objects.get().message, 'Inline')
+
+    def test_overflow_is_counted_and_shutdown_drains_the_queue(self):
+        # Neither the batch size nor the interval wakes the thread before shutdown
+        writer = SystemLogWriter(batch_size=10, flush_interval_ms=60000, max_queue_size=2, asynchronous=True)
+        self.assertTrue(writer.enqueue(level='INFO', message='first'))
+        self.assertTrue(writer.enqueue(level='INFO', message='second'))
+        self.assertFalse(writer.enqueue(level='INFO', message='overflow'))
+        self.assertEqual(writer.stats(), {'pending': 2, 'written': 0, 'dropped': 1, 'failed': 0})
+        self.assertFalse(SystemLog.objects.exists())
+
+        writer.shutdown()
+        self.assertEqual(set(SystemLog.objects.values_list('message', flat=True)), {'first', 'second'})
+        self.assertEqual(writer.stats(), {'pending': 0, 'written': 2, 'dropped': 1, 'failed': 0})
+
+        # Records after shutdown are dropped
+        self.assertFalse(writer.enqueue(level='INFO', message='late'))
+        self.assertEqual(writer.dropped, 2)
+
+
+class BackupTests(TestCase):
+    def setUp(self):
+        backup_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, backup_dir, ignore_errors=True)
+        self.enterContext(override_settings(BACKUP_DIR=backup_dir, BACKUP_CHUNK_SIZE=2))
+        self.path = Path(backup_dir) / 'archive.ndjson.gz'
+        self.user = User.objects.create_user('owner', email='owner@example.com', password='x')
+        self.clients = [
+            Client.objects.create(user=self.user, name=name, contact_email=f'{name}@example.com')
+            for name in ('Acme', 'Globex', 'Initech')
+        ]
+
+    def rewrite(self, edit):
+        with gzip.open(self.path, 'rt') as f:
+            lines = f.read().splitlines()
+        with gzip.open(self.path, 'wt') as f:
+            f.write('\n'.join(edit(lines)) + '\n')
+
+    def test_restore_round_trip_keeps_rows_and_timestamps(self):
+        created = {client.pk: client.created_at for client in Client.objects.all()}
+        counts = write_archive(self.path)
+        self.assertEqual(counts['clients_app.client'], 3)
+
+        Client.objects.filter(pk=self.clients[0].pk).update(name='Renamed')
+        Client.objects.filter(pk=self.clients[1].pk).delete()
+
+        self.assertEqual(restore_archive(self.path), counts)
+        self.assertEqual(
+            sorted(Client.objects.values_list('name', flat=True)), ['Acme', 'Globex', 'Initech']
+        )
+        self.assertEqual({client.pk: client.created_at for client in Client.objects.all()}, created)
+
+    def test_truncated_archive_restores_nothing(self):
+        write_archive(self.path)
+        self.rewrite(lambda lines: lines[:-1])
+        Client.objects.filter(pk=self.clients[0].pk).delete()
+
+        with self.assertRaisesMessage(Exception, 'truncated'):
+            restore_archive(self.path)
+        self.assertEqual(Client.objects.count(), 2)
+
+    def test_checksum_mismatch_is_rejected(self):
+        write_archive(self.path)
+
+        def tamper(lines):
+            for i, line in enumerate(lines):
+                entry = json.loads(line)
+                if entry['type'] == 'chunk' and entry['model'] == 'clients_app.client':
+                    lines[i] = line.replace('Acme', 'Evil')
+                    break
+            return lines
+
+        self.rewrite(tamper)
+        with self.assertRaisesMessage(Exception, 'Checksum mismatch in clients_app.client'):
+            restore_archive(self.path)
+        self.assertFalse(Client.objects.filter(name='Evil').exists())
+
+    def create_backup(self, user):
+        request = RequestFactory().post('/graphql/')
+        request.user = user
+        return schema.execute(
+            'mutation { createBackup(backupType: "manual") { success backupRecord { id status } } }',
+            context_value=request,
+        )
+
+    @override_settings(SCHEDULER_ENABLED=True)
+    def test_only_staff_queue_backups_one_at_a_time(self):
+        result = self.create_backup(self.user)
+        self.assertIn('Only staff', result.errors[0].message)
+
+        staff = User.objects.create_user('staff', password='x', is_staff=True)
+        result = self.create_backup(staff)
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['createBackup']['backupRecord']['status'], 'PENDING')
+        self.assertIn('already pending', self.create_backup(staff).errors[0].message)
+
+        record, = run_pending_backups()
+        self.assertEqual(record.status, 'completed')
+        self.assertTrue(Path(record.file_path).exists())
+
+    @override_settings(SCHEDULER_ENABLED=False)
+    def test_without_the_scheduler_queued_backups_run_in_the_background(self):
+        staff = User.objects.create_user('staff', password='x', is_staff=True)
+        # Run the backup thread's work inline, inside the test's transaction
+        inline = mock.Mock(submit=lambda fn, *args: fn(*args))
+        self.enterContext(mock.patch('admin_dashboard.backup.get_executor', return_value=inline))
+        with self.captureOnCommitCallbacks(execute=True):
+            result = self.create_backup(staff)
+        self.assertIsNone(result.errors)
+
+        record = BackupRecord.objects.get()
+        self.assertEqual(record.status, 'completed')
+        self.assertTrue(Path(record.file_path).exists())
+        # The next request is not blocked by a backup nobody will run
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertIsNone(self.create_backup(staff).errors)
+        self.assertEqual(BackupRecord.objects.filter(status='completed').count(), 2)
+
+    @override_settings(SCHEDULER_ENABLED=True)
+    def test_interrupted_backups_are_failed(self):
+        record = queue_backup()
+        BackupRecord.objects.filter(pk=record.pk).update(
+            status='running', created_at=timezone.now() - timedelta(hours=7)
+        )
+        self.assertEqual(run_pending_backups(), [])
+        record.refresh_from_db()
+        self.assertEqual((record.status, record.error_message), ('failed', 'Interrupted'))
+        queue_backup()
+
+
+class SchedulerTests(TestCase):
+    now = timezone.make_aware(datetime(2026, 3, 10, 12, 0))
+
+    def setUp(self):
+        self.runs = []
+        self.job = Job(
+            name='test_job', func=lambda: self.runs.append(1), every=timedelta(hours=1),
+            jitter=timedelta(minutes=5), timeout=timedelta(minutes=10),
+        )
+
+    def test_new_jobs_first_run_an_interval_later(self):
+        self.assertFalse(run_job(self.job, self.now))
+        next_run_at = ScheduledJob.objects.get(name='test_job').next_run_at
+        self.assertGreaterEqual(next_run_at, self.now + timedelta(hours=1))
+        self.assertLessEqual(next_run_at, self.now + timedelta(hours=1, minutes=5))
+
+        self.assertTrue(run_job(self.job, next_run_at))
+        self.assertEqual(self.runs, [1])
+        self.assertFalse(run_job(self.job, next_run_at))
+
+    def test_a_lease_is_held_by_one_worker_until_it_expires(self):
+        ScheduledJob.objects.create(name='test_job', next_run_at=self.now)
+        self.assertTrue(_claim(self.job, self.now))
+        # Every other poll, however late, is refused while the lease holds
+        self.assertFalse(_claim(self.job, self.now))
+        self.assertFalse(run_job(self.job, self.now + timedelta(minutes=9)))
+        self.assertEqual(self.runs, [])
+
+        # A worker that died mid-run loses the lease after the timeout
+        self.assertTrue(run_job(self.job, self.now + timedelta(minutes=11)))
+        self.assertEqual(self.runs, [1])
+        job = ScheduledJob.objects.get(name='test_job')
+        self.assertEqual((job.last_status, job.locked_by, job.locked_until), ('succeeded', None, None))
+
+    @override_settings(SCHEDULER_RETRY_SECONDS=60, SCHEDULER_RETRY_MAX_SECONDS=600)
+    def test_failed_runs_are_retried_with_a_growing_delay(self):
+        def fail():
+            raise Exception('boom')
+
+        self.job.func = fail
+        ScheduledJob.objects.create(name='test_job', next_run_at=self.now)
+        now = self.now
+        delays = []
+        for _ in range(5):
+            self.assertTrue(run_job(self.job, now))
+            job = ScheduledJob.objects.get(name='test_job')
+            delays.append((job.next_run_at - now).total_seconds())
+            now = job.next_run_at
+        # Doubling from a minute, capped well short of the hourly interval
+        self.assertEqual(delays, [60, 120, 240, 480, 600])
+        self.assertEqual((job.last_status, job.last_error, job.failures), ('failed', 'boom', 5))
+
+        # A success resets the backoff and returns to the interval
+        self.job.func = lambda: self.runs.append(1)
+        self.assertTrue(run_job(self.job, now))
+        job = ScheduledJob.objects.get(name='test_job')
+        self.assertEqual(job.failures, 0)
+        self.assertGreaterEqual(job.next_run_at, now + timedelta(hours=1))
+
+    def test_daily_summary_carries_on_from_the_last_one_sent(self):
+        user = User.objects.create_user('owner', password='x')
+        last_sent = self.now - timedelta(hours=2)
+        AdminSettings.objects.create(user=user, last_notification_sent=last_sent)
+        summary = JOBS['daily_system_summary']
+
+        with mock.patch.object(summary, 'func') as send:
+            self.assertFalse(run_job(summary, self.now))
+        send.assert_not_called()
+        self.assertEqual(
+            ScheduledJob.objects.get(name='daily_system_summary').next_run_at,
+            last_sent + summary.every,
+        )
+
+
+@override_settings(
+    SYSTEM_LOG_RETENTION_DAYS=30,
+    SYSTEM_LOG_RETENTION_BY_LEVEL={'ERROR': 180},
+    SYSTEM_LOG_RETENTION_BY_CATEGORY={'security': 365},
+    SYSTEM_LOG_HOURLY_ROLLUP_DAYS=None,
+)
+class RetentionTests(TestCase):
+    now = timezone.make_aware(datetime(2026, 6, 1, 12, 0))
+
+    def log(self, days_ago, level='INFO', category='general', count=1):
+        created_at = self.now - timedelta(days=days_ago)
+        logs = SystemLog.objects.bulk_create(
+            [SystemLog(level=level, category=category, message='-') for _ in range(count)]
+        )
+        SystemLog.objects.filter(pk__in=[log.pk for log in logs]).update(created_at=created_at)
+        return created_at
+
+    def test_level_and_category_rules_override_the_default(self):
+        self.assertEqual(retention_days('INFO', 'general'), 30)
+        self.assertEqual(retention_days('ERROR', 'general'), 180)
+        self.assertEqual(retention_days('INFO', 'security'), 365)
+        # When both apply the longer one wins
+        self.assertEqual(retention_days('ERROR', 'security'), 365)
+
+    def test_expired_rows_are_rolled_up_and_deleted_in_chunks(self):
+        expired_at = self.log(40, count=5)
+        self.log(10)
+        self.log(40, level='ERROR')
+        self.log(200, category='security')
+
+        with CaptureQueriesContext(connection) as captured:
+            report = apply_retention(now=self.now, chunk_size=2)
+        self.assertEqual(report, {'dropped_partitions': 0, 'INFO/general': 5})
+        deletes = [q['sql'] for q in captured if q['sql'].startswith('DELETE FROM "admin_dashboard_systemlog"')]
+        self.assertEqual(len(deletes), 3)
+
+        self.assertEqual(
+            sorted(SystemLog.objects.values_list('level', 'category')),
+            [('ERROR', 'general'), ('INFO', 'general'), ('INFO', 'security')],
+        )
+        hour = expired_at.replace(minute=0, second=0, microsecond=0)
+        self.assertEqual(
+            set(SystemLogRollup.objects.values_list('granularity', 'bucket_start', 'level', 'category', 'count')),
+            {('hour', hour, 'INFO', 'general', 5), ('day', hour.replace(hour=0), 'INFO', 'general', 5)},
+        )
+
+    def test_rollups_accumulate_across_runs(self):
+        self.log(40, count=2)
+        rollup(SystemLog.objects.all())
+        self.assertEqual(rollup(SystemLog.objects.all()), 2)
+        self.assertEqual(
+            sorted(SystemLogRollup.objects.values_list('granularity', 'count')), [('day', 4), ('hour', 4)]
+        )
@@ -7,12 +7,14 @@ from projects_app.models import Project, UserGoals
 from time_logs_app.models import TimeLog
 from invoices_app.models import Invoice
 from clients_app.models import Client
+from backend.query_budget import query_budget
 
 
 class AnalyticsQuery(graphene.ObjectType):
     business_analytics = graphene.Field(graphene.JSONString)
 
     @staticmethod
+    @query_budget(16)
     def resolve_business_analytics(root, info):
         if not info.context.user or not info.context.user.is_authenticated:
             return {}
@@ -81,23 +83,22 @@ class AnalyticsQuery(graphene.ObjectType):
                 'amount': float(item['amount'])
             })
 
-        # Top performing clients - calculate revenue separately due to complex relationships
-        clients = Client.objects.filter(user=user)
+        # Top performing clients: revenue and billable minutes per client,
+        # one grouped query each
+        revenue_by_client = dict(
+            Invoice.objects.filter(client__user=user, status='PAID')
+            .order_by().values('client').annotate(total=Sum('total')).values_list('client', 'total')
+        )
+        minutes_by_client = dict(
+            TimeLog.objects.filter(client__user=user, is_billable=True)
+            .order_by().values('client').annotate(total=Sum('duration_minutes')).values_list('client', 'total')
+        )
+        clients = Client.objects.filter(user=user).only('id', 'name')
         top_clients_data = []
 
         for client in clients:
-            # Calculate revenue for this client
-            client_revenue = Invoice.objects.filter(
-                client=client,
-                status='PAID'
-            ).aggregate(total=Sum('total'))['total'] or 0
-
-            # Calculate billable hours for this client
-            client_hours = TimeLog.objects.filter(
-                client=client,
-                is_billable=True
-            ).aggregate(total=Sum('duration_minutes'))['total'] or 0
-            client_hours = round(client_hours / 60, 1)  # Convert to hours
+            client_revenue = revenue_by_client.get(client.pk) or 0
+            client_hours = round((minutes_by_client.get(client.pk) or 0) / 60, 1)  # Convert to hours
 
             if client_revenue > 0:  # Only include clients with revenue
                 top_clients_data.append({
@@ -0,0 +1,101 @@
+# backend/query_budget.py
+
+"""
+SQL query-count budgets for GraphQL operations.
+
+Resolvers declare how many SQL queries an operation selecting their root field
+(including its nested relations) may cost:
+
+    @staticmethod
+    @query_budget(3)
+    def resolve_all_invoices(root, info, ...):
+        ...
+
+The registry is enforced by ``backend.tests.QueryBudgetTestCase``, which replays the
+operations used by the React frontend (collected from the query strings in
+``src/``) against a seeded database and fails with the captured SQL whenever
+an operation exceeds the sum of its root fields' budgets.
+"""
+
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from graphene.utils.str_converters import to_camel_case
+from graphql import OperationDefinitionNode, parse
+
+
+# GraphQL root field name -> maximum number of SQL queries
+QUERY_BUDGETS = {}
+
+FRONTEND_SRC_DIR = Path(settings.BASE_DIR).parent / 'src'
+
+_OPERATION_RE = re.compile(r'`\s*((?:query|mutation)\b[^`]*)`')
+
+
+def query_budget(max_queries, field=None):
+    """
+    Declare the SQL query budget for the root field served by a resolver.
+
+    The field name defaults to the camelCase form of the resolver name, so
+    ``resolve_all_invoices`` registers ``allInvoices``. Budgets are keyed by
+    root field alone, so declaring one twice (e.g. on two app queries that
+    both define the field) raises ImproperlyConfigured: only the resolver
+    the root schema serves should declare it.
+    """
+    def decorator(func):
+        name = field or to_camel_case(func.__name__[len('resolve_'):])
+        if name in QUERY_BUDGETS:
+            raise ImproperlyConfigured(
+                f"Query budget for '{name}' declared twice (again on {func.__module__}.{func.__qualname__})"
+            )
+        QUERY_BUDGETS[name] = max_queries
+        return func
+    return decorator
+
+
+def collect_frontend_operations(src_dir=FRONTEND_SRC_DIR, kinds=('query',)):
+    """
+    Collect the GraphQL operations embedded as template literals in the
+    frontend sources.
+
+    Returns a list of ``(source, document)`` tuples, de-duplicated by document
+    text. Literals that interpolate JavaScript (``${...}``) are skipped since
+    they cannot be replayed verbatim.
+    """
+    operations = []
+    seen = set()
+    for path in sorted(Path(src_dir).rglob('*.js*')):
+        text = path.read_text(encoding='utf-8')
+        for match in _OPERATION_RE.finditer(text):
+            document = match.group(1).strip()
+            if '${' in document or document.split(None, 1)[0] not in kinds:
+                continue
+            normalized = ' '.join(document.split())
+            if normalized in seen:
+                continue
+            seen.add(normalized)
+            line = text.count('\n', 0, match.start()) + 1
+            operations.append((f"{path.relative_to(src_dir)}:{line}", document))
+    return operations
+
+
+def operation_budget(document):
+    """
+    Return ``(name, budget)`` for a GraphQL document.
+
+    The budget is the sum of the declared budgets of the operation's root
+    fields, or ``None`` if any root field has no budget declared.
+    """
+    operation = next(
+        d for d in parse(document).definitions if isinstance(d, OperationDefinitionNode)
+    )
+    name = operation.name.value if operation.name else '<anonymous>'
+    budget = 0
+    for selection in operation.selection_set.selections:
+        field_budget = QUERY_BUDGETS.get(selection.name.value)
+        if field_budget is None:
+            return name, None
+        budget += field_budget
+    return name, budget
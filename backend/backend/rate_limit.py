@@ -0,0 +1,48 @@
+# backend/rate_limit.py
+
+"""
+Token-bucket rate limiting backed by the Django cache.
+
+Each key gets a bucket of ``burst`` tokens that refills at ``rate`` tokens
+per second; a call is allowed while the bucket holds at least one token.
+State lives in the default cache, so limits are per process with the default
+local-memory cache and shared across workers with a shared cache (Redis,
+Memcached, database).
+
+    if not allow(f"inquiry:{client_ip(request)}", rate=2 / 60, burst=5):
+        raise Exception("Too many requests. Please try again later.")
+"""
+
+import time
+
+from django.core.cache import cache
+
+
+def allow(key, rate, burst):
+    """Take one token from the bucket for ``key``; return False if it is empty."""
+    cache_key = f"rate_limit:{key}"
+    now = time.time()
+    tokens, updated = cache.get(cache_key, (burst, now))
+
+    tokens = min(burst, tokens + (now - updated) * rate)
+    allowed = tokens >= 1
+    if allowed:
+        tokens -= 1
+
+    # Keep the entry until the bucket would be full again
+    cache.set(cache_key, (tokens, now), timeout=int((burst - tokens) / rate) + 1)
+    return allowed
+
+
+def client_ip(request):
+    """
+    The client address of ``request``.
+
+    Behind a reverse proxy the last X-Forwarded-For entry is the one the
+    proxy added, so unlike the first it cannot be forged by the client.
+    """
+    meta = getattr(request, 'META', {})
+    forwarded = meta.get('HTTP_X_FORWARDED_FOR')
+    if forwarded:
+        return forwarded.split(',')[-1].strip()
+    return meta.get('REMOTE_ADDR')
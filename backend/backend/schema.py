@@ -14,6 +14,8 @@ from projects_app.schema import ProjectQuery, ProjectMutation
 from projects_app.models import Project
 from time_logs_app.schema import TimeLogQuery, TimeLogMutation
 from analytics_app.schema import AnalyticsQuery
+from search_app.schema import SearchQuery
+from .query_budget import query_budget
 
 
 class UserType(DjangoObjectType):
@@ -52,10 +54,11 @@ class ObtainJSONWebToken(graphql_jwt.ObtainJSONWebToken):
         return super().resolve_mutation(root, info, **kwargs)
 
 
-class Query(ProjectQuery, InquiryQuery, AdminDashboardQuery, InvoiceQuery, ClientQuery, TimeLogQuery, AnalyticsQuery, graphene.ObjectType):
+class Query(ProjectQuery, InquiryQuery, AdminDashboardQuery, InvoiceQuery, ClientQuery, TimeLogQuery, AnalyticsQuery, SearchQuery, graphene.ObjectType):
     # Resolve field conflicts by explicitly choosing which implementation to use
     # Use ClientQuery for client-related fields (more complete)
     all_clients = ClientQuery.all_clients
+    resolve_all_clients = staticmethod(ClientQuery.resolve_all_clients)
     client = ClientQuery.client
 
     # Use ProjectQuery for project-related fields (more complete)
@@ -74,13 +77,14 @@ class Query(ProjectQuery, InquiryQuery, AdminDashboardQuery, InvoiceQuery, Clien
     me = graphene.Field(UserType)
 
     @staticmethod
+    @query_budget(2)
     def resolve_all_projects(root, info, status=None, client_id=None, phase=None, priority=None, is_active=None, limit=None, offset=None):
         # Public listing: unauthenticated users should see active projects only
         if not info.context.user.is_authenticated:
-            queryset = Project.objects.filter(is_active=True)
+            queryset = Project.objects.filter(is_active=True).select_related('client')
         else:
             # Authenticated users see their own projects (management view)
-            queryset = Project.objects.filter(user=info.context.user)
+            queryset = Project.objects.filter(user=info.context.user).select_related('client')
 
         if status:
             queryset = queryset.filter(status=status)
@@ -102,12 +106,13 @@ class Query(ProjectQuery, InquiryQuery, AdminDashboardQuery, InvoiceQuery, Clien
         return queryset
 
     @staticmethod
+    @query_budget(2)
     def resolve_all_management_projects(root, info, status=None, client_id=None, phase=None, priority=None, is_active=None, limit=None, offset=None):
         # TEMPORARILY DISABLE AUTH FILTERING FOR DEBUGGING
         # if not info.context.user.is_authenticated:
         #     return Project.objects.none()
         # queryset = Project.objects.filter(user=info.context.user)
-        queryset = Project.objects.all()  # Show all projects for debugging
+        queryset = Project.objects.select_related('client')  # Show all projects for debugging
 
         if status:
             queryset = queryset.filter(status=status)
@@ -128,6 +133,7 @@ class Query(ProjectQuery, InquiryQuery, AdminDashboardQuery, InvoiceQuery, Clien
 
         return queryset
 
+    @query_budget(0)
     def resolve_me(self, info):
         user = info.context.user
         if user.is_authenticated:
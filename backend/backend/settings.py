@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import json
 import os
+import sys
 from pathlib import Path
 import dj_database_url
 
@@ -20,6 +22,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Environment-based settings
 ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
 DEBUG = ENVIRONMENT != 'production'
+# Running under `manage.py test`
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
 SECRET_KEY = os.getenv('SECRET_KEY', 'django-insecure-l9!*66neoz$ldsv*pzi546yqp5zqp6+hr9v(1)1pvs_k%(lxjp')
 
 # ALLOWED_HOSTS configuration
@@ -49,11 +53,12 @@ INSTALLED_APPS = [
     "time_logs_app",
     "projects_app",
     "analytics_app",
+    "search_app",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",  # WhiteNoise for static files
+    "projects_app.middleware.SnapshotWhiteNoiseMiddleware",  # WhiteNoise for static files and the portfolio snapshot
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -147,6 +152,9 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 # WhiteNoise configuration for production static files
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# Far-future caching for content-hashed files: collectstatic's and the
+# portfolio snapshot's (name.<12 hex digits>.ext)
+WHITENOISE_IMMUTABLE_FILE_TEST = r"^.+\.[0-9a-f]{12}\.\w+$"
 
 # Media files
 MEDIA_URL = "/media/"
@@ -201,6 +209,7 @@ else:
 from corsheaders.defaults import default_headers
 CORS_ALLOW_HEADERS = list(default_headers) + [
     'authorization',
+    'x-chunk-sha256',  # chunked project file uploads
 ]
 
 # Security settings for production
@@ -249,6 +258,140 @@ else:
 SYSTEM_NOTIFICATION_EMAIL = 'immanueleshun9@gmail.com'
 SYSTEM_NOTIFICATION_INTERVAL_HOURS = 24
 
+# Units of each currency per US dollar, used to show reports in a currency
+# other than the user's (invoices_app.aging), e.g. '{"USD": 1, "GHS": 15.4}'
+EXCHANGE_RATES = json.loads(os.getenv('EXCHANGE_RATES', '{}'))
+
+# Invoice documents (invoices_app.rendering): render pool size, storage
+# prefix of the content-addressed renders, and how long downloadInvoice
+# waits for a render before returning it as pending (by default not at all:
+# the client polls rather than holding a request thread)
+INVOICE_RENDER_WORKERS = int(os.getenv('INVOICE_RENDER_WORKERS', 2))
+INVOICE_RENDER_PREFIX = os.getenv('INVOICE_RENDER_PREFIX', 'invoices/renders')
+INVOICE_RENDER_WAIT_SECONDS = float(os.getenv('INVOICE_RENDER_WAIT_SECONDS', 0))
+
+# Follow-up and invoice reminder digests (admin_dashboard.reminders)
+INVOICE_REMINDER_DAYS_BEFORE = int(os.getenv('INVOICE_REMINDER_DAYS_BEFORE', 3))
+REMINDER_EMAIL_BATCH_SIZE = int(os.getenv('REMINDER_EMAIL_BATCH_SIZE', 100))
+
+# In-process periodic job scheduler (admin_dashboard.scheduler). Each web
+# worker polls on a thread; the database ensures a due job runs only once.
+# Backups, inquiry ingest, reminders, the overdue sweeps and image refreshes
+# are scheduler jobs: turn it on in production (render.yaml does), or run
+# the run_scheduler command.
+SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'False').lower() == 'true'
+SCHEDULER_TICK_SECONDS = int(os.getenv('SCHEDULER_TICK_SECONDS', 30))
+# A failed job is retried after this many seconds, doubling per consecutive
+# failure up to the maximum (and at most one regular interval later)
+SCHEDULER_RETRY_SECONDS = int(os.getenv('SCHEDULER_RETRY_SECONDS', 60))
+SCHEDULER_RETRY_MAX_SECONDS = int(os.getenv('SCHEDULER_RETRY_MAX_SECONDS', 3600))
+
+# Buffered SystemLog writer (admin_dashboard.log_buffer). With
+# SYSTEM_LOG_ASYNC off (the default under tests) rows are written inline.
+SYSTEM_LOG_ASYNC = os.getenv('SYSTEM_LOG_ASYNC', str(not TESTING)).lower() == 'true'
+SYSTEM_LOG_BATCH_SIZE = int(os.getenv('SYSTEM_LOG_BATCH_SIZE', 100))
+SYSTEM_LOG_FLUSH_INTERVAL_MS = int(os.getenv('SYSTEM_LOG_FLUSH_INTERVAL_MS', 500))
+SYSTEM_LOG_QUEUE_SIZE = int(os.getenv('SYSTEM_LOG_QUEUE_SIZE', 10000))
+
+# SystemLog retention (admin_dashboard.retention), in days. A level or
+# category rule overrides the default; when both match, the longer one applies.
+SYSTEM_LOG_RETENTION_DAYS = int(os.getenv('SYSTEM_LOG_RETENTION_DAYS', 90))
+SYSTEM_LOG_RETENTION_BY_LEVEL = {
+    'DEBUG': 7,
+    'INFO': 30,
+    'WARNING': 90,
+    'ERROR': 180,
+    'CRITICAL': 365,
+}
+SYSTEM_LOG_RETENTION_BY_CATEGORY = {
+    'security': 365,
+}
+SYSTEM_LOG_RETENTION_CHUNK_SIZE = int(os.getenv('SYSTEM_LOG_RETENTION_CHUNK_SIZE', 5000))
+SYSTEM_LOG_HOURLY_ROLLUP_DAYS = int(os.getenv('SYSTEM_LOG_HOURLY_ROLLUP_DAYS', 90))
+# Monthly range partitions for SystemLog (PostgreSQL only)
+SYSTEM_LOG_PARTITIONING = os.getenv('SYSTEM_LOG_PARTITIONING', 'False').lower() == 'true'
+
+# Backups (admin_dashboard.backup)
+BACKUP_DIR = os.getenv('BACKUP_DIR', str(BASE_DIR / 'backups'))
+BACKUP_COMPRESSION = os.getenv('BACKUP_COMPRESSION', 'gzip')  # 'gzip' or 'zstd'
+BACKUP_CHUNK_SIZE = int(os.getenv('BACKUP_CHUNK_SIZE', 2000))
+# Scheduled backups are incremental unless the last full one is older than this
+BACKUP_FULL_INTERVAL_DAYS = int(os.getenv('BACKUP_FULL_INTERVAL_DAYS', 7))
+
+# Relative weights of the lead score components (inquiries.scoring)
+LEAD_SCORE_WEIGHTS = {
+    'budget': 35,
+    'timeline': 20,
+    'service': 15,
+    'source': 15,
+    'message': 15,
+}
+
+# Working hours per calendar day when laying out project schedules
+# (projects_app.schedule)
+SCHEDULE_HOURS_PER_DAY = float(os.getenv('SCHEDULE_HOURS_PER_DAY', 8))
+
+# Budget burn forecasts (projects_app.forecast): days of logged time the
+# smoothed daily rates look back over, and their smoothing factor
+FORECAST_WINDOW_DAYS = int(os.getenv('FORECAST_WINDOW_DAYS', 90))
+FORECAST_SMOOTHING = float(os.getenv('FORECAST_SMOOTHING', 0.1))
+
+# Slug to id mappings kept per process for portfolio page lookups
+# (projects_app.slugs)
+PROJECT_SLUG_CACHE_SIZE = int(os.getenv('PROJECT_SLUG_CACHE_SIZE', 1024))
+
+# Static portfolio snapshot (projects_app.snapshot), written under
+# STATIC_ROOT/PORTFOLIO_SNAPSHOT_DIR and rebuilt after project saves when
+# enabled (by default outside development); files dropped from it are
+# removed after the retention
+PORTFOLIO_SNAPSHOT_DIR = os.getenv('PORTFOLIO_SNAPSHOT_DIR', 'portfolio')
+PORTFOLIO_SNAPSHOT_ON_SAVE = os.getenv('PORTFOLIO_SNAPSHOT_ON_SAVE', str(not DEBUG)).lower() == 'true'
+PORTFOLIO_SNAPSHOT_RETENTION_HOURS = int(os.getenv('PORTFOLIO_SNAPSHOT_RETENTION_HOURS', 24))
+
+# Responsive derivatives of project logos and case-study visuals
+# (projects_app.images): target widths and formats (AVIF only when Pillow
+# can encode it), storage prefix, and the size of the process pool
+IMAGE_DERIVATIVE_WIDTHS = [int(w) for w in os.getenv('IMAGE_DERIVATIVE_WIDTHS', '320,640,960,1280,1920').split(',')]
+IMAGE_DERIVATIVE_FORMATS = os.getenv('IMAGE_DERIVATIVE_FORMATS', 'avif,webp').split(',')
+IMAGE_DERIVATIVE_PREFIX = os.getenv('IMAGE_DERIVATIVE_PREFIX', 'images/derivatives')
+IMAGE_DERIVATIVE_WORKERS = int(os.getenv('IMAGE_DERIVATIVE_WORKERS', 2))
+# An original that failed to fetch or render is retried after this many
+# seconds, doubling per consecutive failure up to the maximum
+IMAGE_RETRY_SECONDS = int(os.getenv('IMAGE_RETRY_SECONDS', 15 * 60))
+IMAGE_RETRY_MAX_SECONDS = int(os.getenv('IMAGE_RETRY_MAX_SECONDS', 24 * 60 * 60))
+
+# Chunked project file uploads (projects_app.uploads). Files are stored in
+# PROJECT_FILE_STORAGE: under MEDIA_ROOT by default, or with any
+# django-storages backend (e.g. storages.backends.s3.S3Storage, configured
+# by its AWS_* settings) named in PROJECT_FILE_STORAGE_BACKEND
+PROJECT_FILE_STORAGE_BACKEND = os.getenv(
+    'PROJECT_FILE_STORAGE_BACKEND', 'django.core.files.storage.FileSystemStorage'
+)
+PROJECT_FILE_STORAGE = {
+    "BACKEND": PROJECT_FILE_STORAGE_BACKEND,
+    "OPTIONS": {"location": MEDIA_ROOT / "project_files", "base_url": f"{MEDIA_URL}project_files/"}
+    if PROJECT_FILE_STORAGE_BACKEND.endswith('.FileSystemStorage') else {},
+}
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))
+UPLOAD_SESSION_HOURS = int(os.getenv('UPLOAD_SESSION_HOURS', 24))
+UPLOAD_ASSEMBLY_WORKERS = int(os.getenv('UPLOAD_ASSEMBLY_WORKERS', 2))
+UPLOAD_ASSEMBLY_HOURS = int(os.getenv('UPLOAD_ASSEMBLY_HOURS', 2))
+PROJECT_FILE_MAX_SIZE = int(os.getenv('PROJECT_FILE_MAX_SIZE', 20 * 1024 ** 3))
+
+# Duplicate detection (clients_app.dedup): minimum similarity for a pair to be
+# reported, and the block size above which blocks are windowed
+DEDUP_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', 0.85))
+DEDUP_MAX_BLOCK_SIZE = int(os.getenv('DEDUP_MAX_BLOCK_SIZE', 200))
+
+# Public inquiry submissions (inquiries.ingest). With write-behind, anonymous
+# CreateInquiry posts are queued and bulk-inserted by a scheduler job;
+# a submission that fails INQUIRY_INGEST_MAX_ATTEMPTS times is dead-lettered.
+INQUIRY_WRITE_BEHIND = os.getenv('INQUIRY_WRITE_BEHIND', str(SCHEDULER_ENABLED)).lower() == 'true'
+INQUIRY_INGEST_BATCH_SIZE = int(os.getenv('INQUIRY_INGEST_BATCH_SIZE', 500))
+INQUIRY_INGEST_MAX_ATTEMPTS = int(os.getenv('INQUIRY_INGEST_MAX_ATTEMPTS', 5))
+INQUIRY_RATE_LIMIT_BURST = int(os.getenv('INQUIRY_RATE_LIMIT_BURST', 5))
+INQUIRY_RATE_LIMIT_PER_HOUR = int(os.getenv('INQUIRY_RATE_LIMIT_PER_HOUR', 20))
+
 AUTHENTICATION_BACKENDS = [
     'graphql_jwt.backends.JSONWebTokenBackend',
     'django.contrib.auth.backends.ModelBackend',
@@ -273,6 +416,10 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'simple',
         },
+        'system_log': {
+            'class': 'admin_dashboard.log_buffer.SystemLogHandler',
+            'level': 'INFO',
+        },
     },
     'root': {
         'handlers': ['console'],
@@ -289,6 +436,12 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': False,
         },
+        # Audit events persisted as SystemLog rows
+        'vistaforge.audit': {
+            'handlers': ['console', 'system_log'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -0,0 +1,228 @@
+# backend/tests.py
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from graphql import NonNullTypeNode, OperationDefinitionNode, parse, validate
+
+from .query_budget import QUERY_BUDGETS, collect_frontend_operations, operation_budget, query_budget
+from .schema import schema
+
+
+def seed_budget_data(user, clients=3, invoices_per_client=3, items_per_invoice=4, tasks_per_project=5):
+    """
+    Seed a small but relationally complete dataset for ``user``.
+
+    Every relation is populated with more than one row so that an N+1 access
+    pattern shows up as a query count that grows with the data. Returns a
+    dict of representative object ids used to fill operation variables.
+    """
+    from clients_app.models import Client, ClientContact, ClientNote
+    from inquiries.models import Inquiry
+    from invoices_app.models import Invoice, InvoiceItem
+    from projects_app.models import Project, ProjectMilestone, ProjectTask, ProjectNote
+    from time_logs_app.models import TimeLog
+
+    today = date.today()
+    ids = {}
+    for c in range(clients):
+        client = Client.objects.create(
+            user=user, name=f"Client {c}", company=f"Company {c}",
+            contact_email=f"client{c}@example.com",
+        )
+        ClientContact.objects.create(client=client, name=f"Contact {c}", email=f"contact{c}@example.com")
+        ClientNote.objects.create(client=client, user=user, title=f"Note {c}", content="Kick-off call")
+
+        project = Project.objects.create(
+            user=user, client=client, title=f"Project {c}", slug=f"project-{c}",
+            budget=Decimal('5000'), hourly_rate=Decimal('50'), estimated_hours=Decimal('100'),
+            start_date=today - timedelta(days=30), end_date=today + timedelta(days=30),
+        )
+        milestone = ProjectMilestone.objects.create(
+            project=project, title=f"Milestone {c}", due_date=today + timedelta(days=7),
+        )
+        for t in range(tasks_per_project):
+            task = ProjectTask.objects.create(
+                project=project, milestone=milestone, title=f"Task {c}.{t}",
+                status='COMPLETED' if t % 2 else 'TODO', estimated_hours=Decimal('4'), order=t,
+            )
+            TimeLog.objects.create(
+                user=user, client=client, project=project, task=task, task_name=task.title,
+                start_time=timezone.now() - timedelta(hours=t + 1), duration_minutes=60,
+                hourly_rate=Decimal('50'),
+            )
+        ProjectNote.objects.create(project=project, user=user, title=f"Note {c}", content="Scope agreed")
+
+        Inquiry.objects.create(
+            user=user, client_name=f"Lead {c}", client_email=f"lead{c}@example.com",
+            message="We need a new website", budget_range='MID_5K_10K',
+        )
+
+        for i in range(invoices_per_client):
+            invoice = Invoice.objects.create(
+                user=user, client=client, invoice_number=f"INV-{c}-{i}",
+                issue_date=today - timedelta(days=20), due_date=today - timedelta(days=5),
+                status='SENT',
+            )
+            for n in range(items_per_invoice):
+                InvoiceItem.objects.create(
+                    invoice=invoice, description=f"Item {n}", quantity=Decimal('2'), rate=Decimal('25'),
+                )
+
+        ids.update(client=client.pk, project=project.pk, milestone=milestone.pk,
+                   task=task.pk, invoice=invoice.pk, slug=project.slug)
+    return ids
+
+
+# Frontend operations that do not match the schema, with what is wrong.
+# They fail in the browser too; fix the frontend and drop them from here.
+KNOWN_INVALID_OPERATIONS = {
+    'GetAllContacts': "queries allContacts, which does not exist (contacts are clientContacts(clientId))",
+    'GetMilestones': "queries allMilestones, which does not exist",
+    'GetUnbilledTimeLogs': "passes isBilled, which allTimeLogs does not accept",
+}
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    Base test case for asserting SQL query budgets of GraphQL operations.
+    """
+
+    user = None
+
+    def execute_operation(self, document, variables=None, user=None):
+        """Execute a GraphQL document and return ``(result, captured_queries)``."""
+        request = RequestFactory().post('/graphql/')
+        request.user = user or self.user or AnonymousUser()
+        with CaptureQueriesContext(connection) as captured:
+            result = schema.execute(document, variables=variables, context_value=request)
+        return result, captured.captured_queries
+
+    def assertWithinBudget(self, document, budget, variables=None, user=None, label=None):
+        """
+        Fail if ``document`` returns errors (a failing resolver costs fewer
+        queries than a working one) or costs more than ``budget`` queries,
+        with the captured SQL.
+        """
+        result, queries = self.execute_operation(document, variables=variables, user=user)
+        if result.errors:
+            self.fail(f"{label or 'Operation'} returned errors: {'; '.join(e.message for e in result.errors)}")
+        if len(queries) > budget:
+            sql = '\n'.join(f"  {i}. {q['sql']}" for i, q in enumerate(queries, start=1))
+            self.fail(
+                f"{label or 'Operation'} executed {len(queries)} queries, budget is {budget}:\n{sql}"
+            )
+        return result
+
+
+class FrontendOperationBudgetTests(QueryBudgetTestCase):
+    """Replay every query operation used by the frontend against its budget."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='budget_admin', password='unused')
+        cls.ids = seed_budget_data(cls.user)
+
+    def variables_for(self, document):
+        """
+        Fill an operation's required variables from the seeded object ids:
+        ``id`` is the root field's object, ``<name>Id`` the named object, and
+        any other required variable the seeded value of the same name.
+        """
+        operation = next(
+            d for d in parse(document).definitions if isinstance(d, OperationDefinitionNode)
+        )
+        root_field = operation.selection_set.selections[0].name.value
+        variables = {}
+        for definition in operation.variable_definitions:
+            if not isinstance(definition.type, NonNullTypeNode):
+                continue
+            name = definition.variable.name.value
+            if name == 'id':
+                variables[name] = self.ids.get(root_field)
+            elif name.endswith('Id') and name[:-2] in self.ids:
+                variables[name] = self.ids[name[:-2]]
+            else:
+                variables[name] = self.ids.get(name)
+        return variables
+
+    def test_frontend_operations_within_budget(self):
+        invalid = {}
+        for source, document in collect_frontend_operations():
+            name, budget = operation_budget(document)
+            with self.subTest(operation=name, source=source):
+                errors = validate(schema.graphql_schema, parse(document))
+                if errors:
+                    invalid[name] = errors[0].message
+                    self.assertIn(
+                        name, KNOWN_INVALID_OPERATIONS,
+                        f"does not validate against the schema: {errors[0].message}",
+                    )
+                    continue
+                self.assertNotIn(name, KNOWN_INVALID_OPERATIONS, "validates now; drop it from KNOWN_INVALID_OPERATIONS")
+                self.assertIsNotNone(budget, "no query budget declared for its root fields")
+                variables = self.variables_for(document)
+                missing = [key for key, value in variables.items() if value is None]
+                self.assertFalse(missing, f"no seeded value for required variable(s) {', '.join(missing)}")
+                self.assertWithinBudget(document, budget, variables=variables, label=name)
+        self.assertEqual(sorted(invalid), sorted(KNOWN_INVALID_OPERATIONS))
+
+
+class BudgetedListQueryTests(QueryBudgetTestCase):
+    """The list queries behind the main screens cost a fixed number of queries however many rows they return."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='budget_admin', password='unused')
+        seed_budget_data(cls.user)
+
+    def assertQueries(self, document, count):
+        self.assertLessEqual(count, operation_budget(document)[1])
+        with self.assertNumQueries(count):
+            result = schema.execute(document, context_value=self.request())
+        self.assertIsNone(result.errors)
+        return result.data
+
+    def request(self):
+        request = RequestFactory().post('/graphql/')
+        request.user = self.user
+        return request
+
+    def test_all_invoices(self):
+        data = self.assertQueries(
+            'query { allInvoices { id total client { name } project { title } items { description amount } } }', 2
+        )
+        self.assertEqual(len(data['allInvoices']), 9)
+        self.assertEqual(sum(len(invoice['items']) for invoice in data['allInvoices']), 36)
+
+    def test_all_clients(self):
+        self.assertEqual(len(self.assertQueries('query { allClients { id name } }', 1)['allClients']), 3)
+
+    def test_all_projects(self):
+        data = self.assertQueries('query { allProjects { id title client { name } } }', 1)
+        self.assertEqual(len(data['allProjects']), 3)
+
+    def test_all_management_projects(self):
+        data = self.assertQueries('query { allManagementProjects { id title client { name } } }', 1)
+        self.assertEqual(len(data['allManagementProjects']), 3)
+
+    def test_all_time_logs(self):
+        data = self.assertQueries('query { allTimeLogs { id client { name } project { title } } }', 1)
+        self.assertEqual(len(data['allTimeLogs']), 15)
+
+    def test_all_inquiries(self):
+        self.assertEqual(len(self.assertQueries('query { allInquiries { id clientName } }', 1)['allInquiries']), 3)
+
+    def test_business_analytics(self):
+        self.assertQueries('query { businessAnalytics }', 16)
+
+    def test_a_root_field_budget_is_declared_once(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "'allInvoices' declared twice"):
+            query_budget(1, field='allInvoices')(lambda root, info: None)
+        self.assertEqual(QUERY_BUDGETS['allInvoices'], 3)
@@ -20,6 +20,7 @@ from graphene_django.views import GraphQLView
 from django.views.decorators.csrf import csrf_exempt
 from graphql_jwt.decorators import jwt_cookie
 from admin_security.admin_config import exclusive_admin_site
+from projects_app import views as project_views
 from .schema import schema
 from . import views
 
@@ -32,6 +33,10 @@ urlpatterns = [
     path('admin/login/', exclusive_admin_site.urls),
     path('admin/', admin.site.urls),  # Fallback admin URL
 
+    # Chunked project file uploads; sessions are started with the
+    # startProjectFileUpload mutation
+    path('uploads/<uuid:upload_id>/chunks/<int:index>', project_views.upload_chunk, name='upload_chunk'),
+
     # GraphQL API
     # Accept both with and without trailing slash so POST requests from
     # clients that omit the trailing slash won't trigger APPEND_SLASH redirects
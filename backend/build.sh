@@ -16,4 +16,7 @@ python3 manage.py migrate --noinput
 # Collect static files
 python3 manage.py collectstatic --noinput --clear
 
+# Pre-render the public portfolio into STATIC_ROOT (removed by --clear)
+python3 manage.py build_portfolio_snapshot
+
 echo "Build completed successfully!"
\ No newline at end of file
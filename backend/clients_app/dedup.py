@@ -0,0 +1,363 @@
+# clients_app/dedup.py
+
+"""
+Fuzzy duplicate detection and merging for clients and inquiries.
+
+Comparing every contact with every other one is quadratic, so records are
+first grouped into blocks by cheap keys that duplicates are likely to share:
+
+- the normalized email address (case, ``+tags`` and Gmail dots removed)
+- the email domain, unless it is a free webmail domain
+- a phonetic key of the name (Soundex of the last name plus first initial)
+- the normalized company name
+- the last digits of the phone number
+
+Only records sharing a block are compared, using Jaro-Winkler similarity on
+name, email and company, plus whether the phone numbers match. A shared
+email is conclusive; a shared phone is one weighted signal among the
+others, since a household or an office switchboard shares one number.
+Blocks larger than ``DEDUP_MAX_BLOCK_SIZE`` are compared with a sliding
+window over the block sorted by name, so a very common key (say, one
+company's domain) stays linear.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import combinations
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+
+DEFAULT_THRESHOLD = 0.85
+DEFAULT_MAX_BLOCK_SIZE = 200
+WINDOW_SIZE = 10
+
+FREE_EMAIL_DOMAINS = {
+    'gmail.com', 'googlemail.com', 'yahoo.com', 'hotmail.com', 'outlook.com',
+    'live.com', 'icloud.com', 'me.com', 'aol.com', 'proton.me', 'protonmail.com',
+    'gmx.com', 'mail.com', 'yandex.com',
+}
+
+COMPANY_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'ltd', 'limited', 'co', 'corp', 'corporation',
+    'company', 'gmbh', 'plc', 'sa', 'srl', 'bv', 'pty', 'the',
+}
+
+# Weights of the field similarities in a pair's score
+FIELD_WEIGHTS = {'name': 0.4, 'email': 0.3, 'company': 0.15, 'phone': 0.15}
+
+
+@dataclass
+class Contact:
+    kind: str  # 'client' or 'inquiry'
+    id: int
+    name: str
+    email: str
+    company: str = ''
+    phone: str = ''
+
+    def __post_init__(self):
+        # Normalized once here rather than for every pair compared
+        self.norm_name = normalize_name(self.name)
+        self.norm_email = normalize_email(self.email)
+        self.norm_company = normalize_company(self.company)
+        self.norm_phone = normalize_phone(self.phone)
+
+
+@dataclass
+class Candidate:
+    left: Contact
+    right: Contact
+    score: float
+    reasons: list
+
+
+# --- Normalization ---
+
+def _ascii(value):
+    value = unicodedata.normalize('NFKD', value or '')
+    return value.encode('ascii', 'ignore').decode().lower().strip()
+
+
+def normalize_email(email):
+    local, _, domain = _ascii(email).partition('@')
+    local = local.split('+', 1)[0]
+    if domain in ('gmail.com', 'googlemail.com'):
+        local, domain = local.replace('.', ''), 'gmail.com'
+    return f"{local}@{domain}" if domain else local
+
+
+def normalize_name(name):
+    return ' '.join(re.sub(r'[^a-z0-9 ]', ' ', _ascii(name)).split())
+
+
+def normalize_company(company):
+    words = re.sub(r'[^a-z0-9 ]', ' ', _ascii(company)).split()
+    return ' '.join(word for word in words if word not in COMPANY_SUFFIXES)
+
+
+def normalize_phone(phone):
+    return re.sub(r'\D', '', phone or '')[-9:]
+
+
+def soundex(word):
+    """American Soundex code of ``word`` (e.g. ``Robert`` -> ``R163``)."""
+    word = re.sub(r'[^a-z]', '', _ascii(word))
+    if not word:
+        return ''
+    codes = {
+        **dict.fromkeys('bfpv', '1'), **dict.fromkeys('cgjkqsxz', '2'),
+        **dict.fromkeys('dt', '3'), 'l': '4', **dict.fromkeys('mn', '5'), 'r': '6',
+    }
+    result = word[0].upper()
+    previous = codes.get(word[0], '')
+    for char in word[1:]:
+        code = codes.get(char, '')
+        if code and code != previous:
+            result += code
+        if char not in 'hw':
+            previous = code
+    return (result + '000')[:4]
+
+
+def blocking_keys(contact):
+    keys = set()
+    email = contact.norm_email
+    if '@' in email:
+        keys.add(f"email:{email}")
+        domain = email.split('@', 1)[1]
+        if domain not in FREE_EMAIL_DOMAINS:
+            keys.add(f"domain:{domain}")
+    name = contact.norm_name.split()
+    if name:
+        keys.add(f"name:{soundex(name[-1])}:{name[0][0]}")
+    if contact.norm_company:
+        keys.add(f"company:{contact.norm_company}")
+    if len(contact.norm_phone) >= 7:
+        keys.add(f"phone:{contact.norm_phone}")
+    return keys
+
+
+# --- Similarity ---
+
+def jaro_winkler(a, b, prefix_scale=0.1):
+    """Jaro-Winkler similarity of two strings, from 0.0 to 1.0."""
+    if a == b:
+        return 1.0 if a else 0.0
+    if not a or not b:
+        return 0.0
+
+    window = max(len(a), len(b)) // 2 - 1
+    a_matched = [False] * len(a)
+    b_matched = [False] * len(b)
+    matches = 0
+    for i, char in enumerate(a):
+        end = min(len(b), i + window + 1)
+        j = b.find(char, max(0, i - window), end)
+        while j != -1 and b_matched[j]:
+            j = b.find(char, j + 1, end)
+        if j != -1:
+            a_matched[i] = b_matched[j] = True
+            matches += 1
+    if not matches:
+        return 0.0
+
+    a_chars = [char for char, hit in zip(a, a_matched) if hit]
+    b_chars = [char for char, hit in zip(b, b_matched) if hit]
+    transpositions = sum(x != y for x, y in zip(a_chars, b_chars)) / 2
+
+    jaro = (matches / len(a) + matches / len(b) + (matches - transpositions) / matches) / 3
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+def compare(left, right, threshold=0.0):
+    """
+    Return ``(score, reasons)`` for a pair of contacts.
+
+    Returns ``(None, [])`` as soon as the pair provably cannot reach
+    ``threshold``, skipping the remaining similarity computations.
+    """
+    if left.norm_email and left.norm_email == right.norm_email:
+        return 1.0, ['same email']
+
+    fields = ['name', 'email']
+    if left.norm_company and right.norm_company:
+        fields.append('company')
+    if len(left.norm_phone) >= 7 and len(right.norm_phone) >= 7:
+        fields.append('phone')
+    total_weight = sum(FIELD_WEIGHTS[name] for name in fields)
+
+    # Name first: if even perfect similarity of the other fields could not
+    # lift the pair over the threshold, stop here.
+    similarities = {'name': jaro_winkler(left.norm_name, right.norm_name)}
+    best_case = similarities['name'] * FIELD_WEIGHTS['name'] + total_weight - FIELD_WEIGHTS['name']
+    if best_case / total_weight < threshold:
+        return None, []
+
+    similarities['email'] = jaro_winkler(left.norm_email.split('@')[0], right.norm_email.split('@')[0])
+    if 'company' in fields:
+        similarities['company'] = jaro_winkler(left.norm_company, right.norm_company)
+    if 'phone' in fields:
+        similarities['phone'] = float(left.norm_phone == right.norm_phone)
+
+    score = sum(similarities[name] * FIELD_WEIGHTS[name] for name in fields) / total_weight
+    reasons = ['same phone' if name == 'phone' else f"similar {name}"
+               for name, value in similarities.items() if value >= 0.9]
+    return score, reasons
+
+
+# --- Candidate search ---
+
+def find_candidates(contacts, threshold=None, max_block_size=None):
+    """
+    Return duplicate candidates among ``contacts``, best first.
+
+    Pairs of two inquiries or two clients, or of an inquiry and a client, are
+    all considered.
+    """
+    threshold = threshold if threshold is not None else getattr(settings, 'DEDUP_THRESHOLD', DEFAULT_THRESHOLD)
+    max_block_size = max_block_size or getattr(settings, 'DEDUP_MAX_BLOCK_SIZE', DEFAULT_MAX_BLOCK_SIZE)
+
+    blocks = defaultdict(list)
+    for contact in contacts:
+        for key in blocking_keys(contact):
+            blocks[key].append(contact)
+
+    seen = set()
+    candidates = []
+    for block in blocks.values():
+        if len(block) < 2:
+            continue
+        if len(block) <= max_block_size:
+            pairs = combinations(block, 2)
+        else:
+            block = sorted(block, key=lambda c: c.norm_name)
+            pairs = (
+                (block[i], block[j])
+                for i in range(len(block))
+                for j in range(i + 1, min(len(block), i + WINDOW_SIZE))
+            )
+        for left, right in pairs:
+            pair = frozenset(((left.kind, left.id), (right.kind, right.id)))
+            if pair in seen:
+                continue
+            seen.add(pair)
+            score, reasons = compare(left, right, threshold)
+            if score is not None and score >= threshold:
+                candidates.append(Candidate(left, right, round(score, 4), reasons))
+
+    candidates.sort(key=lambda candidate: candidate.score, reverse=True)
+    return candidates
+
+
+def client_contacts(user):
+    from .models import Client
+
+    return [
+        Contact('client', pk, name, email, company or '', phone or '')
+        for pk, name, email, company, phone in Client.objects.filter(user=user).values_list(
+            'id', 'name', 'contact_email', 'company', 'phone'
+        )
+    ]
+
+
+def inquiry_contacts(user):
+    """Inquiries that have not been converted to a client yet."""
+    from inquiries.models import Inquiry
+
+    return [
+        Contact('inquiry', pk, name, email, company or '', phone or '')
+        for pk, name, email, company, phone in Inquiry.objects.filter(
+            user=user, converted_client__isnull=True
+        ).values_list('id', 'client_name', 'client_email', 'client_company', 'client_phone')
+    ]
+
+
+def find_matching_client(user, name, email, company=None, phone=None):
+    """
+    Return the id of the existing client that best matches a contact, or None.
+
+    Candidates are narrowed down in the database by email, company domain,
+    phone and last name before being scored.
+    """
+    from .models import Client
+
+    contact = Contact('inquiry', 0, name, email, company or '', phone or '')
+    filters = Q(contact_email__iexact=email)
+    domain = normalize_email(email).partition('@')[2]
+    if domain and domain not in FREE_EMAIL_DOMAINS:
+        filters |= Q(contact_email__iendswith=f"@{domain}")
+    if normalize_phone(phone):
+        filters |= Q(phone__endswith=normalize_phone(phone)[-7:])
+    if company:
+        filters |= Q(company__iexact=company)
+    name_words = normalize_name(name).split()
+    if name_words:
+        filters |= Q(name__icontains=name_words[-1])
+
+    best_id, best_score = None, getattr(settings, 'DEDUP_THRESHOLD', DEFAULT_THRESHOLD)
+    for pk, client_name, client_email, client_company, client_phone in Client.objects.filter(
+        filters, user=user
+    ).values_list('id', 'name', 'contact_email', 'company', 'phone'):
+        client = Contact('client', pk, client_name, client_email, client_company or '', client_phone or '')
+        score, _reasons = compare(contact, client, best_score)
+        if score is not None and score >= best_score:
+            best_id, best_score = pk, score
+    return best_id
+
+
+# --- Merging ---
+
+@transaction.atomic
+def merge_records(model, target, source_ids):
+    """
+    Merge the ``model`` rows in ``source_ids`` into ``target``.
+
+    Every foreign key pointing at a source row is re-pointed at the target
+    with one UPDATE per relation. A one-to-one row of a source moves to the
+    target only if the target has none; otherwise the target's is kept and
+    the source's goes with its source. The sources are then deleted.
+
+    The UPDATEs send no post_save, so the search documents of the moved
+    rows are refreshed and the owner's AR aging reports invalidated here.
+    Returns the number of source rows merged.
+    """
+    from invoices_app import aging
+    from search_app.index import SOURCES, index_objects
+
+    source_ids = [pk for pk in source_ids if str(pk) != str(target.pk)]
+    if not source_ids:
+        return 0
+
+    kinds = {source.model: kind for kind, source in SOURCES.items()}
+    moved = {}
+    for relation in model._meta.related_objects:
+        if relation.many_to_many:
+            continue
+        name = relation.field.name
+        rows = relation.related_model._base_manager.filter(**{f"{name}__in": source_ids})
+        if relation.one_to_one:
+            if relation.related_model._base_manager.filter(**{name: target}).exists():
+                continue
+            rows = relation.related_model._base_manager.filter(pk__in=rows.order_by('pk').values('pk')[:1])
+        kind = kinds.get(relation.related_model._meta.label)
+        if kind:
+            moved.setdefault(kind, []).extend(rows.values_list('pk', flat=True))
+        rows.update(**{name: target})
+
+    for kind, pks in moved.items():
+        index_objects(kind, SOURCES[kind].get_model()._base_manager.filter(pk__in=pks))
+
+    _deleted, by_model = model._base_manager.filter(pk__in=source_ids).delete()
+    if getattr(target, 'user_id', None) is not None:
+        aging.invalidate(target.user_id)
+    return by_model.get(model._meta.label, 0)
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("clients_app", "0002_clientnote_inquiry"),
+        ("inquiries", "0005_inquirysubmission"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="clientnote",
+            name="reminder_sent",
+            field=models.BooleanField(
+                default=False, help_text="Whether follow-up reminder has been sent"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="clientnote",
+            index=models.Index(
+                fields=["reminder_sent", "follow_up_date"],
+                name="clients_app_reminde_cf9fc6_idx",
+            ),
+        ),
+    ]
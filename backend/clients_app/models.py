@@ -1,7 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
-from django.utils import timezone
 
 
 class Client(models.Model):
@@ -99,13 +98,9 @@ class Client(models.Model):
 
     @property
     def overdue_invoices(self):
-        """Get number of overdue invoices for this client."""
+        """Get number of overdue invoices for this client (as marked by the overdue sweep)."""
         from invoices_app.models import Invoice
-        return Invoice.objects.filter(
-            client=self,
-            status__in=['SENT', 'OVERDUE'],
-            due_date__lt=timezone.now().date()
-        ).count()
+        return Invoice.objects.filter(client=self, status='OVERDUE').count()
 
     def update_financial_totals(self):
         """Update client's total revenue and outstanding balance based on invoices."""
@@ -196,6 +191,7 @@ class ClientNote(models.Model):
     follow_up_required = models.BooleanField(default=False, help_text="Does this require follow-up?")
     follow_up_date = models.DateField(blank=True, null=True, help_text="Follow-up date")
     follow_up_completed = models.BooleanField(default=False, help_text="Has follow-up been completed?")
+    reminder_sent = models.BooleanField(default=False, help_text="Whether follow-up reminder has been sent")
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -204,6 +200,9 @@ class ClientNote(models.Model):
         verbose_name = "Client Note"
         verbose_name_plural = "Client Notes"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['reminder_sent', 'follow_up_date']),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.client.name}"
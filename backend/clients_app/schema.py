@@ -4,6 +4,9 @@ from django.db import transaction, models
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User
 from django.conf import settings
+from backend.query_budget import query_budget
+from search_app.index import matching_ids
+from .dedup import client_contacts, find_candidates, inquiry_contacts, merge_records
 from .models import Client, ClientContact, ClientNote
 from typing import Dict, Any, List
 
@@ -67,7 +70,29 @@ class ClientNoteType(DjangoObjectType):
         fields = '__all__'
 
 
+class DuplicateRecordType(graphene.ObjectType):
+    """One side of a duplicate candidate: a client or an unconverted inquiry."""
+    kind = graphene.String()
+    id = graphene.ID()
+    name = graphene.String()
+    email = graphene.String()
+    company = graphene.String()
+    phone = graphene.String()
+
+
+class DuplicateCandidateType(graphene.ObjectType):
+    left = graphene.Field(DuplicateRecordType)
+    right = graphene.Field(DuplicateRecordType)
+    score = graphene.Float()
+    reasons = graphene.List(graphene.String)
+
+
 # --- Input Types ---
+class MergeGroupInput(graphene.InputObjectType):
+    target_id = graphene.ID(required=True)
+    source_ids = graphene.List(graphene.ID, required=True)
+
+
 class ClientContactInput(graphene.InputObjectType):
     name = graphene.String(required=True)
     title = graphene.String()
@@ -118,23 +143,37 @@ class ClientQuery(graphene.ObjectType):
     # Analytics
     client_analytics = graphene.Field(graphene.String)
 
+    # Duplicate detection
+    duplicate_candidates = graphene.List(
+        DuplicateCandidateType,
+        kind=graphene.String(),
+        threshold=graphene.Float(),
+        limit=graphene.Int()
+    )
+
     @staticmethod
+    @query_budget(2)
     def resolve_all_clients(root, info, status=None, search=None, limit=None, offset=None):
-        # TEMPORARILY DISABLE AUTH FILTERING FOR DEBUGGING
-        # if not info.context.user.is_authenticated:
-        #     return Client.objects.none()
-        # queryset = Client.objects.filter(user=info.context.user)
-        queryset = Client.objects.all()  # Show all clients for debugging
+        if not info.context.user.is_authenticated:
+            return Client.objects.none()
+        queryset = Client.objects.filter(user=info.context.user)
 
         if status:
             queryset = queryset.filter(status=status)
 
         if search:
-            queryset = queryset.filter(
+            # The full-text index only matches whole words and prefixes, so keep
+            # the substring match for parts of emails and the middle of names.
+            # Both are scoped to the user's own clients above.
+            condition = (
                 models.Q(name__icontains=search) |
                 models.Q(company__icontains=search) |
                 models.Q(contact_email__icontains=search)
             )
+            matches = matching_ids('client', search)
+            if matches is not None:
+                condition |= models.Q(pk__in=matches)
+            queryset = queryset.filter(condition)
 
         if limit:
             if offset:
@@ -151,18 +190,21 @@ class ClientQuery(graphene.ObjectType):
         return get_object_or_404(Client, pk=id, user=info.context.user)
 
     @staticmethod
+    @query_budget(1)
     def resolve_client_contacts(root, info, client_id):
         if not info.context.user.is_authenticated:
             return ClientContact.objects.none()
         return ClientContact.objects.filter(client_id=client_id, client__user=info.context.user)
 
     @staticmethod
+    @query_budget(1)
     def resolve_client_notes(root, info, client_id):
         if not info.context.user.is_authenticated:
             return ClientNote.objects.none()
         return ClientNote.objects.filter(client_id=client_id, client__user=info.context.user)
 
     @staticmethod
+    @query_budget(3)
     def resolve_client_analytics(root, info):
         if not info.context.user.is_authenticated:
             return "{}"
@@ -183,6 +225,28 @@ class ClientQuery(graphene.ObjectType):
         })
 
 
+    @staticmethod
+    @query_budget(2)
+    def resolve_duplicate_candidates(root, info, kind='client', threshold=None, limit=100):
+        """
+        Likely duplicates among the user's clients (kind 'client') or among
+        their unconverted inquiries and existing clients (kind 'inquiry').
+        """
+        if not info.context.user.is_authenticated:
+            raise Exception("Authentication required.")
+        if kind not in ('client', 'inquiry'):
+            raise Exception("kind must be 'client' or 'inquiry'.")
+
+        contacts = client_contacts(info.context.user)
+        if kind == 'inquiry':
+            contacts += inquiry_contacts(info.context.user)
+        candidates = find_candidates(contacts, threshold=threshold)
+        if kind == 'inquiry':
+            # Client pairs are reported by kind 'client'
+            candidates = [c for c in candidates if 'inquiry' in (c.left.kind, c.right.kind)]
+        return candidates[:limit]
+
+
 # --- Mutations ---
 class CreateClient(LoginRequiredMixin, graphene.Mutation):
     class Arguments:
@@ -315,6 +379,10 @@ class UpdateClientNote(LoginRequiredMixin, graphene.Mutation):
         user = info.context.user
         note = get_object_or_404(ClientNote, pk=id, client__user=user)
 
+        # A new follow-up date gets its own reminder
+        if 'follow_up_date' in input and input['follow_up_date'] != note.follow_up_date:
+            note.reminder_sent = False
+
         for field, value in input.items():
             setattr(note, field, value)
         note.save()
@@ -337,6 +405,57 @@ class DeleteClientNote(LoginRequiredMixin, graphene.Mutation):
         return DeleteClientNote(success=True)
 
 
+class MergeDuplicates(LoginRequiredMixin, graphene.Mutation):
+    """
+    Merge groups of duplicate clients or inquiries: everything that refers to
+    a source record is moved to the group's target and the sources are
+    deleted.
+    """
+    class Arguments:
+        kind = graphene.String(required=True)
+        merges = graphene.List(MergeGroupInput, required=True)
+
+    success = graphene.Boolean()
+    merged_count = graphene.Int()
+
+    @classmethod
+    @transaction.atomic
+    def mutate(cls, root, info, kind, merges):
+        from inquiries.models import Inquiry
+
+        models_by_kind = {'client': Client, 'inquiry': Inquiry}
+        if kind not in models_by_kind:
+            raise Exception("kind must be 'client' or 'inquiry'.")
+        model = models_by_kind[kind]
+        user = info.context.user
+
+        ids = {group.target_id for group in merges} | {pk for group in merges for pk in group.source_ids}
+        owned = {str(pk) for pk in model.objects.filter(pk__in=ids, user=user).values_list('id', flat=True)}
+        if owned != {str(pk) for pk in ids}:
+            raise Exception("Records not found or you lack permission for the specified IDs.")
+
+        # An earlier group may already have merged a later group's target or
+        # sources away (A <- B, then B <- C), so follow them to where they went
+        merged_into = {}
+
+        def resolve(pk):
+            pk = str(pk)
+            while pk in merged_into:
+                pk = merged_into[pk]
+            return pk
+
+        merged_count = 0
+        for group in merges:
+            target = model.objects.get(pk=resolve(group.target_id))
+            source_ids = {resolve(pk) for pk in group.source_ids} - {str(target.pk)}
+            merged_count += merge_records(model, target, sorted(source_ids))
+            merged_into.update((pk, str(target.pk)) for pk in source_ids)
+            if kind == 'client':
+                target.update_financial_totals()
+
+        return MergeDuplicates(success=True, merged_count=merged_count)
+
+
 # --- Mutation Aggregation ---
 class ClientMutation(graphene.ObjectType):
     # Client mutations
@@ -352,4 +471,7 @@ class ClientMutation(graphene.ObjectType):
     # Client note mutations
     create_client_note = CreateClientNote.Field()
     update_client_note = UpdateClientNote.Field()
-    delete_client_note = DeleteClientNote.Field()
\ No newline at end of file
+    delete_client_note = DeleteClientNote.Field()
+
+    # Duplicate merging
+    merge_duplicates = MergeDuplicates.Field()
\ No newline at end of file
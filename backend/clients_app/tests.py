@@ -1,3 +1,119 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from backend.schema import schema
+
+from invoices_app.aging import ar_aging
+from invoices_app.models import Invoice
+from projects_app.models import Project
+from search_app.models import SearchDocument
+from .dedup import Contact, compare, merge_records
+from .models import Client, ClientNote
+
+
+class CompareTests(TestCase):
+    def test_a_shared_phone_alone_is_not_a_duplicate(self):
+        left = Contact('client', 1, 'Ada Lovelace', 'ada@example.com', phone='+1 555 010 2030')
+        right = Contact('client', 2, 'Charles Babbage', 'charles@engines.org', phone='555-010-2030')
+        score, reasons = compare(left, right)
+        self.assertLess(score, 0.85)
+        self.assertIn('same phone', reasons)
+
+    def test_a_shared_phone_strengthens_a_similar_name(self):
+        left = Contact('client', 1, 'Jon Smith', 'jon@smith.io', phone='555 010 2030')
+        right = Contact('client', 2, 'John Smith', 'john.s@smith.io', phone='5550102030')
+        without_phone, _reasons = compare(
+            Contact('client', 1, 'Jon Smith', 'jon@smith.io'), Contact('client', 2, 'John Smith', 'john.s@smith.io')
+        )
+        score, _reasons = compare(left, right)
+        self.assertGreater(score, without_phone)
+        self.assertGreaterEqual(score, 0.85)
+
+    def test_a_shared_email_is_conclusive(self):
+        left = Contact('client', 1, 'Ada', 'A.da+work@gmail.com')
+        right = Contact('inquiry', 2, 'Countess of Lovelace', 'ada@gmail.com')
+        self.assertEqual(compare(left, right), (1.0, ['same email']))
+
+
+class MergeRecordsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user('owner', password='x')
+        self.target = Client.objects.create(user=self.user, name='Acme', contact_email='hello@acme.com')
+        self.source = Client.objects.create(user=self.user, name='ACME Inc', contact_email='billing@acme.com')
+
+    def test_references_move_to_the_target_and_sources_are_deleted(self):
+        note = ClientNote.objects.create(client=self.source, user=self.user, title='Kick-off', content='Scope')
+        project = Project.objects.create(user=self.user, client=self.source, title='Site')
+        Invoice.objects.create(
+            user=self.user, client=self.source, invoice_number='INV-1', status='SENT', total=100,
+            issue_date=date(2026, 3, 1), due_date=date(2026, 3, 31),
+        )
+        as_of = date(2026, 4, 1)
+        self.assertEqual([row.client_id for row in ar_aging(self.user, as_of).rows], [self.source.pk])
+
+        self.assertEqual(merge_records(Client, self.target, [self.source.pk, self.target.pk]), 1)
+
+        self.assertFalse(Client.objects.filter(pk=self.source.pk).exists())
+        note.refresh_from_db()
+        project.refresh_from_db()
+        self.assertEqual((note.client, project.client), (self.target, self.target))
+        self.assertEqual(Invoice.objects.get().client, self.target)
+        # The cached report no longer lists the deleted client
+        self.assertEqual([row.client_id for row in ar_aging(self.user, as_of).rows], [self.target.pk])
+        self.assertTrue(SearchDocument.objects.filter(kind='client_note', object_id=note.pk).exists())
+        self.assertFalse(SearchDocument.objects.filter(kind='client', object_id=self.source.pk).exists())
+
+    def test_merging_the_target_into_itself_does_nothing(self):
+        self.assertEqual(merge_records(Client, self.target, [self.target.pk]), 0)
+        self.assertTrue(Client.objects.filter(pk=self.target.pk).exists())
+
+    def test_chained_groups_merge_into_the_surviving_record(self):
+        third = Client.objects.create(user=self.user, name='Acme Corp', contact_email='ops@acme.com')
+        note = ClientNote.objects.create(client=third, user=self.user, title='Renewal', content='Q3')
+        request = RequestFactory().post('/graphql/')
+        request.user = self.user
+        result = schema.execute(
+            'mutation ($merges: [MergeGroupInput]!) {'
+            ' mergeDuplicates(kind: "client", merges: $merges) { success mergedCount } }',
+            variables={'merges': [
+                {'targetId': self.target.pk, 'sourceIds': [self.source.pk]},
+                {'targetId': self.source.pk, 'sourceIds': [third.pk]},
+            ]},
+            context_value=request,
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['mergeDuplicates'], {'success': True, 'mergedCount': 2})
+        self.assertEqual(list(Client.objects.values_list('pk', flat=True)), [self.target.pk])
+        note.refresh_from_db()
+        self.assertEqual(note.client, self.target)
+
+
+class AllClientsSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='x')
+        self.walmart = Client.objects.create(user=self.user, name='Walmart', contact_email='buyer@walmart.com')
+        self.acme = Client.objects.create(user=self.user, name='Acme', contact_email='hello@acme.co')
+        other = User.objects.create_user('other', password='x')
+        Client.objects.create(user=other, name='Kmart', contact_email='hello@acme.co')
+
+    def search(self, term):
+        request = RequestFactory().post('/graphql/')
+        request.user = self.user
+        result = schema.execute(
+            'query ($search: String) { allClients(search: $search) { id } }',
+            variables={'search': term}, context_value=request,
+        )
+        self.assertIsNone(result.errors)
+        return {int(client['id']) for client in result.data['allClients']}
+
+    def test_whole_words_match_through_the_index(self):
+        self.assertEqual(self.search('walmart'), {self.walmart.pk})
+
+    def test_substrings_still_match(self):
+        self.assertEqual(self.search('mart'), {self.walmart.pk})
+        self.assertEqual(self.search('acme.co'), {self.acme.pk})
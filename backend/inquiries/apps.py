@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class InquiriesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "inquiries"
+
+    def ready(self):
+        from . import jobs  # noqa: F401 - registers the periodic jobs
@@ -0,0 +1,135 @@
+# inquiries/bulk.py
+
+"""
+Set-based bulk operations on inquiries.
+
+``bulk_update_inquiries`` turns a set of changes into a single UPDATE over
+the selected rows, whatever their number:
+
+- ``status`` / ``priority`` are plain column assignments. Moving inquiries
+  to a closed status (WON, LOST) also clears their follow-up date, so no
+  reminder goes out for a settled lead.
+- ``tags`` replaces the tag list; ``add_tags`` / ``remove_tags`` merge into
+  each row's existing list in SQL (jsonb operators on PostgreSQL, json_each
+  on SQLite), keeping the existing order and skipping tags already present.
+- ``follow_up_date`` (or ``clear_follow_up``) sets the next follow-up and
+  re-arms its reminder; ``reset_reminder`` re-arms it on its own.
+
+On other database backends the tag merge falls back to computing the lists
+in Python and writing them with ``bulk_update``.
+"""
+
+import json
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .models import Inquiry
+
+
+# Statuses that end the follow-up cycle for an inquiry
+CLOSED_STATUSES = ('WON', 'LOST')
+
+
+def _check_choice(field, value, choices):
+    if value not in dict(choices):
+        raise Exception(f"Invalid {field} '{value}'. Use one of: {', '.join(dict(choices))}")
+
+
+def _unique(tags):
+    return list(dict.fromkeys(str(tag) for tag in tags))
+
+
+def _merge_tags_sql(vendor, add_tags, remove_tags):
+    """SQL expression and params for the merged ``tags`` column, or None if unsupported."""
+    expression, params = 'tags', []
+    if vendor == 'postgresql':
+        if add_tags:
+            expression = (
+                f"({expression} || (SELECT COALESCE(jsonb_agg(tag ORDER BY position), '[]'::jsonb) "
+                f"FROM jsonb_array_elements(%s::jsonb) WITH ORDINALITY AS added(tag, position) "
+                f"WHERE NOT {expression} @> jsonb_build_array(tag)))"
+            )
+            params = params + [json.dumps(add_tags)] + params
+        if remove_tags:
+            expression = f"({expression} - %s::text[])"
+            params = params + [remove_tags]
+        return expression, params
+
+    if vendor == 'sqlite':
+        if add_tags:
+            expression = (
+                f"(SELECT json_group_array(value) FROM ("
+                f"SELECT value FROM json_each({expression}) UNION ALL "
+                f"SELECT value FROM json_each(%s) WHERE value NOT IN (SELECT value FROM json_each({expression}))))"
+            )
+            params = params + [json.dumps(add_tags)] + params
+        if remove_tags:
+            expression = (
+                f"(SELECT json_group_array(value) FROM json_each({expression}) "
+                f"WHERE value NOT IN (SELECT value FROM json_each(%s)))"
+            )
+            params = params + [json.dumps(remove_tags)]
+        return expression, params
+
+    return None
+
+
+def bulk_update_inquiries(
+    queryset, *, status=None, priority=None, tags=None, add_tags=None, remove_tags=None,
+    follow_up_date=None, clear_follow_up=False, reset_reminder=False,
+):
+    """
+    Apply the given changes to every inquiry in ``queryset`` with one UPDATE.
+
+    Returns the number of inquiries updated. Raises an Exception when no
+    change is given.
+    """
+    changes = {}
+
+    if status is not None:
+        _check_choice('status', status, Inquiry.STATUS_CHOICES)
+        changes['status'] = status
+        if status in CLOSED_STATUSES:
+            changes['follow_up_date'] = None
+    if priority is not None:
+        _check_choice('priority', priority, Inquiry.PRIORITY_CHOICES)
+        changes['priority'] = priority
+
+    if follow_up_date is not None or clear_follow_up:
+        changes['follow_up_date'] = follow_up_date
+        changes['reminder_sent'] = False
+    if reset_reminder:
+        changes['reminder_sent'] = False
+
+    add_tags = _unique(add_tags or [])
+    remove_tags = _unique(remove_tags or [])
+    merge_in_python = False
+    if tags is not None:
+        # A replacement list already has the adds and removes applied
+        changes['tags'] = [tag for tag in _unique(tags + add_tags) if tag not in remove_tags]
+    elif add_tags or remove_tags:
+        merged = _merge_tags_sql(connection.vendor, add_tags, remove_tags)
+        if merged:
+            changes['tags'] = RawSQL(*merged)
+        else:
+            merge_in_python = True
+
+    if not changes and not merge_in_python:
+        raise Exception("No changes given: set a status, priority, tags, follow-up or reminder reset.")
+
+    # update() skips auto_now, so stamp the change time explicitly
+    changes['updated_at'] = timezone.now()
+
+    if not merge_in_python:
+        return queryset.update(**changes)
+
+    inquiries = list(queryset.only('id', 'tags'))
+    for inquiry in inquiries:
+        merged = _unique((inquiry.tags or []) + add_tags)
+        inquiry.tags = [tag for tag in merged if tag not in remove_tags]
+        for field, value in changes.items():
+            setattr(inquiry, field, value)
+    Inquiry.objects.bulk_update(inquiries, ['tags', *changes])
+    return len(inquiries)
@@ -0,0 +1,181 @@
+# inquiries/ingest.py
+
+"""
+Write-behind ingestion of public contact form submissions.
+
+CreateInquiry from an anonymous visitor validates the input, checks the
+visitor's rate limit and stores the submission in the InquirySubmission
+queue table with a single autocommitted INSERT, then acknowledges. The
+``ingest_inquiry_submissions`` periodic job drains the queue in batches:
+it scores each batch in one pass and writes it with ``bulk_create``.
+An inquiry's ``created_at`` is therefore the time it was ingested, up to a
+scheduler interval after the submission.
+
+A batch that fails is retried row by row. A submission that keeps failing
+is retried on later runs until it has failed ``INQUIRY_INGEST_MAX_ATTEMPTS``
+times; it then stays in the queue as a dead letter, with its last error,
+and is logged once and skipped from then on.
+
+Write-behind is on when ``INQUIRY_WRITE_BEHIND`` is set (by default, when
+the scheduler is enabled, since the scheduler drains the queue). Otherwise
+submissions are validated the same way and inserted directly.
+"""
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import F
+
+from admin_dashboard.log_buffer import log_event
+from search_app.index import index_objects
+from .models import Inquiry, InquirySubmission
+from .scoring import score_instances
+
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_MAX_ATTEMPTS = 5
+MAX_MESSAGE_LENGTH = 5000
+MAX_TAGS = 20
+
+EXCLUSIVE_USER_CACHE_KEY = 'inquiries:exclusive_user_id'
+
+CHOICE_FIELDS = {
+    'service_requested': Inquiry.SERVICE_CHOICES,
+    'budget_range': Inquiry.BUDGET_CHOICES,
+    'timeline': Inquiry.TIMELINE_CHOICES,
+    'priority': Inquiry.PRIORITY_CHOICES,
+    'source': Inquiry.SOURCE_CHOICES,
+}
+
+
+def exclusive_user_id():
+    """Id of the EXCLUSIVE_ADMIN_USERNAME user that public inquiries are assigned to (cached)."""
+    exclusive_username = getattr(settings, 'EXCLUSIVE_ADMIN_USERNAME', None)
+    if not exclusive_username:
+        raise Exception("Configuration Error: EXCLUSIVE_ADMIN_USERNAME not set.")
+
+    user_id = cache.get(EXCLUSIVE_USER_CACHE_KEY)
+    if user_id is None:
+        user_id = User.objects.filter(username=exclusive_username).values_list('id', flat=True).first()
+        if user_id is None:
+            raise Exception("Configuration Error: EXCLUSIVE_ADMIN_USERNAME user does not exist.")
+        cache.set(EXCLUSIVE_USER_CACHE_KEY, user_id, timeout=3600)
+    return user_id
+
+
+def clean_submission(data):
+    """
+    Validate CreateInquiry input and return the cleaned field values.
+
+    Raises an Exception listing every problem found.
+    """
+    cleaned = {field: value for field, value in data.items() if value is not None}
+    errors = []
+
+    for field in ('client_name', 'client_email', 'client_phone', 'client_company', 'message'):
+        if isinstance(cleaned.get(field), str):
+            cleaned[field] = cleaned[field].strip()
+    for field in ('client_name', 'client_email', 'message'):
+        if not cleaned.get(field):
+            errors.append(f"{field} is required.")
+
+    for field in ('client_name', 'client_email', 'client_phone', 'client_company'):
+        max_length = Inquiry._meta.get_field(field).max_length
+        if len(cleaned.get(field) or '') > max_length:
+            errors.append(f"{field} must be at most {max_length} characters.")
+    if len(cleaned.get('message') or '') > MAX_MESSAGE_LENGTH:
+        errors.append(f"message must be at most {MAX_MESSAGE_LENGTH} characters.")
+
+    if cleaned.get('client_email'):
+        try:
+            validate_email(cleaned['client_email'])
+        except ValidationError:
+            errors.append("client_email is not a valid email address.")
+
+    for field, choices in CHOICE_FIELDS.items():
+        if field in cleaned and cleaned[field] not in dict(choices):
+            errors.append(f"{field} must be one of: {', '.join(dict(choices))}.")
+
+    if 'tags' in cleaned:
+        cleaned['tags'] = [str(tag)[:50] for tag in cleaned['tags'][:MAX_TAGS]]
+
+    if errors:
+        raise Exception(' '.join(errors))
+    return cleaned
+
+
+def write_behind_enabled():
+    return getattr(settings, 'INQUIRY_WRITE_BEHIND', getattr(settings, 'SCHEDULER_ENABLED', False))
+
+
+def enqueue_submission(cleaned, ip_address=None):
+    """Queue validated input for the ingestion job."""
+    return InquirySubmission.objects.create(payload=cleaned, ip_address=ip_address)
+
+
+def build_inquiry(cleaned, user_id):
+    return Inquiry(user_id=user_id, status='NEW', **cleaned)
+
+
+def ingest_submissions(batch_size=None):
+    """
+    Create Inquiry rows for queued submissions, one batch per transaction.
+
+    If a batch fails it is retried row by row; rows that still fail stay in
+    the queue with their error recorded and are retried on the next run,
+    until they reach the maximum number of attempts. Returns the number of
+    inquiries created.
+    """
+    batch_size = batch_size or getattr(settings, 'INQUIRY_INGEST_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    max_attempts = getattr(settings, 'INQUIRY_INGEST_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+    user_id = exclusive_user_id()
+    created = 0
+    last_id = 0
+
+    while True:
+        batch = list(
+            InquirySubmission.objects.filter(id__gt=last_id, attempts__lt=max_attempts).order_by('id')[:batch_size]
+        )
+        if not batch:
+            return created
+        last_id = batch[-1].id
+
+        try:
+            with transaction.atomic():
+                inquiries = [build_inquiry(submission.payload, user_id) for submission in batch]
+                score_instances(inquiries)
+                Inquiry.objects.bulk_create(inquiries, batch_size=batch_size)
+                # bulk_create skips post_save, so index the batch directly
+                index_objects('inquiry', inquiries)
+                InquirySubmission.objects.filter(id__in=[submission.id for submission in batch]).delete()
+            created += len(inquiries)
+        except Exception:
+            # Isolate the submission(s) that broke the batch
+            created += _ingest_one_by_one(batch, user_id, max_attempts)
+
+
+def _ingest_one_by_one(batch, user_id, max_attempts):
+    created = 0
+    for submission in batch:
+        try:
+            with transaction.atomic():
+                inquiry = build_inquiry(submission.payload, user_id)
+                score_instances([inquiry])
+                inquiry.save()
+                submission.delete()
+            created += 1
+        except Exception as e:
+            InquirySubmission.objects.filter(id=submission.id).update(
+                attempts=F('attempts') + 1, last_error=str(e)
+            )
+            if submission.attempts + 1 >= max_attempts:
+                log_event(
+                    level='ERROR',
+                    message=f'Inquiry submission {submission.id} dead-lettered after {max_attempts} attempts: {e}',
+                    category='system',
+                    metadata={'event': 'inquiry_submission_dead_lettered', 'submission_id': submission.id},
+                )
+    return created
@@ -0,0 +1,16 @@
+# inquiries/jobs.py
+
+from datetime import timedelta
+
+from admin_dashboard.scheduler import periodic_job
+from .ingest import ingest_submissions
+
+
+@periodic_job(
+    'ingest_inquiry_submissions',
+    every=timedelta(minutes=1),
+    jitter=timedelta(seconds=10),
+    timeout=timedelta(minutes=10),
+)
+def ingest_inquiry_submissions():
+    ingest_submissions()
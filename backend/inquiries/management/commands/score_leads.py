@@ -0,0 +1,20 @@
+# inquiries/management/commands/score_leads.py
+
+from django.core.management.base import BaseCommand
+from inquiries.models import Inquiry
+from inquiries.scoring import score_inquiries
+
+
+class Command(BaseCommand):
+    help = 'Recompute lead scores for inquiries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, help='Only rescore inquiries owned by this user')
+
+    def handle(self, *args, **options):
+        inquiries = Inquiry.objects.all()
+        if options['user_id']:
+            inquiries = inquiries.filter(user_id=options['user_id'])
+
+        updated = score_inquiries(inquiries)
+        self.stdout.write(self.style.SUCCESS(f'Updated {updated} lead scores'))
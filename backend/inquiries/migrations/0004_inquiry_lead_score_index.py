@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("clients_app", "0002_clientnote_inquiry"),
+        ("inquiries", "0003_inquiry_converted_client"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="inquiry",
+            index=models.Index(
+                fields=["user", "-lead_score", "-created_at"],
+                name="inquiries_i_user_id_bb63a9_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inquiries", "0004_inquiry_lead_score_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InquirySubmission",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "payload",
+                    models.JSONField(help_text="Validated CreateInquiry input"),
+                ),
+                ("ip_address", models.GenericIPAddressField(blank=True, null=True)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Inquiry Submission",
+                "verbose_name_plural": "Inquiry Submissions",
+                "ordering": ["id"],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("clients_app", "0003_clientnote_reminder_sent_and_more"),
+        ("inquiries", "0005_inquirysubmission"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="inquiry",
+            index=models.Index(
+                fields=["reminder_sent", "follow_up_date"],
+                name="inquiries_i_reminde_1ea9c1_idx",
+            ),
+        ),
+    ]
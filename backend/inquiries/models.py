@@ -43,6 +43,17 @@ class Inquiry(models.Model):
     ]
     budget_range = models.CharField(max_length=15, choices=BUDGET_CHOICES, blank=True, null=True)
 
+    # Numeric value of each budget range
+    BUDGET_AMOUNTS = {
+        'UNDER_1K': 500,
+        'SMALL_1K_5K': 3000,
+        'MID_5K_10K': 7500,
+        'MID_10K_25K': 17500,
+        'LARGE_25K_50K': 37500,
+        'OVER_50K': 75000,
+        'DISCUSS': 0
+    }
+
     # Timeline
     TIMELINE_CHOICES = [
         ('ASAP', 'ASAP'),
@@ -104,24 +115,34 @@ class Inquiry(models.Model):
     class Meta:
         verbose_name_plural = "Inquiries"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-lead_score', '-created_at']),
+            models.Index(fields=['reminder_sent', 'follow_up_date']),
+        ]
 
     def __str__(self):
         return f"{self.client_name} - {self.service_requested} ({self.status})"
 
     def convert_to_client(self):
         """Convert inquiry to a client record."""
+        from clients_app.dedup import find_matching_client
         from clients_app.models import Client
 
-        client, created = Client.objects.get_or_create(
-            user=self.user,
-            contact_email=self.client_email,
-            defaults={
-                'name': self.client_name,
-                'company': self.client_company,
-                'phone': self.client_phone,
-                'notes': f"Converted from inquiry: {self.message[:200]}..."
-            }
+        # Reuse an existing client when the inquiry is a fuzzy match for one
+        client_id = find_matching_client(
+            self.user, self.client_name, self.client_email, self.client_company, self.client_phone
         )
+        if client_id:
+            client = Client.objects.get(pk=client_id)
+        else:
+            client = Client.objects.create(
+                user=self.user,
+                contact_email=self.client_email,
+                name=self.client_name,
+                company=self.client_company,
+                phone=self.client_phone,
+                notes=f"Converted from inquiry: {self.message[:200]}..."
+            )
 
         # Link inquiry to client
         self.converted_client = client
@@ -157,16 +178,7 @@ class Inquiry(models.Model):
 
     def get_budget_amount(self):
         """Convert budget range to numeric value."""
-        budget_map = {
-            'UNDER_1K': 500,
-            'SMALL_1K_5K': 3000,
-            'MID_5K_10K': 7500,
-            'MID_10K_25K': 17500,
-            'LARGE_25K_50K': 37500,
-            'OVER_50K': 75000,
-            'DISCUSS': 0
-        }
-        return budget_map.get(self.budget_range, 0)
+        return self.BUDGET_AMOUNTS.get(self.budget_range, 0)
 
     def get_estimated_hours(self):
         """Estimate hours based on service and budget."""
@@ -190,3 +202,25 @@ class Inquiry(models.Model):
             hours = int(hours * max(0.5, min(3.0, budget_multiplier)))
 
         return hours
+
+
+class InquirySubmission(models.Model):
+    """
+    A public contact form submission waiting to be written as an Inquiry.
+
+    Rows are inserted by CreateInquiry and removed by the ingestion job once
+    the inquiries have been created in bulk (see inquiries.ingest).
+    """
+    payload = models.JSONField(help_text="Validated CreateInquiry input")
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Inquiry Submission"
+        verbose_name_plural = "Inquiry Submissions"
+        ordering = ['id']
+
+    def __str__(self):
+        return f"Submission {self.pk} from {self.payload.get('client_email')}"
@@ -6,9 +6,13 @@ from graphene_django.types import DjangoObjectType
 from django.db import transaction
 from django.shortcuts import get_object_or_404
 # NEW IMPORTS required for non-authenticated assignment logic
-from django.contrib.auth.models import User
 from django.conf import settings
+from backend.query_budget import query_budget
+from backend.rate_limit import allow, client_ip
 from .models import Inquiry # Assumes Inquiry model is imported correctly
+from .bulk import bulk_update_inquiries
+from .ingest import build_inquiry, clean_submission, enqueue_submission, exclusive_user_id, write_behind_enabled
+from .scoring import SCORED_FIELDS, score_inquiry
 from typing import Dict, Any, List
 
 # --- 0. RLS/Auth Mixin (Shared utility) ---
@@ -87,17 +91,33 @@ class InquiryType(DjangoObjectType):
 # --- 3. Inquiry Query (RLS & N+1 Prevention) ---
 # Note: Queries still require login (checked by resolve_all_inquiries/resolve_inquiry)
 
+# allInquiries orderBy values -> ORDER BY; the score orderings are served by
+# the (user, -lead_score, -created_at) index
+INQUIRY_ORDERINGS = {
+    'newest': ['-created_at'],
+    'oldest': ['created_at'],
+    'score': ['-lead_score', '-created_at'],
+    'score_asc': ['lead_score', 'created_at'],
+}
+
+
 class InquiryQuery(graphene.ObjectType):
-    all_inquiries = graphene.List(InquiryType)
+    all_inquiries = graphene.List(InquiryType, order_by=graphene.String())
     inquiry = graphene.Field(InquiryType, id=graphene.ID(required=True))
 
     @staticmethod
-    def resolve_all_inquiries(root, info):
+    @query_budget(1)
+    def resolve_all_inquiries(root, info, order_by='newest'):
         if not info.context.user.is_authenticated:
             return Inquiry.objects.none()
-        return Inquiry.objects.filter(user=info.context.user).select_related('user')
+        if order_by not in INQUIRY_ORDERINGS:
+            raise Exception(f"Invalid orderBy '{order_by}'. Use one of: {', '.join(INQUIRY_ORDERINGS)}")
+        return Inquiry.objects.filter(user=info.context.user).select_related('user').order_by(
+            *INQUIRY_ORDERINGS[order_by]
+        )
 
     @staticmethod
+    @query_budget(1)
     def resolve_inquiry(root, info, id):
         if not info.context.user.is_authenticated:
             return None
@@ -124,34 +144,42 @@ class CreateInquiryInput(graphene.InputObjectType):
 
 
 class CreateInquiry(graphene.Mutation): # LoginRequiredMixin REMOVED
-    """Allows unauthenticated clients to send an inquiry, which is auto-assigned to the sole admin."""
+    """
+    Allows unauthenticated clients to send an inquiry, which is auto-assigned to the sole admin.
+
+    Anonymous submissions are rate limited per IP and, with write-behind
+    enabled, queued and acknowledged with ``queued: true`` and no inquiry;
+    see inquiries.ingest.
+    """
     class Arguments:
         input = CreateInquiryInput(required=True)
 
     inquiry = graphene.Field(InquiryType)
+    queued = graphene.Boolean()
 
     @classmethod
-    @transaction.atomic
     def mutate(cls, root, info, input):
-        # 1. Fetch the one and only exclusive user from settings
-        exclusive_username = getattr(settings, 'EXCLUSIVE_ADMIN_USERNAME', None)
-        
-        if not exclusive_username:
-             raise Exception("Configuration Error: EXCLUSIVE_ADMIN_USERNAME not set.")
-             
-        # Find the designated freelancer user to assign the inquiry to (user must exist)
-        freelancer_user = get_object_or_404(User, username=exclusive_username)
+        is_admin = info.context.user and info.context.user.is_authenticated
+        ip_address = client_ip(info.context)
 
-        # 2. Prepare data, hard-assigning the user
-        inquiry_data = {'user': freelancer_user, 'status': 'NEW'}
+        if not is_admin and not allow(
+            f"create_inquiry:{ip_address}",
+            rate=settings.INQUIRY_RATE_LIMIT_PER_HOUR / 3600,
+            burst=settings.INQUIRY_RATE_LIMIT_BURST,
+        ):
+            raise Exception("Too many inquiries submitted. Please try again later.")
 
-        # Unpack input values (enums are already strings from GraphQL)
-        for field, value in input.items():
-            if value is not None:
-                inquiry_data[field] = value
-            
-        inquiry = Inquiry.objects.create(**inquiry_data)
-        return CreateInquiry(inquiry=inquiry)
+        cleaned = clean_submission(input)
+
+        if not is_admin and write_behind_enabled():
+            enqueue_submission(cleaned, ip_address=ip_address)
+            return CreateInquiry(inquiry=None, queued=True)
+
+        # Hard-assign the one and only exclusive user from settings
+        inquiry = build_inquiry(cleaned, exclusive_user_id())
+        inquiry.lead_score = score_inquiry(inquiry)
+        inquiry.save()
+        return CreateInquiry(inquiry=inquiry, queued=False)
 
 
 # --- 5. Update Inquiry Mutation (Protected by LoginRequiredMixin) ---
@@ -194,25 +222,58 @@ class UpdateInquiry(LoginRequiredMixin, graphene.Mutation):
             if value is not None:
                 update_data[field] = value
         
+        # A new follow-up date gets its own reminder
+        if 'follow_up_date' in update_data and update_data['follow_up_date'] != inquiry.follow_up_date:
+            inquiry.reminder_sent = False
+
         for field, value in update_data.items():
             setattr(inquiry, field, value)
-            
+
+        # Rescore unless the score was set by hand
+        if 'lead_score' not in update_data and any(field in update_data for field in SCORED_FIELDS):
+            inquiry.lead_score = score_inquiry(inquiry)
+
         inquiry.save()
         return UpdateInquiry(inquiry=inquiry)
 
 
 # --- 6. Bulk Update Mutation (Protected by LoginRequiredMixin) ---
 
+class InquirySummaryType(graphene.ObjectType):
+    """Lightweight projection of an inquiry returned by bulk operations."""
+    id = graphene.ID()
+    status = graphene.String()
+    priority = graphene.String()
+    tags = graphene.List(graphene.String)
+    follow_up_date = graphene.Date()
+    reminder_sent = graphene.Boolean()
+    lead_score = graphene.Int()
+
+
 class BulkUpdateInquiries(LoginRequiredMixin, graphene.Mutation):
+    """
+    Apply status, priority, tag, follow-up and reminder changes to many
+    inquiries with a single UPDATE (see inquiries.bulk).
+
+    ``inquiries`` (full rows) and ``items`` (summary projection) are only
+    queried when selected, so callers that need just the count pay for one
+    statement.
+    """
     class Arguments:
         inquiry_ids = graphene.List(graphene.ID, required=True)
         status = graphene.String()
         priority = graphene.String()
         tags = graphene.List(graphene.String)
+        add_tags = graphene.List(graphene.String)
+        remove_tags = graphene.List(graphene.String)
+        follow_up_date = graphene.Date()
+        clear_follow_up = graphene.Boolean()
+        reset_reminder = graphene.Boolean()
 
     success = graphene.Boolean()
     updated_count = graphene.Int()
     inquiries = graphene.List(InquiryType)
+    items = graphene.List(InquirySummaryType)
 
     @classmethod
     @transaction.atomic
@@ -220,24 +281,25 @@ class BulkUpdateInquiries(LoginRequiredMixin, graphene.Mutation):
         user = info.context.user
 
         inquiries_qs = Inquiry.objects.filter(id__in=inquiry_ids, user=user)
-
-        if not inquiries_qs.exists():
+        updated_count = bulk_update_inquiries(
+            inquiries_qs, **{field: value for field, value in kwargs.items() if value is not None}
+        )
+        # Every id must be the user's; raising rolls the UPDATE back
+        if not inquiry_ids or updated_count != len({str(pk) for pk in inquiry_ids}):
             raise Exception("No inquiries found or you lack permission for the specified IDs.")
 
-        update_data = {}
-        for field, value in kwargs.items():
-            if value is not None:
-                update_data[field] = value
-
-        updated_count = inquiries_qs.update(**update_data)
+        result = BulkUpdateInquiries(success=True, updated_count=updated_count)
+        result.queryset = inquiries_qs
+        return result
 
-        updated_inquiries = Inquiry.objects.filter(id__in=inquiry_ids, user=user).select_related('user')
+    def resolve_inquiries(self, info):
+        return self.queryset.select_related('user')
 
-        return BulkUpdateInquiries(
-            success=True,
-            updated_count=updated_count,
-            inquiries=list(updated_inquiries)
-        )
+    def resolve_items(self, info):
+        return [
+            InquirySummaryType(**row)
+            for row in self.queryset.values(*InquirySummaryType._meta.fields)
+        ]
 
 
 # --- 7. Delete Inquiry (Protected by LoginRequiredMixin) ---
@@ -0,0 +1,183 @@
+# inquiries/scoring.py
+
+"""
+Lead scoring for inquiries.
+
+A lead score (0-100) is a weighted sum of five components, each scaled to
+0..1:
+
+- budget:   the inquiry's budget amount (``Inquiry.get_budget_amount``), log-scaled
+- timeline: how soon the client wants to start
+- service:  the typical value of the requested service
+- source:   how well leads from the source tend to convert
+- message:  how detailed the inquiry is (message length, phone, company)
+
+Weights come from ``settings.LEAD_SCORE_WEIGHTS``. Scores for a whole
+queryset are computed in one vectorized NumPy pass over a single
+``values_list`` query and written back with ``bulk_update``.
+"""
+
+import numpy as np
+from django.conf import settings
+from django.db.models import BooleanField, ExpressionWrapper, Q, Value
+from django.db.models.functions import Coalesce, Length
+
+from .models import Inquiry
+
+
+DEFAULT_WEIGHTS = {
+    'budget': 35,
+    'timeline': 20,
+    'service': 15,
+    'source': 15,
+    'message': 15,
+}
+
+TIMELINE_URGENCY = {
+    'ASAP': 1.0,
+    'WEEK_ONE': 0.9,
+    'WEEKS_TWO': 0.75,
+    'MONTH_ONE': 0.6,
+    'MONTHS_THREE': 0.4,
+    'FLEXIBLE': 0.3,
+}
+SERVICE_VALUE = {
+    'MOBILE_APP': 1.0,
+    'WEB_DEV': 0.9,
+    'UI_UX': 0.7,
+    'WEB_DESIGN': 0.7,
+    'BRANDING': 0.6,
+    'SEO': 0.5,
+    'CONSULTING': 0.5,
+    'MAINTENANCE': 0.4,
+    'OTHER': 0.3,
+}
+SOURCE_QUALITY = {
+    'REFERRAL': 1.0,
+    'LINKEDIN': 0.8,
+    'EMAIL': 0.7,
+    'WEBSITE': 0.6,
+    'UPWORK': 0.5,
+    'SOCIAL': 0.4,
+    'OTHER': 0.3,
+}
+
+# Score given to a missing or undisclosed budget / timeline
+UNKNOWN_BUDGET = 0.3
+UNKNOWN_TIMELINE = 0.2
+
+# Messages this long or longer get the full length score
+FULL_MESSAGE_LENGTH = 500
+
+# Inquiry fields the score depends on
+SCORED_FIELDS = (
+    'budget_range', 'timeline', 'service_requested', 'source',
+    'message', 'client_phone', 'client_company',
+)
+
+_MAX_BUDGET = max(Inquiry.BUDGET_AMOUNTS.values())
+
+
+def _lookup(codes, table, default):
+    """Map an array of choice codes to the values in ``table``, vectorized."""
+    keys = np.array(sorted(table))
+    values = np.array([table[key] for key in keys], dtype=float)
+    codes = np.asarray(codes, dtype=str)
+    index = np.clip(np.searchsorted(keys, codes), 0, len(keys) - 1)
+    return np.where(keys[index] == codes, values[index], default)
+
+
+def compute_scores(budget_ranges, timelines, services, sources,
+                   message_lengths, has_phone, has_company, weights=None):
+    """
+    Score inquiries given column arrays of their scored fields.
+
+    Missing choice values should be passed as empty strings. Returns an
+    integer array of scores in 0..100.
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or getattr(settings, 'LEAD_SCORE_WEIGHTS', {}))}
+
+    amounts = _lookup(budget_ranges, Inquiry.BUDGET_AMOUNTS, 0)
+    budget = np.where(amounts > 0, np.log1p(amounts) / np.log1p(_MAX_BUDGET), UNKNOWN_BUDGET)
+
+    timeline = _lookup(timelines, TIMELINE_URGENCY, UNKNOWN_TIMELINE)
+    service = _lookup(services, SERVICE_VALUE, SERVICE_VALUE['OTHER'])
+    source = _lookup(sources, SOURCE_QUALITY, SOURCE_QUALITY['OTHER'])
+
+    detail = np.minimum(np.asarray(message_lengths, dtype=float) / FULL_MESSAGE_LENGTH, 1.0)
+    message = (
+        0.6 * detail
+        + 0.2 * np.asarray(has_phone, dtype=float)
+        + 0.2 * np.asarray(has_company, dtype=float)
+    )
+
+    components = np.vstack([budget, timeline, service, source, message])
+    w = np.array([weights[name] for name in ('budget', 'timeline', 'service', 'source', 'message')], dtype=float)
+    scores = 100 * (w @ components) / w.sum()
+    return np.clip(np.rint(scores), 0, 100).astype(int)
+
+
+def score_inquiry(inquiry):
+    """Return the lead score for a single (possibly unsaved) inquiry."""
+    return int(score_instances([inquiry])[0])
+
+
+def score_instances(inquiries):
+    """
+    Set ``lead_score`` on a list of (possibly unsaved) inquiries in one pass,
+    without saving them. Returns the scores.
+    """
+    if not inquiries:
+        return np.array([], dtype=int)
+    scores = compute_scores(
+        [inquiry.budget_range or '' for inquiry in inquiries],
+        [inquiry.timeline or '' for inquiry in inquiries],
+        [inquiry.service_requested or '' for inquiry in inquiries],
+        [inquiry.source or '' for inquiry in inquiries],
+        [len(inquiry.message or '') for inquiry in inquiries],
+        [bool(inquiry.client_phone) for inquiry in inquiries],
+        [bool(inquiry.client_company) for inquiry in inquiries],
+    )
+    for inquiry, score in zip(inquiries, scores):
+        inquiry.lead_score = int(score)
+    return scores
+
+
+def score_inquiries(queryset, batch_size=1000):
+    """
+    Recompute ``lead_score`` for every inquiry in ``queryset``.
+
+    Only rows whose score changed are written. Returns the number of
+    inquiries updated.
+    """
+    rows = list(
+        queryset.order_by()
+        .annotate(
+            budget_code=Coalesce('budget_range', Value('')),
+            timeline_code=Coalesce('timeline', Value('')),
+            message_length=Coalesce(Length('message'), 0),
+            has_phone=ExpressionWrapper(
+                Q(client_phone__isnull=False) & ~Q(client_phone=''), output_field=BooleanField()
+            ),
+            has_company=ExpressionWrapper(
+                Q(client_company__isnull=False) & ~Q(client_company=''), output_field=BooleanField()
+            ),
+        )
+        .values_list(
+            'id', 'lead_score', 'budget_code', 'timeline_code', 'service_requested', 'source',
+            'message_length', 'has_phone', 'has_company',
+        )
+    )
+    if not rows:
+        return 0
+
+    ids, current, *columns = zip(*rows)
+    scores = compute_scores(*columns)
+    changed = np.flatnonzero(scores != np.asarray(current))
+
+    Inquiry.objects.bulk_update(
+        [Inquiry(id=ids[i], lead_score=int(scores[i])) for i in changed],
+        ['lead_score'],
+        batch_size=batch_size,
+    )
+    return len(changed)
@@ -1,3 +1,212 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from admin_dashboard.models import SystemLog
+from backend.schema import schema
+from .ingest import enqueue_submission, ingest_submissions
+from .models import Inquiry, InquirySubmission
+from .scoring import score_inquiries, score_inquiry
+
+
+def submission(name, **extra):
+    return {
+        'client_name': name,
+        'client_email': f'{name.lower()}@example.com',
+        'message': 'We need a new website',
+        'service_requested': 'WEB_DEV',
+        'budget_range': 'MID_5K_10K',
+        **extra,
+    }
+
+
+class IngestTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.enterContext(override_settings(EXCLUSIVE_ADMIN_USERNAME='owner'))
+        self.user = User.objects.create_user('owner', email='owner@example.com', password='x')
+
+
+class IngestSubmissionsTests(IngestTestCase):
+    def test_queued_submissions_are_inserted_in_batches(self):
+        for name in ('Ada', 'Grace', 'Linus'):
+            enqueue_submission(submission(name))
+
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(ingest_submissions(batch_size=2), 3)
+        inserts = [q['sql'] for q in captured if q['sql'].startswith('INSERT INTO "inquiries_inquiry"')]
+        # One INSERT per batch, not per inquiry
+        self.assertEqual(len(inserts), 2)
+        inquiries = Inquiry.objects.order_by('id')
+        self.assertEqual([i.client_name for i in inquiries], ['Ada', 'Grace', 'Linus'])
+        self.assertTrue(all(i.user == self.user and i.status == 'NEW' and i.lead_score for i in inquiries))
+        self.assertFalse(InquirySubmission.objects.exists())
+
+    @override_settings(INQUIRY_INGEST_MAX_ATTEMPTS=2)
+    def test_poison_rows_are_isolated_then_dead_lettered(self):
+        enqueue_submission(submission('Ada'))
+        poison = enqueue_submission(submission('Mallory', unknown_field=1))
+        enqueue_submission(submission('Linus'))
+
+        self.assertEqual(ingest_submissions(), 2)
+        self.assertEqual(
+            sorted(Inquiry.objects.values_list('client_name', flat=True)), ['Ada', 'Linus']
+        )
+        poison.refresh_from_db()
+        self.assertEqual(poison.attempts, 1)
+        self.assertIn('unknown_field', poison.last_error)
+        self.assertFalse(SystemLog.objects.filter(metadata__event='inquiry_submission_dead_lettered').exists())
+
+        self.assertEqual(ingest_submissions(), 0)
+        poison.refresh_from_db()
+        self.assertEqual(poison.attempts, 2)
+        log = SystemLog.objects.get(metadata__event='inquiry_submission_dead_lettered')
+        self.assertEqual(log.metadata['submission_id'], poison.id)
+
+        # Dead letters stay queued but are no longer read
+        with self.assertNumQueries(1):
+            self.assertEqual(ingest_submissions(), 0)
+        poison.refresh_from_db()
+        self.assertEqual(poison.attempts, 2)
+
+
+@override_settings(INQUIRY_WRITE_BEHIND=True, INQUIRY_RATE_LIMIT_BURST=2, INQUIRY_RATE_LIMIT_PER_HOUR=1)
+class CreateInquiryRateLimitTests(IngestTestCase):
+    mutation = '''
+        mutation Create($input: CreateInquiryInput!) {
+            createInquiry(input: $input) { queued inquiry { id } }
+        }
+    '''
+
+    def create(self, ip, user=None):
+        request = RequestFactory().post('/graphql/', REMOTE_ADDR=ip)
+        request.user = user or AnonymousUser()
+        return schema.execute(
+            self.mutation,
+            variables={'input': {'clientName': 'Ada', 'clientEmail': 'ada@example.com', 'message': 'Hi'}},
+            context_value=request,
+        )
+
+    def test_anonymous_submissions_are_limited_per_ip(self):
+        for _ in range(2):
+            result = self.create('10.0.0.1')
+            self.assertIsNone(result.errors)
+            self.assertEqual(result.data['createInquiry'], {'queued': True, 'inquiry': None})
+
+        result = self.create('10.0.0.1')
+        self.assertIn('Too many inquiries', result.errors[0].message)
+        self.assertEqual(InquirySubmission.objects.count(), 2)
+
+        # Other visitors and the signed-in admin keep their own allowance
+        self.assertIsNone(self.create('10.0.0.2').errors)
+        result = self.create('10.0.0.1', user=self.user)
+        self.assertIsNone(result.errors)
+        self.assertFalse(result.data['createInquiry']['queued'])
+
+
+class BulkUpdateInquiriesTests(IngestTestCase):
+    mutation = '''
+        mutation Bulk($ids: [ID]!, $addTags: [String], $removeTags: [String], $followUpDate: Date,
+                      $status: String) {
+            bulkUpdateInquiries(inquiryIds: $ids, addTags: $addTags, removeTags: $removeTags,
+                                followUpDate: $followUpDate, status: $status) {
+                updatedCount
+                items { id tags followUpDate reminderSent }
+            }
+        }
+    '''
+
+    def inquiry(self, user=None, **kwargs):
+        return Inquiry.objects.create(
+            user=user or self.user, client_name='Ada', client_email='ada@example.com', message='Hi', **kwargs
+        )
+
+    def bulk(self, inquiries, **variables):
+        request = RequestFactory().post('/graphql/')
+        request.user = self.user
+        return schema.execute(
+            self.mutation, variables={'ids': [i.id for i in inquiries], **variables}, context_value=request
+        )
+
+    def test_tags_are_merged_in_place(self):
+        first = self.inquiry(tags=['web', 'urgent'])
+        second = self.inquiry(tags=['seo'])
+
+        result = self.bulk([first, second], addTags=['vip', 'web'], removeTags=['urgent'])
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['bulkUpdateInquiries']['updatedCount'], 2)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        # Existing order kept, no duplicates, removals applied
+        self.assertEqual(first.tags, ['web', 'vip'])
+        self.assertEqual(second.tags, ['seo', 'vip', 'web'])
+
+    def test_a_new_follow_up_rearms_the_reminder_and_closing_clears_it(self):
+        reminded = self.inquiry(follow_up_date=date(2026, 3, 1), reminder_sent=True)
+
+        result = self.bulk([reminded], followUpDate='2026-03-20')
+        item, = result.data['bulkUpdateInquiries']['items']
+        self.assertEqual((item['followUpDate'], item['reminderSent']), ('2026-03-20', False))
+
+        self.bulk([reminded], status='WON')
+        reminded.refresh_from_db()
+        self.assertIsNone(reminded.follow_up_date)
+
+    def test_empty_change_sets_and_foreign_ids_are_rejected_separately(self):
+        mine = self.inquiry(tags=['web'])
+        theirs = self.inquiry(user=User.objects.create_user('other', password='x'))
+
+        self.assertIn('No changes given', self.bulk([mine]).errors[0].message)
+
+        result = self.bulk([mine, theirs], addTags=['vip'])
+        self.assertIn('lack permission', result.errors[0].message)
+        mine.refresh_from_db()
+        self.assertEqual(mine.tags, ['web'])
+
+
+class LeadScoringTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='x')
+
+    def inquiry(self, save=True, **kwargs):
+        fields = {'user': self.user, 'client_name': 'Ada', 'client_email': 'ada@example.com', 'message': 'Hi'}
+        inquiry = Inquiry(**{**fields, **kwargs})
+        if save:
+            inquiry.save()
+        return inquiry
+
+    def test_detailed_urgent_high_budget_leads_score_higher(self):
+        strong = score_inquiry(self.inquiry(
+            save=False, budget_range='OVER_50K', timeline='ASAP', service_requested='MOBILE_APP',
+            source='REFERRAL', message='x' * 500, client_phone='555 0100', client_company='Acme',
+        ))
+        weak = score_inquiry(self.inquiry(save=False, budget_range='UNDER_1K', timeline='FLEXIBLE', source='OTHER'))
+        self.assertEqual(strong, 100)
+        self.assertLess(weak, 50)
+
+    def test_weights_come_from_settings(self):
+        with self.settings(LEAD_SCORE_WEIGHTS={'budget': 1, 'timeline': 0, 'service': 0, 'source': 0, 'message': 0}):
+            self.assertEqual(score_inquiry(self.inquiry(save=False, budget_range='OVER_50K')), 100)
+            # An undisclosed budget gets a fixed partial score, not zero
+            self.assertEqual(score_inquiry(self.inquiry(save=False, budget_range='DISCUSS')), 30)
+
+    def test_rescoring_a_queryset_matches_single_scores_and_writes_only_changes(self):
+        inquiries = [
+            self.inquiry(budget_range='MID_10K_25K', timeline='WEEK_ONE'),
+            self.inquiry(service_requested='SEO', client_company='Acme'),
+            self.inquiry(source='LINKEDIN', message='x' * 250),
+        ]
+        Inquiry.objects.update(lead_score=0)
+
+        self.assertEqual(score_inquiries(Inquiry.objects.all()), 3)
+        self.assertEqual(
+            dict(Inquiry.objects.values_list('id', 'lead_score')),
+            {inquiry.id: score_inquiry(inquiry) for inquiry in inquiries},
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(score_inquiries(Inquiry.objects.all()), 0)
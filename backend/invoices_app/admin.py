@@ -1,28 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
-from .models import InvoiceProject, Invoice, InvoiceItem
-
-
-@admin.register(InvoiceProject)
-class InvoiceProjectAdmin(admin.ModelAdmin):
-    list_display = ['title', 'client', 'status', 'budget', 'start_date', 'end_date', 'is_active']
-    list_filter = ['status', 'is_active', 'created_at']
-    search_fields = ['title', 'client__name', 'client__company']
-    readonly_fields = ['created_at', 'updated_at']
-
-    fieldsets = (
-        ('Basic Information', {
-            'fields': ('client', 'title', 'description')
-        }),
-        ('Project Details', {
-            'fields': ('status', 'budget', 'start_date', 'end_date', 'is_active')
-        }),
-        ('Timestamps', {
-            'fields': ('created_at', 'updated_at'),
-            'classes': ('collapse',)
-        }),
-    )
+from .models import Invoice, InvoiceItem
 
 
 class InvoiceItemInline(admin.TabularInline):
@@ -0,0 +1,155 @@
+# invoices_app/aging.py
+
+"""
+Accounts-receivable aging.
+
+``ar_aging`` computes, per client, the amount outstanding on an as-of date
+split by how far past due it is (0-30, 31-60, 61-90 and 90+ days; invoices
+not yet due count as 0-30) with one grouped query of conditional sums.
+
+An invoice is outstanding on the as-of date if it had been issued by then
+and was not paid yet: SENT or OVERDUE now, or PAID after that date. Drafts
+and cancelled invoices are excluded.
+
+Amounts are in the user's AdminSettings currency. Another ``currency`` can
+be requested when ``EXCHANGE_RATES`` (units of each currency per USD) has a
+rate for both.
+
+Reports are cached per user until one of the user's invoices or clients
+changes (see ``invalidate``, connected in invoices_app.signals).
+"""
+
+import csv
+import io
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, DecimalField, Q, Sum, Value, When
+from django.utils import timezone
+
+from .models import Invoice
+
+
+# (key, label, lowest days past due, highest days past due)
+BUCKETS = [
+    ('days_0_to_30', '0-30', None, 30),
+    ('days_31_to_60', '31-60', 31, 60),
+    ('days_61_to_90', '61-90', 61, 90),
+    ('days_over_90', '90+', 91, None),
+]
+
+CACHE_TIMEOUT = 60 * 60 * 24
+CENT = Decimal('0.01')
+
+
+@dataclass
+class AgingRow:
+    client_id: int = None
+    client_name: str = 'Total'
+    days_0_to_30: Decimal = Decimal('0')
+    days_31_to_60: Decimal = Decimal('0')
+    days_61_to_90: Decimal = Decimal('0')
+    days_over_90: Decimal = Decimal('0')
+    total: Decimal = Decimal('0')
+
+
+@dataclass
+class AgingReport:
+    as_of: object
+    currency: str
+    rows: list = field(default_factory=list)
+    totals: AgingRow = field(default_factory=AgingRow)
+
+    def to_csv(self):
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(['Client', *(label for _key, label, _low, _high in BUCKETS), f'Total ({self.currency})'])
+        for row in [*self.rows, self.totals]:
+            writer.writerow([row.client_name, *(getattr(row, key) for key, *_rest in BUCKETS), row.total])
+        return output.getvalue()
+
+
+def _version_key(user_id):
+    return f"ar_aging:version:{user_id}"
+
+
+def invalidate(user_id):
+    """Drop the cached reports of ``user_id``."""
+    cache.set(_version_key(user_id), time.time_ns(), timeout=None)
+
+
+def user_currency(user):
+    admin_settings = getattr(user, 'admin_settings', None)
+    return admin_settings.currency if admin_settings else 'USD'
+
+
+def exchange_rate(from_currency, to_currency):
+    if from_currency == to_currency:
+        return Decimal('1')
+    rates = getattr(settings, 'EXCHANGE_RATES', {})
+    if from_currency not in rates or to_currency not in rates:
+        raise Exception(f"No exchange rate configured for {from_currency} to {to_currency}.")
+    return Decimal(str(rates[to_currency])) / Decimal(str(rates[from_currency]))
+
+
+def _bucket_sums(as_of):
+    """Conditional sums of ``total`` per aging bucket, keyed by bucket."""
+    money = DecimalField(max_digits=14, decimal_places=2)
+    sums = {}
+    for key, _label, low, high in BUCKETS:
+        # More days past due means an earlier due date
+        condition = Q()
+        if high is not None:
+            condition &= Q(due_date__gte=as_of - timedelta(days=high))
+        if low is not None:
+            condition &= Q(due_date__lte=as_of - timedelta(days=low))
+        sums[key] = Sum(
+            Case(When(condition, then='total'), default=Value(0), output_field=money),
+            default=0,
+        )
+    return sums
+
+
+def compute_ar_aging(user, as_of, currency=None):
+    """Build the aging report for ``user`` on ``as_of`` with one grouped query."""
+    base_currency = user_currency(user)
+    currency = currency or base_currency
+    rate = exchange_rate(base_currency, currency)
+
+    outstanding = Q(status__in=['SENT', 'OVERDUE']) | Q(status='PAID', paid_date__gt=as_of)
+    rows = (
+        Invoice.objects.filter(outstanding, user=user, issue_date__lte=as_of)
+        .values('client_id', 'client__name')
+        .annotate(**_bucket_sums(as_of))
+        .order_by('client__name', 'client_id')
+    )
+
+    report = AgingReport(as_of=as_of, currency=currency)
+    for values in rows:
+        row = AgingRow(client_id=values['client_id'], client_name=values['client__name'])
+        for key, *_rest in BUCKETS:
+            amount = (Decimal(values[key]) * rate).quantize(CENT)
+            setattr(row, key, amount)
+            row.total += amount
+            setattr(report.totals, key, getattr(report.totals, key) + amount)
+        report.totals.total += row.total
+        report.rows.append(row)
+    return report
+
+
+def ar_aging(user, as_of=None, currency=None):
+    """The aging report for ``user``, from the cache when no invoice changed since it was built."""
+    as_of = as_of or timezone.localdate()
+    currency = currency or user_currency(user)
+    version = cache.get_or_set(_version_key(user.pk), time.time_ns, timeout=None)
+    key = f"ar_aging:{user.pk}:{version}:{as_of.isoformat()}:{currency}"
+
+    report = cache.get(key)
+    if report is None:
+        report = compute_ar_aging(user, as_of, currency)
+        cache.set(key, report, timeout=CACHE_TIMEOUT)
+    return report
@@ -5,3 +5,6 @@ class InvoicesAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'invoices_app'
     verbose_name = 'Invoices & Billing'
+
+    def ready(self):
+        from . import jobs, signals  # noqa: F401 - registers the periodic jobs and signal handlers
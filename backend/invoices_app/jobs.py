@@ -0,0 +1,11 @@
+# invoices_app/jobs.py
+
+from datetime import timedelta
+
+from admin_dashboard.scheduler import periodic_job
+from .overdue import sweep_overdue_invoices
+
+
+@periodic_job('overdue_invoice_sweep', every=timedelta(hours=1), timeout=timedelta(minutes=30))
+def overdue_invoice_sweep():
+    sweep_overdue_invoices()
@@ -0,0 +1,29 @@
+# invoices_app/management/commands/render_invoices.py
+
+from django.core.management.base import BaseCommand
+from invoices_app.models import Invoice
+from invoices_app.rendering import FORMATS, render_invoices
+
+
+class Command(BaseCommand):
+    help = 'Render invoice documents into the render cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--status', action='append', help='Only invoices with this status (repeatable)')
+        parser.add_argument('--since', help='Only invoices issued on or after this date (YYYY-MM-DD)')
+        parser.add_argument(
+            '--format',
+            action='append',
+            choices=sorted(FORMATS),
+            help='Formats to render (repeatable, default: pdf)',
+        )
+
+    def handle(self, *args, **options):
+        invoices = Invoice.objects.all()
+        if options['status']:
+            invoices = invoices.filter(status__in=[status.upper() for status in options['status']])
+        if options['since']:
+            invoices = invoices.filter(issue_date__gte=options['since'])
+
+        rendered, cached = render_invoices(invoices, formats=options['format'] or ['pdf'])
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} document(s), {cached} already cached"))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("clients_app", "0003_clientnote_reminder_sent_and_more"),
+        (
+            "invoices_app",
+            "0003_alter_invoice_client_alter_invoiceproject_client_and_more",
+        ),
+        ("time_logs_app", "0003_timelog_milestone"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="invoice",
+            name="reminder_sent",
+            field=models.BooleanField(
+                default=False, help_text="Whether the due date reminder has been sent"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                fields=["reminder_sent", "due_date"],
+                name="invoices_ap_reminde_8f33db_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("clients_app", "0003_clientnote_reminder_sent_and_more"),
+        ("invoices_app", "0004_invoice_reminder_sent_and_more"),
+        ("time_logs_app", "0003_timelog_milestone"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                fields=["status", "due_date"], name="invoices_ap_status_06d28e_idx"
+            ),
+        ),
+    ]
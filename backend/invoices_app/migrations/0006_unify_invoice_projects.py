@@ -0,0 +1,121 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, Value, When
+from django.utils.text import slugify
+
+BATCH_SIZE = 500
+
+
+def merge_invoice_projects(apps, schema_editor):
+    # Point invoices at projects_app projects: each InvoiceProject maps to the
+    # project of the same user, client and title, else to a new project with
+    # its details. New projects stay out of the public portfolio (inactive),
+    # as invoice projects never were in it.
+    InvoiceProject = apps.get_model("invoices_app", "InvoiceProject")
+    Invoice = apps.get_model("invoices_app", "Invoice")
+    Project = apps.get_model("projects_app", "Project")
+
+    existing = {}
+    for pk, user_id, client_id, title in Project.objects.order_by("-pk").values_list(
+        "pk", "user_id", "client_id", "title"
+    ):
+        existing[user_id, client_id, title] = pk
+    taken = set(Project.objects.exclude(slug=None).values_list("slug", flat=True))
+
+    keys = {}
+    created = {}
+    for old in InvoiceProject.objects.order_by("pk"):
+        key = keys[old.pk] = (old.user_id, old.client_id, old.title)
+        if key in existing or key in created:
+            continue
+        base = slugify(old.title)[:200].strip("-") or "project"
+        slug = base
+        suffix = 1
+        while slug in taken:
+            suffix += 1
+            slug = f"{base[:200 - len(str(suffix)) - 1].rstrip('-')}-{suffix}"
+        taken.add(slug)
+        created[key] = Project(
+            user_id=old.user_id,
+            client_id=old.client_id,
+            title=old.title,
+            description=old.description,
+            slug=slug,
+            status=old.status,
+            budget=old.budget or 0,
+            start_date=old.start_date,
+            end_date=old.end_date,
+            is_active=False,
+        )
+    Project.objects.bulk_create(list(created.values()), batch_size=BATCH_SIZE)
+    existing.update((key, project.pk) for key, project in created.items())
+    mapping = {old: existing[key] for old, key in keys.items()}
+
+    # One UPDATE per batch of mapped projects
+    pairs = list(mapping.items())
+    for start in range(0, len(pairs), BATCH_SIZE):
+        batch = pairs[start : start + BATCH_SIZE]
+        Invoice.objects.filter(project_id__in=[old for old, _new in batch]).update(
+            project_ref=Case(
+                *[When(project_id=old, then=Value(new)) for old, new in batch],
+                output_field=models.BigIntegerField(),
+            )
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("clients_app", "0003_clientnote_reminder_sent_and_more"),
+        ("invoices_app", "0005_invoice_invoices_ap_status_06d28e_idx"),
+        ("projects_app", "0012_projectmilestone_projects_ap_is_comp_e5286f_idx"),
+        ("time_logs_app", "0003_timelog_milestone"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="invoice",
+            name="project_ref",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="projects_app.project",
+            ),
+        ),
+        migrations.RunPython(merge_invoice_projects, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="invoice",
+            name="project",
+        ),
+        migrations.RenameField(
+            model_name="invoice",
+            old_name="project_ref",
+            new_name="project",
+        ),
+        migrations.AlterField(
+            model_name="invoice",
+            name="project",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="invoices",
+                to="projects_app.project",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                fields=["project", "status", "issue_date"],
+                name="invoices_ap_project_e869e5_idx",
+            ),
+        ),
+        migrations.DeleteModel(
+            name="InvoiceProject",
+        ),
+    ]
@@ -9,50 +9,6 @@ import uuid
 # cycles during migrations.
 
 
-class InvoiceProject(models.Model):
-    """Project model for invoice association."""
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='projects')
-    # Reference the canonical Client model from clients_app using a string to
-    # avoid circular imports and duplicated model classes. Use a unique
-    # related_name to avoid clashing with the `projects_app.Project` relation.
-    client = models.ForeignKey('clients_app.Client', on_delete=models.CASCADE, related_name='invoice_projects')
-    title = models.CharField(max_length=200, help_text="Project title")
-    description = models.TextField(blank=True, null=True, help_text="Project description")
-    status = models.CharField(
-        max_length=20,
-        choices=[
-            ('PLANNING', 'Planning'),
-            ('IN_PROGRESS', 'In Progress'),
-            ('COMPLETED', 'Completed'),
-            ('ON_HOLD', 'On Hold'),
-            ('CANCELLED', 'Cancelled'),
-        ],
-        default='PLANNING',
-        help_text="Project status"
-    )
-    budget = models.DecimalField(
-        max_digits=12,
-        decimal_places=2,
-        blank=True,
-        null=True,
-        help_text="Project budget"
-    )
-    start_date = models.DateField(blank=True, null=True, help_text="Project start date")
-    end_date = models.DateField(blank=True, null=True, help_text="Project end date")
-    is_active = models.BooleanField(default=True, help_text="Whether project is active")
-
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
-
-    class Meta:
-        verbose_name = "Project"
-        verbose_name_plural = "Projects"
-        ordering = ['-created_at']
-
-    def __str__(self):
-        return f"{self.title} - {self.client.name}"
-
-
 class Invoice(models.Model):
     """Invoice model with comprehensive billing features."""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='invoices')
@@ -68,8 +24,10 @@ class Invoice(models.Model):
     # Relationships
     # Use the canonical Client model from the clients_app
     client = models.ForeignKey('clients_app.Client', on_delete=models.CASCADE, related_name='invoices')
+    # The canonical Project model from projects_app (invoices used to point at
+    # a separate InvoiceProject model, merged into it by migration 0006)
     project = models.ForeignKey(
-        InvoiceProject,
+        'projects_app.Project',
         on_delete=models.SET_NULL,
         blank=True,
         null=True,
@@ -80,6 +38,7 @@ class Invoice(models.Model):
     issue_date = models.DateField(help_text="Invoice issue date")
     due_date = models.DateField(help_text="Payment due date")
     paid_date = models.DateField(blank=True, null=True, help_text="Date payment was received")
+    reminder_sent = models.BooleanField(default=False, help_text="Whether the due date reminder has been sent")
 
     # Status
     STATUS_CHOICES = [
@@ -140,19 +99,31 @@ class Invoice(models.Model):
         verbose_name = "Invoice"
         verbose_name_plural = "Invoices"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['reminder_sent', 'due_date']),
+            models.Index(fields=['status', 'due_date']),
+            # Revenue of a user's projects by status and period (analytics)
+            models.Index(fields=['project', 'status', 'issue_date']),
+        ]
 
     def __str__(self):
         return f"#{self.invoice_number} - {self.client.name}"
 
-    def save(self, *args, **kwargs):
+    def save(self, *args, sync_client=True, total=None, **kwargs):
+        # Auto-calculate total, unless one is given
+        self.total = total if total is not None else self.subtotal + self.tax - self.discount
+
+        # The invoice write service (invoices_app.services) refreshes client
+        # balances once per write itself
+        if not sync_client:
+            super().save(*args, **kwargs)
+            return
+
         # Store old status for comparison
         old_status = None
         if self.pk:
             old_status = Invoice.objects.get(pk=self.pk).status
 
-        # Auto-calculate total
-        self.total = self.subtotal + self.tax - self.discount
-
         # Auto-update client total revenue when invoice becomes paid
         if old_status != 'PAID' and self.status == 'PAID':
             if not self.paid_date:
@@ -178,9 +149,8 @@ class Invoice(models.Model):
 
     @property
     def is_overdue(self):
-        """Check if invoice is overdue."""
-        from django.utils import timezone
-        return self.status in ['SENT', 'OVERDUE'] and self.due_date < timezone.now().date()
+        """Check if invoice is overdue (invoices_app.overdue marks SENT invoices past due)."""
+        return self.status == 'OVERDUE'
 
     @property
     def days_overdue(self):
@@ -0,0 +1,58 @@
+# invoices_app/overdue.py
+
+"""
+Set-based invoice status maintenance.
+
+``sweep_overdue_invoices`` moves every SENT invoice whose due date has
+passed to OVERDUE with a single UPDATE over the (status, due_date) index,
+records one SystemLog row per transition (the status change ledger, with
+the old and new status in its metadata) in one bulk INSERT, and refreshes
+the balances of the affected clients with ``services.refresh_client_balances``.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from admin_dashboard.log_buffer import log_event
+from admin_dashboard.models import SystemLog
+from .models import Invoice
+from .services import refresh_client_balances
+
+
+@transaction.atomic
+def sweep_overdue_invoices(today=None):
+    """Mark SENT invoices past their due date as OVERDUE. Returns the number of invoices moved."""
+    today = today or timezone.localdate()
+    due = Invoice.objects.filter(status='SENT', due_date__lt=today)
+
+    # Lock the rows being moved so the log matches the UPDATE exactly
+    rows = list(
+        due.select_for_update().values_list('id', 'user_id', 'client_id', 'invoice_number', 'due_date', 'total')
+    )
+    if not rows:
+        return 0
+    moved = due.update(status='OVERDUE', updated_at=timezone.now())
+
+    SystemLog.objects.bulk_create([
+        SystemLog(
+            user_id=user_id,
+            level='WARNING',
+            category='system',
+            message=f'Invoice #{number} is overdue (due {due_date})',
+            related_invoice_id=pk,
+            related_client_id=client_id,
+            metadata={
+                'event': 'invoice_status_changed',
+                'from_status': 'SENT',
+                'to_status': 'OVERDUE',
+                'due_date': due_date.isoformat(),
+                'days_overdue': (today - due_date).days,
+                'total': str(total),
+            },
+        )
+        for pk, user_id, client_id, number, due_date, total in rows
+    ])
+    refresh_client_balances(client_id for _pk, _user_id, client_id, *_rest in rows)
+
+    log_event(level='INFO', message=f'Marked {moved} invoice(s) overdue', category='system')
+    return moved
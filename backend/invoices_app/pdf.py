@@ -0,0 +1,96 @@
+# invoices_app/pdf.py
+
+"""
+Minimal PDF writer for text documents.
+
+Lays out lines of text on A4 pages using the standard Type 1 fonts that
+every PDF viewer ships (Courier for body text so columns line up,
+Helvetica-Bold for headings), so invoices can be rendered without a PDF
+library. Characters outside Windows-1252 are replaced.
+"""
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 50
+BODY_SIZE = 9
+HEADING_SIZE = 14
+LEADING = 1.45
+
+FONTS = {'body': ('F1', 'Courier'), 'heading': ('F2', 'Helvetica-Bold')}
+
+
+def _escape(text):
+    data = text.encode('cp1252', errors='replace')
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def _paginate(lines):
+    """Split ``(style, text)`` lines into pages of positioned ``(style, size, y, text)``."""
+    pages, page = [], []
+    y = PAGE_HEIGHT - MARGIN
+    for style, text in lines:
+        size = HEADING_SIZE if style == 'heading' else BODY_SIZE
+        y -= size * LEADING
+        if y < MARGIN:
+            pages.append(page)
+            page, y = [], PAGE_HEIGHT - MARGIN - size * LEADING
+        page.append((style, size, y, text))
+    pages.append(page)
+    return pages
+
+
+def text_to_pdf(text, title=''):
+    """
+    Render ``text`` as a PDF and return its bytes.
+
+    Lines starting with ``# `` are set as headings.
+    """
+    lines = [
+        ('heading', line[2:]) if line.startswith('# ') else ('body', line)
+        for line in text.splitlines()
+    ]
+    pages = _paginate(lines)
+
+    objects = []  # object bodies; object n is objects[n - 1]
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(None)
+    page_tree = add(None)
+    font_refs = {
+        name: add(f"<< /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>".encode())
+        for name, base in FONTS.values()
+    }
+    resources = ' '.join(f"/{name} {ref} 0 R" for name, ref in font_refs.items())
+
+    page_refs = []
+    for page in pages:
+        stream = b''.join(
+            b"BT /%s %d Tf 1 0 0 1 %d %.2f Tm (%s) Tj ET\n"
+            % (FONTS[style][0].encode(), size, MARGIN, y, _escape(text))
+            for style, size, y, text in page
+        )
+        content = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        page_refs.append(add(
+            f"<< /Type /Page /Parent {page_tree} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << {resources} >> >> /Contents {content} 0 R >>".encode()
+        ))
+
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {page_tree} 0 R >>".encode()
+    kids = ' '.join(f"{ref} 0 R" for ref in page_refs)
+    objects[page_tree - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_refs)} >>".encode()
+    info = add(b"<< /Title (%s) /Producer (VistaForge) >>" % _escape(title))
+
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b''.join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog, info, xref
+    )
+    return bytes(output)
@@ -0,0 +1,302 @@
+# invoices_app/rendering.py
+
+"""
+Invoice rendering.
+
+Invoices are rendered to HTML (``invoices_app/invoice.html``) and PDF (the
+fixed-width ``invoices_app/invoice.txt`` laid out by ``invoices_app.pdf``)
+and stored in the default storage under the SHA-256 of everything that
+appears on the document: the invoice, its client and items, and the
+sender's branding from AdminSettings. An unchanged invoice is therefore
+never rendered twice, and editing it simply produces a new file.
+
+The data is gathered into a plain snapshot on the calling thread; rendering
+and storing happen on a small thread pool (``INVOICE_RENDER_WORKERS``), and
+concurrent requests for the same document share one render.
+"""
+
+import hashlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, wait
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.mail import EmailMessage
+from django.template.loader import render_to_string
+
+from admin_dashboard.log_buffer import log_event
+from admin_dashboard.models import AdminSettings
+from .pdf import text_to_pdf
+
+
+# Bump when the templates or the PDF layout change so old renders are not reused
+RENDER_VERSION = 1
+
+FORMATS = {
+    'pdf': 'application/pdf',
+    'html': 'text/html',
+}
+
+RULE = '-' * 80
+
+
+@dataclass
+class Render:
+    invoice_number: str
+    format: str
+    content_hash: str
+    path: str
+    ready: bool
+
+    @property
+    def status(self):
+        return 'READY' if self.ready else 'PENDING'
+
+    @property
+    def filename(self):
+        return f"invoice-{self.invoice_number}.{self.format}"
+
+    @property
+    def content_type(self):
+        return FORMATS[self.format]
+
+    def url(self):
+        return default_storage.url(self.path) if self.ready else None
+
+    def read(self):
+        with default_storage.open(self.path, 'rb') as f:
+            return f.read()
+
+
+def branding_for(user_id):
+    """The sender details printed on ``user_id``'s invoices."""
+    admin_settings = AdminSettings.objects.filter(user_id=user_id).select_related('user').first()
+    if admin_settings is None:
+        return {'name': '', 'company': '', 'email': '', 'phone': '', 'currency': 'USD'}
+    return {
+        'name': admin_settings.full_name or '',
+        'company': admin_settings.company or '',
+        'email': admin_settings.email or admin_settings.user.email or '',
+        'phone': admin_settings.phone or '',
+        'currency': admin_settings.currency,
+    }
+
+
+def _amount(value):
+    # Unsaved instances may hold ints or differently scaled Decimals
+    return f"{Decimal(str(value or 0)):.2f}"
+
+
+def invoice_snapshot(invoice, branding=None):
+    """
+    Everything that appears on ``invoice``'s document, as plain strings.
+
+    Items are read through ``invoice.items.all()`` so a prefetched queryset
+    is reused; ``branding`` can be passed in when rendering many invoices
+    of the same user.
+    """
+    client = invoice.client
+    items = sorted(invoice.items.all(), key=lambda item: (item.created_at, str(item.id)))
+    return {
+        'version': RENDER_VERSION,
+        'invoice': {
+            'invoice_number': invoice.invoice_number,
+            'status': invoice.get_status_display(),
+            'issue_date': str(invoice.issue_date),
+            'due_date': str(invoice.due_date),
+            'project': invoice.project.title if invoice.project_id else '',
+            'subtotal': _amount(invoice.subtotal),
+            'tax': _amount(invoice.tax),
+            'discount': _amount(invoice.discount),
+            'total': _amount(invoice.total),
+            'notes': invoice.notes or '',
+        },
+        'client': {
+            'name': client.name,
+            'company': client.company or '',
+            'contact_email': client.contact_email,
+            'address': client.address or '',
+        },
+        'items': [
+            {
+                'description': item.description,
+                'quantity': _amount(item.quantity),
+                'rate': _amount(item.rate),
+                'amount': _amount(item.amount),
+            }
+            for item in items
+        ],
+        'branding': branding if branding is not None else branding_for(invoice.user_id),
+    }
+
+
+def content_hash(snapshot):
+    payload = json.dumps(snapshot, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def storage_path(digest, fmt):
+    prefix = getattr(settings, 'INVOICE_RENDER_PREFIX', 'invoices/renders')
+    return f"{prefix}/{digest[:2]}/{digest}.{fmt}"
+
+
+def render_bytes(snapshot, fmt):
+    """Render ``snapshot`` in ``fmt``. Uses no database queries, so it can run on any thread."""
+    invoice = snapshot['invoice']
+    context = {
+        **snapshot,
+        'invoice': {**invoice, 'note_lines': invoice['notes'].splitlines()},
+        'client': {**snapshot['client'], 'address_lines': snapshot['client']['address'].splitlines()},
+        'total_label': f"Total ({snapshot['branding']['currency']})",
+        'rule': RULE,
+    }
+    if fmt == 'html':
+        return render_to_string('invoices_app/invoice.html', context).encode()
+    if fmt == 'pdf':
+        text = render_to_string('invoices_app/invoice.txt', context)
+        return text_to_pdf(text, title=f"Invoice #{invoice['invoice_number']}")
+    raise Exception(f"Unsupported invoice format: {fmt}")
+
+
+def _store(snapshot, fmt, path):
+    if default_storage.exists(path):
+        return path
+    saved = default_storage.save(path, ContentFile(render_bytes(snapshot, fmt)))
+    if saved != path:
+        # Another worker stored the same content first
+        default_storage.delete(saved)
+    return path
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_in_flight = {}
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'INVOICE_RENDER_WORKERS', 2),
+                thread_name_prefix='invoice-render',
+            )
+        return _executor
+
+
+def submit_render(snapshot, fmt, path):
+    """Render ``snapshot`` to ``path`` on the pool, joining a render of the same path already running."""
+    executor = get_executor()
+    with _executor_lock:
+        future = _in_flight.get(path)
+        if future is None:
+            future = _in_flight[path] = executor.submit(_store, snapshot, fmt, path)
+            future.add_done_callback(lambda _f: _in_flight.pop(path, None))
+    return future
+
+
+def request_render(invoice, fmt='pdf', timeout=None, snapshot=None):
+    """
+    The render of ``invoice`` in ``fmt``, from storage when it exists.
+
+    Otherwise it is rendered on the pool; this waits up to ``timeout``
+    seconds (``None`` waits until done) and returns a pending render if it
+    is still running, which can be requested again later.
+    """
+    if fmt not in FORMATS:
+        raise Exception(f"Unsupported invoice format: {fmt}")
+    snapshot = snapshot or invoice_snapshot(invoice)
+    digest = content_hash(snapshot)
+    path = storage_path(digest, fmt)
+    render = Render(invoice.invoice_number, fmt, digest, path, ready=False)
+
+    if default_storage.exists(path):
+        render.ready = True
+        return render
+    future = submit_render(snapshot, fmt, path)
+    try:
+        future.result(timeout=timeout)
+        render.ready = True
+    except TimeoutError:
+        pass
+    return render
+
+
+def render_invoices(invoices, formats=('pdf',)):
+    """
+    Render many invoices on the pool. Returns ``(rendered, cached)`` counts
+    of documents.
+    """
+    invoices = invoices.select_related('client', 'project').prefetch_related('items')
+    brandings = {}
+    futures, cached = [], 0
+    for invoice in invoices.iterator(chunk_size=200):
+        if invoice.user_id not in brandings:
+            brandings[invoice.user_id] = branding_for(invoice.user_id)
+        snapshot = invoice_snapshot(invoice, brandings[invoice.user_id])
+        digest = content_hash(snapshot)
+        for fmt in formats:
+            path = storage_path(digest, fmt)
+            if default_storage.exists(path):
+                cached += 1
+            else:
+                futures.append(submit_render(snapshot, fmt, path))
+    done, _pending = wait(futures)
+    for future in done:
+        future.result()
+    return len(futures), cached
+
+
+def _send(snapshot, fmt, path, message):
+    _store(snapshot, fmt, path)
+    with default_storage.open(path, 'rb') as f:
+        message.attach(f"invoice-{snapshot['invoice']['invoice_number']}.{fmt}", f.read(), FORMATS[fmt])
+    message.send()
+
+
+def email_invoice(invoice, email_data=None):
+    """
+    Email ``invoice``'s PDF to its client on the pool, reusing a stored render.
+
+    ``email_data`` may override ``to`` (an address or list), ``subject`` and
+    ``message``. Returns the future of the send.
+    """
+    email_data = email_data or {}
+    snapshot = invoice_snapshot(invoice)
+    path = storage_path(content_hash(snapshot), 'pdf')
+
+    to = email_data.get('to') or invoice.client.contact_email
+    sender = snapshot['branding']['company'] or snapshot['branding']['name'] or 'us'
+    message = EmailMessage(
+        subject=email_data.get('subject') or f"Invoice #{invoice.invoice_number}",
+        body=email_data.get('message') or (
+            f"Hello {invoice.client.name},\n\n"
+            f"Please find attached invoice #{invoice.invoice_number} for "
+            f"{snapshot['branding']['currency']} {invoice.total}, due {invoice.due_date}.\n\n"
+            f"Thank you,\n{sender}"
+        ),
+        to=[to] if isinstance(to, str) else list(to),
+        reply_to=[snapshot['branding']['email']] if snapshot['branding']['email'] else None,
+    )
+
+    def report(future):
+        error = future.exception()
+        log_event(
+            level='ERROR' if error else 'INFO',
+            message=(
+                f'Failed to email invoice #{invoice.invoice_number}: {error}' if error
+                else f'Emailed invoice #{invoice.invoice_number} to {", ".join(message.to)}'
+            ),
+            category='system',
+            user_id=invoice.user_id,
+            related_invoice_id=invoice.pk,
+            related_client_id=invoice.client_id,
+        )
+
+    future = get_executor().submit(_send, snapshot, 'pdf', path, message)
+    future.add_done_callback(report)
+    return future
@@ -1,12 +1,20 @@
+import base64
 import graphene
 from graphene_django.types import DjangoObjectType
 from django.db import transaction
+from django.db.models import Count, Q, Sum
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User
 from django.conf import settings
-from .models import InvoiceProject, Invoice, InvoiceItem
+from backend.query_budget import query_budget
+from .aging import BUCKETS, ar_aging
+from .models import Invoice, InvoiceItem
+from .rendering import email_invoice, request_render
+from .services import create_invoice, refresh_client_balances, save_invoice, update_invoice
 from clients_app.models import Client as ClientsAppClient
 from clients_app.schema import ClientType
+from projects_app.models import Project
+from projects_app.schema import CreateProject, DeleteProject, ProjectType, UpdateProject
 from typing import Dict, Any, List
 from decimal import Decimal
 from django.utils import timezone
@@ -22,12 +30,6 @@ class LoginRequiredMixin:
         return super().mutate(root, info, **kwargs)
 
 
-class InvoiceProjectType(DjangoObjectType):
-    class Meta:
-        model = InvoiceProject
-        fields = '__all__'
-
-
 class InvoiceItemType(DjangoObjectType):
     class Meta:
         model = InvoiceItem
@@ -50,19 +52,10 @@ class ClientInput(graphene.InputObjectType):
     notes = graphene.String()
 
 
-class ProjectInput(graphene.InputObjectType):
-    client_id = graphene.ID(required=True)
-    title = graphene.String(required=True)
-    description = graphene.String()
-    status = graphene.String()
-    budget = graphene.Decimal()
-    start_date = graphene.Date()
-    end_date = graphene.Date()
-    is_active = graphene.Boolean()
-
-
 class InvoiceItemInput(graphene.InputObjectType):
     # Accept both camelCase and snake_case field names from frontend
+    # id of an existing item, to update it in place (UpdateInvoice)
+    id = graphene.ID()
     description = graphene.String(required=True)
     quantity = graphene.Decimal(required=True)
     rate = graphene.Decimal(required=True)
@@ -93,14 +86,62 @@ class InvoiceInput(graphene.InputObjectType):
 
 
 # --- Queries ---
+class ARAgingRowType(graphene.ObjectType):
+    """Outstanding amounts of one client (or the total) by days past due."""
+    client_id = graphene.ID()
+    client_name = graphene.String()
+    days_0_to_30 = graphene.Float()
+    days_31_to_60 = graphene.Float()
+    days_61_to_90 = graphene.Float()
+    days_over_90 = graphene.Float()
+    total = graphene.Float()
+
+
+class ARAgingType(graphene.ObjectType):
+    as_of = graphene.Date()
+    currency = graphene.String()
+    buckets = graphene.List(graphene.String)
+    rows = graphene.List(ARAgingRowType)
+    totals = graphene.Field(ARAgingRowType)
+    csv = graphene.String(description="The report as CSV, for export")
+
+    def resolve_buckets(self, info):
+        return [label for _key, label, _low, _high in BUCKETS]
+
+    def resolve_csv(self, info):
+        return self.to_csv()
+
+
+class InvoiceFormatEnum(graphene.Enum):
+    PDF = 'pdf'
+    HTML = 'html'
+
+
+class InvoiceRenderType(graphene.ObjectType):
+    """A rendered invoice document. Request it again while status is PENDING."""
+    status = graphene.String()
+    format = graphene.String()
+    filename = graphene.String()
+    content_type = graphene.String()
+    content_hash = graphene.String()
+    url = graphene.String()
+    content = graphene.String(description="The document, base64-encoded")
+
+    def resolve_url(self, info):
+        return self.url()
+
+    def resolve_content(self, info):
+        return base64.b64encode(self.read()).decode() if self.ready else None
+
+
 class InvoiceQuery(graphene.ObjectType):
     # Clients
     all_clients = graphene.List(ClientType)
     client = graphene.Field(ClientType, id=graphene.ID(required=True))
 
-    # Projects
-    all_projects = graphene.List(InvoiceProjectType)
-    project = graphene.Field(InvoiceProjectType, id=graphene.ID(required=True))
+    # Projects: aliases of projects_app's, which invoices point at
+    all_projects = graphene.List(ProjectType)
+    project = graphene.Field(ProjectType, id=graphene.ID(required=True))
 
     # Invoices
     all_invoices = graphene.List(
@@ -116,6 +157,16 @@ class InvoiceQuery(graphene.ObjectType):
     # Analytics
     invoice_analytics = graphene.Field(graphene.JSONString)
 
+    # Accounts-receivable aging
+    ar_aging = graphene.Field(ARAgingType, as_of=graphene.Date(), currency=graphene.String())
+
+    # Rendered invoice documents
+    download_invoice = graphene.Field(
+        InvoiceRenderType,
+        id=graphene.ID(required=True),
+        format=InvoiceFormatEnum(default_value='pdf'),
+    )
+
     @staticmethod
     def resolve_all_clients(root, info):
         if not info.context.user.is_authenticated:
@@ -123,6 +174,7 @@ class InvoiceQuery(graphene.ObjectType):
         return ClientsAppClient.objects.filter(user=info.context.user)
 
     @staticmethod
+    @query_budget(1)
     def resolve_client(root, info, id):
         if not info.context.user.is_authenticated:
             return None
@@ -131,26 +183,27 @@ class InvoiceQuery(graphene.ObjectType):
     @staticmethod
     def resolve_all_projects(root, info):
         if not info.context.user.is_authenticated:
-            return InvoiceProject.objects.none()
-        return InvoiceProject.objects.filter(user=info.context.user).select_related('client')
+            return Project.objects.none()
+        return Project.objects.filter(user=info.context.user).select_related('client')
 
     @staticmethod
     def resolve_project(root, info, id):
         if not info.context.user.is_authenticated:
             return None
         return get_object_or_404(
-            InvoiceProject.objects.select_related('client'),
+            Project.objects.select_related('client'),
             pk=id,
             user=info.context.user
         )
 
     @staticmethod
+    @query_budget(3)
     def resolve_all_invoices(root, info, status=None, client_id=None, project_id=None, limit=None, offset=None):
         # TEMPORARILY DISABLE AUTH FILTERING FOR DEBUGGING
         # if not info.context.user.is_authenticated:
         #     return Invoice.objects.none()
         # queryset = Invoice.objects.filter(user=info.context.user).select_related('client', 'project')
-        queryset = Invoice.objects.all().select_related('client', 'project')
+        queryset = Invoice.objects.all().select_related('client', 'project').prefetch_related('items')
 
         if status:
             queryset = queryset.filter(status=status)
@@ -168,6 +221,7 @@ class InvoiceQuery(graphene.ObjectType):
         return queryset
 
     @staticmethod
+    @query_budget(3)
     def resolve_invoice(root, info, id):
         if not info.context.user.is_authenticated:
             return None
@@ -178,33 +232,57 @@ class InvoiceQuery(graphene.ObjectType):
         )
 
     @staticmethod
+    @query_budget(1)
     def resolve_invoice_analytics(root, info):
         if not info.context.user.is_authenticated:
             return {}
 
-        invoices = Invoice.objects.filter(user=info.context.user)
-
-        total_revenue = sum(invoice.total for invoice in invoices.filter(status='PAID'))
-        pending_amount = sum(invoice.total for invoice in invoices.filter(status__in=['SENT', 'DRAFT']))
-        paid_amount = total_revenue
-        overdue_amount = sum(invoice.total for invoice in invoices.filter(status='OVERDUE'))
-
-        total_invoices = invoices.count()
-        paid_invoices = invoices.filter(status='PAID').count()
-        pending_invoices = invoices.filter(status__in=['SENT', 'DRAFT']).count()
-        overdue_invoices = invoices.filter(status='OVERDUE').count()
+        paid = Q(status='PAID')
+        pending = Q(status__in=['SENT', 'DRAFT'])
+        overdue = Q(status='OVERDUE')
+
+        # Gather every figure in one conditional aggregate
+        totals = Invoice.objects.filter(user=info.context.user).aggregate(
+            total_revenue=Sum('total', filter=paid, default=0),
+            pending_amount=Sum('total', filter=pending, default=0),
+            overdue_amount=Sum('total', filter=overdue, default=0),
+            total_invoices=Count('id'),
+            paid_invoices=Count('id', filter=paid),
+            pending_invoices=Count('id', filter=pending),
+            overdue_invoices=Count('id', filter=overdue),
+        )
 
         return {
-            'totalRevenue': float(total_revenue),
-            'pendingAmount': float(pending_amount),
-            'paidAmount': float(paid_amount),
-            'overdueAmount': float(overdue_amount),
-            'totalInvoices': total_invoices,
-            'paidInvoices': paid_invoices,
-            'pendingInvoices': pending_invoices,
-            'overdueInvoices': overdue_invoices,
+            'totalRevenue': float(totals['total_revenue']),
+            'pendingAmount': float(totals['pending_amount']),
+            'paidAmount': float(totals['total_revenue']),
+            'overdueAmount': float(totals['overdue_amount']),
+            'totalInvoices': totals['total_invoices'],
+            'paidInvoices': totals['paid_invoices'],
+            'pendingInvoices': totals['pending_invoices'],
+            'overdueInvoices': totals['overdue_invoices'],
         }
 
+    @staticmethod
+    @query_budget(2)
+    def resolve_ar_aging(root, info, as_of=None, currency=None):
+        if not info.context.user.is_authenticated:
+            return None
+        return ar_aging(info.context.user, as_of=as_of, currency=currency)
+
+    @staticmethod
+    @query_budget(4)
+    def resolve_download_invoice(root, info, id, format='pdf'):
+        if not info.context.user.is_authenticated:
+            return None
+        invoice = get_object_or_404(
+            Invoice.objects.select_related('client', 'project'), pk=id, user=info.context.user
+        )
+        format = getattr(format, 'value', format)
+        # Not rendered yet: PENDING at once (unless INVOICE_RENDER_WAIT_SECONDS
+        # allows a wait), and the client asks again
+        return request_render(invoice, format, timeout=getattr(settings, 'INVOICE_RENDER_WAIT_SECONDS', 0))
+
 
 # --- Mutations ---
 class CreateClient(LoginRequiredMixin, graphene.Mutation):
@@ -256,63 +334,6 @@ class DeleteClient(LoginRequiredMixin, graphene.Mutation):
         return DeleteClient(success=True)
 
 
-class CreateProject(LoginRequiredMixin, graphene.Mutation):
-    class Arguments:
-        input = ProjectInput(required=True)
-
-    project = graphene.Field(InvoiceProjectType)
-
-    @classmethod
-    @transaction.atomic
-    def mutate(cls, root, info, input):
-        user = info.context.user
-        client_id = input.pop('client_id')
-        client = get_object_or_404(ClientsAppClient, pk=client_id, user=user)
-
-        project = InvoiceProject.objects.create(user=user, client=client, **input)
-        return CreateProject(project=project)
-
-
-class UpdateProject(LoginRequiredMixin, graphene.Mutation):
-    class Arguments:
-        id = graphene.ID(required=True)
-        input = ProjectInput(required=True)
-
-    project = graphene.Field(InvoiceProjectType)
-
-    @classmethod
-    @transaction.atomic
-    def mutate(cls, root, info, id, input):
-        user = info.context.user
-        project = get_object_or_404(InvoiceProject, pk=id, user=user)
-
-        client_id = input.pop('client_id', None)
-        if client_id:
-            client = get_object_or_404(ClientsAppClient, pk=client_id, user=user)
-            project.client = client
-
-        for field, value in input.items():
-            setattr(project, field, value)
-        project.save()
-
-        return UpdateProject(project=project)
-
-
-class DeleteProject(LoginRequiredMixin, graphene.Mutation):
-    class Arguments:
-        id = graphene.ID(required=True)
-
-    success = graphene.Boolean()
-
-    @classmethod
-    @transaction.atomic
-    def mutate(cls, root, info, id):
-        user = info.context.user
-        project = get_object_or_404(InvoiceProject, pk=id, user=user)
-        project.delete()
-        return DeleteProject(success=True)
-
-
 class CreateInvoice(LoginRequiredMixin, graphene.Mutation):
     class Arguments:
         input = InvoiceInput(required=True)
@@ -345,7 +366,7 @@ class CreateInvoice(LoginRequiredMixin, graphene.Mutation):
         client = get_object_or_404(ClientsAppClient, pk=client_id, user=user)
         project = None
         if project_id:
-            project = get_object_or_404(InvoiceProject, pk=project_id, user=user)
+            project = get_object_or_404(Project, pk=project_id, user=user)
 
         # Generate invoice number if not provided
         if not invoice_number:
@@ -357,8 +378,9 @@ class CreateInvoice(LoginRequiredMixin, graphene.Mutation):
         else:
             status = 'DRAFT'
 
-        # Create invoice record (use provided dates if available)
-        invoice = Invoice.objects.create(
+        # Build the invoice (use provided dates if available); a provided
+        # total is kept, else it is subtotal + tax - discount
+        invoice = Invoice(
             user=user,
             client=client,
             project=project,
@@ -367,39 +389,11 @@ class CreateInvoice(LoginRequiredMixin, graphene.Mutation):
             due_date=due_date or timezone.now().date(),
             notes=input.pop('notes', None),
             status=status,
+            tax=Decimal(str(tax_amount)) if tax_amount is not None else Decimal('0'),
+            discount=Decimal(str(discount_amount)) if discount_amount is not None else Decimal('0'),
         )
-
-        # Create invoice items and compute subtotal
-        subtotal = Decimal('0')
-        for item_data in items_data:
-            # Only pick allowed fields to avoid unexpected kwargs (like id or amount)
-            description = item_data.get('description')
-            quantity = Decimal(str(item_data.get('quantity') or item_data.get('qty') or 0))
-            rate = Decimal(str(item_data.get('rate') or 0))
-            item = InvoiceItem.objects.create(
-                invoice=invoice,
-                description=description,
-                quantity=quantity,
-                rate=rate
-            )
-            subtotal += item.amount
-
-        # Use provided financials if present, otherwise compute
-        if subtotal_amount is None:
-            invoice.subtotal = subtotal
-        else:
-            invoice.subtotal = Decimal(str(subtotal_amount))
-
-        invoice.tax = Decimal(str(tax_amount)) if tax_amount is not None else Decimal('0')
-        invoice.discount = Decimal(str(discount_amount)) if discount_amount is not None else Decimal('0')
-
-        # Final total: prefer provided total_amount, otherwise compute
-        if total_amount is not None:
-            invoice.total = Decimal(str(total_amount))
-        else:
-            invoice.total = invoice.subtotal + invoice.tax - invoice.discount
-
-        invoice.save()
+        # Items are inserted in one statement and client balances refreshed once
+        create_invoice(invoice, items_data, subtotal=subtotal_amount, total=total_amount)
 
         return CreateInvoice(invoice=invoice)
 
@@ -416,6 +410,7 @@ class UpdateInvoice(LoginRequiredMixin, graphene.Mutation):
     def mutate(cls, root, info, id, input):
         user = info.context.user
         invoice = get_object_or_404(Invoice, pk=id, user=user)
+        previous_client_id = invoice.client_id
 
         # Support both camelCase and snake_case keys
         client_id = input.pop('client_id', None) or input.pop('clientId', None)
@@ -427,7 +422,7 @@ class UpdateInvoice(LoginRequiredMixin, graphene.Mutation):
             invoice.client = client
 
         if project_id:
-            project = get_object_or_404(InvoiceProject, pk=project_id, user=user)
+            project = get_object_or_404(Project, pk=project_id, user=user)
             invoice.project = project
         elif 'project_id' in input or 'projectId' in input:
             # Explicitly set to None when frontend sends null/empty
@@ -444,7 +439,11 @@ class UpdateInvoice(LoginRequiredMixin, graphene.Mutation):
         if 'issue_date' in input or 'issueDate' in input:
             invoice.issue_date = input.get('issue_date') or input.get('issueDate')
         if 'due_date' in input or 'dueDate' in input:
-            invoice.due_date = input.get('due_date') or input.get('dueDate')
+            due_date = input.get('due_date') or input.get('dueDate')
+            # A new due date gets its own reminder
+            if due_date != invoice.due_date:
+                invoice.reminder_sent = False
+            invoice.due_date = due_date
 
         # Financial fields if provided
         tax_amount = input.pop('tax', None)
@@ -459,34 +458,9 @@ class UpdateInvoice(LoginRequiredMixin, graphene.Mutation):
         if subtotal_amount is not None:
             invoice.subtotal = Decimal(str(subtotal_amount))
 
-        # Update items if provided
-        if items_data is not None:
-            # Delete existing items
-            invoice.items.all().delete()
-
-            # Create new items and compute subtotal
-            subtotal = Decimal('0')
-            for item_data in items_data:
-                description = item_data.get('description')
-                quantity = Decimal(str(item_data.get('quantity') or item_data.get('qty') or 0))
-                rate = Decimal(str(item_data.get('rate') or 0))
-                item = InvoiceItem.objects.create(
-                    invoice=invoice,
-                    description=description,
-                    quantity=quantity,
-                    rate=rate
-                )
-                subtotal += item.amount
-
-            invoice.subtotal = subtotal
-
-        # Final total: prefer provided total_amount, otherwise compute
-        if total_amount is not None:
-            invoice.total = Decimal(str(total_amount))
-        else:
-            invoice.total = invoice.subtotal + invoice.tax - invoice.discount
-
-        invoice.save()
+        # Items are diffed against the existing ones (subtotal follows them
+        # when given) and client balances refreshed once
+        update_invoice(invoice, items_data, previous_client_id=previous_client_id, total=total_amount)
         return UpdateInvoice(invoice=invoice)
 
 
@@ -502,6 +476,7 @@ class DeleteInvoice(LoginRequiredMixin, graphene.Mutation):
         user = info.context.user
         invoice = get_object_or_404(Invoice, pk=id, user=user)
         invoice.delete()
+        refresh_client_balances([invoice.client_id])
         return DeleteInvoice(success=True)
 
 
@@ -517,14 +492,15 @@ class SendInvoice(LoginRequiredMixin, graphene.Mutation):
     @transaction.atomic
     def mutate(cls, root, info, id, email_data=None):
         user = info.context.user
-        invoice = get_object_or_404(Invoice, pk=id, user=user)
+        invoice = get_object_or_404(Invoice.objects.select_related('client', 'project'), pk=id, user=user)
 
         # Update status to sent
         invoice.status = 'SENT'
-        invoice.save()
+        save_invoice(invoice)
 
-        # TODO: Implement actual email sending logic here
-        # For now, just mark as sent
+        # The PDF is rendered (or taken from the render cache) and emailed
+        # on the render pool once the status change is committed
+        transaction.on_commit(lambda: email_invoice(invoice, email_data))
 
         return SendInvoice(success=True, invoice=invoice)
 
@@ -547,7 +523,7 @@ class MarkInvoicePaid(LoginRequiredMixin, graphene.Mutation):
         from django.utils import timezone
         invoice.status = 'PAID'
         invoice.paid_date = timezone.now().date()
-        invoice.save()
+        save_invoice(invoice)
 
         return MarkInvoicePaid(success=True, invoice=invoice)
 
@@ -559,7 +535,7 @@ class InvoiceMutation(graphene.ObjectType):
     update_client = UpdateClient.Field()
     delete_client = DeleteClient.Field()
 
-    # Project mutations
+    # Project mutations: aliases of projects_app's
     create_project = CreateProject.Field()
     update_project = UpdateProject.Field()
     delete_project = DeleteProject.Field()
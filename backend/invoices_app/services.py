@@ -0,0 +1,155 @@
+# invoices_app/services.py
+
+"""
+Invoice write service.
+
+Line item amounts and invoice totals are computed in memory; items are
+inserted with one ``bulk_create`` and, on update, diffed against the
+existing rows so unchanged items are left alone. The invoice is saved
+without ``Invoice.save``'s per-save client bookkeeping, and the client
+balances are refreshed once per write with ``refresh_client_balances``.
+
+A 50-line invoice is created in a handful of queries: the invoice insert,
+one item insert, and one aggregate plus one update for the client.
+"""
+
+from decimal import Decimal
+
+from django.db.models import DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from clients_app.models import Client
+from .models import InvoiceItem
+
+
+UNPAID_STATUSES = ('SENT', 'OVERDUE')
+ITEM_FIELDS = ('description', 'quantity', 'rate', 'amount')
+CENT = Decimal('0.01')
+
+
+def refresh_client_balances(client_ids):
+    """
+    Recompute total revenue and outstanding balance of the given clients
+    from their invoices in one grouped aggregate, then write them back in
+    one bulk UPDATE. Returns the number of clients updated.
+    """
+    zero = Value(0, output_field=DecimalField(max_digits=12, decimal_places=2))
+    clients = list(
+        Client.objects.filter(id__in={pk for pk in client_ids if pk}).annotate(
+            paid_total=Coalesce(Sum('invoices__total', filter=Q(invoices__status='PAID')), zero),
+            unpaid_total=Coalesce(Sum('invoices__total', filter=Q(invoices__status__in=UNPAID_STATUSES)), zero),
+        ).only('id', 'total_revenue', 'outstanding_balance')
+    )
+    changed = []
+    for client in clients:
+        if (client.total_revenue, client.outstanding_balance) != (client.paid_total, client.unpaid_total):
+            client.total_revenue, client.outstanding_balance = client.paid_total, client.unpaid_total
+            changed.append(client)
+    # bulk_update bypasses Client.save(), which would recompute per client
+    Client.objects.bulk_update(changed, ['total_revenue', 'outstanding_balance'])
+    return len(changed)
+
+
+def _decimal(value):
+    return Decimal(str(value or 0))
+
+
+def item_values(item_data):
+    """Cleaned description, quantity, rate and computed amount of one item input."""
+    quantity = _decimal(item_data.get('quantity') or item_data.get('qty'))
+    rate = _decimal(item_data.get('rate'))
+    return {
+        'description': item_data.get('description'),
+        'quantity': quantity,
+        'rate': rate,
+        'amount': (quantity * rate).quantize(CENT),
+    }
+
+
+def save_invoice(invoice, previous_client_id=None, total=None):
+    """
+    Save ``invoice`` and bring its client's balances up to date.
+
+    Replaces the bookkeeping ``Invoice.save`` does on every save: the
+    paid date defaults to the issue date when the invoice is paid, and the
+    client (and the previous client, if the invoice moved) is refreshed
+    with one aggregate. A given ``total`` is kept instead of subtotal +
+    tax - discount.
+    """
+    if invoice.status == 'PAID' and not invoice.paid_date:
+        invoice.paid_date = invoice.issue_date
+    invoice.save(sync_client=False, total=_decimal(total) if total is not None else None)
+    refresh_client_balances([invoice.client_id, previous_client_id])
+    return invoice
+
+
+def create_invoice(invoice, items_data, subtotal=None, total=None):
+    """
+    Insert a new ``invoice`` and its items.
+
+    The subtotal is the sum of the item amounts unless one is given, and the
+    total is subtotal + tax - discount unless one is given.
+    """
+    values = [item_values(item_data) for item_data in items_data]
+    invoice.subtotal = (
+        _decimal(subtotal) if subtotal is not None
+        else sum((item['amount'] for item in values), Decimal('0'))
+    )
+    save_invoice(invoice, total=total)
+    InvoiceItem.objects.bulk_create([InvoiceItem(invoice=invoice, **item) for item in values])
+    return invoice
+
+
+def update_invoice(invoice, items_data=None, previous_client_id=None, total=None):
+    """
+    Save changes to ``invoice``, syncing its items when ``items_data`` is
+    given (the subtotal then becomes the sum of the item amounts). A given
+    ``total`` is kept as in ``create_invoice``.
+    """
+    if items_data is not None:
+        invoice.subtotal = sync_items(invoice, items_data)
+    return save_invoice(invoice, previous_client_id, total=total)
+
+
+def sync_items(invoice, items_data):
+    """
+    Make ``invoice``'s items match ``items_data``. Returns their subtotal.
+
+    Inputs with an ``id`` update that item; the others take the place of
+    the remaining existing items in order. Changed items are written with
+    one bulk UPDATE, new ones with one INSERT, and left-over items are
+    deleted with one DELETE.
+    """
+    existing = list(invoice.items.order_by('created_at', 'id'))
+    by_id = {str(item.id): item for item in existing}
+    claimed = {str(item_data.get('id')) for item_data in items_data if item_data.get('id')}
+    unclaimed = [item for item in existing if str(item.id) not in claimed]
+
+    now = timezone.now()
+    to_create, to_update, kept = [], [], set()
+    subtotal = Decimal('0')
+    for item_data in items_data:
+        values = item_values(item_data)
+        subtotal += values['amount']
+
+        item_id = item_data.get('id')
+        item = by_id.get(str(item_id)) if item_id else (unclaimed.pop(0) if unclaimed else None)
+        if item is None:
+            to_create.append(InvoiceItem(invoice=invoice, **values))
+            continue
+        kept.add(item.id)
+        if any(getattr(item, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(item, field, value)
+            item.updated_at = now
+            to_update.append(item)
+
+    stale = [item.id for item in existing if item.id not in kept]
+    if stale:
+        InvoiceItem.objects.filter(id__in=stale).delete()
+    if to_update:
+        InvoiceItem.objects.bulk_update(to_update, [*ITEM_FIELDS, 'updated_at'])
+    if to_create:
+        InvoiceItem.objects.bulk_create(to_create)
+    return subtotal
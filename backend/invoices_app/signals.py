@@ -0,0 +1,14 @@
+# invoices_app/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from clients_app.models import Client
+from . import aging
+from .models import Invoice
+
+
+@receiver([post_save, post_delete], sender=Invoice, dispatch_uid='ar_aging_invoice_changed')
+@receiver([post_save, post_delete], sender=Client, dispatch_uid='ar_aging_client_changed')
+def invalidate_ar_aging(sender, instance, **kwargs):
+    aging.invalidate(instance.user_id)
@@ -1,3 +1,357 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from concurrent.futures import Future
+from datetime import date
+from decimal import Decimal
+from itertools import count
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from admin_dashboard.models import AdminSettings, SystemLog
+from clients_app.models import Client
+from backend.schema import schema
+from projects_app.models import Project
+from .aging import ar_aging
+from .models import Invoice, InvoiceItem
+from .overdue import sweep_overdue_invoices
+from .services import create_invoice, update_invoice
+from .schema import InvoiceQuery
+from .rendering import email_invoice, render_invoices, request_render
+
+
+class ImmediateExecutor:
+    """Runs submitted work in the calling thread, inside the test's transaction."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class RenderingTests(TestCase):
+    def setUp(self):
+        self.enterContext(mock.patch('invoices_app.rendering.get_executor', return_value=ImmediateExecutor()))
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user('owner', email='owner@example.com', password='x')
+        AdminSettings.objects.create(user=self.user, company='Vista Studio', currency='GHS')
+        client = Client.objects.create(user=self.user, name='Acme', contact_email='a@acme.com')
+        self.invoice = Invoice.objects.create(
+            user=self.user, client=client, invoice_number='INV-1', status='SENT', subtotal=150,
+            issue_date=date(2026, 3, 1), due_date=date(2026, 3, 31),
+        )
+        self.item = InvoiceItem.objects.create(
+            invoice=self.invoice, description='Logo design (v2)', quantity=3, rate=50, amount=150
+        )
+
+    def test_renders_are_cached_by_content(self):
+        pdf = request_render(self.invoice, 'pdf')
+        self.assertTrue(pdf.ready)
+        data = pdf.read()
+        self.assertTrue(data.startswith(b'%PDF-1.4'))
+        self.assertIn(b'Logo design \\(v2\\)', data)
+
+        html = request_render(self.invoice, 'html')
+        self.assertEqual(html.content_hash, pdf.content_hash)
+        self.assertIn('Total (GHS)', html.read().decode())
+
+        # Nothing changed: the stored render is reused
+        self.assertEqual(render_invoices(Invoice.objects.all(), formats=['pdf', 'html']), (0, 2))
+
+        # Editing an item addresses a new document
+        self.item.description = 'Logo design (v3)'
+        self.item.save()
+        self.invoice.refresh_from_db()
+        changed = request_render(self.invoice, 'pdf')
+        self.assertNotEqual(changed.content_hash, pdf.content_hash)
+        self.assertTrue(default_storage.exists(pdf.path))
+        self.assertTrue(default_storage.exists(changed.path))
+
+    def test_email_attaches_the_pdf(self):
+        email_invoice(self.invoice, {'subject': 'Your invoice'}).result()
+
+        self.assertEqual(len(mail.outbox), 1)
+        message = mail.outbox[0]
+        self.assertEqual(message.to, ['a@acme.com'])
+        self.assertEqual(message.subject, 'Your invoice')
+        filename, content, content_type = message.attachments[0]
+        self.assertEqual((filename, content_type), ('invoice-INV-1.pdf', 'application/pdf'))
+        self.assertEqual(content, request_render(self.invoice, 'pdf').read())
+        self.assertTrue(SystemLog.objects.filter(related_invoice=self.invoice, message__startswith='Emailed').exists())
+
+    def test_downloads_are_pending_until_rendered_without_waiting(self):
+        queued = []
+
+        class QueuedExecutor:
+            def submit(self, fn, *args):
+                future = Future()
+                queued.append((future, fn, args))
+                return future
+
+        request = RequestFactory().post('/graphql/')
+        request.user = self.user
+        query = 'query ($id: ID!) { downloadInvoice(id: $id) { status content } }'
+
+        with mock.patch('invoices_app.rendering.get_executor', return_value=QueuedExecutor()):
+            result = schema.execute(query, variables={'id': self.invoice.pk}, context_value=request)
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['downloadInvoice'], {'status': 'PENDING', 'content': None})
+
+        future, fn, args = queued.pop()
+        future.set_result(fn(*args))
+        result = schema.execute(query, variables={'id': self.invoice.pk}, context_value=request)
+        self.assertEqual(result.data['downloadInvoice']['status'], 'READY')
+
+
+class InvoiceProjectTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='x')
+        self.client_record = Client.objects.create(user=self.user, name='Acme', contact_email='a@acme.com')
+        self.project = Project.objects.create(user=self.user, client=self.client_record, title='Site')
+        self.request = RequestFactory().post('/graphql/')
+        self.request.user = self.user
+
+    def test_invoices_belong_to_projects_app_projects(self):
+        result = schema.execute(
+            """
+            mutation ($input: InvoiceInput!) {
+                createInvoice(input: $input) { invoice { id project { id title slug } } }
+            }
+            """,
+            variables={'input': {
+                'clientId': self.client_record.pk, 'projectId': self.project.pk,
+                'issueDate': '2026-03-01', 'dueDate': '2026-03-31',
+            }},
+            context_value=self.request,
+        )
+        self.assertIsNone(result.errors)
+        invoice = result.data['createInvoice']['invoice']
+        self.assertEqual(invoice['project'], {'id': str(self.project.pk), 'title': 'Site', 'slug': 'site'})
+        self.assertEqual(list(self.project.invoices.values_list('pk', flat=True)), [int(invoice['id'])])
+
+        # The invoice app's project fields are aliases of projects_app's
+        info = type('Info', (), {'context': self.request})
+        self.assertEqual(list(InvoiceQuery.resolve_all_projects(None, info)), [self.project])
+        self.assertEqual(InvoiceQuery.resolve_project(None, info, self.project.pk), self.project)
+
+
+class InvoiceTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user('owner', password='x')
+        self.client_record = Client.objects.create(user=self.user, name='Acme', contact_email='a@acme.com')
+        self.numbers = count(1)
+
+    def invoice(self, subtotal, due_date, status='SENT', client=None, **kwargs):
+        # Saved without Invoice.save's client bookkeeping, as the write service does
+        invoice = Invoice(
+            user=self.user, client=client or self.client_record, invoice_number=f'INV-{next(self.numbers)}',
+            status=status, subtotal=Decimal(subtotal), issue_date=kwargs.pop('issue_date', date(2026, 1, 1)),
+            due_date=due_date, **kwargs,
+        )
+        invoice.save(sync_client=False)
+        return invoice
+
+
+class SweepOverdueInvoicesTests(InvoiceTestCase):
+    def test_only_sent_invoices_past_due_are_moved_and_logged(self):
+        late = self.invoice('120.00', date(2026, 3, 10))
+        due_today = self.invoice('80.00', date(2026, 3, 20))
+        draft = self.invoice('50.00', date(2026, 3, 1), status='DRAFT')
+        paid = self.invoice('70.00', date(2026, 3, 1), status='PAID', paid_date=date(2026, 3, 2))
+
+        self.assertFalse(late.is_overdue)
+        self.assertEqual(self.client_record.overdue_invoices, 0)
+
+        self.assertEqual(sweep_overdue_invoices(today=date(2026, 3, 20)), 1)
+
+        late.refresh_from_db()
+        self.assertTrue(late.is_overdue)
+        self.assertEqual(self.client_record.overdue_invoices, 1)
+        statuses = dict(Invoice.objects.values_list('pk', 'status'))
+        self.assertEqual(
+            [statuses[i.pk] for i in (late, due_today, draft, paid)], ['OVERDUE', 'SENT', 'DRAFT', 'PAID']
+        )
+        log = SystemLog.objects.get(metadata__event='invoice_status_changed')
+        self.assertEqual((log.related_invoice, log.related_client, log.level), (late, self.client_record, 'WARNING'))
+        self.assertEqual(
+            {key: log.metadata[key] for key in ('from_status', 'to_status', 'days_overdue', 'total')},
+            {'from_status': 'SENT', 'to_status': 'OVERDUE', 'days_overdue': 10, 'total': '120.00'},
+        )
+        # The client's balances are recomputed from its invoices
+        self.client_record.refresh_from_db()
+        self.assertEqual(
+            (self.client_record.outstanding_balance, self.client_record.total_revenue),
+            (Decimal('200.00'), Decimal('70.00')),
+        )
+
+    def test_a_second_sweep_moves_and_logs_nothing(self):
+        self.invoice('120.00', date(2026, 3, 10))
+        self.assertEqual(sweep_overdue_invoices(today=date(2026, 3, 20)), 1)
+
+        self.assertEqual(sweep_overdue_invoices(today=date(2026, 3, 21)), 0)
+        self.assertEqual(SystemLog.objects.filter(metadata__event='invoice_status_changed').count(), 1)
+
+
+class ARAgingTests(InvoiceTestCase):
+    as_of = date(2026, 4, 30)
+
+    def setUp(self):
+        super().setUp()
+        self.other_client = Client.objects.create(user=self.user, name='Beta', contact_email='b@beta.com')
+
+    def amounts(self, row):
+        return [row.days_0_to_30, row.days_31_to_60, row.days_61_to_90, row.days_over_90, row.total]
+
+    def test_outstanding_amounts_are_bucketed_by_days_past_due(self):
+        self.invoice('100.00', date(2026, 5, 10))  # not yet due
+        self.invoice('50.00', date(2026, 3, 31))  # 30 days
+        self.invoice('200.00', date(2026, 3, 30), status='OVERDUE')  # 31 days
+        # Paid after the as-of date, so still outstanding on it
+        self.invoice('300.00', date(2026, 2, 15), status='PAID', paid_date=date(2026, 5, 5), client=self.other_client)
+        self.invoice('400.00', date(2026, 1, 1), status='OVERDUE', client=self.other_client)
+        # Paid, drafted or issued outside the report
+        self.invoice('1000.00', date(2026, 3, 1), status='PAID', paid_date=date(2026, 4, 1))
+        self.invoice('1000.00', date(2026, 3, 1), status='DRAFT')
+        self.invoice('1000.00', date(2026, 5, 31), issue_date=date(2026, 5, 1))
+
+        report = ar_aging(self.user, self.as_of)
+
+        acme, beta = report.rows
+        self.assertEqual((acme.client_name, beta.client_name), ('Acme', 'Beta'))
+        self.assertEqual(self.amounts(acme), [Decimal('150.00'), Decimal('200.00'), 0, 0, Decimal('350.00')])
+        self.assertEqual(self.amounts(beta), [0, 0, Decimal('300.00'), Decimal('400.00'), Decimal('700.00')])
+        self.assertEqual(
+            self.amounts(report.totals),
+            [Decimal('150.00'), Decimal('200.00'), Decimal('300.00'), Decimal('400.00'), Decimal('1050.00')],
+        )
+
+    def test_cached_reports_are_dropped_when_an_invoice_is_saved_or_deleted(self):
+        invoice = self.invoice('100.00', date(2026, 4, 15))
+        stale = self.invoice('40.00', date(2026, 4, 15))
+        self.assertEqual(ar_aging(self.user, self.as_of, 'USD').totals.total, Decimal('140.00'))
+        with self.assertNumQueries(0):
+            self.assertEqual(ar_aging(self.user, self.as_of, 'USD').totals.total, Decimal('140.00'))
+
+        invoice.status = 'PAID'
+        invoice.paid_date = date(2026, 4, 20)
+        invoice.save(sync_client=False)
+        self.assertEqual(ar_aging(self.user, self.as_of, 'USD').totals.total, Decimal('40.00'))
+
+        stale.delete()
+        report = ar_aging(self.user, self.as_of, 'USD')
+        self.assertEqual((report.rows, report.totals.total), ([], Decimal('0')))
+
+
+class InvoiceServiceTests(InvoiceTestCase):
+    def new_invoice(self, **kwargs):
+        return Invoice(
+            user=self.user, client=self.client_record, invoice_number='INV-100', status='SENT',
+            issue_date=date(2026, 3, 1), due_date=date(2026, 3, 31), **kwargs,
+        )
+
+    def test_create_inserts_all_items_at_once_and_refreshes_the_client(self):
+        items = [{'description': f'Line {n}', 'quantity': '1.5', 'rate': '10.01'} for n in range(50)]
+
+        with CaptureQueriesContext(connection) as captured:
+            invoice = create_invoice(self.new_invoice(tax=Decimal('5.00')), items)
+        item_inserts = [q for q in captured if q['sql'].startswith('INSERT INTO "invoices_app_invoiceitem"')]
+        self.assertEqual(len(item_inserts), 1)
+        self.assertLessEqual(len(captured), 10)
+
+        # Amounts are rounded to the cent before being summed
+        self.assertEqual(set(invoice.items.values_list('amount', flat=True)), {Decimal('15.02')})
+        invoice.refresh_from_db()
+        self.assertEqual((invoice.subtotal, invoice.total), (Decimal('751.00'), Decimal('756.00')))
+        self.client_record.refresh_from_db()
+        self.assertEqual(self.client_record.outstanding_balance, Decimal('756.00'))
+
+    def test_update_diffs_items_and_refreshes_both_clients_when_moved(self):
+        invoice = create_invoice(self.new_invoice(), [
+            {'description': 'Design', 'quantity': 1, 'rate': 100},
+            {'description': 'Build', 'quantity': 2, 'rate': 200},
+            {'description': 'Hosting', 'quantity': 1, 'rate': 20},
+        ])
+        design, build, hosting = invoice.items.order_by('created_at', 'id')
+        other = Client.objects.create(user=self.user, name='Beta', contact_email='b@beta.com')
+
+        previous_client_id = invoice.client_id
+        invoice.client = other
+        with CaptureQueriesContext(connection) as captured:
+            update_invoice(invoice, [
+                {'id': build.pk, 'description': 'Build', 'quantity': 3, 'rate': 200},
+                {'description': 'Design', 'quantity': 1, 'rate': 100},
+            ], previous_client_id=previous_client_id)
+        writes = [q['sql'].split()[0] for q in captured if 'invoices_app_invoiceitem' in q['sql']]
+        # Build is updated, Design is left alone and Hosting is deleted
+        self.assertEqual(writes.count('UPDATE'), 1)
+        self.assertEqual(writes.count('DELETE'), 1)
+        self.assertNotIn('INSERT', writes)
+
+        self.assertEqual(
+            list(invoice.items.order_by('created_at', 'id').values_list('pk', 'quantity')),
+            [(design.pk, Decimal('1.00')), (build.pk, Decimal('3.00'))],
+        )
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.total, Decimal('700.00'))
+        self.client_record.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(
+            (self.client_record.outstanding_balance, other.outstanding_balance), (Decimal('0'), Decimal('700.00'))
+        )
+
+    def test_paid_invoices_default_their_paid_date_to_the_issue_date(self):
+        invoice = create_invoice(self.new_invoice(), [{'description': 'Design', 'quantity': 1, 'rate': 100}])
+        invoice.status = 'PAID'
+        update_invoice(invoice)
+
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.paid_date, date(2026, 3, 1))
+        self.client_record.refresh_from_db()
+        self.assertEqual(
+            (self.client_record.total_revenue, self.client_record.outstanding_balance),
+            (Decimal('100.00'), Decimal('0')),
+        )
+
+    def test_a_total_sent_by_the_client_is_kept(self):
+        request = RequestFactory().post('/graphql/')
+        request.user = self.user
+        result = schema.execute(
+            """
+            mutation ($input: InvoiceInput!) {
+                createInvoice(input: $input) { invoice { id subtotal total } }
+            }
+            """,
+            variables={'input': {
+                'clientId': self.client_record.pk, 'subtotal': '100.00', 'tax': '5.00', 'total': '99.99',
+                'items': [{'description': 'Design', 'quantity': 1, 'rate': 100}],
+            }},
+            context_value=request,
+        )
+        self.assertIsNone(result.errors)
+        invoice = Invoice.objects.get(pk=result.data['createInvoice']['invoice']['id'])
+        self.assertEqual(invoice.total, Decimal('99.99'))
+
+        update_invoice(invoice, total='120.00')
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.total, Decimal('120.00'))
+        # Without one it is computed again
+        update_invoice(invoice)
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.total, Decimal('105.00'))
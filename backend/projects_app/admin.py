@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Project, ProjectMilestone, ProjectTask, ProjectNote, ProjectFile
+from .models import ImageAsset, Project, ProjectMilestone, ProjectTask, ProjectNote, ProjectFile
 
 
 @admin.register(Project)
@@ -65,4 +65,12 @@ class ProjectFileAdmin(admin.ModelAdmin):
     list_display = ['title', 'project', 'user', 'file_type', 'file_name', 'file_size', 'created_at']
     list_filter = ['file_type', 'created_at']
     search_fields = ['title', 'file_name', 'project__title']
-    ordering = ['-created_at']
\ No newline at end of file
+    ordering = ['-created_at']
+
+
+@admin.register(ImageAsset)
+class ImageAssetAdmin(admin.ModelAdmin):
+    list_display = ['source_url', 'width', 'height', 'processed_at', 'created_at']
+    search_fields = ['source_url', 'source_hash']
+    readonly_fields = ['source_hash', 'width', 'height', 'variants', 'processed_at', 'created_at']
+    ordering = ['-created_at']
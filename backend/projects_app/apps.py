@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class ProjectsAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'projects_app'
\ No newline at end of file
+    name = 'projects_app'
+
+    def ready(self):
+        from . import jobs, signals  # noqa: F401 - registers the periodic jobs and signal handlers
@@ -0,0 +1,186 @@
+# projects_app/counters.py
+
+"""
+Denormalized task counters.
+
+Projects and milestones carry the number of their tasks, how many of them
+are completed, and the estimated hours of both, so progress needs no count
+queries. ``task_changed`` applies the difference between a task's previous
+and current state as ``F()`` increments, one UPDATE per affected project or
+milestone; the project's ``progress_percentage`` is recomputed from the
+new counters in the same UPDATE. The ProjectTask signals in
+projects_app.signals call it on every create, update and delete, diffing
+against the state the instance was loaded (or last saved) with.
+
+Writes that bypass model signals (``bulk_update``, ``bulk_create``) must
+pass their changes to ``tasks_changed``, or call ``recount`` for the
+projects they touched. ``recount`` with
+``fix=False`` only reports drift; see the ``verify_task_counters`` command.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, When
+from django.db.models.lookups import GreaterThan
+
+from .models import Project, ProjectMilestone, ProjectTask
+
+
+COMPLETED = 'COMPLETED'
+COUNTER_FIELDS = ('total_tasks', 'completed_tasks', 'estimated_task_hours', 'completed_task_hours')
+STATE_FIELDS = ('project_id', 'milestone_id', 'status', 'estimated_hours')
+CENT = Decimal('0.01')
+
+
+@dataclass(frozen=True)
+class TaskState:
+    """What a task contributes to its project's and milestone's counters."""
+    project_id: int
+    milestone_id: int
+    completed: bool
+    hours: Decimal
+
+    @classmethod
+    def of(cls, task):
+        """The state of ``task`` as loaded or assigned, or None if a field is deferred."""
+        values = task.__dict__
+        if any(field not in values for field in STATE_FIELDS):
+            return None
+        return cls(
+            project_id=values['project_id'],
+            milestone_id=values['milestone_id'],
+            completed=values['status'] == COMPLETED,
+            hours=Decimal(str(values['estimated_hours'] or 0)).quantize(CENT),
+        )
+
+    @classmethod
+    def load(cls, pk):
+        """The state of task ``pk`` as stored."""
+        values = ProjectTask.objects.filter(pk=pk).values(*STATE_FIELDS).first()
+        if values is None:
+            return None
+        return cls(
+            project_id=values['project_id'],
+            milestone_id=values['milestone_id'],
+            completed=values['status'] == COMPLETED,
+            hours=values['estimated_hours'] or Decimal('0'),
+        )
+
+    def deltas(self, sign):
+        return {
+            'total_tasks': sign,
+            'completed_tasks': sign if self.completed else 0,
+            'estimated_task_hours': sign * self.hours,
+            'completed_task_hours': sign * self.hours if self.completed else Decimal('0'),
+        }
+
+
+def _progress(deltas):
+    total = F('total_tasks') + deltas['total_tasks']
+    completed = F('completed_tasks') + deltas['completed_tasks']
+    return Case(
+        When(GreaterThan(total, 0), then=completed * 100 / total),
+        default=F('progress_percentage'),
+        output_field=IntegerField(),
+    )
+
+
+def task_changed(old, new):
+    """
+    Move a task's contribution from ``old`` to ``new`` (TaskStates, either
+    None for a created or deleted task). Issues no query when nothing that
+    is counted changed.
+    """
+    tasks_changed([(old, new)])
+
+
+def tasks_changed(changes):
+    """
+    Apply many ``(old, new)`` task state changes at once, e.g. after a
+    ``bulk_update``, with one UPDATE per affected project and milestone.
+    """
+    projects = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    milestones = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    for old, new in changes:
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+            for field, value in state.deltas(sign).items():
+                projects[state.project_id][field] += value
+                if state.milestone_id:
+                    milestones[state.milestone_id][field] += value
+
+    for pk, deltas in projects.items():
+        if any(deltas.values()):
+            Project.objects.filter(pk=pk).update(
+                progress_percentage=_progress(deltas),
+                **{field: F(field) + delta for field, delta in deltas.items() if delta},
+            )
+    for pk, deltas in milestones.items():
+        if any(deltas.values()):
+            ProjectMilestone.objects.filter(pk=pk).update(
+                **{field: F(field) + delta for field, delta in deltas.items() if delta}
+            )
+
+
+def _actual_counters(group_field, ids):
+    tasks = ProjectTask.objects.all()
+    if ids is not None:
+        tasks = tasks.filter(**{f'{group_field}__in': ids})
+    completed = Q(status=COMPLETED)
+    rows = (
+        tasks.exclude(**{group_field: None}).order_by().values(group_field).annotate(
+            total_tasks=Count('id'),
+            completed_tasks=Count('id', filter=completed),
+            estimated_task_hours=Sum('estimated_hours', default=0),
+            completed_task_hours=Sum('estimated_hours', filter=completed, default=0),
+        )
+    )
+    return {row.pop(group_field): row for row in rows}
+
+
+def recount(project_ids=None, fix=True):
+    """
+    Recompute the counters of the given projects (all when None) and their
+    milestones from their tasks with one grouped query per model.
+
+    Returns the drift found as ``(model name, pk, field, stored, actual)``
+    tuples; with ``fix`` the stored counters are corrected in one bulk
+    UPDATE per model.
+    """
+    drift = []
+    zero = {'total_tasks': 0, 'completed_tasks': 0,
+            'estimated_task_hours': Decimal('0'), 'completed_task_hours': Decimal('0')}
+    for model, group_field, project_field in (
+        (Project, 'project_id', 'pk'),
+        (ProjectMilestone, 'milestone_id', 'project_id'),
+    ):
+        objects = model.objects.all()
+        if project_ids is not None:
+            objects = objects.filter(**{f'{project_field}__in': project_ids})
+        actual = _actual_counters(group_field, None if project_ids is None else list(
+            objects.values_list('pk', flat=True)
+        ))
+
+        changed = []
+        fields = [*COUNTER_FIELDS, 'progress_percentage'] if model is Project else list(COUNTER_FIELDS)
+        for obj in objects.only('pk', *fields).iterator(chunk_size=2000):
+            expected = actual.get(obj.pk, zero)
+            diffs = [
+                (field, getattr(obj, field), expected[field])
+                for field in COUNTER_FIELDS
+                if getattr(obj, field) != expected[field]
+            ]
+            if not diffs:
+                continue
+            drift.extend((model._meta.model_name, obj.pk, *diff) for diff in diffs)
+            for field in COUNTER_FIELDS:
+                setattr(obj, field, expected[field])
+            if model is Project and obj.total_tasks:
+                obj.progress_percentage = obj.completed_tasks * 100 // obj.total_tasks
+            changed.append(obj)
+        if fix:
+            model.objects.bulk_update(changed, fields, batch_size=1000)
+    return drift
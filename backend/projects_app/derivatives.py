@@ -0,0 +1,39 @@
+# projects_app/derivatives.py
+
+"""
+Image resizing and encoding for projects_app.images, run in pool
+processes. Kept free of Django imports so that worker processes can
+import it however they are started.
+"""
+
+import io
+
+
+QUALITY = {'avif': 60, 'webp': 80}
+
+
+def render_derivatives(data, widths, formats):
+    """
+    Resize and encode an original (runs in a pool process, no database
+    access). Returns ``(width, height, [(format, width, height, bytes)])``.
+    """
+    from PIL import Image, ImageOps
+
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+    width, height = image.size
+    # Formats this Pillow can encode (AVIF needs Pillow 11.2+ or its plugin)
+    Image.init()
+    formats = [fmt for fmt in formats if fmt.upper() in Image.SAVE]
+    targets = sorted({w for w in widths if w < width} | {min(width, max(widths))})
+
+    variants = []
+    for target in targets:
+        resized = image if target == width else image.resize(
+            (target, max(1, round(height * target / width))), Image.Resampling.LANCZOS
+        )
+        for fmt in formats:
+            out = io.BytesIO()
+            resized.save(out, format=fmt.upper(), quality=QUALITY[fmt])
+            variants.append((fmt, resized.width, resized.height, out.getvalue()))
+    return width, height, variants
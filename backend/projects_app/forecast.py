@@ -0,0 +1,166 @@
+# projects_app/forecast.py
+
+"""
+Project budget burn and completion forecasts.
+
+``burn_series`` reads the time logged on all of a user's projects with one
+grouped TimeLog aggregate (minutes and cost per project per day; cost uses
+the log's hourly rate, else the project's) and lays it out as a NumPy
+matrix of projects by days. The recent burn rate and hours per day are
+exponentially weighted means over the last ``FORECAST_WINDOW_DAYS`` days
+(smoothing factor ``FORECAST_SMOOTHING``), computed for every project at
+once as a matrix-vector product.
+
+``forecast`` combines a project's series with its budget and estimate to
+project when the budget runs out and when the estimated hours are used
+up. ``project_forecast`` batches the series per owner for the duration of
+a request, so a list of projects costs one aggregate.
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from time_logs_app.models import TimeLog
+
+
+DEFAULT_WINDOW_DAYS = 90
+DEFAULT_SMOOTHING = 0.1
+
+
+@dataclass
+class BurnSeries:
+    """Logged time of one project: totals, smoothed daily rates and the cumulative cost by day."""
+    logged_minutes: int
+    cost: float
+    cost_per_day: float
+    hours_per_day: float
+    first_day: object
+    cumulative_cost: np.ndarray
+
+
+@dataclass
+class ProjectForecast:
+    project_id: int
+    logged_hours: float
+    cost: float
+    remaining_hours: float
+    remaining_budget: float
+    burn_rate: float
+    hours_per_day: float
+    is_over_budget: bool
+    over_budget_on: object
+    completion_on: object
+
+
+def burn_series(user_id, today=None):
+    """The BurnSeries of each of ``user_id``'s projects with logged time, by project id."""
+    today = today or timezone.localdate()
+    money = DecimalField(max_digits=14, decimal_places=4)
+    rows = list(
+        TimeLog.objects.filter(project__user_id=user_id)
+        .annotate(day=TruncDate('start_time'))
+        .values('project_id', 'day')
+        .annotate(
+            minutes=Sum('duration_minutes'),
+            cost=Sum(ExpressionWrapper(
+                F('duration_minutes') * Coalesce('hourly_rate', 'project__hourly_rate') / Decimal(60),
+                output_field=money,
+            )),
+        )
+        .order_by()
+    )
+    if not rows:
+        return {}
+
+    project_ids = sorted({row['project_id'] for row in rows})
+    index = {pk: i for i, pk in enumerate(project_ids)}
+    first_day = min(row['day'] for row in rows)
+    last_day = max(today, max(row['day'] for row in rows))
+    days = (last_day - first_day).days + 1
+
+    minutes = np.zeros((len(project_ids), days))
+    cost = np.zeros((len(project_ids), days))
+    project_idx = np.array([index[row['project_id']] for row in rows])
+    day_idx = np.array([(row['day'] - first_day).days for row in rows])
+    np.add.at(minutes, (project_idx, day_idx), [row['minutes'] or 0 for row in rows])
+    np.add.at(cost, (project_idx, day_idx), [float(row['cost'] or 0) for row in rows])
+
+    # Exponentially weighted means over the window, the latest day weighing most
+    window = min(getattr(settings, 'FORECAST_WINDOW_DAYS', DEFAULT_WINDOW_DAYS), days)
+    alpha = getattr(settings, 'FORECAST_SMOOTHING', DEFAULT_SMOOTHING)
+    weights = alpha * (1 - alpha) ** np.arange(window - 1, -1, -1)
+    weights /= weights.sum()
+    cost_per_day = cost[:, -window:] @ weights
+    hours_per_day = minutes[:, -window:] @ weights / 60
+
+    cumulative_cost = cost.cumsum(axis=1)
+    total_minutes = minutes.sum(axis=1)
+    return {
+        pk: BurnSeries(
+            logged_minutes=int(total_minutes[i]),
+            cost=float(cumulative_cost[i, -1]),
+            cost_per_day=float(cost_per_day[i]),
+            hours_per_day=float(hours_per_day[i]),
+            first_day=first_day,
+            cumulative_cost=cumulative_cost[i],
+        )
+        for pk, i in index.items()
+    }
+
+
+def forecast(project, series=None, today=None):
+    """Forecast ``project`` from its BurnSeries (None when it has no logged time)."""
+    today = today or timezone.localdate()
+    budget = float(project.budget or 0)
+    estimated_hours = float(project.estimated_hours or 0)
+    logged_hours = series.logged_minutes / 60 if series else 0.0
+    cost = series.cost if series else 0.0
+    cost_per_day = series.cost_per_day if series else 0.0
+    hours_per_day = series.hours_per_day if series else 0.0
+
+    over_budget_on = None
+    if budget > 0 and series and cost >= budget:
+        # The day the cumulative cost first reached the budget
+        crossed = int(np.searchsorted(series.cumulative_cost, budget))
+        over_budget_on = series.first_day + timedelta(days=crossed)
+    elif budget > 0 and cost_per_day > 0:
+        over_budget_on = today + timedelta(days=math.ceil((budget - cost) / cost_per_day))
+
+    remaining_hours = max(estimated_hours - logged_hours, 0.0)
+    completion_on = None
+    if estimated_hours > 0 and remaining_hours == 0:
+        completion_on = today
+    elif remaining_hours > 0 and hours_per_day > 0:
+        completion_on = today + timedelta(days=math.ceil(remaining_hours / hours_per_day))
+
+    return ProjectForecast(
+        project_id=project.pk,
+        logged_hours=round(logged_hours, 2),
+        cost=round(cost, 2),
+        remaining_hours=round(remaining_hours, 2),
+        remaining_budget=round(budget - cost, 2),
+        burn_rate=round(cost_per_day, 2),
+        hours_per_day=round(hours_per_day, 2),
+        is_over_budget=budget > 0 and cost > budget,
+        over_budget_on=over_budget_on,
+        completion_on=completion_on,
+    )
+
+
+def project_forecast(context, project):
+    """
+    Forecast ``project``, loading the burn series of all of its owner's
+    projects once per request (``context`` is the GraphQL context).
+    """
+    loaded = context.__dict__.setdefault('_project_burn_series', {})
+    if project.user_id not in loaded:
+        loaded[project.user_id] = burn_series(project.user_id)
+    return forecast(project, loaded[project.user_id].get(project.pk))
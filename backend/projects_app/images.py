@@ -0,0 +1,311 @@
+# projects_app/images.py
+
+"""
+Responsive image derivatives for project logos and case-study visuals.
+
+``refresh_project_images`` ingests the images a project references
+(``Project.logo`` and the URLs in ``case_study['visuals']``) once each:
+an ImageAsset row per source URL records the original's hash, size and
+derivatives. An original is downloaded only while its URL has no asset;
+if its content hash matches an original already processed under another
+URL, that asset's derivatives are reused. Otherwise it is resized to each
+of ``IMAGE_DERIVATIVE_WIDTHS`` narrower than the original and encoded in
+each of ``IMAGE_DERIVATIVE_FORMATS`` in a process pool, and the results
+are stored content-addressed under
+``IMAGE_DERIVATIVE_PREFIX/<hash[:2]>/<hash>/<width>w.<format>``.
+
+AVIF is only produced when the installed Pillow can encode it (Pillow
+11.2+, or the pillow-avif-plugin); WebP always is.
+
+Each project keeps the derivatives of its images in ``Project.images``
+(by source URL), so reading them costs no queries;
+``responsive_image`` turns an entry into ``srcset``-ready variants. A
+refresh writes the changed entries with one ``bulk_update`` and rebuilds
+the portfolio snapshot once, not once per project.
+
+The pool's processes are spawned rather than forked: the ``project_images``
+job runs on the scheduler thread of a multi-threaded web worker, and a
+forked child inherits locks other threads held at fork time (logging,
+database drivers) and can hang on them. Spawning costs an interpreter
+start per pool process, so large backfills are better run with the
+``process_project_images`` management command, outside the web workers.
+
+Remote originals are only fetched from public addresses: a connection
+that lands on a private, loopback or link-local address (including after
+a redirect or a DNS change) is refused. An original that could not be
+fetched or rendered is retried after ``IMAGE_RETRY_SECONDS``, doubling
+per consecutive failure up to ``IMAGE_RETRY_MAX_SECONDS``.
+"""
+
+import hashlib
+import http.client
+import ipaddress
+import multiprocessing
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .derivatives import render_derivatives
+from .models import ImageAsset, Project
+
+
+DEFAULT_WIDTHS = (320, 640, 960, 1280, 1920)
+DEFAULT_FORMATS = ('avif', 'webp')
+DEFAULT_PREFIX = 'images/derivatives'
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+DEFAULT_RETRY_SECONDS = 15 * 60
+DEFAULT_RETRY_MAX_SECONDS = 24 * 60 * 60
+
+
+def _visuals(project):
+    visuals = (project.case_study or {}).get('visuals')
+    if not isinstance(visuals, dict):
+        return {}
+    return {key: value for key, value in visuals.items() if isinstance(value, str) and value}
+
+
+def project_image_urls(project):
+    """The image URLs ``project`` references: its logo, then its case-study visuals."""
+    return list(dict.fromkeys([*filter(None, [project.logo]), *_visuals(project).values()]))
+
+
+def storage_path(digest, width, fmt):
+    prefix = getattr(settings, 'IMAGE_DERIVATIVE_PREFIX', DEFAULT_PREFIX)
+    return f"{prefix}/{digest[:2]}/{digest}/{width}w.{fmt}"
+
+
+class _PublicHTTPConnection(http.client.HTTPConnection):
+    """An HTTP connection that refuses to talk to a non-public address."""
+
+    def connect(self):
+        super().connect()
+        address = ipaddress.ip_address(self.sock.getpeername()[0])
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global:
+            self.sock.close()
+            raise Exception(f"Refusing to fetch from non-public address {address}")
+
+
+class _PublicHTTPSConnection(http.client.HTTPSConnection, _PublicHTTPConnection):
+    # HTTPSConnection.connect checks the address before the TLS handshake
+    pass
+
+
+class _PublicHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_PublicHTTPConnection, req)
+
+
+class _PublicHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_PublicHTTPSConnection, req, context=self._context)
+
+
+def _opener():
+    # Only HTTP(S), redirects included, and no proxies: the address checked
+    # must be the one the request goes to
+    opener = urllib.request.OpenerDirector()
+    for handler in (
+        _PublicHTTPHandler(), _PublicHTTPSHandler(), urllib.request.HTTPRedirectHandler(),
+        urllib.request.HTTPDefaultErrorHandler(), urllib.request.HTTPErrorProcessor(),
+    ):
+        opener.add_handler(handler)
+    return opener
+
+
+def fetch_original(url):
+    """The bytes of the image at ``url``: a MEDIA_URL path from storage, else over HTTP(S)."""
+    max_bytes = getattr(settings, 'IMAGE_MAX_SOURCE_BYTES', 20 * 1024 * 1024)
+    if url.startswith(settings.MEDIA_URL):
+        with default_storage.open(url[len(settings.MEDIA_URL):], 'rb') as f:
+            data = f.read(max_bytes + 1)
+    elif url.startswith(('http://', 'https://')):
+        request = urllib.request.Request(url, headers={'User-Agent': 'vistaforge-images'})
+        with _opener().open(request, timeout=getattr(settings, 'IMAGE_FETCH_TIMEOUT', 15)) as response:
+            data = response.read(max_bytes + 1)
+    else:
+        raise Exception(f"Unsupported image URL: {url}")
+    if len(data) > max_bytes:
+        raise Exception(f"Image larger than {max_bytes} bytes: {url}")
+    return data
+
+
+def _store(digest, rendered):
+    """Store rendered derivatives content-addressed. Returns the asset's variant list."""
+    _width, _height, variants = rendered
+    stored = []
+    for fmt, width, height, content in variants:
+        path = storage_path(digest, width, fmt)
+        if not default_storage.exists(path):
+            saved = default_storage.save(path, ContentFile(content))
+            if saved != path:
+                # Another worker stored the same derivative first
+                default_storage.delete(saved)
+        stored.append({'format': fmt, 'width': width, 'height': height, 'path': path})
+    return stored
+
+
+def _retry_delay(failures):
+    """How long after its ``failures``-th consecutive failure an original is retried."""
+    base = getattr(settings, 'IMAGE_RETRY_SECONDS', DEFAULT_RETRY_SECONDS)
+    cap = getattr(settings, 'IMAGE_RETRY_MAX_SECONDS', DEFAULT_RETRY_MAX_SECONDS)
+    return timedelta(seconds=min(base * 2 ** min(failures - 1, 16), cap))
+
+
+def _failed(asset, error, now):
+    asset.error = error
+    asset.failures += 1
+    asset.retry_at = now + _retry_delay(asset.failures)
+
+
+def process_images(urls, force=False):
+    """
+    Make sure every URL in ``urls`` has a processed ImageAsset. URLs
+    already processed, or that failed and are not due for a retry yet, are
+    skipped unless ``force``. Returns ``(processed, reused, failed)`` counts.
+    """
+    assets = ImageAsset.objects.in_bulk(list(urls), field_name='source_url')
+    now = timezone.now()
+    pending = {}
+    failed = 0
+    for url in urls:
+        asset = assets.get(url) or ImageAsset(source_url=url)
+        if not force and (asset.processed_at or (asset.retry_at and asset.retry_at > now)):
+            continue
+        asset.error = ''
+        try:
+            data = fetch_original(url)
+        except Exception as e:
+            _failed(asset, str(e), now)
+            asset.save()
+            failed += 1
+            continue
+        asset.source_hash = hashlib.sha256(data).hexdigest()
+        pending[url] = (asset, data)
+    if not pending:
+        return 0, 0, failed
+
+    # Originals already processed under another URL
+    done = {
+        asset.source_hash: asset
+        for asset in ImageAsset.objects.filter(
+            source_hash__in={asset.source_hash for asset, _data in pending.values()}, processed_at__isnull=False
+        ).exclude(source_url__in=list(pending))
+    }
+    reused = 0
+    to_render = {}
+    for url, (asset, data) in pending.items():
+        if asset.source_hash in done and not force:
+            original = done[asset.source_hash]
+            asset.width, asset.height, asset.variants = original.width, original.height, original.variants
+            reused += 1
+        else:
+            to_render.setdefault(asset.source_hash, (data, []))[1].append(asset)
+
+    widths = getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', DEFAULT_WIDTHS)
+    formats = getattr(settings, 'IMAGE_DERIVATIVE_FORMATS', DEFAULT_FORMATS)
+    if to_render:
+        with ProcessPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_DERIVATIVE_WORKERS', 2),
+            mp_context=multiprocessing.get_context('spawn'),
+        ) as pool:
+            futures = {
+                digest: pool.submit(render_derivatives, data, widths, formats)
+                for digest, (data, _assets) in to_render.items()
+            }
+            for digest, future in futures.items():
+                try:
+                    rendered = future.result()
+                    variants = _store(digest, rendered)
+                except Exception as e:
+                    for asset in to_render[digest][1]:
+                        _failed(asset, str(e), now)
+                    continue
+                for asset in to_render[digest][1]:
+                    asset.width, asset.height, asset.variants = rendered[0], rendered[1], variants
+
+    processed = 0
+    for asset, _data in pending.values():
+        if asset.variants and not asset.error:
+            asset.processed_at = now
+            asset.failures, asset.retry_at = 0, None
+            processed += 1
+        else:
+            if not asset.error:
+                _failed(asset, 'No derivatives were produced', now)
+            failed += 1
+        asset.save()
+    return processed - reused, reused, failed
+
+
+def refresh_project_images(projects=None, force=False):
+    """
+    Process the images of ``projects`` (all active projects when None) and
+    update their ``images``. Returns ``(processed, reused, failed)`` counts.
+    """
+    from . import snapshot  # snapshot imports this module
+
+    if projects is None:
+        projects = Project.objects.filter(is_active=True)
+    projects = list(projects.only('pk', 'logo', 'case_study', 'images'))
+    urls = {url for project in projects for url in project_image_urls(project)}
+    counts = process_images(urls, force=force)
+
+    assets = ImageAsset.objects.in_bulk(list(urls), field_name='source_url')
+    now = timezone.now()
+    changed = []
+    for project in projects:
+        images = {
+            url: {'width': asset.width, 'height': asset.height, 'variants': asset.variants}
+            for url in project_image_urls(project)
+            if (asset := assets.get(url)) is not None and asset.processed_at
+        }
+        if images != project.images:
+            project.images = images
+            project.updated_at = now
+            changed.append(project)
+    if changed:
+        # bulk_update sends no post_save: rebuild the snapshot once for all
+        Project.objects.bulk_update(changed, ['images', 'updated_at'], batch_size=500)
+        snapshot.snapshot_changed(['images'])
+    return counts
+
+
+def srcset(variants, fmt):
+    """A ``srcset`` of the ``fmt`` variants (as ``responsive_image`` lists them), or None."""
+    return ', '.join(f"{v['url']} {v['width']}w" for v in variants if v['format'] == fmt) or None
+
+
+def responsive_image(project, url):
+    """
+    ``url`` of ``project`` as ``{src, width, height, variants, srcset,
+    sources}``: variants with storage URLs, a WebP ``srcset`` and one
+    ``<source>`` per format. Without derivatives only ``src`` is set.
+    """
+    if not url:
+        return None
+    entry = (project.images or {}).get(url) or {}
+    variants = [
+        {**{k: v for k, v in variant.items() if k != 'path'}, 'url': default_storage.url(variant['path'])}
+        for variant in entry.get('variants', [])
+    ]
+    formats = list(dict.fromkeys(v['format'] for v in variants))
+    return {
+        'src': url,
+        'width': entry.get('width'),
+        'height': entry.get('height'),
+        'variants': variants,
+        'srcset': srcset(variants, 'webp'),
+        'sources': [{'type': MIME_TYPES.get(fmt, f'image/{fmt}'), 'srcset': srcset(variants, fmt)} for fmt in formats],
+    }
+
+
+def case_study_visuals(project):
+    """The case-study visuals of ``project`` as ``[{key, image}]`` responsive images."""
+    return [{'key': key, 'image': responsive_image(project, url)} for key, url in _visuals(project).items()]
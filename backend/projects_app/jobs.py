@@ -0,0 +1,23 @@
+# projects_app/jobs.py
+
+from datetime import timedelta
+
+from admin_dashboard.scheduler import periodic_job
+from .images import refresh_project_images
+from .milestones import sweep_overdue_milestones
+from .uploads import expire_uploads
+
+
+@periodic_job('project_images', every=timedelta(minutes=15), timeout=timedelta(hours=1))
+def project_images():
+    refresh_project_images()
+
+
+@periodic_job('expire_project_file_uploads', every=timedelta(hours=1), timeout=timedelta(minutes=30))
+def expire_project_file_uploads():
+    expire_uploads()
+
+
+@periodic_job('overdue_milestone_sweep', every=timedelta(hours=1), timeout=timedelta(minutes=30))
+def overdue_milestone_sweep():
+    sweep_overdue_milestones()
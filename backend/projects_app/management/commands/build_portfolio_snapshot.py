@@ -0,0 +1,18 @@
+# projects_app/management/commands/build_portfolio_snapshot.py
+
+from django.core.management.base import BaseCommand
+from projects_app.snapshot import build_snapshot, snapshot_root
+
+
+class Command(BaseCommand):
+    help = 'Write the static portfolio snapshot (active projects and case studies) under STATIC_ROOT'
+
+    def handle(self, *args, **options):
+        result = build_snapshot()
+        for path in result.written:
+            self.stdout.write(f"Wrote {path}")
+        for path in result.removed:
+            self.stdout.write(f"Removed {path}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Portfolio snapshot {result.version}: {result.projects} project(s) in {snapshot_root()}"
+        ))
@@ -0,0 +1,24 @@
+# projects_app/management/commands/process_project_images.py
+
+from django.core.management.base import BaseCommand
+from projects_app.images import refresh_project_images
+from projects_app.models import Project
+
+
+class Command(BaseCommand):
+    help = 'Generate responsive derivatives of project logos and case-study visuals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, action='append', help='Only this project (repeatable)')
+        parser.add_argument('--force', action='store_true', help='Reprocess images already processed, or failed and not yet due for a retry')
+
+    def handle(self, *args, **options):
+        projects = Project.objects.filter(is_active=True)
+        if options['project']:
+            projects = Project.objects.filter(pk__in=options['project'])
+        processed, reused, failed = refresh_project_images(projects, force=options['force'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {processed} image(s), reused {reused} already processed original(s)"
+        ))
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} image(s) failed; see ImageAsset.error"))
@@ -0,0 +1,24 @@
+# projects_app/management/commands/verify_task_counters.py
+
+from django.core.management.base import BaseCommand
+from projects_app.counters import recount
+
+
+class Command(BaseCommand):
+    help = 'Recompute project and milestone task counters and report drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, action='append', help='Only this project (repeatable)')
+        parser.add_argument('--fix', action='store_true', help='Correct the counters that drifted')
+
+    def handle(self, *args, **options):
+        drift = recount(project_ids=options['project'], fix=options['fix'])
+        for model_name, pk, field, stored, actual in drift:
+            self.stdout.write(f"{model_name} {pk}: {field} is {stored}, expected {actual}")
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Task counters are consistent"))
+        elif options['fix']:
+            self.stdout.write(self.style.SUCCESS(f"Fixed {len(drift)} drifted counter(s)"))
+        else:
+            self.stdout.write(self.style.WARNING(f"{len(drift)} drifted counter(s); run with --fix to correct"))
@@ -0,0 +1,50 @@
+# projects_app/middleware.py
+
+"""
+WhiteNoise for a static root that changes while serving.
+
+WhiteNoise indexes STATIC_ROOT once at startup (outside autorefresh), so
+portfolio snapshot files written later by projects_app.snapshot would not
+be found. This middleware looks such files up on disk the first time they
+are requested and indexes them, as they never change once written. The
+snapshot manifest does change, so it is always looked up afresh.
+"""
+
+import os
+
+from django.conf import settings
+from whitenoise.base import MissingFileError
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .snapshot import MANIFEST_NAME, snapshot_dir
+
+
+class SnapshotWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings=settings)
+        self.snapshot_prefix = f"{self.static_prefix}{snapshot_dir()}/"
+        self.snapshot_manifest = self.snapshot_prefix + MANIFEST_NAME
+
+    def find_snapshot_file(self, url):
+        if not self.static_root or not self.url_is_canonical(url):
+            return None
+        root = os.path.abspath(self.static_root) + os.path.sep
+        try:
+            return self.find_file_at_path(os.path.join(root, url[len(self.static_prefix):]), url)
+        except MissingFileError:
+            return None
+
+    def __call__(self, request):
+        url = request.path_info
+        if not self.autorefresh and url.startswith(self.snapshot_prefix):
+            if url == self.snapshot_manifest:
+                static_file = self.find_snapshot_file(url)
+            else:
+                static_file = self.files.get(url)
+                if static_file is None:
+                    static_file = self.find_snapshot_file(url)
+                    if static_file is not None:
+                        self.files[url] = static_file
+            if static_file is not None:
+                return self.serve(static_file, request)
+        return super().__call__(request)
@@ -0,0 +1,99 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:19
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def count_tasks(apps, schema_editor):
+    ProjectTask = apps.get_model("projects_app", "ProjectTask")
+    completed = Q(status="COMPLETED")
+    for model_name, group_field in (
+        ("Project", "project_id"),
+        ("ProjectMilestone", "milestone_id"),
+    ):
+        model = apps.get_model("projects_app", model_name)
+        rows = (
+            ProjectTask.objects.exclude(**{group_field: None})
+            .order_by()
+            .values(group_field)
+            .annotate(
+                total_tasks=Count("id"),
+                completed_tasks=Count("id", filter=completed),
+                estimated_task_hours=Sum("estimated_hours", default=0),
+                completed_task_hours=Sum(
+                    "estimated_hours", filter=completed, default=0
+                ),
+            )
+        )
+        for row in rows:
+            model.objects.filter(pk=row.pop(group_field)).update(**row)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("projects_app", "0006_project_inquiry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="completed_task_hours",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                help_text="Estimated hours of completed tasks",
+                max_digits=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="completed_tasks",
+            field=models.IntegerField(default=0, help_text="Number of completed tasks"),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="estimated_task_hours",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                help_text="Estimated hours of all tasks",
+                max_digits=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="total_tasks",
+            field=models.IntegerField(default=0, help_text="Number of tasks"),
+        ),
+        migrations.AddField(
+            model_name="projectmilestone",
+            name="completed_task_hours",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                help_text="Estimated hours of completed tasks",
+                max_digits=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="projectmilestone",
+            name="completed_tasks",
+            field=models.IntegerField(default=0, help_text="Number of completed tasks"),
+        ),
+        migrations.AddField(
+            model_name="projectmilestone",
+            name="estimated_task_hours",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                help_text="Estimated hours of all tasks",
+                max_digits=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="projectmilestone",
+            name="total_tasks",
+            field=models.IntegerField(default=0, help_text="Number of tasks"),
+        ),
+        migrations.RunPython(count_tasks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("projects_app", "0007_task_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="projecttask",
+            name="depends_on",
+            field=models.ManyToManyField(
+                blank=True,
+                help_text="Tasks that must be finished before this task starts",
+                related_name="dependents",
+                to="projects_app.projecttask",
+            ),
+        ),
+    ]
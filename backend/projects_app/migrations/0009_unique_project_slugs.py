@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:27
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def assign_slugs(apps, schema_editor):
+    # Give every project a slug and make them unique, oldest project first
+    Project = apps.get_model("projects_app", "Project")
+    taken = set()
+    changed = []
+    for project in Project.objects.order_by("pk").only("pk", "slug", "title"):
+        base = slugify(project.slug or project.title)[:200].strip("-") or "project"
+        slug = base
+        suffix = 1
+        while slug in taken:
+            suffix += 1
+            slug = f"{base[:200 - len(str(suffix)) - 1].rstrip('-')}-{suffix}"
+        taken.add(slug)
+        if slug != project.slug:
+            project.slug = slug
+            changed.append(project)
+    Project.objects.bulk_update(changed, ["slug"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("clients_app", "0003_clientnote_reminder_sent_and_more"),
+        ("inquiries", "0006_inquiry_inquiries_i_reminde_1ea9c1_idx"),
+        ("projects_app", "0008_task_dependencies"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(assign_slugs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="project",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_active", True)),
+                fields=("slug",),
+                name="unique_active_project_slug",
+            ),
+        ),
+    ]
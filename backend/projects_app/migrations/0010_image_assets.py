@@ -0,0 +1,72 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("projects_app", "0009_unique_project_slugs"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImageAsset",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "source_url",
+                    models.CharField(
+                        help_text="URL of the original image",
+                        max_length=500,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "source_hash",
+                    models.CharField(
+                        blank=True,
+                        db_index=True,
+                        help_text="SHA-256 of the original",
+                        max_length=64,
+                    ),
+                ),
+                ("width", models.PositiveIntegerField(blank=True, null=True)),
+                ("height", models.PositiveIntegerField(blank=True, null=True)),
+                (
+                    "variants",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        help_text="[{format, width, height, path}]",
+                    ),
+                ),
+                (
+                    "error",
+                    models.TextField(
+                        blank=True, help_text="Why the last attempt failed"
+                    ),
+                ),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Image Asset",
+                "verbose_name_plural": "Image Assets",
+            },
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="images",
+            field=models.JSONField(
+                blank=True, default=dict, help_text="Image derivatives by source URL"
+            ),
+        ),
+    ]
@@ -0,0 +1,120 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:36
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("projects_app", "0010_image_assets"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="projectfile",
+            name="sha256",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="SHA-256 of the content",
+                max_length=64,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="projectfile",
+            name="file_size",
+            field=models.BigIntegerField(help_text="File size in bytes"),
+        ),
+        migrations.CreateModel(
+            name="ProjectFileUpload",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("title", models.CharField(max_length=200)),
+                ("file_name", models.CharField(max_length=255)),
+                (
+                    "file_type",
+                    models.CharField(
+                        choices=[
+                            ("DESIGN", "Design File"),
+                            ("DOCUMENT", "Document"),
+                            ("CODE", "Code/Script"),
+                            ("IMAGE", "Image"),
+                            ("VIDEO", "Video"),
+                            ("OTHER", "Other"),
+                        ],
+                        default="OTHER",
+                        max_length=20,
+                    ),
+                ),
+                ("file_size", models.BigIntegerField(help_text="File size in bytes")),
+                (
+                    "sha256",
+                    models.CharField(
+                        help_text="SHA-256 the assembled file must have", max_length=64
+                    ),
+                ),
+                ("chunk_size", models.IntegerField()),
+                ("total_chunks", models.IntegerField()),
+                ("received_chunks", models.IntegerField(default=0)),
+                ("received_bytes", models.BigIntegerField(default=0)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("UPLOADING", "Uploading"),
+                            ("ASSEMBLING", "Assembling"),
+                            ("COMPLETE", "Complete"),
+                            ("FAILED", "Failed"),
+                        ],
+                        default="UPLOADING",
+                        max_length=20,
+                    ),
+                ),
+                ("error", models.TextField(blank=True)),
+                ("expires_at", models.DateTimeField(db_index=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "file",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="projects_app.projectfile",
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="file_uploads",
+                        to="projects_app.project",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="project_file_uploads",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Project File Upload",
+                "verbose_name_plural": "Project File Uploads",
+            },
+        ),
+    ]
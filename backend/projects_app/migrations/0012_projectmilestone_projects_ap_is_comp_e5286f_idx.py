@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("projects_app", "0011_chunked_uploads"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="projectmilestone",
+            index=models.Index(
+                fields=["is_completed", "due_date"],
+                name="projects_ap_is_comp_e5286f_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("projects_app", "0012_projectmilestone_projects_ap_is_comp_e5286f_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="imageasset",
+            name="failures",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Consecutive failed attempts"
+            ),
+        ),
+        migrations.AddField(
+            model_name="imageasset",
+            name="retry_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When a failed original is fetched again",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,184 @@
+# projects_app/milestones.py
+
+"""
+Set-based milestone status maintenance and deadlines.
+
+``sweep_overdue_milestones`` moves every incomplete milestone whose due
+date has passed to OVERDUE with a single UPDATE over the
+(is_completed, due_date) index and records one SystemLog row per
+transition in one bulk INSERT. Once committed, the owners are notified
+with one digest email each (unless they turned ``project_updates`` off),
+sent over one SMTP connection in batches of ``REMINDER_EMAIL_BATCH_SIZE``.
+
+OVERDUE is not permanent: a milestone whose due date was moved out of the
+past goes back to IN_PROGRESS if any of its tasks is completed, else to
+PENDING. UpdateProjectMilestone does this as soon as the date changes
+(``reopened_status``); the sweep does it for every other way of changing
+the date, with the same single UPDATE and log INSERT.
+
+``upcoming_deadlines`` reads the same index for the dashboard's upcoming
+deadlines widget: a user's incomplete milestones due within a number of
+days, overdue ones first, in one query however many projects they have.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.utils import timezone
+
+from admin_dashboard.log_buffer import log_event
+from admin_dashboard.models import AdminSettings, SystemLog
+from admin_dashboard.reminders import recipients
+from .models import ProjectMilestone
+
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_DEADLINE_DAYS = 14
+DEFAULT_DEADLINE_LIMIT = 10
+
+# The milestone values each status transition is logged and notified with
+ROW_FIELDS = ('id', 'status', 'title', 'due_date', 'project_id', 'project__title', 'project__user_id')
+
+
+def reopened_status(milestone):
+    """The status an OVERDUE milestone returns to when it is no longer past due."""
+    return 'IN_PROGRESS' if milestone.completed_tasks else 'PENDING'
+
+
+def _log_transitions(transitions, today):
+    """Record ``(row, to_status)`` status changes with one INSERT."""
+    SystemLog.objects.bulk_create([
+        SystemLog(
+            user_id=user_id,
+            level='WARNING' if to_status == 'OVERDUE' else 'INFO',
+            category='system',
+            message=(
+                f'Milestone "{title}" of {project_title} is overdue (due {due_date})'
+                if to_status == 'OVERDUE' else
+                f'Milestone "{title}" of {project_title} is no longer overdue (due {due_date})'
+            ),
+            related_project_id=project_id,
+            metadata={
+                'event': 'milestone_status_changed',
+                'milestone_id': pk,
+                'from_status': status,
+                'to_status': to_status,
+                'due_date': due_date.isoformat(),
+                'days_overdue': max(0, (today - due_date).days),
+            },
+        )
+        for (pk, status, title, due_date, project_id, project_title, user_id), to_status in transitions
+    ])
+
+
+def _reopened_rows(today):
+    """Move OVERDUE milestones whose due date is no longer past back to an open status."""
+    reopened = ProjectMilestone.objects.filter(is_completed=False, due_date__gte=today, status='OVERDUE')
+    rows = list(reopened.select_for_update().values_list(*ROW_FIELDS, 'completed_tasks').order_by('due_date', 'id'))
+    if not rows:
+        return rows
+    reopened.update(
+        status=Case(When(completed_tasks__gt=0, then=Value('IN_PROGRESS')), default=Value('PENDING')),
+        updated_at=timezone.now(),
+    )
+    _log_transitions([(row[:-1], 'IN_PROGRESS' if row[-1] else 'PENDING') for row in rows], today)
+    return rows
+
+
+def _overdue_rows(today):
+    """Mark the past-due incomplete milestones OVERDUE; return the rows moved."""
+    due = ProjectMilestone.objects.filter(is_completed=False, due_date__lt=today).exclude(
+        status__in=['OVERDUE', 'COMPLETED']
+    )
+
+    # Lock the rows being moved so the log matches the UPDATE exactly
+    rows = list(due.select_for_update().values_list(*ROW_FIELDS).order_by('due_date', 'id'))
+    if not rows:
+        return rows
+    due.update(status='OVERDUE', updated_at=timezone.now())
+    _log_transitions([(row, 'OVERDUE') for row in rows], today)
+    return rows
+
+
+def build_digest(address, lines, today):
+    count = f"{len(lines)} milestone{'s' if len(lines) != 1 else ''}"
+    body = '\n'.join(f"- {line}" for line in lines)
+    return EmailMessage(
+        subject=f"VistaForge: {count} overdue as of {today}",
+        body=f"{count} passed their due date:\n\n{body}\n\n---\n"
+             f"This is an automated notification from VistaForge.\n",
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[address],
+    )
+
+
+def notify_overdue(rows, today, batch_size=None, connection=None):
+    """Email each owner one digest of their milestones in ``rows``. Returns the number of emails sent."""
+    batch_size = batch_size or getattr(settings, 'REMINDER_EMAIL_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    lines = defaultdict(list)
+    for _pk, _status, title, due_date, _project_id, project_title, user_id in rows:
+        lines[user_id].append(f"{project_title}: {title} - due {due_date}")
+    opted_out = set(
+        AdminSettings.objects.filter(user_id__in=lines, project_updates=False).values_list('user_id', flat=True)
+    )
+    addresses = recipients(set(lines) - opted_out)
+    digests = [build_digest(address, lines[user_id], today) for user_id, address in addresses.items()]
+    if not digests:
+        return 0
+
+    connection = connection or get_connection(fail_silently=False)
+    with connection:
+        for start in range(0, len(digests), batch_size):
+            connection.send_messages(digests[start:start + batch_size])
+    return len(digests)
+
+
+def sweep_overdue_milestones(today=None, connection=None):
+    """
+    Mark incomplete milestones past their due date as OVERDUE and notify
+    their owners, and reopen OVERDUE ones that were rescheduled. Returns
+    the number of milestones marked overdue.
+    """
+    today = today or timezone.localdate()
+    with transaction.atomic():
+        reopened = _reopened_rows(today)
+        rows = _overdue_rows(today)
+    if reopened:
+        log_event(level='INFO', message=f'Reopened {len(reopened)} rescheduled milestone(s)', category='system')
+    if not rows:
+        return 0
+
+    try:
+        sent = notify_overdue(rows, today, connection=connection)
+    except Exception as e:
+        # The transitions stand; only this run's digests are lost
+        log_event(level='ERROR', message=f'Failed to send overdue milestone digests: {e}', category='system')
+        sent = 0
+    log_event(
+        level='INFO',
+        message=f'Marked {len(rows)} milestone(s) overdue and sent {sent} digest(s)',
+        category='system',
+    )
+    return len(rows)
+
+
+def upcoming_deadlines(user, days=None, limit=None, today=None):
+    """
+    The incomplete milestones of ``user``'s active projects due within
+    ``days`` days (overdue ones included), soonest first, with their project.
+    """
+    today = today or timezone.localdate()
+    days = DEFAULT_DEADLINE_DAYS if days is None else days
+    limit = DEFAULT_DEADLINE_LIMIT if limit is None else limit
+    return (
+        ProjectMilestone.objects.filter(
+            project__user=user, project__is_active=True, is_completed=False,
+            due_date__lte=today + timedelta(days=days),
+        )
+        .select_related('project')
+        .order_by('due_date', 'id')[:max(0, limit)]
+    )
@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -27,6 +29,10 @@ class Project(models.Model):
     #   process: { researchMethods, technicalImplementation, testingValidation, lessonsLearned }
     # }
     case_study = models.JSONField(default=dict, blank=True, null=True, help_text="Structured case study content")
+    # Responsive derivatives of the logo and case-study visuals, by source
+    # URL: {url: {width, height, variants: [{format, width, height, path}]}},
+    # maintained by projects_app.images
+    images = models.JSONField(default=dict, blank=True, help_text="Image derivatives by source URL")
     client = models.ForeignKey('clients_app.Client', on_delete=models.CASCADE, related_name='projects', help_text="Associated client")
 
     # Status and Phase
@@ -109,11 +115,30 @@ class Project(models.Model):
         help_text="Project completion percentage (0-100)"
     )
 
+    # Task counters, maintained by projects_app.counters from ProjectTask
+    # signals; progress_percentage follows them while the project has tasks
+    total_tasks = models.IntegerField(default=0, help_text="Number of tasks")
+    completed_tasks = models.IntegerField(default=0, help_text="Number of completed tasks")
+    estimated_task_hours = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, help_text="Estimated hours of all tasks"
+    )
+    completed_task_hours = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, help_text="Estimated hours of completed tasks"
+    )
+
     # Metadata
     is_active = models.BooleanField(default=True, help_text="Is project currently active")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            # Portfolio pages look active projects up by slug
+            models.UniqueConstraint(
+                fields=['slug'], condition=models.Q(is_active=True), name='unique_active_project_slug'
+            ),
+        ]
+
     # class Meta:
     #     verbose_name = "Project"
     #     verbose_name_plural = "Projects"
@@ -156,12 +181,10 @@ class Project(models.Model):
     #     return (self.end_date - today).days
 
     def update_progress_from_tasks(self):
-        """Update project progress based on completed tasks."""
-        total_tasks = self.tasks.count()
-        if total_tasks > 0:
-            completed_tasks = self.tasks.filter(status='COMPLETED').count()
-            self.progress_percentage = int((completed_tasks / total_tasks) * 100)
-            self.save()
+        """Update project progress from its task counters."""
+        if self.total_tasks > 0:
+            self.progress_percentage = self.completed_tasks * 100 // self.total_tasks
+            self.save(update_fields=['progress_percentage', 'updated_at'])
 
     def update_client_revenue(self):
         """Update client's total revenue when project is completed."""
@@ -219,6 +242,16 @@ class ProjectMilestone(models.Model):
     order = models.IntegerField(default=0, help_text="Display order")
     is_completed = models.BooleanField(default=False, help_text="Is milestone completed")
 
+    # Task counters, maintained by projects_app.counters
+    total_tasks = models.IntegerField(default=0, help_text="Number of tasks")
+    completed_tasks = models.IntegerField(default=0, help_text="Number of completed tasks")
+    estimated_task_hours = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, help_text="Estimated hours of all tasks"
+    )
+    completed_task_hours = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, help_text="Estimated hours of completed tasks"
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -226,6 +259,10 @@ class ProjectMilestone(models.Model):
         verbose_name = "Project Milestone"
         verbose_name_plural = "Project Milestones"
         ordering = ['order', 'due_date']
+        indexes = [
+            # Overdue sweep and upcoming deadlines (projects_app.milestones)
+            models.Index(fields=['is_completed', 'due_date']),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.project.title}"
@@ -280,6 +317,12 @@ class ProjectTask(models.Model):
         help_text="Estimated hours for task"
     )
 
+    # Tasks that must be finished before this one can start (projects_app.schedule)
+    depends_on = models.ManyToManyField(
+        'self', symmetrical=False, blank=True, related_name='dependents',
+        help_text="Tasks that must be finished before this task starts"
+    )
+
     order = models.IntegerField(default=0, help_text="Display order")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -356,7 +399,9 @@ class ProjectFile(models.Model):
     title = models.CharField(max_length=200, help_text="File title/description")
     file_name = models.CharField(max_length=255, help_text="Original file name")
     file_path = models.CharField(max_length=500, help_text="File path/URL")
-    file_size = models.IntegerField(help_text="File size in bytes")
+    file_size = models.BigIntegerField(help_text="File size in bytes")
+    # Set for uploaded files (projects_app.uploads), which share storage by hash
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True, help_text="SHA-256 of the content")
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -370,6 +415,66 @@ class ProjectFile(models.Model):
         return f"{self.title} - {self.project.title}"
 
 
+class ProjectFileUpload(models.Model):
+    """A chunked, resumable upload of a project file (see projects_app.uploads)."""
+
+    STATUS_CHOICES = [
+        ('UPLOADING', 'Uploading'),
+        ('ASSEMBLING', 'Assembling'),
+        ('COMPLETE', 'Complete'),
+        ('FAILED', 'Failed'),
+    ]
+
+    # Random, and the credential of the chunk uploads
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='file_uploads')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='project_file_uploads')
+    title = models.CharField(max_length=200)
+    file_name = models.CharField(max_length=255)
+    file_type = models.CharField(max_length=20, choices=ProjectFile.FILE_TYPE_CHOICES, default='OTHER')
+    file_size = models.BigIntegerField(help_text="File size in bytes")
+    sha256 = models.CharField(max_length=64, help_text="SHA-256 the assembled file must have")
+    chunk_size = models.IntegerField()
+    total_chunks = models.IntegerField()
+    received_chunks = models.IntegerField(default=0)
+    received_bytes = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='UPLOADING')
+    error = models.TextField(blank=True)
+    file = models.ForeignKey(ProjectFile, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Project File Upload"
+        verbose_name_plural = "Project File Uploads"
+
+    def __str__(self):
+        return f"{self.file_name} ({self.status})"
+
+
+class ImageAsset(models.Model):
+    """An ingested image and its responsive derivatives (see projects_app.images)."""
+
+    source_url = models.CharField(max_length=500, unique=True, help_text="URL of the original image")
+    source_hash = models.CharField(max_length=64, blank=True, db_index=True, help_text="SHA-256 of the original")
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    variants = models.JSONField(default=list, blank=True, help_text="[{format, width, height, path}]")
+    error = models.TextField(blank=True, help_text="Why the last attempt failed")
+    failures = models.PositiveIntegerField(default=0, help_text="Consecutive failed attempts")
+    retry_at = models.DateTimeField(null=True, blank=True, help_text="When a failed original is fetched again")
+    processed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Image Asset"
+        verbose_name_plural = "Image Assets"
+
+    def __str__(self):
+        return self.source_url
+
+
 class UserGoals(models.Model):
     """User-defined goals and targets for analytics tracking."""
 
@@ -0,0 +1,188 @@
+# projects_app/ordering.py
+
+"""
+Task and milestone ordering.
+
+Tasks are ordered within their Kanban column (project and status) by
+``order`` keys spaced ``ORDER_GAP`` apart, so moving a card usually writes
+one row: the moved task gets a key between its new neighbours. Only when
+two neighbours have no key left between them is the column renumbered,
+with one ``bulk_update`` (a single ``CASE`` UPDATE).
+
+Status and milestone changes made here bypass ``ProjectTask.save``, so
+they are applied to the task counters with ``counters.tasks_changed`` and
+the project's cached schedule is dropped here.
+"""
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from . import schedule
+from .counters import TaskState, tasks_changed
+from .models import ProjectMilestone, ProjectTask
+
+
+ORDER_GAP = 1024
+STATUSES = [status for status, _label in ProjectTask.STATUS_CHOICES]
+
+
+def next_order(project_id, status):
+    """The order key that puts a new task last in its column."""
+    last = ProjectTask.objects.filter(project_id=project_id, status=status).aggregate(last=Max('order'))['last']
+    return ORDER_GAP if last is None else last + ORDER_GAP
+
+
+def _renumber(objects):
+    """Space the order keys of ``objects`` ORDER_GAP apart in list order. Returns the ones changed."""
+    changed = []
+    for position, obj in enumerate(objects, start=1):
+        if obj.order != position * ORDER_GAP:
+            obj.order = position * ORDER_GAP
+            changed.append(obj)
+    return changed
+
+
+def _retarget(tasks, status, milestone):
+    """Apply the target status and milestone to ``tasks``. Returns the ones changed."""
+    changed = []
+    for task in tasks:
+        before = (task.status, task.milestone_id)
+        if status is not None:
+            task.status = status
+        if milestone is not None:
+            task.milestone_id = milestone.pk
+        if (task.status, task.milestone_id) != before:
+            changed.append(task)
+    return changed
+
+
+def _save(tasks, retargeted):
+    """Write ``tasks`` with one bulk UPDATE and bring the counters up to date."""
+    if not tasks:
+        return
+    now = timezone.now()
+    fields = ['order', 'updated_at']
+    if retargeted:
+        fields += ['status', 'milestone']
+    changes = []
+    for task in tasks:
+        task.updated_at = now
+        if task in retargeted:
+            new = TaskState.of(task)
+            changes.append((task._counted_state, new))
+            task._counted_state = new
+    ProjectTask.objects.bulk_update(tasks, fields)
+    tasks_changed(changes)
+    if retargeted:
+        schedule.invalidate(retargeted[0].project_id)
+
+
+def _validate(project, status, milestone_id):
+    if status is not None and status not in STATUSES:
+        raise Exception(f"Invalid task status: {status}")
+    if milestone_id is None:
+        return None
+    milestone = ProjectMilestone.objects.filter(pk=milestone_id, project=project).first()
+    if milestone is None:
+        raise Exception("Milestone not found in this project.")
+    return milestone
+
+
+@transaction.atomic
+def move_task(project, task_id, *, after_id=None, before_id=None, status=None, milestone_id=None):
+    """
+    Move a task next to another card of the target column (after
+    ``after_id`` or before ``before_id``, else to the end), optionally
+    changing its status and milestone. Returns the tasks written.
+    """
+    milestone = _validate(project, status, milestone_id)
+    task = ProjectTask.objects.select_for_update().filter(project=project, pk=task_id).first()
+    if task is None:
+        raise Exception("Task not found in this project.")
+    retargeted = _retarget([task], status, milestone)
+
+    column = list(
+        ProjectTask.objects.filter(project=project, status=task.status)
+        .exclude(pk=task.pk)
+        .order_by('order', 'created_at')
+        .only('id', 'order', 'created_at', 'status', 'milestone_id')
+    )
+    ids = [str(other.pk) for other in column]
+    if after_id is not None and str(after_id) in ids:
+        index = ids.index(str(after_id)) + 1
+    elif before_id is not None and str(before_id) in ids:
+        index = ids.index(str(before_id))
+    elif after_id is not None or before_id is not None:
+        raise Exception("Neighbouring task not found in the target column.")
+    else:
+        index = len(column)
+
+    previous = column[index - 1].order if index > 0 else None
+    following = column[index].order if index < len(column) else None
+    if previous is None and following is None:
+        key = ORDER_GAP
+    elif previous is None:
+        key = following - ORDER_GAP
+    elif following is None:
+        key = previous + ORDER_GAP
+    elif following - previous > 1:
+        key = (previous + following) // 2
+    else:
+        key = None
+
+    if key is not None:
+        if key != task.order or retargeted:
+            task.order = key
+            written = [task]
+        else:
+            written = []
+    else:
+        # No room between the neighbours: renumber the whole column
+        column.insert(index, task)
+        written = _renumber(column)
+        if retargeted and task not in written:
+            written.append(task)
+    _save(written, retargeted)
+    return written
+
+
+@transaction.atomic
+def reorder_tasks(project, task_ids, *, status=None, milestone_id=None):
+    """
+    Give the tasks ``task_ids`` the order of the list (the new order of a
+    column), optionally moving them all to ``status`` and ``milestone_id``.
+    Returns the tasks written.
+    """
+    milestone = _validate(project, status, milestone_id)
+    ids = [str(pk) for pk in task_ids]
+    tasks = {
+        str(task.pk): task
+        for task in ProjectTask.objects.select_for_update().filter(project=project, pk__in=ids)
+    }
+    if len(tasks) != len(set(ids)):
+        raise Exception("Some tasks were not found in this project.")
+
+    ordered = [tasks[pk] for pk in dict.fromkeys(ids)]
+    retargeted = _retarget(ordered, status, milestone)
+    written = _renumber(ordered)
+    written += [task for task in retargeted if task not in written]
+    _save(written, retargeted)
+    return written
+
+
+@transaction.atomic
+def reorder_milestones(project, milestone_ids):
+    """Give the milestones ``milestone_ids`` the order of the list with one UPDATE."""
+    ids = [str(pk) for pk in milestone_ids]
+    milestones = {str(m.pk): m for m in ProjectMilestone.objects.filter(project=project, pk__in=ids)}
+    if len(milestones) != len(set(ids)):
+        raise Exception("Some milestones were not found in this project.")
+    changed = []
+    for position, pk in enumerate(dict.fromkeys(ids), start=1):
+        milestone = milestones[pk]
+        if milestone.order != position:
+            milestone.order = position
+            changed.append(milestone)
+    ProjectMilestone.objects.bulk_update(changed, ['order'])
+    return changed
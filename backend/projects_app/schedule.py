@@ -0,0 +1,263 @@
+# projects_app/schedule.py
+
+"""
+Project scheduling (critical path method).
+
+Each task takes its estimated hours of work and may depend on other tasks
+of the project (``ProjectTask.depends_on``). ``compute_schedule`` orders
+the tasks topologically (Kahn's algorithm) and makes a forward pass for the
+earliest start and finish of every task and a backward pass for the latest
+ones, both linear in tasks plus dependencies. A task's latest finish is
+bounded by its successors, its milestone's due date and the project's end
+date; slack is latest minus earliest start, and the tasks with the least
+slack form the critical path. A dependency cycle raises ``ScheduleCycleError``.
+
+Times are working hours from the project start (today if unset), with
+``SCHEDULE_HOURS_PER_DAY`` hours per calendar day for the Gantt dates.
+
+Schedules are cached per project until one of its tasks, dependencies or
+milestones changes (see ``invalidate``, connected in projects_app.signals).
+"""
+
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import ProjectMilestone, ProjectTask
+
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class ScheduleCycleError(Exception):
+    def __init__(self, titles):
+        self.titles = titles
+        super().__init__(f"Task dependencies form a cycle: {' depends on '.join(titles)}")
+
+
+@dataclass
+class ScheduledTask:
+    task_id: int
+    title: str
+    status: str
+    milestone_id: int
+    depends_on: list
+    duration_hours: Decimal
+    earliest_start: Decimal = Decimal('0')
+    earliest_finish: Decimal = Decimal('0')
+    latest_start: Decimal = Decimal('0')
+    latest_finish: Decimal = Decimal('0')
+    slack: Decimal = Decimal('0')
+    is_critical: bool = False
+    start_date: object = None
+    end_date: object = None
+
+
+@dataclass
+class ScheduledMilestone:
+    milestone_id: int
+    title: str
+    due_date: object
+    projected_date: object = None
+    is_late: bool = False
+
+
+@dataclass
+class Schedule:
+    project_id: int
+    start_date: object
+    finish_date: object = None
+    duration_hours: Decimal = Decimal('0')
+    tasks: list = field(default_factory=list)
+    milestones: list = field(default_factory=list)
+    critical_path: list = field(default_factory=list)
+
+
+def _version_key(project_id):
+    return f"project_schedule:version:{project_id}"
+
+
+def invalidate(project_id):
+    """Drop the cached schedule of ``project_id``."""
+    cache.set(_version_key(project_id), time.time_ns(), timeout=None)
+
+
+def _hours_per_day():
+    return Decimal(str(getattr(settings, 'SCHEDULE_HOURS_PER_DAY', 8)))
+
+
+def _topological_order(tasks, successors):
+    """Kahn's algorithm over ``tasks`` (by id). Raises ScheduleCycleError on a cycle."""
+    in_degree = {pk: len(task.depends_on) for pk, task in tasks.items()}
+    queue = deque(pk for pk, degree in in_degree.items() if degree == 0)
+    order = []
+    while queue:
+        pk = queue.popleft()
+        order.append(pk)
+        for successor in successors[pk]:
+            in_degree[successor] -= 1
+            if in_degree[successor] == 0:
+                queue.append(successor)
+    if len(order) < len(tasks):
+        raise ScheduleCycleError(_find_cycle(tasks, in_degree))
+    return order
+
+
+def _find_cycle(tasks, in_degree):
+    """Titles along one cycle among the tasks Kahn's algorithm could not order."""
+    # Every unordered task has an unordered predecessor, so walking
+    # predecessors from any of them must revisit a task
+    pk = next(pk for pk, degree in in_degree.items() if degree > 0)
+    seen = {}
+    path = []
+    while pk not in seen:
+        seen[pk] = len(path)
+        path.append(pk)
+        pk = next(dep for dep in tasks[pk].depends_on if in_degree[dep] > 0)
+    cycle = path[seen[pk]:]
+    return [tasks[pk].title for pk in [*cycle, cycle[0]]]
+
+
+def _day(start_date, hours, hours_per_day, end=False):
+    """Calendar date of an hour offset; ``end`` dates a finish inside its last day."""
+    if end and hours > 0:
+        return start_date + timedelta(days=math.ceil(hours / hours_per_day) - 1)
+    return start_date + timedelta(days=int(hours // hours_per_day))
+
+
+def compute_schedule(project):
+    """Schedule ``project``'s tasks with three queries (tasks, dependencies, milestones)."""
+    hours_per_day = _hours_per_day()
+    start_date = project.start_date or timezone.localdate()
+    schedule = Schedule(project_id=project.pk, start_date=start_date)
+
+    tasks = {
+        row['id']: ScheduledTask(
+            task_id=row['id'],
+            title=row['title'],
+            status=row['status'],
+            milestone_id=row['milestone_id'],
+            depends_on=[],
+            duration_hours=row['estimated_hours'] or Decimal('0'),
+        )
+        for row in ProjectTask.objects.filter(project=project)
+        .order_by('order', 'created_at')
+        .values('id', 'title', 'status', 'milestone_id', 'estimated_hours')
+    }
+    successors = {pk: [] for pk in tasks}
+    edges = ProjectTask.depends_on.through.objects.filter(
+        from_projecttask__project=project
+    ).values_list('from_projecttask_id', 'to_projecttask_id')
+    for task_id, dependency_id in edges:
+        # Dependencies on other projects' tasks are ignored
+        if dependency_id in tasks:
+            tasks[task_id].depends_on.append(dependency_id)
+            successors[dependency_id].append(task_id)
+
+    milestones = list(
+        ProjectMilestone.objects.filter(project=project).order_by('order', 'due_date')
+        .values_list('id', 'title', 'due_date')
+    )
+
+    def deadline(day):
+        # End of ``day`` in hours from the project start
+        return ((day - start_date).days + 1) * hours_per_day
+
+    order = _topological_order(tasks, successors)
+
+    # Forward pass: earliest start after every dependency has finished
+    for pk in order:
+        task = tasks[pk]
+        task.earliest_start = max((tasks[dep].earliest_finish for dep in task.depends_on), default=Decimal('0'))
+        task.earliest_finish = task.earliest_start + task.duration_hours
+    finish = max((task.earliest_finish for task in tasks.values()), default=Decimal('0'))
+
+    # Backward pass: latest finish before every successor must start
+    milestone_deadlines = {pk: deadline(due_date) for pk, _title, due_date in milestones}
+    project_deadline = deadline(project.end_date) if project.end_date else finish
+    for pk in reversed(order):
+        task = tasks[pk]
+        latest = min((tasks[succ].latest_start for succ in successors[pk]), default=project_deadline)
+        if task.milestone_id in milestone_deadlines:
+            latest = min(latest, milestone_deadlines[task.milestone_id])
+        task.latest_finish = latest
+        task.latest_start = latest - task.duration_hours
+        task.slack = task.latest_start - task.earliest_start
+
+    # Without deadlines the critical tasks have no slack; with deadlines
+    # they may have some left, or be late (negative slack)
+    min_slack = min((task.slack for task in tasks.values()), default=Decimal('0'))
+    for pk in order:
+        task = tasks[pk]
+        task.is_critical = task.slack <= min_slack
+        task.start_date = _day(start_date, task.earliest_start, hours_per_day)
+        task.end_date = max(task.start_date, _day(start_date, task.earliest_finish, hours_per_day, end=True))
+        schedule.tasks.append(task)
+        if task.is_critical:
+            schedule.critical_path.append(pk)
+
+    schedule.duration_hours = finish
+    schedule.finish_date = _day(start_date, finish, hours_per_day, end=True)
+    milestone_finish = {}
+    for task in tasks.values():
+        if task.milestone_id:
+            milestone_finish[task.milestone_id] = max(milestone_finish.get(task.milestone_id, 0), task.earliest_finish)
+    for pk, title, due_date in milestones:
+        projected = (
+            _day(start_date, milestone_finish[pk], hours_per_day, end=True) if pk in milestone_finish else None
+        )
+        schedule.milestones.append(ScheduledMilestone(
+            milestone_id=pk, title=title, due_date=due_date, projected_date=projected,
+            is_late=projected is not None and projected > due_date,
+        ))
+    return schedule
+
+
+def project_schedule(project):
+    """The schedule of ``project``, from the cache when nothing changed since it was computed."""
+    version = cache.get_or_set(_version_key(project.pk), time.time_ns, timeout=None)
+    key = f"project_schedule:{project.pk}:{version}:{project.start_date}:{project.end_date}:{timezone.localdate()}"
+    schedule = cache.get(key)
+    if schedule is None:
+        schedule = compute_schedule(project)
+        cache.set(key, schedule, timeout=CACHE_TIMEOUT)
+    return schedule
+
+
+def check_dependencies(task, dependency_ids):
+    """
+    Raise ScheduleCycleError if ``task`` depending on ``dependency_ids``
+    would create a cycle, i.e. if ``task`` is among their own (transitive)
+    dependencies. Linear in the project's dependencies.
+    """
+    depends_on = {}
+    edges = ProjectTask.depends_on.through.objects.filter(
+        from_projecttask__project_id=task.project_id
+    ).values_list('from_projecttask_id', 'to_projecttask_id')
+    for task_id, dependency_id in edges:
+        depends_on.setdefault(task_id, []).append(dependency_id)
+
+    # Depth-first search from the new dependencies, remembering the
+    # dependent each task was reached from
+    reached_from = {pk: None for pk in dependency_ids}
+    stack = list(dependency_ids)
+    while stack:
+        pk = stack.pop()
+        if pk == task.pk:
+            chain = []
+            while pk is not None:
+                chain.append(pk)
+                pk = reached_from[pk]
+            titles = dict(ProjectTask.objects.filter(project_id=task.project_id).values_list('id', 'title'))
+            raise ScheduleCycleError([titles[pk] for pk in [task.pk, *reversed(chain)]])
+        for dependency in depends_on.get(pk, []):
+            if dependency not in reached_from:
+                reached_from[dependency] = pk
+                stack.append(dependency)
@@ -4,7 +4,17 @@ from django.db import transaction, models
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User
 from django.conf import settings
-from .models import Project, ProjectMilestone, ProjectTask, ProjectNote, ProjectFile, UserGoals
+from django.urls import reverse
+from django.utils import timezone
+from backend.query_budget import query_budget
+from .models import Project, ProjectMilestone, ProjectTask, ProjectNote, ProjectFile, ProjectFileUpload, UserGoals
+from .forecast import burn_series, forecast, project_forecast
+from .images import case_study_visuals, responsive_image, srcset
+from .milestones import reopened_status, upcoming_deadlines
+from .ordering import move_task, next_order, reorder_milestones, reorder_tasks
+from .schedule import check_dependencies, project_schedule
+from .slugs import project_by_slug
+from .uploads import complete_upload, start_upload
 from clients_app.schema import ClientType
 from typing import Dict, Any, List
 
@@ -44,6 +54,18 @@ class ProjectFileType(DjangoObjectType):
         fields = '__all__'
 
 
+class ProjectFileUploadType(DjangoObjectType):
+    class Meta:
+        model = ProjectFileUpload
+        exclude = ('user',)
+
+    upload_url = graphene.String(description="PUT chunk N to this URL followed by N")
+
+    def resolve_upload_url(self, info):
+        path = reverse('upload_chunk', kwargs={'upload_id': self.pk, 'index': 0}).removesuffix('0')
+        return info.context.build_absolute_uri(path)
+
+
 class CaseStudyType(graphene.ObjectType):
     startingPoint = graphene.String()
     theTransformation = graphene.String()
@@ -51,39 +73,103 @@ class CaseStudyType(graphene.ObjectType):
     visuals = graphene.List(graphene.String)
 
 
+class ImageVariantType(graphene.ObjectType):
+    url = graphene.String()
+    width = graphene.Int()
+    height = graphene.Int()
+    format = graphene.String()
+
+
+class ImageSourceType(graphene.ObjectType):
+    type = graphene.String()
+    srcset = graphene.String()
+
+
+class ResponsiveImageType(graphene.ObjectType):
+    src = graphene.String(description="URL of the original image")
+    width = graphene.Int()
+    height = graphene.Int()
+    variants = graphene.List(ImageVariantType)
+    srcset = graphene.String(format=graphene.String(default_value='webp'))
+    sources = graphene.List(ImageSourceType, description="One <source> per format, best first")
+
+    def resolve_srcset(self, info, format='webp'):
+        return srcset(self['variants'], format)
+
+
+class CaseStudyVisualType(graphene.ObjectType):
+    key = graphene.String()
+    image = graphene.Field(ResponsiveImageType)
+
+
+def _owner_forecast(info, project, name):
+    # Logged time and costs are the owner's business, even on a public project
+    if info.context.user.pk != project.user_id:
+        return None
+    return getattr(project_forecast(info.context, project), name)
+
+
 class ProjectType(DjangoObjectType):
     class Meta:
         model = Project
 
-    # Add computed fields
-    # totalLoggedHours = graphene.Float()
-    # totalCost = graphene.Float()
-    # remainingHours = graphene.Float()
-    # isOverBudget = graphene.Boolean()
-    # daysUntilDeadline = graphene.Int()
-    # totalTasks = graphene.Int()
+    # Time and budget forecast (projects_app.forecast), batched per owner;
+    # null unless the requester owns the project
+    totalLoggedHours = graphene.Float()
+    totalCost = graphene.Float()
+    remainingHours = graphene.Float()
+    remainingBudget = graphene.Float()
+    isOverBudget = graphene.Boolean()
+    burnRate = graphene.Float(description="Smoothed cost per day of recent logged time")
+    hoursPerDay = graphene.Float(description="Smoothed hours logged per day")
+    forecastOverBudgetOn = graphene.Date(description="When the budget ran or is projected to run out")
+    forecastCompletionOn = graphene.Date(description="When the estimated hours are projected to be used up")
+    daysUntilDeadline = graphene.Int()
+    # Responsive derivatives (projects_app.images); no queries
+    logoImage = graphene.Field(ResponsiveImageType)
+    caseStudyVisuals = graphene.List(CaseStudyVisualType)
     # Friendly aliases used by frontend
     name = graphene.String()
     caseStudy = graphene.JSONString()
     clientType = graphene.String()
 
-    # def resolve_totalLoggedHours(self, info):
-    #     return self.total_logged_hours / 60  # Convert minutes to hours
+    def resolve_totalLoggedHours(self, info):
+        return _owner_forecast(info, self, 'logged_hours')
+
+    def resolve_totalCost(self, info):
+        return _owner_forecast(info, self, 'cost')
+
+    def resolve_remainingHours(self, info):
+        return _owner_forecast(info, self, 'remaining_hours')
 
-    # def resolve_totalCost(self, info):
-    #     return self.total_cost
+    def resolve_remainingBudget(self, info):
+        return _owner_forecast(info, self, 'remaining_budget')
 
-    # def resolve_remainingHours(self, info):
-    #     return self.remaining_hours
+    def resolve_isOverBudget(self, info):
+        return _owner_forecast(info, self, 'is_over_budget')
 
-    # def resolve_isOverBudget(self, info):
-    #     return self.is_over_budget
+    def resolve_burnRate(self, info):
+        return _owner_forecast(info, self, 'burn_rate')
 
-    # def resolve_daysUntilDeadline(self, info):
-    #     return self.days_until_deadline
+    def resolve_hoursPerDay(self, info):
+        return _owner_forecast(info, self, 'hours_per_day')
 
-    # def resolve_totalTasks(self, info):
-    #     return self.projecttask_set.count()
+    def resolve_forecastOverBudgetOn(self, info):
+        return _owner_forecast(info, self, 'over_budget_on')
+
+    def resolve_forecastCompletionOn(self, info):
+        return _owner_forecast(info, self, 'completion_on')
+
+    def resolve_daysUntilDeadline(self, info):
+        if not self.end_date:
+            return None
+        return (self.end_date - timezone.localdate()).days
+
+    def resolve_logoImage(self, info):
+        return responsive_image(self, self.logo)
+
+    def resolve_caseStudyVisuals(self, info):
+        return case_study_visuals(self)
 
     def resolve_name(self, info):
         return getattr(self, 'title', None)
@@ -96,6 +182,49 @@ class ProjectType(DjangoObjectType):
         return getattr(self, 'client_type', None)
 
 
+class KanbanColumnType(graphene.ObjectType):
+    """The tasks of one status column, in board order."""
+    status = graphene.String()
+    label = graphene.String()
+    tasks = graphene.List(ProjectTaskType)
+
+
+class ScheduledTaskType(graphene.ObjectType):
+    """A task on the project timeline. Times are working hours from the project start."""
+    task_id = graphene.ID()
+    title = graphene.String()
+    status = graphene.String()
+    milestone_id = graphene.ID()
+    depends_on = graphene.List(graphene.ID)
+    duration_hours = graphene.Float()
+    earliest_start = graphene.Float()
+    earliest_finish = graphene.Float()
+    latest_start = graphene.Float()
+    latest_finish = graphene.Float()
+    slack = graphene.Float()
+    is_critical = graphene.Boolean()
+    start_date = graphene.Date()
+    end_date = graphene.Date()
+
+
+class ScheduledMilestoneType(graphene.ObjectType):
+    milestone_id = graphene.ID()
+    title = graphene.String()
+    due_date = graphene.Date()
+    projected_date = graphene.Date()
+    is_late = graphene.Boolean()
+
+
+class ProjectScheduleType(graphene.ObjectType):
+    project_id = graphene.ID()
+    start_date = graphene.Date()
+    finish_date = graphene.Date()
+    duration_hours = graphene.Float()
+    tasks = graphene.List(ScheduledTaskType)
+    milestones = graphene.List(ScheduledMilestoneType)
+    critical_path = graphene.List(graphene.ID)
+
+
 # --- Input Types ---
 class ProjectMilestoneInput(graphene.InputObjectType):
     title = graphene.String(required=True)
@@ -131,6 +260,14 @@ class ProjectFileInput(graphene.InputObjectType):
     file_size = graphene.Int(required=True)
 
 
+class ProjectFileUploadInput(graphene.InputObjectType):
+    file_type = graphene.String()
+    title = graphene.String(required=True)
+    file_name = graphene.String(required=True)
+    file_size = graphene.BigInt(required=True)
+    sha256 = graphene.String(required=True)
+
+
 class UserGoalsType(DjangoObjectType):
     class Meta:
         model = UserGoals
@@ -167,6 +304,18 @@ class ProjectInput(graphene.InputObjectType):
 
 
 # --- Queries ---
+def _visible_project_by_slug(info, slug):
+    # Active projects are public; owners also see their inactive ones
+    user = info.context.user
+    project = project_by_slug(slug)
+    if user.is_authenticated:
+        if project is None:
+            project = Project.objects.select_related('client').filter(slug=slug, user=user).first()
+        if project is not None and project.user_id != user.pk:
+            return None
+    return project
+
+
 class ProjectQuery(graphene.ObjectType):
     # Projects
     all_projects = graphene.List(
@@ -189,17 +338,29 @@ class ProjectQuery(graphene.ObjectType):
         limit=graphene.Int(),
         offset=graphene.Int()
     )
-    project = graphene.Field(ProjectType, id=graphene.ID(required=True))
+    project = graphene.Field(ProjectType, id=graphene.ID(), slug=graphene.String())
+    # Portfolio / case study pages
+    project_by_slug = graphene.Field(ProjectType, slug=graphene.String(required=True))
 
     # Project components
     project_milestones = graphene.List(ProjectMilestoneType, project_id=graphene.ID(required=True))
     project_tasks = graphene.List(ProjectTaskType, project_id=graphene.ID(required=True))
     project_notes = graphene.List(ProjectNoteType, project_id=graphene.ID(required=True))
     project_files = graphene.List(ProjectFileType, project_id=graphene.ID(required=True))
+    project_file_upload = graphene.Field(ProjectFileUploadType, id=graphene.UUID(required=True))
+
+    # Dashboard "upcoming_deadlines" widget: incomplete milestones due soon
+    upcoming_deadlines = graphene.List(ProjectMilestoneType, days=graphene.Int(), limit=graphene.Int())
 
     # All tasks (for dashboard)
     all_tasks = graphene.List(ProjectTaskType, project_id=graphene.ID())
 
+    # Kanban board: a project's tasks grouped by status
+    kanban_board = graphene.List(KanbanColumnType, project_id=graphene.ID(required=True))
+
+    # Critical-path schedule for Gantt charts
+    project_schedule = graphene.Field(ProjectScheduleType, project_id=graphene.ID(required=True))
+
     # Analytics
     project_analytics = graphene.Field(graphene.JSONString)
 
@@ -216,7 +377,7 @@ class ProjectQuery(graphene.ObjectType):
         # else:
         #     # Authenticated users see their own projects (management view)
         #     queryset = Project.objects.filter(user=info.context.user)
-        queryset = Project.objects.all()  # Show all projects for debugging
+        queryset = Project.objects.select_related('client')  # Show all projects for debugging
 
         if status:
             queryset = queryset.filter(status=status)
@@ -244,7 +405,7 @@ class ProjectQuery(graphene.ObjectType):
         # if not info.context.user.is_authenticated:
         #     return Project.objects.none()
         # queryset = Project.objects.filter(user=info.context.user)
-        queryset = Project.objects.all()  # Show all projects for debugging
+        queryset = Project.objects.select_related('client')  # Show all projects for debugging
 
         if status:
             queryset = queryset.filter(status=status)
@@ -266,68 +427,129 @@ class ProjectQuery(graphene.ObjectType):
         return queryset
 
     @staticmethod
-    def resolve_project(root, info, id):
+    @query_budget(3)
+    def resolve_project(root, info, id=None, slug=None):
+        if id is None:
+            if not slug:
+                raise Exception("Either id or slug is required.")
+            return _visible_project_by_slug(info, slug)
         # Public project detail for active projects, otherwise require ownership
-        project = get_object_or_404(Project, pk=id)
+        project = get_object_or_404(Project.objects.select_related('client'), pk=id)
         if not info.context.user.is_authenticated and not project.is_active:
             return None
-        if info.context.user.is_authenticated and project.user != info.context.user:
+        if info.context.user.is_authenticated and project.user_id != info.context.user.pk:
             # Authenticated users can only access their own management projects
             return None
         return project
 
     @staticmethod
+    @query_budget(2)
+    def resolve_project_by_slug(root, info, slug):
+        return _visible_project_by_slug(info, slug)
+
+    @staticmethod
+    @query_budget(1)
     def resolve_project_milestones(root, info, project_id):
         if not info.context.user.is_authenticated:
             return ProjectMilestone.objects.none()
         return ProjectMilestone.objects.filter(project_id=project_id, project__user=info.context.user)
 
     @staticmethod
+    @query_budget(1)
+    def resolve_upcoming_deadlines(root, info, days=None, limit=None):
+        if not info.context.user.is_authenticated:
+            return ProjectMilestone.objects.none()
+        return upcoming_deadlines(info.context.user, days=days, limit=limit)
+
+    @staticmethod
+    @query_budget(1)
     def resolve_project_tasks(root, info, project_id):
         if not info.context.user.is_authenticated:
             return ProjectTask.objects.none()
         return ProjectTask.objects.filter(project_id=project_id, project__user=info.context.user)
 
     @staticmethod
+    @query_budget(1)
     def resolve_project_notes(root, info, project_id):
         if not info.context.user.is_authenticated:
             return ProjectNote.objects.none()
         return ProjectNote.objects.filter(project_id=project_id, project__user=info.context.user)
 
     @staticmethod
+    @query_budget(1)
     def resolve_project_files(root, info, project_id):
         if not info.context.user.is_authenticated:
             return ProjectFile.objects.none()
         return ProjectFile.objects.filter(project_id=project_id, project__user=info.context.user)
 
     @staticmethod
+    @query_budget(1)
+    def resolve_project_file_upload(root, info, id):
+        if not info.context.user.is_authenticated:
+            return None
+        return ProjectFileUpload.objects.filter(pk=id, user=info.context.user).first()
+
+    @staticmethod
+    @query_budget(2)
     def resolve_all_tasks(root, info, project_id=None):
         if not info.context.user.is_authenticated:
             return ProjectTask.objects.none()
-        queryset = ProjectTask.objects.filter(project__user=info.context.user)
+        queryset = ProjectTask.objects.filter(project__user=info.context.user).select_related('project')
         if project_id:
             queryset = queryset.filter(project_id=project_id)
         return queryset
 
     @staticmethod
+    @query_budget(1)
+    def resolve_kanban_board(root, info, project_id):
+        if not info.context.user.is_authenticated:
+            return []
+        columns = {status: [] for status, _label in ProjectTask.STATUS_CHOICES}
+        tasks = ProjectTask.objects.filter(
+            project_id=project_id, project__user=info.context.user
+        ).order_by('order', 'created_at')
+        for task in tasks:
+            columns.setdefault(task.status, []).append(task)
+        labels = dict(ProjectTask.STATUS_CHOICES)
+        return [
+            KanbanColumnType(status=status, label=labels.get(status, status), tasks=column_tasks)
+            for status, column_tasks in columns.items()
+        ]
+
+    @staticmethod
+    @query_budget(4)
+    def resolve_project_schedule(root, info, project_id):
+        if not info.context.user.is_authenticated:
+            return None
+        project = get_object_or_404(Project, pk=project_id, user=info.context.user)
+        return project_schedule(project)
+
+    @staticmethod
+    @query_budget(2)
     def resolve_project_analytics(root, info):
         if not info.context.user.is_authenticated:
             return {}
 
-        projects = Project.objects.filter(user=info.context.user)
-
-        total_projects = projects.count()
-        active_projects = projects.filter(is_active=True).count()
-        completed_projects = projects.filter(status='COMPLETED').count()
-        total_budget = sum(float(p.budget) for p in projects)
-        total_value = sum(p.total_cost for p in projects)
+        projects = list(Project.objects.filter(user=info.context.user).only(
+            'id', 'user_id', 'status', 'is_active', 'budget', 'estimated_hours', 'end_date'
+        ))
+        series = burn_series(info.context.user.pk)
+        forecasts = [forecast(project, series.get(project.pk)) for project in projects]
 
         return {
-            'totalProjects': total_projects,
-            'activeProjects': active_projects,
-            'completedProjects': completed_projects,
-            'totalBudget': float(total_budget),
-            'totalValue': float(total_value),
+            'totalProjects': len(projects),
+            'activeProjects': sum(1 for p in projects if p.is_active),
+            'completedProjects': sum(1 for p in projects if p.status == 'COMPLETED'),
+            'totalBudget': float(sum(p.budget for p in projects)),
+            'totalValue': round(sum(f.cost for f in forecasts), 2),
+            'totalLoggedHours': round(sum(f.logged_hours for f in forecasts), 2),
+            'totalBurnRate': round(sum(f.burn_rate for f in forecasts), 2),
+            'overBudgetProjects': sum(1 for f in forecasts if f.is_over_budget),
+            'atRiskProjects': sum(
+                1 for p, f in zip(projects, forecasts)
+                if p.status not in ('COMPLETED', 'CANCELLED') and not f.is_over_budget
+                and f.over_budget_on and p.end_date and f.over_budget_on <= p.end_date
+            ),
         }
 
 
@@ -426,6 +648,12 @@ class UpdateProjectMilestone(LoginRequiredMixin, graphene.Mutation):
 
         for field, value in input.items():
             setattr(milestone, field, value)
+        # Rescheduled out of the past: no longer overdue
+        if (
+            milestone.status == 'OVERDUE' and not milestone.is_completed
+            and milestone.due_date >= timezone.localdate()
+        ):
+            milestone.status = reopened_status(milestone)
         milestone.save()
 
         return UpdateProjectMilestone(milestone=milestone)
@@ -464,6 +692,10 @@ class CreateProjectTask(LoginRequiredMixin, graphene.Mutation):
         if milestone_id:
             milestone = get_object_or_404(ProjectMilestone, pk=milestone_id, project=project)
 
+        if input.get('order') is None:
+            # New cards go to the bottom of their column
+            input['order'] = next_order(project.pk, input.get('status') or 'TODO')
+
         task = ProjectTask.objects.create(project=project, milestone=milestone, **input)
         return CreateProjectTask(task=task)
 
@@ -510,6 +742,80 @@ class DeleteProjectTask(LoginRequiredMixin, graphene.Mutation):
         return DeleteProjectTask(success=True)
 
 
+class ReorderTasks(LoginRequiredMixin, graphene.Mutation):
+    """
+    Reorder Kanban cards: either set the order of a column with ``taskIds``,
+    or move ``taskId`` after ``afterId`` / before ``beforeId`` (else to the
+    end of the column). ``status`` and ``milestoneId`` move the tasks to
+    another column or milestone.
+    """
+    class Arguments:
+        project_id = graphene.ID(required=True)
+        task_ids = graphene.List(graphene.ID)
+        task_id = graphene.ID()
+        after_id = graphene.ID()
+        before_id = graphene.ID()
+        status = graphene.String()
+        milestone_id = graphene.ID()
+
+    success = graphene.Boolean()
+    updated_count = graphene.Int()
+    tasks = graphene.List(ProjectTaskType, description="The tasks whose order, status or milestone changed")
+
+    @classmethod
+    @transaction.atomic
+    def mutate(cls, root, info, project_id, task_ids=None, task_id=None, after_id=None, before_id=None,
+               status=None, milestone_id=None):
+        project = get_object_or_404(Project, pk=project_id, user=info.context.user)
+        if task_ids is not None:
+            written = reorder_tasks(project, task_ids, status=status, milestone_id=milestone_id)
+        elif task_id is not None:
+            written = move_task(
+                project, task_id, after_id=after_id, before_id=before_id, status=status, milestone_id=milestone_id
+            )
+        else:
+            raise Exception("Either taskIds or taskId is required.")
+        return ReorderTasks(success=True, updated_count=len(written), tasks=written)
+
+
+class SetTaskDependencies(LoginRequiredMixin, graphene.Mutation):
+    """Replace the tasks a task depends on. Dependencies that would form a cycle are rejected."""
+    class Arguments:
+        task_id = graphene.ID(required=True)
+        depends_on_ids = graphene.List(graphene.ID, required=True)
+
+    task = graphene.Field(ProjectTaskType)
+
+    @classmethod
+    @transaction.atomic
+    def mutate(cls, root, info, task_id, depends_on_ids):
+        task = get_object_or_404(ProjectTask, pk=task_id, project__user=info.context.user)
+        dependency_ids = list(
+            ProjectTask.objects.filter(project_id=task.project_id, pk__in=depends_on_ids).values_list('pk', flat=True)
+        )
+        if len(dependency_ids) != len(set(depends_on_ids)):
+            raise Exception("Dependencies must be tasks of the same project.")
+        check_dependencies(task, dependency_ids)
+        task.depends_on.set(dependency_ids)
+        return SetTaskDependencies(task=task)
+
+
+class ReorderProjectMilestones(LoginRequiredMixin, graphene.Mutation):
+    class Arguments:
+        project_id = graphene.ID(required=True)
+        milestone_ids = graphene.List(graphene.ID, required=True)
+
+    success = graphene.Boolean()
+    milestones = graphene.List(ProjectMilestoneType)
+
+    @classmethod
+    @transaction.atomic
+    def mutate(cls, root, info, project_id, milestone_ids):
+        project = get_object_or_404(Project, pk=project_id, user=info.context.user)
+        reorder_milestones(project, milestone_ids)
+        return ReorderProjectMilestones(success=True, milestones=project.milestones.all())
+
+
 class CreateProjectNote(LoginRequiredMixin, graphene.Mutation):
     class Arguments:
         project_id = graphene.ID(required=True)
@@ -614,6 +920,40 @@ class DeleteProjectFile(LoginRequiredMixin, graphene.Mutation):
         return DeleteProjectFile(success=True)
 
 
+class StartProjectFileUpload(LoginRequiredMixin, graphene.Mutation):
+    """Open a chunked upload; completes at once when the content is already stored."""
+    class Arguments:
+        project_id = graphene.ID(required=True)
+        input = ProjectFileUploadInput(required=True)
+
+    upload = graphene.Field(ProjectFileUploadType)
+
+    @classmethod
+    @transaction.atomic
+    def mutate(cls, root, info, project_id, input):
+        user = info.context.user
+        project = get_object_or_404(Project, pk=project_id, user=user)
+        upload = start_upload(
+            project, user, title=input.title, file_name=input.file_name, file_type=input.file_type or 'OTHER',
+            file_size=input.file_size, sha256=input.sha256,
+        )
+        return StartProjectFileUpload(upload=upload)
+
+
+class CompleteProjectFileUpload(LoginRequiredMixin, graphene.Mutation):
+    """Assemble an upload in the background; poll projectFileUpload for its file."""
+    class Arguments:
+        id = graphene.UUID(required=True)
+
+    upload = graphene.Field(ProjectFileUploadType)
+
+    @classmethod
+    @transaction.atomic
+    def mutate(cls, root, info, id):
+        upload = get_object_or_404(ProjectFileUpload, pk=id, user=info.context.user)
+        return CompleteProjectFileUpload(upload=complete_upload(upload))
+
+
 # --- Mutation Aggregation ---
 class UpdateUserGoals(LoginRequiredMixin, graphene.Mutation):
     class Arguments:
@@ -644,11 +984,14 @@ class ProjectMutation(graphene.ObjectType):
     create_project_milestone = CreateProjectMilestone.Field()
     update_project_milestone = UpdateProjectMilestone.Field()
     delete_project_milestone = DeleteProjectMilestone.Field()
+    reorder_project_milestones = ReorderProjectMilestones.Field()
 
     # Project task mutations
     create_project_task = CreateProjectTask.Field()
     update_project_task = UpdateProjectTask.Field()
     delete_project_task = DeleteProjectTask.Field()
+    reorder_tasks = ReorderTasks.Field()
+    set_task_dependencies = SetTaskDependencies.Field()
 
     # Project note mutations
     create_project_note = CreateProjectNote.Field()
@@ -659,6 +1002,8 @@ class ProjectMutation(graphene.ObjectType):
     create_project_file = CreateProjectFile.Field()
     update_project_file = UpdateProjectFile.Field()
     delete_project_file = DeleteProjectFile.Field()
+    start_project_file_upload = StartProjectFileUpload.Field()
+    complete_project_file_upload = CompleteProjectFileUpload.Field()
 
     # User goals mutations
     update_user_goals = UpdateUserGoals.Field()
\ No newline at end of file
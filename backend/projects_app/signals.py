@@ -0,0 +1,105 @@
+# projects_app/signals.py
+
+import threading
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import schedule, snapshot, uploads
+from .counters import TaskState, task_changed
+from .models import Project, ProjectFile, ProjectMilestone, ProjectTask
+from .slugs import assign_slug, slug_cache
+
+
+@receiver(post_init, sender=ProjectTask, dispatch_uid='task_counters_loaded')
+def remember_task_state(sender, instance, **kwargs):
+    # The state the task was loaded with, to diff against on save
+    instance._counted_state = TaskState.of(instance)
+
+
+@receiver(pre_save, sender=ProjectTask, dispatch_uid='task_counters_pre_save')
+def load_task_state(sender, instance, raw=False, **kwargs):
+    # Tasks loaded with deferred fields
+    if not raw and instance.pk and not instance._state.adding and instance._counted_state is None:
+        instance._counted_state = TaskState.load(instance.pk)
+
+
+@receiver(post_save, sender=ProjectTask, dispatch_uid='task_counters_saved')
+def count_saved_task(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    new = TaskState.of(instance) or TaskState.load(instance.pk)
+    task_changed(None if created else instance._counted_state, new)
+    instance._counted_state = new
+
+
+# Ids of the projects being deleted by this thread
+_deleting = threading.local()
+
+
+def _deleting_projects():
+    if not hasattr(_deleting, 'projects'):
+        _deleting.projects = set()
+    return _deleting.projects
+
+
+@receiver(pre_delete, sender=Project, dispatch_uid='task_counters_project_deleting')
+def remember_deleted_project(sender, instance, **kwargs):
+    # Django sends every pre_delete of a cascade before the first DELETE
+    _deleting_projects().add(instance.pk)
+
+
+@receiver(post_delete, sender=Project, dispatch_uid='task_counters_project_deleted')
+def forget_deleted_project(sender, instance, **kwargs):
+    _deleting_projects().discard(instance.pk)
+
+
+@receiver(post_delete, sender=ProjectTask, dispatch_uid='task_counters_deleted')
+def count_deleted_task(sender, instance, **kwargs):
+    # The counters of a project being deleted (and of its milestones) go with it
+    if instance.project_id in _deleting_projects():
+        return
+    task_changed(getattr(instance, '_counted_state', None) or TaskState.of(instance), None)
+
+
+@receiver([post_save, post_delete], sender=ProjectTask, dispatch_uid='schedule_task_changed')
+@receiver([post_save, post_delete], sender=ProjectMilestone, dispatch_uid='schedule_milestone_changed')
+def invalidate_schedule(sender, instance, **kwargs):
+    schedule.invalidate(instance.project_id)
+
+
+@receiver(m2m_changed, sender=ProjectTask.depends_on.through, dispatch_uid='schedule_dependencies_changed')
+def invalidate_schedule_dependencies(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        schedule.invalidate(instance.project_id)
+
+
+@receiver(post_init, sender=Project, dispatch_uid='project_slug_loaded')
+def remember_slug(sender, instance, **kwargs):
+    instance._loaded_slug = instance.__dict__.get('slug')
+
+
+@receiver(pre_save, sender=Project, dispatch_uid='project_slug_assigned')
+def generate_slug(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        assign_slug(instance, update_fields)
+
+
+@receiver([post_save, post_delete], sender=Project, dispatch_uid='project_slug_cache')
+def invalidate_slug(sender, instance, **kwargs):
+    slug_cache.discard(*filter(None, (instance._loaded_slug, instance.__dict__.get('slug'))))
+    instance._loaded_slug = instance.__dict__.get('slug')
+
+
+@receiver([post_save, post_delete], sender=Project, dispatch_uid='portfolio_snapshot')
+def rebuild_snapshot(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        snapshot.snapshot_changed(update_fields)
+
+
+@receiver(post_delete, sender=ProjectFile, dispatch_uid='project_file_release')
+def release_deleted_file(sender, instance, **kwargs):
+    # Uploaded content is shared by hash; deleted with its last file
+    if instance.sha256:
+        transaction.on_commit(lambda: uploads.release_file(instance))
@@ -0,0 +1,111 @@
+# projects_app/slugs.py
+
+"""
+Project slugs for the public portfolio pages.
+
+``assign_slug`` gives every saved project a slug (its own, else one made
+from the title) that no other project has, appending ``-2``, ``-3``... on
+collisions with one ``startswith`` query; it only runs when the slug is
+new or changed. A partial unique index on the slugs of active projects
+backs it against concurrent saves.
+
+``project_by_slug`` looks active projects up through a small in-process
+LRU of slug to id mappings, so a case study page loads with one primary
+key fetch. The mappings of a project are dropped when it is saved or
+deleted (projects_app.signals); as other processes' saves are not seen,
+a cached id is only trusted if the row it fetches still has that slug and
+is active, and otherwise looked up again.
+"""
+
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.text import slugify
+
+from .models import Project
+
+
+DEFAULT_CACHE_SIZE = 1024
+SLUG_LENGTH = Project._meta.get_field('slug').max_length
+
+
+class SlugCache:
+    """Thread-safe LRU of slug to project id mappings."""
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize or getattr(settings, 'PROJECT_SLUG_CACHE_SIZE', DEFAULT_CACHE_SIZE)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, slug):
+        with self._lock:
+            pk = self._entries.get(slug)
+            if pk is not None:
+                self._entries.move_to_end(slug)
+            return pk
+
+    def set(self, slug, pk):
+        with self._lock:
+            self._entries[slug] = pk
+            self._entries.move_to_end(slug)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, *slugs):
+        with self._lock:
+            for slug in slugs:
+                self._entries.pop(slug, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+slug_cache = SlugCache()
+
+
+def unique_slug(value, exclude_pk=None):
+    """A slug made from ``value`` that no project other than ``exclude_pk`` has."""
+    base = slugify(value)[:SLUG_LENGTH].strip('-') or 'project'
+    taken = set(
+        Project.objects.filter(slug__startswith=base[:SLUG_LENGTH - 4])
+        .exclude(pk=exclude_pk)
+        .values_list('slug', flat=True)
+    )
+    slug = base
+    suffix = 1
+    while slug in taken:
+        suffix += 1
+        ending = f'-{suffix}'
+        slug = base[:SLUG_LENGTH - len(ending)].rstrip('-') + ending
+    return slug
+
+
+def assign_slug(project, update_fields=None):
+    """Give ``project`` a unique slug before it is saved, if it has none or it changed."""
+    if 'slug' not in project.__dict__ or (update_fields is not None and 'slug' not in update_fields):
+        return
+    loaded = getattr(project, '_loaded_slug', None)
+    if project.slug and project.slug == loaded and not project._state.adding:
+        return
+    project.slug = unique_slug(project.slug or project.title, exclude_pk=project.pk)
+
+
+def project_by_slug(slug):
+    """The active project with ``slug``, or None. One query, by primary key once cached."""
+    projects = Project.objects.select_related('client')
+    pk = slug_cache.get(slug)
+    if pk is not None:
+        project = projects.filter(pk=pk).first()
+        if project is not None and project.slug == slug and project.is_active:
+            return project
+        slug_cache.discard(slug)
+    project = projects.filter(slug=slug, is_active=True).first()
+    if project is not None:
+        slug_cache.set(slug, project.pk)
+    return project
+
@@ -0,0 +1,213 @@
+# projects_app/snapshot.py
+
+"""
+Pre-rendered portfolio snapshot.
+
+The public portfolio (active projects and their case studies) changes
+rarely, so ``build_snapshot`` writes it as static JSON under
+``STATIC_ROOT/<PORTFOLIO_SNAPSHOT_DIR>``: one ``projects.<hash>.json``
+listing and one ``case-studies/<slug>.<hash>.json`` per project, each
+with gzip (and, when the ``brotli`` package is installed, brotli)
+precompressed variants that WhiteNoise serves to clients accepting them.
+The hash is of the file's content, so the files never change and are
+served with far-future caching (``WHITENOISE_IMMUTABLE_FILE_TEST``);
+``manifest.json`` maps them and is the only file that changes.
+
+Project saves and deletes rebuild the snapshot after commit
+(``PORTFOLIO_SNAPSHOT_ON_SAVE``); files whose content is unchanged are not
+rewritten. Files dropped from the manifest are removed
+``PORTFOLIO_SNAPSHOT_RETENTION_HOURS`` later, so clients holding a previous
+manifest can still load them. ``collectstatic --clear`` removes the
+snapshot, so deploys run ``build_portfolio_snapshot`` after it. Each
+server writes to its own STATIC_ROOT: with several instances, saves only
+refresh the snapshot of the instance that handled them.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .images import case_study_visuals, responsive_image
+from .models import Project
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+DEFAULT_DIR = 'portfolio'
+DEFAULT_RETENTION_HOURS = 24
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 12
+FIELDS = (
+    'title', 'slug', 'intro', 'logo', 'client_type', 'industry', 'case_study', 'images', 'created_at', 'updated_at',
+)
+
+
+@dataclass
+class SnapshotResult:
+    version: str
+    projects: int
+    written: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+
+
+def snapshot_dir():
+    """The snapshot's directory, relative to STATIC_ROOT."""
+    return getattr(settings, 'PORTFOLIO_SNAPSHOT_DIR', DEFAULT_DIR).strip('/')
+
+
+def snapshot_root():
+    return Path(settings.STATIC_ROOT) / snapshot_dir()
+
+
+def snapshot_url(name=MANIFEST_NAME):
+    return f"{settings.STATIC_URL.rstrip('/')}/{snapshot_dir()}/{name}"
+
+
+def serialize_project(project):
+    """A project as the public GraphQL project fields return it."""
+    return {
+        'id': str(project.pk),
+        'title': project.title,
+        'name': project.title,
+        'slug': project.slug,
+        'intro': project.intro,
+        'logo': project.logo,
+        'clientType': project.client_type,
+        'industry': project.industry,
+        'caseStudy': project.case_study or {},
+        'logoImage': responsive_image(project, project.logo),
+        'caseStudyVisuals': case_study_visuals(project),
+        'createdAt': project.created_at,
+        'updatedAt': project.updated_at,
+    }
+
+
+def _encode(data):
+    # Canonical JSON, so unchanged data hashes the same
+    return json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':')).encode()
+
+
+def _hashed_name(stem, content):
+    return f"{stem}.{hashlib.md5(content).hexdigest()[:HASH_LENGTH]}.json"
+
+
+def _write(path, content):
+    """Write ``path`` and its compressed variants atomically. Returns the paths written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    variants = [(path, content), (path.with_name(path.name + '.gz'), gzip.compress(content, 9, mtime=0))]
+    if brotli is not None:
+        variants.append((path.with_name(path.name + '.br'), brotli.compress(content)))
+    for target, data in variants:
+        temporary = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporary.write_bytes(data)
+        os.replace(temporary, target)
+    return [target for target, _data in variants]
+
+
+def _variants(path):
+    return [path, path.with_name(path.name + '.gz'), path.with_name(path.name + '.br')]
+
+
+def _prune(root, keep, dropped, now):
+    """
+    Remove the snapshot files not in ``keep`` (relative names) whose
+    retention is over, counted from when they were dropped from the
+    manifest (``dropped`` now; their mtime is set to it).
+    """
+    for name in dropped:
+        for path in _variants(root / name):
+            if path.exists():
+                os.utime(path, (now, now))
+    retention = getattr(settings, 'PORTFOLIO_SNAPSHOT_RETENTION_HOURS', DEFAULT_RETENTION_HOURS) * 3600
+    removed = []
+    for path in root.rglob('*'):
+        if not path.is_file() or path.name.startswith((MANIFEST_NAME, '.')):
+            continue
+        name = path.relative_to(root).as_posix()
+        for suffix in ('.gz', '.br'):
+            name = name.removesuffix(suffix)
+        if name not in keep and now - path.stat().st_mtime > retention:
+            path.unlink()
+            removed.append(path)
+    return removed
+
+
+def build_snapshot(now=None):
+    """Write the snapshot of the active projects with one query. Returns a SnapshotResult."""
+    root = snapshot_root()
+    now = now or time.time()
+    projects = [
+        serialize_project(project)
+        for project in Project.objects.filter(is_active=True).order_by('-created_at', '-pk').only(*FIELDS)
+    ]
+
+    listing = _encode(projects)
+    listing_name = _hashed_name('projects', listing)
+    files = {listing_name: listing}
+    case_studies = {}
+    for project in projects:
+        if not project['slug']:
+            continue
+        content = _encode(project)
+        name = _hashed_name(f"case-studies/{project['slug']}", content)
+        files[name] = content
+        case_studies[project['slug']] = name
+
+    index = {
+        'projects': listing_name,
+        'caseStudies': case_studies,
+    }
+    version = hashlib.md5(_encode(index)).hexdigest()[:HASH_LENGTH]
+    result = SnapshotResult(version=version, projects=len(projects))
+    for name, content in files.items():
+        if not (root / name).exists():
+            result.written.extend(_write(root / name, content))
+
+    previous = read_manifest() or {}
+    dropped = set()
+    if previous.get('version') != version:
+        manifest = _encode({'version': version, 'generatedAt': timezone.now(), **index})
+        result.written.extend(_write(root / MANIFEST_NAME, manifest))
+        dropped = _manifest_files(previous) - set(files)
+    result.removed = _prune(root, set(files), dropped, now)
+    return result
+
+
+def _manifest_files(manifest):
+    names = set(manifest.get('caseStudies', {}).values())
+    if manifest.get('projects'):
+        names.add(manifest['projects'])
+    return names
+
+
+def read_manifest():
+    """The manifest of the snapshot on disk, or None."""
+    try:
+        return json.loads((snapshot_root() / MANIFEST_NAME).read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def snapshot_changed(update_fields=None):
+    """
+    Rebuild the snapshot after the current transaction commits, if enabled
+    and the project fields saved (``update_fields``, None for all) are in it.
+    """
+    content_fields = {*FIELDS, 'is_active'} - {'created_at', 'updated_at'}
+    if update_fields is not None and not content_fields & set(update_fields):
+        return
+    if getattr(settings, 'PORTFOLIO_SNAPSHOT_ON_SAVE', False):
+        transaction.on_commit(build_snapshot)
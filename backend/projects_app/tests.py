@@ -1,3 +1,667 @@
-from django.test import TestCase
+import hashlib
+import io
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from importlib.util import find_spec
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
\ No newline at end of file
+from django.contrib.auth.models import AnonymousUser, User
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, connection, transaction
+from django.conf import settings
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from admin_dashboard.models import AdminSettings, SystemLog
+from backend.schema import schema
+from clients_app.models import Client
+from time_logs_app.models import TimeLog
+from .counters import recount
+from .forecast import burn_series, forecast
+from .images import fetch_original, process_images, refresh_project_images, responsive_image
+from .milestones import sweep_overdue_milestones, upcoming_deadlines
+from .models import ImageAsset, Project, ProjectFile, ProjectFileUpload, ProjectMilestone, ProjectTask
+from .ordering import ORDER_GAP, move_task, next_order, reorder_tasks
+from .schedule import ScheduleCycleError, check_dependencies, project_schedule
+from .slugs import project_by_slug, slug_cache
+from .snapshot import build_snapshot, read_manifest, snapshot_url
+from .uploads import (
+    assemble, blob_path, chunk_path, complete_upload, expire_uploads, file_storage, start_upload,
+)
+
+
+class TaskCounterTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('owner', password='x')
+        client = Client.objects.create(user=user, name='Acme', contact_email='a@acme.com')
+        self.project = Project.objects.create(user=user, client=client, title='Site')
+        self.milestone = ProjectMilestone.objects.create(project=self.project, title='Beta', due_date=date(2026, 5, 1))
+
+    def counters(self, obj):
+        obj.refresh_from_db()
+        return obj.total_tasks, obj.completed_tasks, obj.estimated_task_hours, obj.completed_task_hours
+
+    def test_counters_follow_task_changes(self):
+        first = ProjectTask.objects.create(project=self.project, milestone=self.milestone, title='A', estimated_hours=2)
+        second = ProjectTask.objects.create(project=self.project, title='B', estimated_hours=Decimal('1.5'))
+        self.assertEqual(self.counters(self.project), (2, 0, Decimal('3.50'), Decimal('0')))
+        self.assertEqual(self.counters(self.milestone), (1, 0, Decimal('2.00'), Decimal('0')))
+
+        first.status = 'COMPLETED'
+        first.save()
+        self.assertEqual(self.counters(self.project), (2, 1, Decimal('3.50'), Decimal('2.00')))
+        self.assertEqual(self.project.progress_percentage, 50)
+        self.assertEqual(self.counters(self.milestone), (1, 1, Decimal('2.00'), Decimal('2.00')))
+
+        # Moving a task to a milestone, from a partially loaded instance
+        task = ProjectTask.objects.only('id', 'milestone').get(pk=second.pk)
+        task.milestone = self.milestone
+        task.save()
+        self.assertEqual(self.counters(self.milestone), (2, 1, Decimal('3.50'), Decimal('2.00')))
+
+        # Saving an unchanged task issues no counter update
+        with self.assertNumQueries(1):
+            first.save()
+
+        ProjectTask.objects.get(pk=second.pk).delete()
+        self.assertEqual(self.counters(self.project), (1, 1, Decimal('2.00'), Decimal('2.00')))
+        self.assertEqual(self.project.progress_percentage, 100)
+        self.assertEqual(recount(fix=False), [])
+
+    def test_deleting_a_project_skips_its_task_counter_updates(self):
+        for title in 'ABCDE':
+            ProjectTask.objects.create(project=self.project, milestone=self.milestone, title=title)
+        other = Project.objects.create(user=self.project.user, client=self.project.client, title='Other')
+        kept = ProjectTask.objects.create(project=other, title='Kept', estimated_hours=1)
+
+        with CaptureQueriesContext(connection) as captured:
+            self.project.delete()
+        counter_updates = [
+            q['sql'] for q in captured
+            if q['sql'].startswith(('UPDATE "projects_app_project" ', 'UPDATE "projects_app_projectmilestone" '))
+        ]
+        self.assertEqual(counter_updates, [])
+
+        # Tasks of other projects are still counted
+        kept.delete()
+        self.assertEqual(self.counters(other), (0, 0, Decimal('0'), Decimal('0')))
+
+    def test_recount_reports_and_fixes_drift(self):
+        ProjectTask.objects.create(project=self.project, title='A', status='COMPLETED', estimated_hours=4)
+        Project.objects.filter(pk=self.project.pk).update(total_tasks=7)
+
+        self.assertEqual(recount(fix=False), [('project', self.project.pk, 'total_tasks', 7, 1)])
+        recount()
+        self.assertEqual(self.counters(self.project), (1, 1, Decimal('4.00'), Decimal('4.00')))
+        self.assertEqual(recount(fix=False), [])
+
+
+class TaskOrderingTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('owner', password='x')
+        client = Client.objects.create(user=user, name='Acme', contact_email='a@acme.com')
+        self.project = Project.objects.create(user=user, client=client, title='Site')
+        self.tasks = [
+            ProjectTask.objects.create(project=self.project, title=title, order=next_order(self.project.pk, 'TODO'))
+            for title in 'ABC'
+        ]
+
+    def column(self, status):
+        return list(
+            ProjectTask.objects.filter(project=self.project, status=status)
+            .order_by('order', 'created_at').values_list('title', flat=True)
+        )
+
+    def test_move_writes_one_row(self):
+        a, b, c = self.tasks
+        written = move_task(self.project, c.pk, after_id=a.pk)
+        self.assertEqual([task.pk for task in written], [c.pk])
+        self.assertEqual(self.column('TODO'), ['A', 'C', 'B'])
+        self.assertEqual(ProjectTask.objects.get(pk=c.pk).order, ORDER_GAP + ORDER_GAP // 2)
+
+        move_task(self.project, b.pk, status='COMPLETED')
+        self.assertEqual(self.column('TODO'), ['A', 'C'])
+        self.assertEqual(self.column('COMPLETED'), ['B'])
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.total_tasks, self.project.completed_tasks), (3, 1))
+
+    def test_column_is_renumbered_when_keys_run_out(self):
+        a, b, c = self.tasks
+        ProjectTask.objects.filter(pk=b.pk).update(order=a.order + 1)
+        written = move_task(self.project, c.pk, before_id=b.pk)
+        self.assertEqual(self.column('TODO'), ['A', 'C', 'B'])
+        self.assertEqual(len(written), 2)
+        self.assertEqual(
+            list(ProjectTask.objects.order_by('order').values_list('order', flat=True)),
+            [ORDER_GAP, 2 * ORDER_GAP, 3 * ORDER_GAP],
+        )
+
+    def test_reorder_list_into_another_column(self):
+        a, b, c = self.tasks
+        reorder_tasks(self.project, [c.pk, a.pk], status='IN_PROGRESS')
+        self.assertEqual(self.column('IN_PROGRESS'), ['C', 'A'])
+        self.assertEqual(self.column('TODO'), ['B'])
+        self.assertEqual(recount(fix=False), [])
+
+
+@override_settings(SCHEDULE_HOURS_PER_DAY=8)
+class ScheduleTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('owner', password='x')
+        client = Client.objects.create(user=user, name='Acme', contact_email='a@acme.com')
+        self.project = Project.objects.create(user=user, client=client, title='Site', start_date=date(2026, 3, 2))
+        self.milestone = ProjectMilestone.objects.create(project=self.project, title='Launch', due_date=date(2026, 3, 3))
+        self.a, self.b, self.c, self.d = (
+            ProjectTask.objects.create(project=self.project, title=title, estimated_hours=hours)
+            for title, hours in (('A', 8), ('B', 16), ('C', 4), ('D', 8))
+        )
+        self.b.depends_on.add(self.a)
+        self.c.depends_on.add(self.a)
+        self.d.depends_on.add(self.b, self.c)
+
+    def test_critical_path_and_dates(self):
+        schedule = project_schedule(self.project)
+        tasks = {task.title: task for task in schedule.tasks}
+        self.assertEqual(schedule.duration_hours, 32)
+        self.assertEqual(schedule.finish_date, date(2026, 3, 5))
+        self.assertEqual(schedule.critical_path, [self.a.pk, self.b.pk, self.d.pk])
+        self.assertEqual(tasks['C'].slack, 12)
+        self.assertEqual((tasks['B'].start_date, tasks['B'].end_date), (date(2026, 3, 3), date(2026, 3, 4)))
+
+        # Cached until a task changes
+        with self.assertNumQueries(0):
+            project_schedule(self.project)
+        self.c.milestone = self.milestone
+        self.c.save()
+        tasks = {task.title: task for task in project_schedule(self.project).tasks}
+        self.assertEqual(tasks['C'].latest_finish, 16)
+        self.assertEqual(project_schedule(self.project).milestones[0].is_late, False)
+
+    def test_cycles_are_rejected(self):
+        with self.assertRaises(ScheduleCycleError) as raised:
+            check_dependencies(self.a, [self.d.pk])
+        self.assertIn(raised.exception.titles, (['A', 'D', 'B', 'A'], ['A', 'D', 'C', 'A']))
+
+        self.a.depends_on.add(self.d)
+        with self.assertRaises(ScheduleCycleError):
+            project_schedule(self.project)
+
+
+@override_settings(FORECAST_WINDOW_DAYS=30, FORECAST_SMOOTHING=0.1)
+class ForecastTests(TestCase):
+    today = date(2026, 3, 31)
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='x')
+        client = Client.objects.create(user=self.user, name='Acme', contact_email='a@acme.com')
+        self.project = Project.objects.create(
+            user=self.user, client=client, title='Site', budget=1000, hourly_rate=50, estimated_hours=40
+        )
+
+    def log(self, days_ago, hours, rate=None):
+        start = datetime.combine(self.today - timedelta(days=days_ago), datetime.min.time(), dt_timezone.utc)
+        TimeLog.objects.create(
+            user=self.user, project=self.project, start_time=start.replace(hour=9),
+            duration_minutes=int(hours * 60), hourly_rate=rate,
+        )
+
+    def test_burn_rate_and_projected_dates(self):
+        self.log(10, 4)
+        self.log(2, 8, rate=25)
+        with self.assertNumQueries(1):
+            series = burn_series(self.user.pk, today=self.today)
+
+        result = forecast(self.project, series[self.project.pk], today=self.today)
+        self.assertEqual((result.logged_hours, result.cost, result.remaining_hours), (12, 400, 28))
+        self.assertFalse(result.is_over_budget)
+        self.assertGreater(result.burn_rate, 0)
+        self.assertGreater(result.over_budget_on, self.today)
+        self.assertGreater(result.completion_on, self.today)
+
+    def test_over_budget_date_is_when_the_budget_ran_out(self):
+        self.log(5, 12)
+        self.log(3, 12)
+        result = forecast(self.project, burn_series(self.user.pk, today=self.today)[self.project.pk], today=self.today)
+        self.assertTrue(result.is_over_budget)
+        self.assertEqual(result.over_budget_on, self.today - timedelta(days=3))
+
+    def test_project_without_logs(self):
+        result = forecast(self.project, None, today=self.today)
+        self.assertEqual((result.cost, result.remaining_hours, result.over_budget_on), (0, 40, None))
+
+    def test_only_the_owner_sees_the_forecast(self):
+        self.log(2, 8)
+        document = 'query ($id: ID!) { project(id: $id) { title totalCost burnRate remainingBudget } }'
+        for user, cost in ((self.user, 400), (AnonymousUser(), None)):
+            request = RequestFactory().post('/graphql/')
+            request.user = user
+            result = schema.execute(document, variables={'id': self.project.pk}, context_value=request)
+            self.assertIsNone(result.errors)
+            self.assertEqual(result.data['project']['title'], 'Site')
+            self.assertEqual(result.data['project']['totalCost'], cost)
+        self.assertIsNone(result.data['project']['burnRate'])
+        self.assertIsNone(result.data['project']['remainingBudget'])
+
+
+class ProjectSlugTests(TestCase):
+    def setUp(self):
+        slug_cache.clear()
+        self.user = User.objects.create_user('owner', password='x')
+        self.client_obj = Client.objects.create(user=self.user, name='Acme', contact_email='a@acme.com')
+
+    def create(self, title, **fields):
+        return Project.objects.create(user=self.user, client=self.client_obj, title=title, **fields)
+
+    def test_slugs_are_generated_without_collisions(self):
+        first = self.create('Brand Refresh')
+        second = self.create('Brand refresh!')
+        third = self.create('Other', slug='Brand Refresh')
+        self.assertEqual([first.slug, second.slug, third.slug], ['brand-refresh', 'brand-refresh-2', 'brand-refresh-3'])
+
+        # Saving a project with an unchanged slug needs no lookup (the
+        # queries are the UPDATE and its search document)
+        with self.assertNumQueries(2):
+            first.save()
+
+        # The index only covers active projects
+        Project.objects.filter(pk=second.pk).update(slug='shared', is_active=False)
+        Project.objects.filter(pk=third.pk).update(slug='shared')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Project.objects.filter(pk=first.pk).update(slug='shared')
+
+    def test_lookup_is_cached_and_invalidated(self):
+        project = self.create('Case Study')
+        self.assertEqual(project_by_slug('case-study'), project)
+        with self.assertNumQueries(1):
+            self.assertEqual(project_by_slug('case-study').client, self.client_obj)
+
+        project.slug = 'renamed'
+        project.save()
+        self.assertIsNone(project_by_slug('case-study'))
+        self.assertEqual(project_by_slug('renamed'), project)
+
+        # Changes made elsewhere (another process) are caught on fetch
+        Project.objects.filter(pk=project.pk).update(is_active=False)
+        self.assertIsNone(project_by_slug('renamed'))
+        self.assertEqual(len(slug_cache), 0)
+
+
+class PortfolioSnapshotTests(TestCase):
+    def setUp(self):
+        static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(static_root.cleanup)
+        self.enterContext(override_settings(
+            STATIC_ROOT=static_root.name, PORTFOLIO_SNAPSHOT_DIR='portfolio', PORTFOLIO_SNAPSHOT_RETENTION_HOURS=1
+        ))
+        self.root = Path(static_root.name) / 'portfolio'
+        user = User.objects.create_user('owner', password='x')
+        client = Client.objects.create(user=user, name='Acme', contact_email='a@acme.com')
+        self.project = Project.objects.create(
+            user=user, client=client, title='Sunrise', case_study={'startingPoint': 'Outdated packaging'}
+        )
+        Project.objects.create(user=user, client=client, title='Hidden', is_active=False)
+
+    def test_snapshot_files_are_content_addressed(self):
+        with self.assertNumQueries(1):
+            first = build_snapshot()
+        manifest = read_manifest()
+        listing = json.loads((self.root / manifest['projects']).read_text())
+        self.assertEqual([project['slug'] for project in listing], ['sunrise'])
+        self.assertEqual(list(manifest['caseStudies']), ['sunrise'])
+        self.assertTrue((self.root / (manifest['projects'] + '.gz')).exists())
+
+        # Unchanged data writes nothing
+        self.assertEqual(build_snapshot().written, [])
+
+        self.project.intro = 'Organic snacks'
+        self.project.save()
+        second = build_snapshot()
+        self.assertNotEqual(second.version, first.version)
+        self.assertTrue((self.root / manifest['projects']).exists())
+
+        # Dropped files are removed once their retention is over
+        build_snapshot(now=time.time() + 2 * 3600)
+        self.assertFalse((self.root / manifest['projects']).exists())
+
+    def test_files_written_after_startup_are_served(self):
+        self.client.get('/')
+        build_snapshot()
+        manifest = self.client.get(snapshot_url())
+        self.assertEqual(manifest.status_code, 200)
+        self.assertNotIn('immutable', manifest.headers.get('Cache-Control', ''))
+
+        listing = self.client.get(snapshot_url(read_manifest()['projects']), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(listing.status_code, 200)
+        self.assertEqual(listing.headers['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', listing.headers['Cache-Control'])
+
+
+@override_settings(IMAGE_DERIVATIVE_WIDTHS=[320, 640], IMAGE_DERIVATIVE_FORMATS=['avif', 'webp'])
+class ProjectImageTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        user = User.objects.create_user('owner', password='x')
+        self.client_obj = Client.objects.create(user=user, name='Acme', contact_email='a@acme.com')
+        self.user = user
+
+    def upload(self, name, content):
+        return settings.MEDIA_URL + default_storage.save(name, ContentFile(content))
+
+    def test_originals_processed_under_another_url_are_reused(self):
+        url = self.upload('logos/copy.png', b'same original')
+        variants = [{'format': 'webp', 'width': 320, 'height': 160, 'path': 'images/derivatives/ab/ab/320w.webp'}]
+        ImageAsset.objects.create(
+            source_url='https://cdn.example.com/logo.png', source_hash=hashlib.sha256(b'same original').hexdigest(),
+            width=640, height=320, variants=variants, processed_at=timezone.now(),
+        )
+        project = Project.objects.create(user=self.user, client=self.client_obj, title='Site', logo=url)
+
+        self.assertEqual(refresh_project_images(), (0, 1, 0))
+        project.refresh_from_db()
+        image = responsive_image(project, project.logo)
+        self.assertEqual((image['width'], image['height']), (640, 320))
+        self.assertEqual(image['srcset'], f"{settings.MEDIA_URL}images/derivatives/ab/ab/320w.webp 320w")
+
+        # Processed URLs are not fetched again
+        default_storage.delete(url[len(settings.MEDIA_URL):])
+        self.assertEqual(refresh_project_images(), (0, 0, 0))
+
+    @override_settings(PORTFOLIO_SNAPSHOT_ON_SAVE=True)
+    def test_refresh_writes_projects_in_bulk_and_rebuilds_the_snapshot_once(self):
+        url = 'https://cdn.example.com/logo.png'
+        ImageAsset.objects.create(
+            source_url=url, source_hash='ab' * 32, width=640, height=320, processed_at=timezone.now(),
+            variants=[{'format': 'webp', 'width': 320, 'height': 160, 'path': 'images/derivatives/ab/ab/320w.webp'}],
+        )
+        for n in range(3):
+            Project.objects.create(user=self.user, client=self.client_obj, title=f'Site {n}', logo=url)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            refresh_project_images()
+        self.assertEqual([callback.__name__ for callback in callbacks], ['build_snapshot'])
+        self.assertEqual(
+            [set(images) for images in Project.objects.values_list('images', flat=True)], [{url}] * 3
+        )
+
+    def test_originals_on_private_addresses_are_not_fetched(self):
+        requests = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                requests.append(self.path)
+                self.send_response(200)
+                self.end_headers()
+                self.wfile.write(b'internal')
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        with self.assertRaisesMessage(Exception, 'non-public address 127.0.0.1'):
+            fetch_original(f'http://127.0.0.1:{server.server_port}/logo.png')
+        self.assertEqual(requests, [])
+
+    @override_settings(IMAGE_RETRY_SECONDS=60, IMAGE_RETRY_MAX_SECONDS=100)
+    def test_failed_originals_are_retried_with_a_growing_delay(self):
+        url = 'ftp://cdn.example.com/logo.png'
+        self.assertEqual(process_images([url]), (0, 0, 1))
+        asset = ImageAsset.objects.get()
+        self.assertEqual((asset.error, asset.failures), (f"Unsupported image URL: {url}", 1))
+        self.assertAlmostEqual(asset.retry_at, timezone.now() + timedelta(seconds=60), delta=timedelta(seconds=5))
+
+        # Not retried before it is due, then with a longer delay
+        self.assertEqual(process_images([url]), (0, 0, 0))
+        ImageAsset.objects.update(retry_at=timezone.now())
+        self.assertEqual(process_images([url]), (0, 0, 1))
+        asset.refresh_from_db()
+        self.assertEqual(asset.failures, 2)
+        self.assertAlmostEqual(asset.retry_at, timezone.now() + timedelta(seconds=100), delta=timedelta(seconds=5))
+
+    @unittest.skipUnless(find_spec('PIL'), 'Pillow is not installed')
+    def test_derivatives_are_generated_for_each_width(self):
+        from PIL import Image
+
+        original = io.BytesIO()
+        Image.new('RGB', (800, 400), 'orange').save(original, format='PNG')
+        project = Project.objects.create(
+            user=self.user, client=self.client_obj, title='Site',
+            case_study={'visuals': {'hero': self.upload('visuals/hero.png', original.getvalue())}},
+        )
+        self.assertEqual(refresh_project_images(), (1, 0, 0))
+        project.refresh_from_db()
+        image = responsive_image(project, project.case_study['visuals']['hero'])
+        self.assertEqual(
+            sorted({(v['width'], v['height']) for v in image['variants']}), [(320, 160), (640, 320)]
+        )
+        self.assertEqual(image['sources'][-1]['type'], 'image/webp')
+        for variant in ImageAsset.objects.get().variants:
+            self.assertTrue(default_storage.exists(variant['path']))
+
+
+class ProjectFileUploadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(
+            UPLOAD_CHUNK_SIZE=4,
+            PROJECT_FILE_STORAGE={
+                'BACKEND': 'django.core.files.storage.FileSystemStorage',
+                'OPTIONS': {'location': media_root},
+            },
+        ))
+        self.user = User.objects.create_user('owner', password='x')
+        client = Client.objects.create(user=self.user, name='Acme', contact_email='a@acme.com')
+        self.project = Project.objects.create(user=self.user, client=client, title='Site')
+
+    def start(self, content, sha256=None):
+        return start_upload(
+            self.project, self.user, title='Brief', file_name='brief.txt', file_type='DOCUMENT',
+            file_size=len(content), sha256=sha256 or hashlib.sha256(content).hexdigest(),
+        )
+
+    def put(self, upload, index, data):
+        return self.client.put(
+            f'/uploads/{upload.pk}/chunks/{index}', data, content_type='application/octet-stream'
+        )
+
+    def test_chunks_are_assembled_into_a_shared_file(self):
+        content = b'0123456789'
+        upload = self.start(content)
+        self.assertEqual(upload.total_chunks, 3)
+
+        self.assertEqual(self.put(upload, 0, content[:4]).json()['receivedChunks'], 1)
+        # A chunk sent again is acknowledged; one out of order is not
+        self.assertEqual(self.put(upload, 0, content[:4]).json()['receivedChunks'], 1)
+        self.assertEqual(self.put(upload, 2, content[8:]).status_code, 409)
+        self.assertEqual(self.put(upload, 1, content[4:7]).status_code, 400)
+        self.put(upload, 1, content[4:8])
+        self.put(upload, 2, content[8:])
+
+        upload.refresh_from_db()
+        self.assertEqual(complete_upload(upload).status, 'ASSEMBLING')
+        upload = assemble(upload.pk)
+        self.assertEqual(upload.status, 'COMPLETE')
+        self.assertEqual(upload.file.file_path, blob_path(upload.sha256))
+        storage = file_storage()
+        with storage.open(upload.file.file_path) as f:
+            self.assertEqual(f.read(), content)
+        self.assertFalse(storage.exists(chunk_path(upload, 0)))
+
+        # The same content again is not transferred
+        again = self.start(content)
+        self.assertEqual(again.status, 'COMPLETE')
+        self.assertEqual(again.file.file_path, upload.file.file_path)
+        self.assertEqual(ProjectFile.objects.count(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            upload.file.delete()
+        self.assertTrue(storage.exists(again.file.file_path))
+        with self.captureOnCommitCallbacks(execute=True):
+            again.file.delete()
+        self.assertFalse(storage.exists(again.file.file_path))
+
+    def test_content_not_matching_its_hash_fails(self):
+        upload = self.start(b'abcd', sha256='0' * 64)
+        self.put(upload, 0, b'abcd')
+        upload.refresh_from_db()
+        complete_upload(upload)
+        upload = assemble(upload.pk)
+        self.assertEqual(upload.status, 'FAILED')
+        self.assertFalse(ProjectFile.objects.exists())
+        self.assertFalse(file_storage().exists(blob_path('0' * 64)))
+
+    def test_stored_content_is_only_linked_for_its_owner(self):
+        content = b'secret'
+        upload = self.start(content)
+        self.put(upload, 0, content[:4])
+        self.put(upload, 1, content[4:])
+        upload.refresh_from_db()
+        complete_upload(upload)
+        assemble(upload.pk)
+
+        other = User.objects.create_user('other', password='x')
+        theirs = start_upload(
+            self.project, other, title='Brief', file_name='brief.txt', file_type='DOCUMENT',
+            file_size=len(content), sha256=hashlib.sha256(content).hexdigest(),
+        )
+        self.assertEqual(theirs.status, 'UPLOADING')
+        self.assertIsNone(theirs.file)
+
+        # Sending other bytes under the stored hash does not link the stored file
+        self.put(theirs, 0, b'junk')
+        self.put(theirs, 1, b'!!')
+        theirs.refresh_from_db()
+        complete_upload(theirs)
+        theirs = assemble(theirs.pk)
+        self.assertEqual(theirs.status, 'FAILED')
+        self.assertFalse(ProjectFile.objects.filter(user=other).exists())
+        with file_storage().open(blob_path(upload.sha256)) as f:
+            self.assertEqual(f.read(), content)
+
+        # The same bytes are verified and linked
+        again = start_upload(
+            self.project, other, title='Brief', file_name='brief.txt', file_type='DOCUMENT',
+            file_size=len(content), sha256=hashlib.sha256(content).hexdigest(),
+        )
+        self.put(again, 0, content[:4])
+        self.put(again, 1, content[4:])
+        again.refresh_from_db()
+        complete_upload(again)
+        again = assemble(again.pk)
+        self.assertEqual(again.status, 'COMPLETE')
+        self.assertEqual(again.file.file_path, blob_path(upload.sha256))
+
+    def test_abandoned_assemblies_are_expired_with_their_chunks(self):
+        upload = self.start(b'abcdefgh')
+        self.put(upload, 0, b'abcd')
+        self.put(upload, 1, b'efgh')
+        upload.refresh_from_db()
+        complete_upload(upload)
+        storage = file_storage()
+        self.assertTrue(storage.exists(chunk_path(upload, 1)))
+
+        # Still within the assembly window
+        self.assertEqual(expire_uploads(), 0)
+        self.assertEqual(expire_uploads(now=timezone.now() + timedelta(hours=3)), 1)
+        self.assertFalse(ProjectFileUpload.objects.exists())
+        self.assertFalse(storage.exists(chunk_path(upload, 0)))
+        self.assertFalse(storage.exists(chunk_path(upload, 1)))
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class MilestoneDeadlineTests(TestCase):
+    today = date(2026, 3, 10)
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', email='owner@example.com', password='x')
+        client = Client.objects.create(user=self.user, name='Acme', contact_email='a@acme.com')
+        self.project = Project.objects.create(user=self.user, client=client, title='Site')
+
+    def milestone(self, days, **kwargs):
+        return ProjectMilestone.objects.create(
+            project=self.project, title=f'Due in {days}', due_date=self.today + timedelta(days=days), **kwargs
+        )
+
+    def test_past_due_milestones_are_marked_overdue_once(self):
+        late = self.milestone(-3, status='IN_PROGRESS')
+        done = self.milestone(-3, is_completed=True)
+        upcoming = self.milestone(0)
+
+        self.assertEqual(sweep_overdue_milestones(today=self.today), 1)
+        self.assertEqual(
+            dict(ProjectMilestone.objects.values_list('id', 'status')),
+            {late.id: 'OVERDUE', done.id: 'PENDING', upcoming.id: 'PENDING'},
+        )
+        log = SystemLog.objects.get(metadata__event='milestone_status_changed')
+        self.assertEqual(log.related_project_id, self.project.id)
+        self.assertEqual(log.metadata['from_status'], 'IN_PROGRESS')
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('1 milestone overdue', mail.outbox[0].subject)
+        self.assertIn('Site: Due in -3', mail.outbox[0].body)
+
+        self.assertEqual(sweep_overdue_milestones(today=self.today), 0)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_rescheduled_milestones_are_no_longer_overdue(self):
+        edited = self.milestone(-3)
+        moved = self.milestone(-2, completed_tasks=1)
+        self.assertEqual(sweep_overdue_milestones(today=self.today), 2)
+
+        # Rescheduled through the API: reopened at once
+        request = RequestFactory().post('/graphql/')
+        request.user = self.user
+        with mock.patch('django.utils.timezone.localdate', return_value=self.today):
+            result = schema.execute(
+                'mutation($id: ID!, $date: Date!) { updateProjectMilestone(id: $id, input: '
+                '{title: "Due later", dueDate: $date, status: "OVERDUE"}) { milestone { status } } }',
+                variables={'id': edited.id, 'date': (self.today + timedelta(days=5)).isoformat()},
+                context_value=request,
+            )
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['updateProjectMilestone']['milestone']['status'], 'PENDING')
+
+        # Rescheduled any other way: reopened by the next sweep
+        ProjectMilestone.objects.filter(pk=moved.pk).update(due_date=self.today)
+        self.assertEqual(sweep_overdue_milestones(today=self.today), 0)
+        moved.refresh_from_db()
+        self.assertEqual(moved.status, 'IN_PROGRESS')
+        log = SystemLog.objects.get(metadata__event='milestone_status_changed', metadata__to_status='IN_PROGRESS')
+        self.assertEqual(log.metadata['milestone_id'], moved.id)
+
+    def test_owners_who_opted_out_are_not_emailed(self):
+        AdminSettings.objects.create(user=self.user, project_updates=False)
+        self.milestone(-1)
+        self.assertEqual(sweep_overdue_milestones(today=self.today), 1)
+        self.assertEqual(mail.outbox, [])
+
+    def test_upcoming_deadlines(self):
+        late = self.milestone(-2)
+        soon = self.milestone(3)
+        self.milestone(30)
+        self.milestone(1, is_completed=True)
+        other = User.objects.create_user('other', password='x')
+        Project.objects.create(user=other, client=self.project.client, title='Other').milestones.create(
+            title='Theirs', due_date=self.today
+        )
+
+        with self.assertNumQueries(1):
+            deadlines = list(upcoming_deadlines(self.user, days=7, today=self.today))
+            self.assertEqual([(m, m.project) for m in deadlines], [(late, self.project), (soon, self.project)])
+        self.assertEqual(list(upcoming_deadlines(self.user, days=7, limit=1, today=self.today)), [late])
@@ -0,0 +1,346 @@
+# projects_app/uploads.py
+
+"""
+Chunked, resumable uploads of project files.
+
+An upload starts with ``start_upload`` (the ``startProjectFileUpload``
+mutation), which records the file's name, size and SHA-256 in a
+ProjectFileUpload session. If the same user already stored a file with
+that hash, the new ProjectFile points at it and nothing is transferred;
+another user's file is never linked on the strength of a hash alone, so
+knowing a hash does not grant its content. Otherwise
+the client PUTs the file in ``UPLOAD_CHUNK_SIZE`` chunks, in order, to
+``/uploads/<session id>/chunks/<index>`` (``receive_chunk``); the random
+session id is the upload's credential. A chunk already received is
+acknowledged again, so an interrupted client resumes from the session's
+``received_chunks``. Each chunk is streamed from the request to storage
+in small blocks, so no request holds more than a block in memory nor
+takes longer than one chunk's transfer.
+
+``complete_upload`` assembles the chunks on a background thread by
+streaming their concatenation into the file's content-addressed path
+(``<hash[:2]>/<hash>``), computing the SHA-256 on the way; a mismatch
+fails the upload. When that path is already stored the chunks are still
+read and hashed, just not stored again. Files live in the ``PROJECT_FILE_STORAGE`` storage:
+Django's file system storage by default, or any django-storages backend.
+Stored files are shared by every ProjectFile with their hash and deleted
+with the last one.
+
+``expire_uploads`` deletes unfinished sessions past their expiry, and
+sessions still ASSEMBLING ``UPLOAD_ASSEMBLY_HOURS`` after completion (their
+worker died mid-assembly), together with their chunks.
+"""
+
+import hashlib
+import io
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import storages
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models import F, Q
+from django.dispatch import receiver
+from django.utils import timezone
+
+from admin_dashboard.log_buffer import log_event
+from .models import ProjectFile, ProjectFileUpload
+
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_MAX_SIZE = 20 * 1024 ** 3
+DEFAULT_SESSION_HOURS = 24
+DEFAULT_ASSEMBLY_HOURS = 2
+BLOCK_SIZE = 256 * 1024
+
+
+class UploadError(Exception):
+    """A request the upload session cannot accept; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+_storage = None
+
+
+def file_storage():
+    """The storage project files are uploaded to (``PROJECT_FILE_STORAGE``)."""
+    global _storage
+    if _storage is None:
+        _storage = storages.create_storage(settings.PROJECT_FILE_STORAGE)
+    return _storage
+
+
+@receiver(setting_changed, dispatch_uid='project_file_storage_changed')
+def _reset_storage(setting, **kwargs):
+    global _storage
+    if setting == 'PROJECT_FILE_STORAGE':
+        _storage = None
+
+
+def blob_path(sha256):
+    return f"{sha256[:2]}/{sha256}"
+
+
+def chunk_path(upload, index):
+    return f"uploads/{upload.pk}/{index:06d}"
+
+
+class _RequestReader(io.RawIOBase):
+    """Reads ``length`` bytes of a request body in blocks, hashing them."""
+
+    def __init__(self, stream, length):
+        self.stream = stream
+        self.remaining = length
+        self.digest = hashlib.sha256()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.remaining, BLOCK_SIZE)
+        data = self.stream.read(size) if size else b''
+        if size and not data:
+            raise UploadError("The chunk ended early.")
+        self.remaining -= len(data)
+        self.digest.update(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class _ChunkReader(io.RawIOBase):
+    """Reads stored chunks one after another, hashing the concatenation."""
+
+    def __init__(self, storage, names):
+        self.storage = storage
+        self.names = list(names)
+        self.current = None
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while True:
+            if self.current is None:
+                if not self.names:
+                    return 0
+                self.current = self.storage.open(self.names.pop(0), 'rb')
+            data = self.current.read(min(len(buffer), BLOCK_SIZE))
+            if data:
+                self.digest.update(data)
+                self.size += len(data)
+                buffer[:len(data)] = data
+                return len(data)
+            self.current.close()
+            self.current = None
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+        super().close()
+
+
+def _chunk_size():
+    return getattr(settings, 'UPLOAD_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+@transaction.atomic
+def start_upload(project, user, *, title, file_name, file_type, file_size, sha256):
+    """
+    Open an upload session for a file of ``file_size`` bytes with hash
+    ``sha256``. When ``user`` already stored a file with that hash, the
+    session is complete at once and its ``file`` is the new ProjectFile.
+    """
+    sha256 = sha256.lower()
+    if len(sha256) != 64 or any(c not in '0123456789abcdef' for c in sha256):
+        raise Exception("sha256 must be 64 hexadecimal digits.")
+    if file_size < 0 or file_size > getattr(settings, 'PROJECT_FILE_MAX_SIZE', DEFAULT_MAX_SIZE):
+        raise Exception("File size is out of range.")
+    if file_type not in dict(ProjectFile.FILE_TYPE_CHOICES):
+        raise Exception(f"Invalid file type: {file_type}")
+
+    chunk_size = _chunk_size()
+    upload = ProjectFileUpload(
+        project=project, user=user, title=title, file_name=file_name, file_type=file_type,
+        file_size=file_size, sha256=sha256, chunk_size=chunk_size,
+        total_chunks=max(1, math.ceil(file_size / chunk_size)),
+        expires_at=timezone.now() + timedelta(hours=getattr(settings, 'UPLOAD_SESSION_HOURS', DEFAULT_SESSION_HOURS)),
+    )
+    stored = (
+        ProjectFile.objects.filter(user=user, sha256=sha256, file_size=file_size).exclude(file_path='').first()
+    )
+    if stored is not None:
+        upload.file = ProjectFile.objects.create(
+            project=project, user=user, title=title, file_name=file_name, file_type=file_type,
+            file_path=stored.file_path, file_size=file_size, sha256=sha256,
+        )
+        upload.status = 'COMPLETE'
+        upload.received_chunks = upload.total_chunks
+        upload.received_bytes = file_size
+    upload.save()
+    return upload
+
+
+def receive_chunk(upload_id, index, stream, length, chunk_sha256=None):
+    """
+    Store chunk ``index`` of an upload from ``stream`` (``length`` bytes).
+    Chunks must arrive in order; one already received is acknowledged
+    again. Returns the session. Raises UploadError.
+    """
+    upload = ProjectFileUpload.objects.filter(pk=upload_id).first()
+    if upload is None or upload.expires_at < timezone.now():
+        raise UploadError("Upload not found.", status=404)
+    if index < upload.received_chunks:
+        return upload
+    if upload.status != 'UPLOADING':
+        raise UploadError(f"Upload is {upload.status.lower()}.", status=409)
+    if index != upload.received_chunks:
+        raise UploadError(f"Expected chunk {upload.received_chunks}.", status=409)
+    expected = min(upload.chunk_size, upload.file_size - index * upload.chunk_size)
+    if length != expected:
+        raise UploadError(f"Chunk {index} must be {expected} bytes.")
+
+    storage = file_storage()
+    name = chunk_path(upload, index)
+    if storage.exists(name):
+        # Left by an attempt that failed before it was recorded
+        storage.delete(name)
+    reader = _RequestReader(stream, length)
+    saved = storage.save(name, File(io.BufferedReader(reader, BLOCK_SIZE), name=name))
+    if chunk_sha256 and reader.digest.hexdigest() != chunk_sha256.lower():
+        storage.delete(saved)
+        raise UploadError(f"Chunk {index} does not match its SHA-256.")
+
+    updated = ProjectFileUpload.objects.filter(pk=upload.pk, received_chunks=index, status='UPLOADING').update(
+        received_chunks=F('received_chunks') + 1,
+        received_bytes=F('received_bytes') + length,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        # The same chunk was received concurrently
+        raise UploadError(f"Chunk {index} was already received.", status=409)
+    upload.refresh_from_db()
+    return upload
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'UPLOAD_ASSEMBLY_WORKERS', 2),
+                thread_name_prefix='upload-assembly',
+            )
+        return _executor
+
+
+def complete_upload(upload):
+    """
+    Assemble an upload whose chunks have all been received, on the
+    assembly pool once the current transaction commits. Returns the
+    session, now ASSEMBLING (or as it was, if already past uploading).
+    """
+    if upload.status != 'UPLOADING':
+        return upload
+    if upload.received_chunks < upload.total_chunks:
+        raise Exception(f"Only {upload.received_chunks} of {upload.total_chunks} chunks were received.")
+    if ProjectFileUpload.objects.filter(pk=upload.pk, status='UPLOADING').update(
+        status='ASSEMBLING', updated_at=timezone.now()
+    ):
+        transaction.on_commit(lambda: get_executor().submit(assemble, upload.pk))
+    upload.refresh_from_db()
+    return upload
+
+
+def _delete_chunks(storage, upload):
+    for index in range(upload.total_chunks):
+        name = chunk_path(upload, index)
+        if storage.exists(name):
+            storage.delete(name)
+
+
+def assemble(upload_id):
+    """Concatenate an upload's chunks into its content-addressed file and create the ProjectFile."""
+    upload = ProjectFileUpload.objects.select_related('project').get(pk=upload_id)
+    storage = file_storage()
+    path = blob_path(upload.sha256)
+    try:
+        reader = _ChunkReader(storage, (chunk_path(upload, i) for i in range(upload.total_chunks)))
+        stored = storage.exists(path)
+        if stored:
+            # The content is stored already: hash the chunks without storing
+            # them, so a claimed hash never links someone else's file
+            with reader:
+                while reader.read(BLOCK_SIZE):
+                    pass
+            saved = path
+        else:
+            content = File(io.BufferedReader(reader, BLOCK_SIZE), name=path)
+            content.size = upload.file_size
+            saved = storage.save(path, content)
+        if reader.digest.hexdigest() != upload.sha256 or reader.size != upload.file_size:
+            if not stored:
+                storage.delete(saved)
+            raise Exception("The uploaded file does not match its SHA-256.")
+        if saved != path:
+            # Another upload stored the same content first
+            storage.delete(saved)
+        with transaction.atomic():
+            upload.file = ProjectFile.objects.create(
+                project=upload.project, user_id=upload.user_id, title=upload.title, file_name=upload.file_name,
+                file_type=upload.file_type, file_path=path, file_size=upload.file_size, sha256=upload.sha256,
+            )
+            upload.status = 'COMPLETE'
+            upload.save(update_fields=['file', 'status', 'updated_at'])
+    except Exception as e:
+        upload.status = 'FAILED'
+        upload.error = str(e)
+        upload.save(update_fields=['status', 'error', 'updated_at'])
+        log_event(
+            level='ERROR',
+            message=f'Upload {upload.pk} of {upload.file_name} failed: {e}',
+            category='system',
+            user_id=upload.user_id,
+        )
+    finally:
+        _delete_chunks(storage, upload)
+    return upload
+
+
+def release_file(file_obj):
+    """Delete the stored content of a deleted ProjectFile unless another one shares it."""
+    if not file_obj.sha256 or ProjectFile.objects.filter(sha256=file_obj.sha256).exists():
+        return
+    storage = file_storage()
+    if storage.exists(file_obj.file_path):
+        storage.delete(file_obj.file_path)
+
+
+def expire_uploads(now=None):
+    """
+    Delete the sessions (and chunks) of uploads that expired unfinished or
+    whose assembly was abandoned. Returns how many.
+    """
+    now = now or timezone.now()
+    assembly_hours = getattr(settings, 'UPLOAD_ASSEMBLY_HOURS', DEFAULT_ASSEMBLY_HOURS)
+    storage = file_storage()
+    expired = list(ProjectFileUpload.objects.filter(
+        Q(expires_at__lt=now, status__in=['UPLOADING', 'FAILED'])
+        | Q(status='ASSEMBLING', updated_at__lt=now - timedelta(hours=assembly_hours))
+    ))
+    for upload in expired:
+        _delete_chunks(storage, upload)
+    ProjectFileUpload.objects.filter(pk__in=[upload.pk for upload in expired]).delete()
+    return len(expired)
@@ -1,3 +1,32 @@
-from django.shortcuts import render
+# projects_app/views.py
 
-# Create your views here.
\ No newline at end of file
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from .uploads import UploadError, receive_chunk
+
+
+def upload_state(upload):
+    return {
+        'id': str(upload.pk),
+        'status': upload.status,
+        'receivedChunks': upload.received_chunks,
+        'receivedBytes': upload.received_bytes,
+        'totalChunks': upload.total_chunks,
+    }
+
+
+@csrf_exempt
+@require_http_methods(['PUT'])
+def upload_chunk(request, upload_id, index):
+    """
+    Receive one chunk of a project file upload (see projects_app.uploads).
+    The body is streamed to storage, never read into memory at once.
+    """
+    try:
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+        upload = receive_chunk(upload_id, index, request, length, request.headers.get('X-Chunk-SHA256'))
+    except UploadError as e:
+        return JsonResponse({'error': str(e)}, status=e.status)
+    return JsonResponse(upload_state(upload))
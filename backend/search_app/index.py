@@ -0,0 +1,212 @@
+# search_app/index.py
+
+"""
+Full-text search over clients, projects, inquiries and notes.
+
+Every indexed row has a SearchDocument holding its title and body text.
+Signals upsert or delete the document when the row is saved or deleted;
+``rebuild`` re-creates the documents of rows written without signals
+(``bulk_create``, ``QuerySet.update``). The database does the indexing:
+
+- PostgreSQL: ``search_vector`` is a generated tsvector column (title
+  weighted above body) with a GIN index, queried with ``to_tsquery`` and
+  ranked with ``ts_rank``.
+- SQLite: an external-content FTS5 table kept in sync with the documents by
+  triggers, queried with MATCH and ranked with ``bm25``.
+
+Every word of the query must match, and each word also matches as a prefix
+("acm" finds "Acme").
+"""
+
+import re
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import SearchDocument
+
+
+DOCUMENT_TABLE = SearchDocument._meta.db_table
+FTS_TABLE = f"{DOCUMENT_TABLE}_fts"
+PG_CONFIG = 'english'
+MAX_TERMS = 10
+DEFAULT_LIMIT = 20
+REBUILD_CHUNK_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class Source:
+    model: str
+    title_fields: tuple
+    body_fields: tuple
+
+    @property
+    def fields(self):
+        return set(self.title_fields) | set(self.body_fields)
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+
+SOURCES = {
+    'client': Source('clients_app.Client', ('name',), ('company', 'contact_email', 'notes')),
+    'project': Source('projects_app.Project', ('title',), ('description',)),
+    'inquiry': Source('inquiries.Inquiry', ('client_name', 'client_company'), ('client_email', 'message', 'notes')),
+    'client_note': Source('clients_app.ClientNote', ('title',), ('content',)),
+    'project_note': Source('projects_app.ProjectNote', ('title',), ('content',)),
+}
+
+
+def _join(values):
+    return ' '.join(str(value) for value in values if value)
+
+
+def _document(kind, pk, user_id, values):
+    source = SOURCES[kind]
+    title_count = len(source.title_fields)
+    return SearchDocument(
+        kind=kind,
+        object_id=pk,
+        user_id=user_id,
+        title=_join(values[:title_count])[:255],
+        body=_join(values[title_count:]),
+    )
+
+
+def _upsert(documents):
+    SearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=['kind', 'object_id'],
+        update_fields=['user', 'title', 'body'],
+    )
+
+
+def index_objects(kind, objects):
+    """Create or refresh the search documents of ``objects`` in one statement."""
+    source = SOURCES[kind]
+    fields = source.title_fields + source.body_fields
+    documents = [
+        _document(kind, obj.pk, obj.user_id, [getattr(obj, field) for field in fields])
+        for obj in objects
+    ]
+    if documents:
+        _upsert(documents)
+
+
+def remove_objects(kind, pks):
+    SearchDocument.objects.filter(kind=kind, object_id__in=pks).delete()
+
+
+def rebuild(kinds=None):
+    """Re-create the search documents of every row of ``kinds`` (default: all). Returns the count."""
+    total = 0
+    for kind in kinds or SOURCES:
+        source = SOURCES[kind]
+        model = source.get_model()
+        SearchDocument.objects.filter(kind=kind).exclude(
+            object_id__in=model._base_manager.values('pk')
+        ).delete()
+
+        rows = model._base_manager.values_list(
+            'pk', 'user_id', *source.title_fields, *source.body_fields
+        ).iterator(chunk_size=REBUILD_CHUNK_SIZE)
+        chunk = []
+        for pk, user_id, *values in rows:
+            chunk.append(_document(kind, pk, user_id, values))
+            if len(chunk) >= REBUILD_CHUNK_SIZE:
+                _upsert(chunk)
+                total += len(chunk)
+                chunk = []
+        if chunk:
+            _upsert(chunk)
+            total += len(chunk)
+    return total
+
+
+# --- Querying ---
+
+def _terms(text):
+    return re.findall(r'\w+', (text or '').lower())[:MAX_TERMS]
+
+
+def _match_expression(text):
+    """The backend's full-text query for ``text`` (each word as a prefix), or None."""
+    terms = _terms(text)
+    if not terms:
+        return None
+    if connection.vendor == 'postgresql':
+        return ' & '.join(f"{term}:*" for term in terms)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _match_sql():
+    """SQL (one ``%s`` param: the match expression) selecting ids of matching documents."""
+    if connection.vendor == 'postgresql':
+        return f"SELECT id FROM {DOCUMENT_TABLE} WHERE search_vector @@ to_tsquery('{PG_CONFIG}', %s)"
+    return f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+
+
+def matching_ids(kind, text):
+    """
+    Subquery of the ids of ``kind`` rows matching ``text``, for ``pk__in`` filters.
+
+    Returns None when ``text`` has no searchable words.
+    """
+    match = _match_expression(text)
+    if match is None:
+        return None
+    return RawSQL(
+        f"SELECT object_id FROM {DOCUMENT_TABLE} WHERE kind = %s AND id IN ({_match_sql()})",
+        [kind, match],
+    )
+
+
+def search(user, text, kinds=None, limit=DEFAULT_LIMIT):
+    """
+    Return up to ``limit`` of ``user``'s documents matching ``text``, best first.
+
+    Each result is a dict with kind, object_id, title, snippet and rank
+    (higher is better).
+    """
+    match = _match_expression(text)
+    if match is None or limit <= 0:
+        return []
+
+    params = [match, user.pk]
+    kind_filter = ''
+    if kinds:
+        kind_filter = f"AND d.kind IN ({', '.join(['%s'] * len(kinds))})"
+        params += list(kinds)
+    params.append(limit)
+
+    if connection.vendor == 'postgresql':
+        sql = f"""
+            SELECT d.kind, d.object_id, d.title,
+                   ts_headline('{PG_CONFIG}', d.body, q.query, 'StartSel=[, StopSel=], MaxWords=20, MinWords=5'),
+                   ts_rank(d.search_vector, q.query) AS rank
+            FROM {DOCUMENT_TABLE} d, to_tsquery('{PG_CONFIG}', %s) AS q(query)
+            WHERE d.search_vector @@ q.query AND d.user_id = %s {kind_filter}
+            ORDER BY rank DESC, d.id DESC
+            LIMIT %s
+        """
+    else:
+        # bm25() is lower for better matches; titles weigh 10x the body
+        sql = f"""
+            SELECT d.kind, d.object_id, d.title,
+                   snippet({FTS_TABLE}, 1, '[', ']', '...', 12),
+                   -bm25({FTS_TABLE}, 10.0, 1.0) AS rank
+            FROM {FTS_TABLE} JOIN {DOCUMENT_TABLE} d ON d.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH %s AND d.user_id = %s {kind_filter}
+            ORDER BY rank DESC, d.id DESC
+            LIMIT %s
+        """
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [
+            {'kind': kind, 'object_id': object_id, 'title': title, 'snippet': snippet, 'rank': rank}
+            for kind, object_id, title, snippet, rank in cursor.fetchall()
+        ]
@@ -0,0 +1,20 @@
+# search_app/management/commands/rebuild_search_index.py
+
+from django.core.management.base import BaseCommand
+from search_app.index import SOURCES, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search documents from the indexed models'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind',
+            action='append',
+            choices=sorted(SOURCES),
+            help='Only rebuild this kind of document (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild(options['kind'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} documents"))
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("client", "Client"),
+                            ("project", "Project"),
+                            ("inquiry", "Inquiry"),
+                            ("client_note", "Client Note"),
+                            ("project_note", "Project Note"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("object_id", models.BigIntegerField()),
+                ("title", models.CharField(max_length=255)),
+                ("body", models.TextField(blank=True, default="")),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_documents",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Search Document",
+                "verbose_name_plural": "Search Documents",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("kind", "object_id"), name="unique_search_document"
+                    )
+                ],
+            },
+        ),
+    ]
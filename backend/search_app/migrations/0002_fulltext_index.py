@@ -0,0 +1,112 @@
+# Full-text index over SearchDocument for the database in use, and the
+# initial documents for existing rows.
+
+from django.db import migrations
+
+
+TABLE = "search_app_searchdocument"
+FTS_TABLE = "search_app_searchdocument_fts"
+
+POSTGRES_SQL = [
+    f"""
+    ALTER TABLE {TABLE} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', title), 'A') ||
+        setweight(to_tsvector('english', body), 'B')
+    ) STORED
+    """,
+    f"CREATE INDEX {TABLE}_vector_idx ON {TABLE} USING GIN (search_vector)",
+]
+POSTGRES_REVERSE_SQL = [f"ALTER TABLE {TABLE} DROP COLUMN search_vector"]
+
+SQLITE_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, body, content='{TABLE}', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {TABLE}_ai AFTER INSERT ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {TABLE}_ad AFTER DELETE ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {TABLE}_au AFTER UPDATE ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+SQLITE_REVERSE_SQL = [
+    f"DROP TRIGGER IF EXISTS {TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+# kind -> (model, title fields, body fields), as in search_app.index.SOURCES
+SOURCES = {
+    "client": ("clients_app.Client", ("name",), ("company", "contact_email", "notes")),
+    "project": ("projects_app.Project", ("title",), ("description",)),
+    "inquiry": (
+        "inquiries.Inquiry",
+        ("client_name", "client_company"),
+        ("client_email", "message", "notes"),
+    ),
+    "client_note": ("clients_app.ClientNote", ("title",), ("content",)),
+    "project_note": ("projects_app.ProjectNote", ("title",), ("content",)),
+}
+
+
+def _join(values):
+    return " ".join(str(value) for value in values if value)
+
+
+def _run(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_index(apps, schema_editor):
+    _run(schema_editor, {"postgresql": POSTGRES_SQL, "sqlite": SQLITE_SQL})
+
+    SearchDocument = apps.get_model("search_app", "SearchDocument")
+    for kind, (label, title_fields, body_fields) in SOURCES.items():
+        documents = [
+            SearchDocument(
+                kind=kind,
+                object_id=pk,
+                user_id=user_id,
+                title=_join(values[: len(title_fields)])[:255],
+                body=_join(values[len(title_fields) :]),
+            )
+            for pk, user_id, *values in apps.get_model(label)
+            .objects.values_list("pk", "user_id", *title_fields, *body_fields)
+            .iterator()
+        ]
+        SearchDocument.objects.bulk_create(documents, batch_size=1000)
+
+
+def drop_index(apps, schema_editor):
+    _run(
+        schema_editor,
+        {"postgresql": POSTGRES_REVERSE_SQL, "sqlite": SQLITE_REVERSE_SQL},
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("search_app", "0001_initial"),
+        ("clients_app", "0003_clientnote_reminder_sent_and_more"),
+        ("projects_app", "0006_project_inquiry"),
+        ("inquiries", "0006_inquiry_inquiries_i_reminde_1ea9c1_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
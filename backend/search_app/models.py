@@ -0,0 +1,36 @@
+from django.db import models
+from django.contrib.auth.models import User
+
+
+class SearchDocument(models.Model):
+    """
+    Searchable text of one client, project, inquiry or note.
+
+    A denormalized copy kept in sync by signals (see search_app.index). The
+    full-text index over it is created by the migrations for the database in
+    use: a generated ``search_vector`` tsvector column with a GIN index on
+    PostgreSQL, an FTS5 table maintained by triggers on SQLite.
+    """
+    KIND_CHOICES = [
+        ('client', 'Client'),
+        ('project', 'Project'),
+        ('inquiry', 'Inquiry'),
+        ('client_note', 'Client Note'),
+        ('project_note', 'Project Note'),
+    ]
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_documents')
+
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True, default='')
+
+    class Meta:
+        verbose_name = "Search Document"
+        verbose_name_plural = "Search Documents"
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_document'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.title}"
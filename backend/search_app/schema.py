@@ -0,0 +1,46 @@
+# search_app/schema.py
+
+import graphene
+from backend.query_budget import query_budget
+from .index import DEFAULT_LIMIT, search
+from .models import SearchDocument
+
+
+SearchKindEnum = graphene.Enum('SearchKindEnum', [(kind.upper(), kind) for kind, _label in SearchDocument.KIND_CHOICES])
+
+MAX_LIMIT = 100
+
+
+class SearchResultType(graphene.ObjectType):
+    """One ranked search hit; ``id`` is the id of the client, project, inquiry or note."""
+    kind = graphene.Field(SearchKindEnum)
+    id = graphene.ID()
+    title = graphene.String()
+    snippet = graphene.String()
+    rank = graphene.Float()
+
+
+class SearchQuery(graphene.ObjectType):
+    search = graphene.List(
+        SearchResultType,
+        q=graphene.String(required=True),
+        kinds=graphene.List(SearchKindEnum),
+        limit=graphene.Int(),
+    )
+
+    @staticmethod
+    @query_budget(1)
+    def resolve_search(root, info, q, kinds=None, limit=DEFAULT_LIMIT):
+        if not info.context.user.is_authenticated:
+            return []
+        kinds = [getattr(kind, 'value', kind) for kind in kinds or []]
+        return [
+            SearchResultType(
+                kind=result['kind'],
+                id=result['object_id'],
+                title=result['title'],
+                snippet=result['snippet'],
+                rank=result['rank'],
+            )
+            for result in search(info.context.user, q, kinds=kinds, limit=min(limit, MAX_LIMIT))
+        ]
@@ -0,0 +1,25 @@
+# search_app/signals.py
+
+from django.db.models.signals import post_delete, post_save
+
+from .index import SOURCES, index_objects, remove_objects
+
+
+def _connect(kind, source):
+    model = source.get_model()
+
+    def update_document(sender, instance, update_fields=None, raw=False, **kwargs):
+        # Saves that only touch unindexed fields leave the document as is
+        if raw or (update_fields is not None and not source.fields & set(update_fields)):
+            return
+        index_objects(kind, [instance])
+
+    def remove_document(sender, instance, **kwargs):
+        remove_objects(kind, [instance.pk])
+
+    post_save.connect(update_document, sender=model, weak=False, dispatch_uid=f'search_index_{kind}')
+    post_delete.connect(remove_document, sender=model, weak=False, dispatch_uid=f'search_remove_{kind}')
+
+
+for kind, source in SOURCES.items():
+    _connect(kind, source)
@@ -0,0 +1,47 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from clients_app.models import Client, ClientNote
+from inquiries.models import Inquiry
+from .index import rebuild, search
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='x')
+        self.client_record = Client.objects.create(
+            user=self.user, name='Acme Corporation', contact_email='info@acme.com', notes='Builds rockets'
+        )
+
+    def results(self, text, **kwargs):
+        return [(result['kind'], result['object_id']) for result in search(self.user, text, **kwargs)]
+
+    def test_prefix_matching_ranked_and_scoped_to_user(self):
+        other = User.objects.create_user('other', password='x')
+        Client.objects.create(user=other, name='Acme Other', contact_email='x@acme.com')
+        note = ClientNote.objects.create(
+            client=self.client_record, user=self.user, title='Rocket launch', content='Kickoff call'
+        )
+
+        self.assertEqual(self.results('acm'), [('client', self.client_record.id)])
+        # Title matches outrank body matches
+        self.assertEqual(
+            self.results('rocket'), [('client_note', note.id), ('client', self.client_record.id)]
+        )
+        self.assertEqual(self.results('rocket', kinds=['client']), [('client', self.client_record.id)])
+        self.assertEqual(self.results('!!'), [])
+
+    def test_documents_follow_saves_deletes_and_rebuilds(self):
+        self.client_record.name = 'Globex'
+        self.client_record.save()
+        self.assertEqual(self.results('glob'), [('client', self.client_record.id)])
+
+        inquiries = Inquiry.objects.bulk_create([
+            Inquiry(user=self.user, client_name='Jane Roe', client_email='jane@roe.com', message='Bakery site')
+        ])
+        self.assertEqual(self.results('bakery'), [])
+        rebuild(['inquiry'])
+        self.assertEqual(self.results('bakery'), [('inquiry', inquiries[0].id)])
+
+        self.client_record.delete()
+        self.assertEqual(self.results('glob'), [])
@@ -4,6 +4,7 @@ from django.db import transaction, models
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User
 from django.conf import settings
+from backend.query_budget import query_budget
 from .models import TimeLog, TimeLogEntry
 from typing import Dict, Any, List
 
@@ -86,12 +87,13 @@ class TimeLogQuery(graphene.ObjectType):
     time_log_analytics = graphene.Field(graphene.JSONString)
 
     @staticmethod
+    @query_budget(2)
     def resolve_all_time_logs(root, info, status=None, client_id=None, project_id=None, task_id=None, date_from=None, date_to=None, limit=None, offset=None):
         # TEMPORARILY DISABLE AUTH FILTERING FOR DEBUGGING
         # if not info.context.user.is_authenticated:
         #     return TimeLog.objects.none()
         # queryset = TimeLog.objects.filter(user=info.context.user)
-        queryset = TimeLog.objects.all()
+        queryset = TimeLog.objects.all().select_related('user', 'client', 'project', 'task')
 
         if status:
             queryset = queryset.filter(status=status)
@@ -120,18 +122,21 @@ class TimeLogQuery(graphene.ObjectType):
         return queryset
 
     @staticmethod
+    @query_budget(2)
     def resolve_time_log(root, info, id):
         if not info.context.user.is_authenticated:
             return None
         return get_object_or_404(TimeLog, pk=id, user=info.context.user)
 
     @staticmethod
+    @query_budget(1)
     def resolve_time_log_entries(root, info, time_log_id):
         if not info.context.user.is_authenticated:
             return TimeLogEntry.objects.none()
         return TimeLogEntry.objects.filter(time_log_id=time_log_id, time_log__user=info.context.user)
 
     @staticmethod
+    @query_budget(4)
     def resolve_time_log_analytics(root, info):
         if not info.context.user.is_authenticated:
             return "{}"
@@ -1,22 +1,18 @@
 import React from 'react';
+import { useQuery } from '@tanstack/react-query';
 import { BsCalendar, BsExclamationTriangle } from 'react-icons/bs';
 import { Link } from 'react-router-dom';
+import apiService from '../services/api';
 
-const UpcomingDeadlinesWidget = ({ projects }) => {
-  // Filter projects due within the next 7 days
-  const upcomingDeadlines = projects
-    ?.filter(p => p.endDate)
-    .filter(p => {
-      const dueDate = new Date(p.endDate);
-      const today = new Date();
-      const sevenDaysFromNow = new Date(today);
-      sevenDaysFromNow.setDate(today.getDate() + 7);
-      return dueDate >= today && dueDate <= sevenDaysFromNow;
-    })
-    .sort((a, b) => new Date(a.endDate) - new Date(b.endDate))
-    .slice(0, 5) || [];
+const UpcomingDeadlinesWidget = () => {
+  // Incomplete milestones due within the next 7 days, overdue ones first
+  const { data: upcomingDeadlines = [] } = useQuery({
+    queryKey: ['upcomingDeadlines'],
+    queryFn: () => apiService.getUpcomingDeadlines(7, 5)
+  });
 
-  const isOverdue = (dueDate) => new Date(dueDate) < new Date();
+  const isOverdue = (milestone) =>
+    milestone.status === 'OVERDUE' || new Date(milestone.dueDate) < new Date(new Date().toDateString());
 
   return (
     <div className="bg-gradient-to-br from-[#0015AA] to-[#003366] p-6 rounded-xl shadow-lg hover:shadow-2xl transition-all duration-300 transform hover:scale-105 hover:-translate-y-1 border border-white/10">
@@ -25,26 +21,26 @@ const UpcomingDeadlinesWidget = ({ projects }) => {
         Upcoming Deadlines
       </h3>
       <div className="space-y-3">
-        {upcomingDeadlines.map(project => (
+        {upcomingDeadlines.map(milestone => (
           <Link
-            key={project.id}
-            to={`/projects/${project.id}`}
+            key={milestone.id}
+            to={`/projects/${milestone.project.id}`}
             className="block p-3 bg-white/10 backdrop-blur-sm rounded-lg hover:bg-white/20 transition-all duration-300 border border-white/20 hover:border-[#FBB03B]/50 transform hover:scale-105"
           >
             <div className="flex items-center justify-between">
               <div className="flex-1">
-                <h4 className="font-medium text-white">{project.title}</h4>
-                <p className="text-sm text-white/70">{project.clientType}</p>
+                <h4 className="font-medium text-white">{milestone.title}</h4>
+                <p className="text-sm text-white/70">{milestone.project.title}</p>
               </div>
               <div className="text-right">
                 <div className={`text-sm font-medium flex items-center ${
-                  isOverdue(project.endDate) ? 'text-red-300' : 'text-white'
+                  isOverdue(milestone) ? 'text-red-300' : 'text-white'
                 }`}>
-                  {isOverdue(project.endDate) && <BsExclamationTriangle className="mr-1" />}
-                  {new Date(project.endDate).toLocaleDateString()}
+                  {isOverdue(milestone) && <BsExclamationTriangle className="mr-1" />}
+                  {new Date(milestone.dueDate).toLocaleDateString()}
                 </div>
                 <div className="text-xs text-white/60">
-                  {Math.ceil((new Date(project.endDate) - new Date()) / (1000 * 60 * 60 * 24))} days
+                  {Math.ceil((new Date(milestone.dueDate) - new Date()) / (1000 * 60 * 60 * 24))} days
                 </div>
               </div>
             </div>
@@ -58,4 +54,4 @@ const UpcomingDeadlinesWidget = ({ projects }) => {
   );
 };
 
-export default UpcomingDeadlinesWidget;
\ No newline at end of file
+export default UpcomingDeadlinesWidget;
@@ -165,7 +165,7 @@ const ProjectsListPage = () => {
 
         {/* 4. Alerts and Planning */}
         <div className="grid grid-cols-1 lg:grid-cols-3 gap-6">
-          <UpcomingDeadlinesWidget projects={displayProjects} />
+          <UpcomingDeadlinesWidget />
           <RecentActivityFeed timeLogs={timeLogs} invoices={invoices} />
           <QuickClientProjectEntry />
         </div>
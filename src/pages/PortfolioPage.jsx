@@ -168,6 +168,8 @@ const PortfolioPage = () => {
                                 </div>
                                 <img
                                     src={sourceProjects[activeProjectIndex]?.logo}
+                                    srcSet={sourceProjects[activeProjectIndex]?.logoImage?.srcset || undefined}
+                                    sizes="80px"
                                     alt={`${sourceProjects[activeProjectIndex]?.name || sourceProjects[activeProjectIndex]?.title} Logo`}
                                     className="rounded-full object-cover shadow-md transition-transform duration-300 ml-4 w-20 h-20"
                                 />
@@ -437,6 +439,8 @@ const PortfolioPage = () => {
                                             </div>
                                             <img
                                                 src={project.logo}
+                                                srcSet={project.logoImage?.srcset || undefined}
+                                                sizes="48px"
                                                 alt={`${project.name || project.title} Logo`}
                                                 className="rounded-full object-cover shadow-md transition-transform duration-300 ml-4 w-12 h-12"
                                             />
@@ -79,6 +79,8 @@ const ProjectDetailPage = () => {
                         <div className="flex-shrink-0">
                             <img
                                 src={project.logo}
+                                srcSet={project.logoImage?.srcset || undefined}
+                                sizes="128px"
                                 alt={`${project.title || project.name} Logo`}
                                 className="w-32 h-32 rounded-full object-cover shadow-lg"
                             />
@@ -489,7 +489,7 @@ const ProjectManagementPage = () => {
 
               {/* Upcoming Deadlines */}
               <div>
-                <UpcomingDeadlinesWidget projects={projectsArray} />
+                <UpcomingDeadlinesWidget />
               </div>
             </div>
 
@@ -1,5 +1,8 @@
  // GraphQL API service for communicating with Django backend
 const GRAPHQL_URL = import.meta.env.VITE_GRAPHQL_URL || 'https://vistaforge.onrender.com/graphql/';
+// Pre-rendered public portfolio, served as static files by the backend
+const PORTFOLIO_SNAPSHOT_URL = import.meta.env.VITE_PORTFOLIO_SNAPSHOT_URL
+    || new URL('/static/portfolio/manifest.json', GRAPHQL_URL).href;
 
 class GraphQLService {
     constructor() {
@@ -198,7 +201,25 @@ class GraphQLService {
         }
     }
 
+    // Static portfolio snapshot: the manifest, or a file it lists. Returns
+    // null when the snapshot is unavailable, so callers fall back to GraphQL.
+    async getPortfolioSnapshot(file = null) {
+        try {
+            const response = await fetch(new URL(file || PORTFOLIO_SNAPSHOT_URL, PORTFOLIO_SNAPSHOT_URL));
+            return response.ok ? await response.json() : null;
+        } catch (error) {
+            console.warn('Portfolio snapshot unavailable:', error);
+            return null;
+        }
+    }
+
     async getPublicProjects() {
+        const manifest = await this.getPortfolioSnapshot();
+        const projects = manifest && await this.getPortfolioSnapshot(manifest.projects);
+        if (projects) {
+            return projects;
+        }
+
         // Public access: use allProjects query and request case-study fields
         const query = `
             query GetPublicProjects {
@@ -212,6 +233,9 @@ class GraphQLService {
                     clientType
                     industry
                     caseStudy
+                    logoImage {
+                        srcset
+                    }
                     createdAt
                 }
             }
@@ -222,6 +246,13 @@ class GraphQLService {
     }
 
     async getProject(slug) {
+        const manifest = await this.getPortfolioSnapshot();
+        const caseStudy = manifest?.caseStudies?.[slug];
+        const project = caseStudy && await this.getPortfolioSnapshot(caseStudy);
+        if (project) {
+            return project;
+        }
+
         // For public access, we need to check if project is active
         // Since the backend filters by is_active=True for unauthenticated users,
         // this should work for public viewing
@@ -237,6 +268,15 @@ class GraphQLService {
                     clientType
                     industry
                     caseStudy
+                    logoImage {
+                        srcset
+                    }
+                    caseStudyVisuals {
+                        key
+                        image {
+                            srcset
+                        }
+                    }
                     createdAt
                     updatedAt
                 }
@@ -726,6 +766,26 @@ class GraphQLService {
         return result.deleteMilestone.success;
     }
 
+    async getUpcomingDeadlines(days = 14, limit = 5) {
+        const query = `
+            query GetUpcomingDeadlines($days: Int, $limit: Int) {
+                upcomingDeadlines(days: $days, limit: $limit) {
+                    id
+                    title
+                    dueDate
+                    status
+                    project {
+                        id
+                        title
+                    }
+                }
+            }
+        `;
+
+        const result = await this.request(query, { days, limit });
+        return result.upcomingDeadlines;
+    }
+
     async getTimeLogs() {
       const query = `
         query GetTimeLogs {
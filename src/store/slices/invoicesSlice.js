@@ -101,7 +101,7 @@ export const fetchInvoices = createAsyncThunk(
             id
             title
           }
-          totalAmount
+          total
           status
           issueDate
           dueDate
@@ -110,7 +110,13 @@ export const fetchInvoices = createAsyncThunk(
           tax
           discount
           notes
-          items
+          items {
+            id
+            description
+            quantity
+            rate
+            amount
+          }
         }
       }
     `;
@@ -131,8 +137,8 @@ export const fetchInvoices = createAsyncThunk(
         id: invoice.project.id,
         title: invoice.project.title
       } : null,
-      total: invoice.totalAmount,
-      amount: invoice.totalAmount,
+      total: invoice.total,
+      amount: invoice.total,
       subtotal: invoice.subtotal,
       tax: invoice.tax,
       discount: invoice.discount,